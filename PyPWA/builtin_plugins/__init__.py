@@ -23,12 +23,18 @@ All the plugins that come packaged with PyPWA by default.
 - data - A not so basic data plugin that supports caching, different file 
   types, can be extended, and even supports both parsing and iterating.
 
+- distributed - Runs the same kernels as process across worker daemons on
+  several hosts, or on this machine when no hosts are given.
+
 - minuit - A python / cython minimizer based on ROOT's PyPWA.
 
 - nestle - A python maximizer based off of Multinest.
 
 - process - A Kernel based multiprocessing module. Allows for an 
   embarrassingly parallel calculation to be expanded across multiple cores.
+
+- threads - Runs the same kernels as process inside of threads over views
+  of the data, for functions that spend their time inside of numpy.
   
 For more information about how these plugins work, see their documentation 
 as well.
@@ -0,0 +1,131 @@
+#  coding=utf-8
+#
+#  PyPWA, a scientific analysis toolkit.
+#  Copyright (C) 2016 JLab
+#
+#  This program is free software: you can redistribute it and/or modify
+#  it under the terms of the GNU General Public License as published by
+#  the Free Software Foundation, either version 3 of the License, or
+#  (at your option) any later version.
+#
+#  This program is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#  GNU General Public License for more details.
+#
+#  You should have received a copy of the GNU General Public License
+#  along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+"""
+The batched nestle maximizer
+----------------------------
+Nested sampling like the Nestle plugin, except several of the worst live
+points are replaced in each iteration. Their replacements are proposed
+together and sent to the processes as one batch, so the time of each
+iteration depends on the number of processes instead of on the time it
+takes to send each point and wait on its result. The prior is also called
+on the whole batch when it can handle a matrix of points.
+
+The results are the same as nestle's, and are saved to the same files and
+tables as the Nestle plugin's. The sampling loop itself lives in
+PyPWA.libs.nested_sampling, which the Nestle plugin also uses to checkpoint.
+
+- _setup - Provides the interface between the plugin and the configurator.
+
+- batched - The optimizer object itself.
+"""
+
+
+from PyPWA import AUTHOR, VERSION
+from PyPWA.builtin_plugins.batch_nestle import _setup
+from PyPWA.builtin_plugins.nestle import _setup as nestle_setup
+from PyPWA.initializers.configurator import options
+
+__credits__ = ["Mark Jones"]
+__author__ = AUTHOR
+__version__ = VERSION
+
+
+class BatchNestleOptions(options.Plugin):
+    plugin_name = "Batch Nestle"
+    setup = _setup.BatchNestleSetup
+    provides = options.Types.OPTIMIZER
+    defined_function = nestle_setup.NestlePriorFunction
+    module_comment = "Nestle's nested sampling, evaluated in batches."
+
+    default_options = {
+        "prior location": "/location/to/prior.py",
+        "prior name": "prior_function",
+        "ndim": 1,
+        "npoints": 100,
+        "method": "single",
+        "batch size": 8,
+        "update interval": None,
+        "npdim": None,
+        "maxiter": None,
+        "maxcall": None,
+        "dlogz": None,
+        "decline_factor": None
+    }
+
+    option_difficulties = {
+        "prior location": options.Levels.REQUIRED,
+        "prior name": options.Levels.REQUIRED,
+        "ndim": options.Levels.REQUIRED,
+        "npoints": options.Levels.OPTIONAL,
+        "method": options.Levels.OPTIONAL,
+        "batch size": options.Levels.OPTIONAL,
+        "update interval": options.Levels.ADVANCED,
+        "npdim": options.Levels.ADVANCED,
+        "maxiter": options.Levels.ADVANCED,
+        "maxcall": options.Levels.ADVANCED,
+        "dlogz": options.Levels.ADVANCED,
+        "decline_factor": options.Levels.ADVANCED
+    }
+
+    option_types = {
+        "prior location": str,
+        "prior name": str,
+        "ndim": int,
+        "npoints": int,
+        "method": ["single", "multi"],
+        "batch size": int,
+        "update interval": int,
+        "npdim": int,
+        "maxiter": int,
+        "maxcall": int,
+        "dlogz": float,
+        "decline_factor": float
+    }
+
+    option_comments = {
+        "prior location":
+            "The path of the file containing the prior.",
+        "prior name":
+            "The name of the prior function.",
+        "ndim":
+            "Number of parameters returned by prior.",
+        "npoints":
+            "Number of active points.",
+        "method":
+            "Method to select new points.",
+        "batch size":
+            "How many live points are replaced in each iteration, at least "
+            "the number of processes.",
+        "update interval":
+            "Only update the new point selector after this many points "
+            "have been replaced.",
+        "npdim":
+            "Number of parameters accepted by prior.",
+        "maxiter":
+            "Maximum number of replaced points.",
+        "maxcall":
+            "Maximum number of likelihood evaluations.",
+        "dlogz":
+            "If supplied, iteration will stop when the estimated "
+            "contribution of the remaining prior volume to the total "
+            "evidence falls below this threshold.",
+        "decline_factor":
+            "If supplied, iteration will stop when the weight of newly "
+            "saved samples has been declining for x consecutive samples."
+    }
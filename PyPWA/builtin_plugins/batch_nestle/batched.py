@@ -0,0 +1,145 @@
+#  coding=utf-8
+#
+#  PyPWA, a scientific analysis toolkit.
+#  Copyright (C) 2016 JLab
+#
+#  This program is free software: you can redistribute it and/or modify
+#  it under the terms of the GNU General Public License as published by
+#  the Free Software Foundation, either version 3 of the License, or
+#  (at your option) any later version.
+#
+#  This program is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#  GNU General Public License for more details.
+#
+#  You should have received a copy of the GNU General Public License
+#  along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+"""
+Batched Multinest Maximization
+------------------------------
+Nested sampling that replaces several live points at once, the proposed
+points of each iteration are sent to the processes as a single batch. The
+results are nestle's, so they are saved exactly like the Nestle plugin's.
+
+- _BatchParserObject - Hands the user's function a single point, whether
+  it came by itself or as part of a batch.
+- BatchNestedSampling - The actual optimizer object.
+"""
+
+import logging
+from typing import Any, Callable, Tuple
+from typing import Optional as Opt
+
+import nestle
+import numpy
+
+from PyPWA import AUTHOR, VERSION
+from PyPWA.builtin_plugins.nestle import _save_results
+from PyPWA.libs import checkpoints
+from PyPWA.libs import nested_sampling
+from PyPWA.libs.interfaces import optimizers
+
+__credits__ = ["Mark Jones"]
+__author__ = AUTHOR
+__version__ = VERSION
+
+
+class _BatchParserObject(optimizers.OptimizerOptionParser):
+
+    def convert(self, *args):
+        # type: (Tuple[Tuple[Any]]) -> numpy.ndarray
+        return numpy.ravel(args[0][0])
+
+
+class BatchNestedSampling(optimizers.Optimizer):
+
+    OPTIMIZER_TYPE = optimizers.OptimizerTypes.MAXIMIZER
+    CHECKPOINTS = True
+
+    __LOGGER = logging.getLogger(__name__ + ".BatchNestedSampling")
+
+    def __init__(
+            self,
+            prior,  # type: Callable[[numpy.ndarray], numpy.ndarray]
+            ndim,  # type: int
+            npoints=100,  # type: int
+            method="single",  # type: str
+            batch_size=8,  # type: int
+            update_interval=None,  # type: Opt[int]
+            npdim=None,  # type: Opt[int]
+            maxiter=None,  # type: Opt[int]
+            maxcall=None,  # type: Opt[int]
+            dlogz=None,  # type: Opt[float]
+            decline_factor=None  # type: Opt[float]
+    ):
+        # type: (...) -> None
+        self.__save_data = _save_results.SaveData()
+        self.__prior = prior
+        self.__ndim = ndim
+        self.__npoints = npoints
+        self.__method = method
+        self.__batch_size = batch_size
+        self.__update_interval = update_interval
+        self.__npdim = npdim
+        self.__maxiter = maxiter
+        self.__maxcall = maxcall
+        self.__dlogz = dlogz
+        self.__decline_factor = decline_factor
+        self.__calc_function = None  # type: Callable[[Any], float]
+        self.__batch_function = None  # type: Callable[[Any], Any]
+        self.__results = None  # type: nestle.Result
+        self.__checkpoint = None  # type: checkpoints.Checkpoint
+        self.__resume = False
+
+    def main_options(
+            self,
+            calc_function,  # type: Callable[[Any], float]
+            fitting_type=False,  # type: optimizers.LikelihoodTypes
+            batch_function=None,  # type: Callable[[Any], Any]
+            gradient_function=None  # type: Callable[[Any], Any]
+    ):
+        # type: (...) -> None
+        self.__calc_function = calc_function
+        self.__batch_function = batch_function
+        if batch_function is None:
+            self.__LOGGER.warning(
+                "Batches can't be calculated, each point will be sent to "
+                "the processes by itself."
+            )
+
+    def start(self):
+        sampler = nested_sampling.BatchSampler(
+            nested_sampling.BatchPrior(self.__prior, self.__ndim),
+            self.__evaluate, self.__npdim or self.__ndim, self.__npoints,
+            self.__method, self.__batch_size,
+            nested_sampling.get_update_interval(
+                self.__update_interval, self.__npoints
+            ),
+            self.__maxiter or float("inf"), self.__maxcall or float("inf"),
+            nested_sampling.get_dlogz(self.__dlogz, self.__decline_factor),
+            self.__decline_factor, self.__checkpoint, self.__resume
+        )
+        self.__results = sampler.sample()
+
+    def set_checkpoint(self, checkpoint, resume=False):
+        # type: (checkpoints.Checkpoint, bool) -> None
+        self.__checkpoint = checkpoint
+        self.__resume = resume
+
+    def __evaluate(self, points):
+        # type: (numpy.ndarray) -> numpy.ndarray
+        if self.__batch_function is None:
+            return numpy.array(
+                [self.__calc_function(point) for point in points]
+            )
+        return self.__batch_function(points)
+
+    def return_parser(self):
+        # type: () -> _BatchParserObject
+        return _BatchParserObject()
+
+    def save_extra(self, save_name):
+        # type: (str) -> None
+        self.__save_data.save_data(save_name, self.__results)
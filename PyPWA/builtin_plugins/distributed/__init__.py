@@ -0,0 +1,92 @@
+#  coding=utf-8
+#
+#  PyPWA, a scientific analysis toolkit.
+#  Copyright (C) 2016 JLab
+#
+#  This program is free software: you can redistribute it and/or modify
+#  it under the terms of the GNU General Public License as published by
+#  the Free Software Foundation, either version 3 of the License, or
+#  (at your option) any later version.
+#
+#  This program is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#  GNU General Public License for more details.
+#
+#  You should have received a copy of the GNU General Public License
+#  along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+"""
+This is the builtin plugin for distributed processing. It takes the same
+kernels and interface as the multiprocessing plugin, but spreads them over
+worker daemons running on several hosts, which talk to the master over TCP.
+
+The data is written once into the shard folder, which has to be on a file
+system that every host can read, and each host only reads its own share of
+it. Each host sums the values of its processes before sending them on, so
+duplex kernels must return values that can be summed, and their interface
+receives one connection for each host instead of one for each process.
+
+When no hosts are given, the plugin starts its own daemons on this machine
+instead, which is useful for testing a setup before moving it to a cluster.
+
+Example:
+    foreman = DistributedForeman(["node1:7431", "node2:7431"], "secret")
+    foreman.main_options(data, AbstractKernel, AbstractInterface)
+    interface = foreman.fetch_interface()
+    processed_value = interface.run("Your args")
+"""
+
+from PyPWA import AUTHOR, VERSION
+from PyPWA.builtin_plugins.distributed import _setup
+from PyPWA.initializers.configurator import options
+
+__credits__ = ["Mark Jones"]
+__author__ = AUTHOR
+__version__ = VERSION
+
+
+class Distributed(options.Plugin):
+
+    plugin_name = "Distributed Processing"
+    setup = _setup.DistributedSetup
+    provides = options.Types.KERNEL_PROCESSING
+    defined_function = None
+    module_comment = "Spreads the kernels over worker daemons on several " \
+                     "hosts"
+
+    default_options = {
+        "hosts": None,
+        "authentication key": None,
+        "shard folder": None,
+        "local daemons": 2,
+        "processes per local daemon": 1
+    }
+
+    option_difficulties = {
+        "hosts": options.Levels.OPTIONAL,
+        "authentication key": options.Levels.OPTIONAL,
+        "shard folder": options.Levels.OPTIONAL,
+        "local daemons": options.Levels.ADVANCED,
+        "processes per local daemon": options.Levels.ADVANCED
+    }
+
+    option_types = {
+        "hosts": list,
+        "authentication key": str,
+        "shard folder": str,
+        "local daemons": int,
+        "processes per local daemon": int
+    }
+
+    option_comments = {
+        "hosts": "The daemons to use, each as name:port. Leave empty to "
+                 "start local daemons instead.",
+        "authentication key": "The key the daemons were started with, "
+                              "local daemons use a random key.",
+        "shard folder": "A folder every host can read, the data is written "
+                        "here for the hosts to load.",
+        "local daemons": "How many daemons to start when there are no hosts.",
+        "processes per local daemon": "Number of processes for each of the "
+                                      "local daemons."
+    }
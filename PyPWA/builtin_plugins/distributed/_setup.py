@@ -0,0 +1,49 @@
+#  coding=utf-8
+#
+#  PyPWA, a scientific analysis toolkit.
+#  Copyright (C) 2016 JLab
+#
+#  This program is free software: you can redistribute it and/or modify
+#  it under the terms of the GNU General Public License as published by
+#  the Free Software Foundation, either version 3 of the License, or
+#  (at your option) any later version.
+#
+#  This program is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#  GNU General Public License for more details.
+#
+#  You should have received a copy of the GNU General Public License
+#  along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+from PyPWA import AUTHOR, VERSION
+from PyPWA.builtin_plugins.distributed import foreman
+from PyPWA.initializers.configurator import options
+
+__credits__ = ["Mark Jones"]
+__author__ = AUTHOR
+__version__ = VERSION
+
+
+class DistributedSetup(options.Setup):
+
+    __command = None
+    __interface = None
+
+    def __init__(self, command):
+        self.__command = command
+        self.__setup_interface()
+
+    def __setup_interface(self):
+        self.__interface = foreman.DistributedForeman(
+            hosts=self.__command.hosts,
+            authentication_key=self.__command.authentication_key,
+            shard_folder=self.__command.shard_folder,
+            local_daemons=self.__command.local_daemons,
+            processes_per_local_daemon=(
+                self.__command.processes_per_local_daemon
+            )
+        )
+
+    def return_interface(self):
+        return self.__interface
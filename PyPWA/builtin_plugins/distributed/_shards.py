@@ -0,0 +1,164 @@
+#  coding=utf-8
+#
+#  PyPWA, a scientific analysis toolkit.
+#  Copyright (C) 2016 JLab
+#
+#  This program is free software: you can redistribute it and/or modify
+#  it under the terms of the GNU General Public License as published by
+#  the Free Software Foundation, either version 3 of the License, or
+#  (at your option) any later version.
+#
+#  This program is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#  GNU General Public License for more details.
+#
+#  You should have received a copy of the GNU General Public License
+#  along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+"""
+Data Shards on a Shared File System
+-----------------------------------
+The master writes each array once into a folder that every host can see,
+and only sends each host which range of those files belongs to it. The
+hosts then read their own range straight from the file system instead of
+receiving the data over the network.
+
+- ShardFile - A picklable range of rows inside of a saved array.
+- ShardFolder - Writes the arrays of each run into their own folder, and
+  removes that folder once it's no longer needed.
+- split_ranges - Cuts a length into contiguous ranges sized by weight.
+- load_packet - Replaces every ShardFile inside a packet with its rows.
+"""
+
+import atexit
+import itertools
+import logging
+import os
+import shutil
+import tempfile
+from typing import Any, Dict, List, Tuple
+
+import numpy
+
+from PyPWA import AUTHOR, VERSION
+
+__credits__ = ["Mark Jones"]
+__author__ = AUTHOR
+__version__ = VERSION
+
+
+_COUNTER = itertools.count()
+
+
+class ShardFile(object):
+
+    def __init__(self, location, start, stop):
+        # type: (str, int, int) -> None
+        self.location = location
+        self.start = start
+        self.stop = stop
+
+    def __len__(self):
+        # type: () -> int
+        return self.stop - self.start
+
+    def load(self):
+        # type: () -> numpy.ndarray
+        # Only the pages of this host's rows are ever read from the disk.
+        saved = numpy.load(self.location, mmap_mode="r")
+        return saved[self.start:self.stop]
+
+
+def split_ranges(length, weights):
+    # type: (int, List[int]) -> List[Tuple[int, int]]
+    total = sum(weights)
+    ranges, start, cumulative = [], 0, 0
+    for weight in weights:
+        cumulative += weight
+        stop = (length * cumulative) // total
+        ranges.append((start, stop))
+        start = stop
+    return ranges
+
+
+class ShardFolder(object):
+
+    __LOGGER = logging.getLogger(__name__ + ".ShardFolder")
+
+    def __init__(self, folder=None):
+        # type: (str) -> None
+        if folder:
+            self.__folder = folder
+        else:
+            self.__folder = tempfile.gettempdir()
+        self.__location = None  # type: str
+        atexit.register(self.release)
+
+    def shard(self, data, weights):
+        # type: (Dict[str, Any], List[int]) -> List[Dict[str, Any]]
+        self.release()
+        self.__location = os.path.join(
+            self.__folder, "PyPWA-%d-%d" % (os.getpid(), next(_COUNTER))
+        )
+        os.makedirs(self.__location)
+
+        packets = [dict() for weight in weights]
+        for index, (name, value) in enumerate(data.items()):
+            ranges = split_ranges(len(value), weights)
+            shards = self.__shard_value(index, name, value, ranges)
+            for packet, shard in zip(packets, shards):
+                packet[name] = shard
+        return packets
+
+    def __shard_value(self, index, name, value, ranges):
+        # type: (int, str, Any, List[Tuple[int, int]]) -> List[Any]
+        if self.__is_savable(value):
+            location = self.__save(index, name, value)
+            return [ShardFile(location, start, stop) for start, stop in ranges]
+        elif isinstance(value, (list, numpy.ndarray)):
+            self.__LOGGER.debug("'%s' can not be saved, sending it." % name)
+            return [value[start:stop] for start, stop in ranges]
+        else:
+            raise ValueError("Unknown data type: %s!" % type(value))
+
+    @staticmethod
+    def __is_savable(value):
+        # type: (Any) -> bool
+        return (
+            isinstance(value, numpy.ndarray) and value.ndim > 0 and
+            not value.dtype.hasobject
+        )
+
+    def __save(self, index, name, array):
+        # type: (int, str, numpy.ndarray) -> str
+        clean_name = "".join(char for char in name if char.isalnum())
+        location = os.path.join(
+            self.__location, "%d-%s.npy" % (index, clean_name)
+        )
+        numpy.save(location, array)
+        self.__LOGGER.debug(
+            "Saved '%s' (%d bytes) at %s" % (name, array.nbytes, location)
+        )
+        return location
+
+    @property
+    def location(self):
+        # type: () -> str
+        return self.__location
+
+    def release(self):
+        if self.__location:
+            shutil.rmtree(self.__location, ignore_errors=True)
+            self.__location = None
+
+
+def load_packet(packet):
+    # type: (Dict[str, Any]) -> Dict[str, Any]
+    loaded = dict()
+    for name, value in packet.items():
+        if isinstance(value, ShardFile):
+            loaded[name] = value.load()
+        else:
+            loaded[name] = value
+    return loaded
@@ -0,0 +1,360 @@
+#  coding=utf-8
+#
+#  PyPWA, a scientific analysis toolkit.
+#  Copyright (C) 2016 JLab
+#
+#  This program is free software: you can redistribute it and/or modify
+#  it under the terms of the GNU General Public License as published by
+#  the Free Software Foundation, either version 3 of the License, or
+#  (at your option) any later version.
+#
+#  This program is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#  GNU General Public License for more details.
+#
+#  You should have received a copy of the GNU General Public License
+#  along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+"""
+Worker Daemons
+--------------
+A daemon runs on each host, loads the range of the data that belongs to its
+host from the shared file system, and runs the kernels over that data with
+the regular multiprocessing plugin. The results of its processes are summed
+on the host, so the master only receives a single value from each host.
+
+Start a daemon on each host with:
+    PyPWADaemon --address 0.0.0.0 --port 7431 --authentication-key secret
+
+Masters send pickled kernels, so anyone who knows the key can run code on
+the host. Without a key the daemon makes a random one and prints it, and
+without an address it only listens on localhost.
+
+- WorkerDaemon - Serves the masters that connect to it, one at a time.
+- start_local_daemon - Starts a daemon in a process of this machine and
+  returns its address, this is how the plugin runs without any hosts.
+- make_key - A random authentication key.
+- main - The entry point for the daemon program.
+"""
+
+import argparse
+import binascii
+import logging
+import multiprocessing
+import os
+import pickle
+import socket
+import sys
+from multiprocessing import connection
+from typing import Any, Dict, List, Tuple
+
+import numpy
+
+from PyPWA import AUTHOR, VERSION
+from PyPWA.builtin_plugins.distributed import _shards
+from PyPWA.builtin_plugins.process import _topology
+from PyPWA.builtin_plugins.process import foreman
+from PyPWA.libs.interfaces import kernel
+
+__credits__ = ["Mark Jones"]
+__author__ = AUTHOR
+__version__ = VERSION
+
+
+HELLO = "hello"
+
+
+class _OffsetKernel(kernel.Kernel):
+
+    # The processes of a host are numbered from zero, the offset moves
+    # them to their place among the processes of every host, which simplex
+    # interfaces rely on to put the results back in order.
+
+    def __init__(self, process_kernel, offset):
+        # type: (kernel.Kernel, int) -> None
+        self.__kernel = process_kernel
+        self.__offset = offset
+
+    def setup(self):
+        self.__forward_data()
+        self.__kernel.setup()
+
+    def process(self, data=False):
+        # type: (Any) -> Any
+        self.__forward_data()
+        return self.__kernel.process(data)
+
+    def process_batch(self, points):
+        # type: (List[Any]) -> List[Any]
+        self.__forward_data()
+        return self.__kernel.process_batch(points)
+
+    def process_gradient(self, data, names):
+        # type: (Any, List[str]) -> numpy.ndarray
+        self.__forward_data()
+        return self.__kernel.process_gradient(data, names)
+
+    def process_gradient_batch(self, points, names):
+        # type: (List[Any], List[str]) -> numpy.ndarray
+        self.__forward_data()
+        return self.__kernel.process_gradient_batch(points, names)
+
+    def __forward_data(self):
+        # The data is loaded into this kernel, and by dynamic scheduling
+        # again before each chunk, so it's handed down on every call.
+        for name, value in vars(self).items():
+            if not name.startswith("_OffsetKernel__"):
+                setattr(self.__kernel, name, value)
+        self.__kernel.PROCESS_ID = self.PROCESS_ID + self.__offset
+
+
+class _HostInterface(kernel.KernelInterface):
+
+    def __init__(self, duplex):
+        # type: (bool) -> None
+        self.IS_DUPLEX = duplex
+
+    def run(self, communicator, args):
+        # type: (List[Any], Tuple[Any]) -> Any
+        if not self.IS_DUPLEX:
+            return [connection.recv() for connection in communicator]
+
+        for connection in communicator:
+            connection.send(args[0])
+        results = [connection.recv() for connection in communicator]
+        if self.__has_error(results):
+            return kernel.ProcessCodes.ERROR
+        return sum(results)
+
+    def run_batch(self, communicator, points):
+        # type: (List[Any], List[Any]) -> Any
+        for connection in communicator:
+            connection.send((kernel.ProcessCodes.BATCH, points))
+        results = [connection.recv() for connection in communicator]
+        if self.__has_error(results):
+            return kernel.ProcessCodes.ERROR
+
+        total = numpy.zeros(len(points))
+        for result in results:
+            total += numpy.asarray(result)
+        return total
+
+    @staticmethod
+    def __has_error(results):
+        # type: (List[Any]) -> bool
+        return any(result is kernel.ProcessCodes.ERROR for result in results)
+
+
+class WorkerDaemon(object):
+
+    __LOGGER = logging.getLogger(__name__ + ".WorkerDaemon")
+
+    def __init__(self, listener, number_of_processes=None, **foreman_options):
+        # type: (connection.Listener, int, Any) -> None
+        if number_of_processes is None:
+            number_of_processes = _topology.Topology().physical_cores
+        self.__listener = listener
+        self.__number_of_processes = number_of_processes
+        self.__foreman = foreman.CalculationForeman(
+            number_of_processes, **foreman_options
+        )
+        self.__interface = None  # type: kernel.ProcessInterface
+
+    def serve_forever(self):
+        self.__LOGGER.info("Listening on %s:%d" % self.__listener.address)
+        while True:
+            self.serve()
+
+    def serve(self):
+        try:
+            master = self.__listener.accept()
+        except (EOFError, IOError, connection.AuthenticationError) as error:
+            self.__LOGGER.warning("Refused a connection: %s" % error)
+            return
+
+        self.__LOGGER.info("Serving a new master.")
+        master.send((HELLO, self.__number_of_processes, socket.gethostname()))
+        try:
+            while True:
+                self.__handle(master, master.recv())
+        except EOFError:
+            self.__LOGGER.info("The master disconnected.")
+        finally:
+            self.__stop_interface()
+            self.__foreman.close()
+            master.close()
+
+    def __handle(self, master, message):
+        # type: (connection.Connection, Any) -> None
+        if message is kernel.ProcessCodes.SHUTDOWN:
+            self.__stop_interface()
+        elif self.__is_load(message):
+            self.__load(master, *message[1:])
+        else:
+            master.send(self.__calculate(message))
+
+    @staticmethod
+    def __is_load(message):
+        # type: (Any) -> bool
+        return (
+            isinstance(message, tuple) and len(message) == 6 and
+            message[0] is kernel.ProcessCodes.LOAD
+        )
+
+    def __load(
+            self,
+            master,  # type: connection.Connection
+            path,  # type: List[str]
+            pickled_kernel,  # type: bytes
+            packet,  # type: Dict[str, Any]
+            duplex,  # type: bool
+            offset  # type: int
+    ):
+        # type: (...) -> None
+        self.__stop_interface()
+        try:
+            self.__start_kernels(path, pickled_kernel, packet, duplex, offset)
+            if duplex:
+                master.send(kernel.ProcessCodes.LOAD)
+            else:
+                master.send(self.__interface.run())
+                self.__stop_interface()
+        except Exception as error:
+            self.__LOGGER.exception(error)
+            master.send(kernel.ProcessCodes.ERROR)
+
+    def __start_kernels(self, path, pickled_kernel, packet, duplex, offset):
+        # type: (List[str], bytes, Dict[str, Any], bool, int) -> None
+        # The master's path is used so the module that defined the kernel
+        # can be found on the shared file system.
+        for location in path:
+            if location not in sys.path:
+                sys.path.append(location)
+
+        process_kernel = _OffsetKernel(pickle.loads(pickled_kernel), offset)
+        self.__foreman.main_options(
+            _shards.load_packet(packet), process_kernel,
+            _HostInterface(duplex)
+        )
+        self.__interface = self.__foreman.fetch_interface()
+
+    def __calculate(self, value):
+        # type: (Any) -> Any
+        if self.__interface is None:
+            self.__LOGGER.error("Received a value without a kernel!")
+            return kernel.ProcessCodes.ERROR
+        try:
+            if kernel.is_batch(value):
+                return self.__interface.run_batch(value[1])
+            return self.__interface.run(value)
+        except Exception as error:
+            self.__LOGGER.exception(error)
+            return kernel.ProcessCodes.ERROR
+
+    def __stop_interface(self):
+        if self.__interface is not None:
+            self.__interface.stop()
+            self.__interface = None
+
+
+def _serve_locally(address_pipe, authentication_key, number_of_processes):
+    # type: (Any, bytes, int) -> None
+    listener = connection.Listener(
+        ("localhost", 0), authkey=authentication_key
+    )
+    address_pipe.send(listener.address)
+    address_pipe.close()
+
+    # Every local daemon shares the same cores, so none of them pin.
+    daemon = WorkerDaemon(
+        listener, number_of_processes, pin_processes=False
+    )
+    daemon.serve()
+    listener.close()
+
+
+def start_local_daemon(authentication_key, number_of_processes=1):
+    # type: (bytes, int) -> Tuple[multiprocessing.Process, Tuple[str, int]]
+    """
+    The daemon serves a single master then exits. The process isn't a
+    daemonic process, since it starts processes of its own.
+    """
+    receive, send = multiprocessing.Pipe(False)
+    process = multiprocessing.Process(
+        target=_serve_locally,
+        args=(send, authentication_key, number_of_processes)
+    )
+    process.start()
+    send.close()
+    address = receive.recv()
+    receive.close()
+    return process, address
+
+
+def make_key():
+    # type: () -> str
+    return binascii.hexlify(os.urandom(16)).decode()
+
+
+def _parse_arguments(arguments=None):
+    # type: (List[str]) -> argparse.Namespace
+    parser = argparse.ArgumentParser(
+        description="Worker daemon for PyPWA's distributed processing."
+    )
+    parser.add_argument(
+        "--address", type=str, default="localhost",
+        help="Address to listen on, 0.0.0.0 for every interface."
+    )
+    parser.add_argument(
+        "--port", "-p", type=int, required=True, help="Port to listen on."
+    )
+    parser.add_argument(
+        "--processes", type=int, default=_topology.Topology().physical_cores,
+        help="Number of processes to use on this host."
+    )
+    parser.add_argument(
+        "--authentication-key", type=str, default=None,
+        help="Key the masters must know to connect, a random key is made "
+             "and printed when it isn't given."
+    )
+    parser.add_argument(
+        "--scheduling", choices=["static", "dynamic"], default="static",
+        help="How the data is scheduled between this host's processes."
+    )
+    parser.add_argument(
+        "--blas-threads", type=int, default=1,
+        help="Threads BLAS may use inside each process, 0 for any."
+    )
+    parser.add_argument(
+        "--no-pinning", action="store_true", default=False,
+        help="Don't pin each process to a physical core."
+    )
+    return parser.parse_args(arguments)
+
+
+def main(arguments=None):
+    # type: (List[str]) -> None
+    logging.basicConfig(level=logging.INFO)
+    namespace = _parse_arguments(arguments)
+    if namespace.authentication_key is None:
+        namespace.authentication_key = make_key()
+        print("Authentication key: " + namespace.authentication_key)
+
+    listener = connection.Listener(
+        (namespace.address, namespace.port),
+        authkey=namespace.authentication_key.encode()
+    )
+    daemon = WorkerDaemon(
+        listener, namespace.processes, scheduling=namespace.scheduling,
+        blas_threads=namespace.blas_threads,
+        pin_processes=not namespace.no_pinning
+    )
+    try:
+        daemon.serve_forever()
+    except KeyboardInterrupt:
+        listener.close()
+
+
+if __name__ == "__main__":
+    main()
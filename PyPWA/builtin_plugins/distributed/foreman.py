@@ -0,0 +1,265 @@
+#  coding=utf-8
+#
+#  PyPWA, a scientific analysis toolkit.
+#  Copyright (C) 2016 JLab
+#
+#  This program is free software: you can redistribute it and/or modify
+#  it under the terms of the GNU General Public License as published by
+#  the Free Software Foundation, either version 3 of the License, or
+#  (at your option) any later version.
+#
+#  This program is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#  GNU General Public License for more details.
+#
+#  You should have received a copy of the GNU General Public License
+#  along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+"""
+Distributed Processing
+----------------------
+Runs the kernels across worker daemons on several hosts. Each host receives
+a share of the data sized by how many processes it has, reads that share
+from the shared file system, and sums the results of its own processes
+before sending them to the master. Duplex interfaces therefore see one
+connection for each host, while simplex interfaces still see one
+connection for each process.
+
+- _Host - The master's connection to a single daemon.
+- _ProcessConnection - Receives the result of one of a host's simplex
+  processes.
+- _DistributedInterface - Interface between the hosts and the requesting
+  plugins.
+- DistributedForeman - Connects to the hosts, or starts local daemons when
+  there are none, and loads the kernels into them.
+"""
+
+import atexit
+import logging
+import pickle
+import sys
+from multiprocessing import connection
+from typing import Any, Dict, List, Tuple
+from typing import Optional as Opt
+
+from PyPWA import AUTHOR, VERSION
+from PyPWA.builtin_plugins.distributed import _shards
+from PyPWA.builtin_plugins.distributed import daemon
+from PyPWA.libs.interfaces import kernel
+
+__credits__ = ["Mark Jones"]
+__author__ = AUTHOR
+__version__ = VERSION
+
+
+class _Host(object):
+
+    __LOGGER = logging.getLogger(__name__ + "._Host")
+
+    def __init__(self, address, authentication_key):
+        # type: (Tuple[str, int], bytes) -> None
+        self.connection = connection.Client(
+            address, authkey=authentication_key
+        )
+        hello, self.processes, self.name = self.connection.recv()
+        self.__results = None  # type: List[Any]
+        self.__LOGGER.info(
+            "Connected to %s with %d processes." % (self.name, self.processes)
+        )
+
+    def load(self, path, pickled_kernel, packet, duplex, offset):
+        # type: (List[str], bytes, Dict[str, Any], bool, int) -> None
+        self.__results = None
+        self.connection.send((
+            kernel.ProcessCodes.LOAD, path, pickled_kernel, packet, duplex,
+            offset
+        ))
+
+    def wait_until_loaded(self):
+        if self.connection.recv() is not kernel.ProcessCodes.LOAD:
+            raise RuntimeError("%s failed to load the kernel!" % self.name)
+
+    def result(self, index):
+        # type: (int) -> Any
+        if self.__results is None:
+            self.__results = self.connection.recv()
+        if self.__results is kernel.ProcessCodes.ERROR:
+            return kernel.ProcessCodes.ERROR
+        return self.__results[index]
+
+
+class _ProcessConnection(object):
+
+    def __init__(self, host, index):
+        # type: (_Host, int) -> None
+        self.__host = host
+        self.__index = index
+
+    def recv(self):
+        # type: () -> Any
+        return self.__host.result(self.__index)
+
+
+class _DistributedInterface(kernel.ProcessInterface):
+
+    __LOGGER = logging.getLogger(__name__ + "._DistributedInterface")
+
+    def __init__(
+            self,
+            interface_kernel,  # type: kernel.KernelInterface
+            connections,  # type: List[Any]
+            hosts  # type: List[_Host]
+    ):
+        # type: (...) -> None
+        self.__interface = interface_kernel
+        self.__connections = connections
+        self.__hosts = hosts
+
+    def run(self, *args):
+        return self.__interface.run(self.__connections, args)
+
+    def run_batch(self, points):
+        return self.__interface.run_batch(self.__connections, points)
+
+    def stop(self, force=False):
+        # The daemons own their processes, so even a forced stop is only
+        # a request that the daemons stop them.
+        if force:
+            self.__LOGGER.debug("Remote processes can't be terminated.")
+        if self.__interface.IS_DUPLEX:
+            for host in self.__hosts:
+                host.connection.send(kernel.ProcessCodes.SHUTDOWN)
+
+    @property
+    def is_alive(self):
+        return not self.__hosts[0].connection.closed
+
+
+class DistributedForeman(kernel.KernelProcessing):
+
+    __LOGGER = logging.getLogger(__name__ + ".DistributedForeman")
+
+    def __init__(
+            self, hosts=None, authentication_key=None, shard_folder=None,
+            local_daemons=2, processes_per_local_daemon=1
+    ):
+        # type: (List[str], str, str, int, int) -> None
+        self.__addresses = [self.__parse_host(host) for host in hosts or []]
+        self.__authentication_key = self.__get_key(authentication_key)
+        self.__shard_folder = _shards.ShardFolder(shard_folder)
+        self.__local_daemons = local_daemons
+        self.__processes_per_local_daemon = processes_per_local_daemon
+        self.__daemon_processes = []  # type: List[Any]
+        self.__hosts = None  # type: List[_Host]
+        self.__interface = None  # type: _DistributedInterface
+        atexit.register(self.close)
+
+    def __get_key(self, authentication_key):
+        # type: (Opt[str]) -> bytes
+        if authentication_key:
+            return authentication_key.encode()
+        elif self.__addresses:
+            raise ValueError(
+                "The hosts need the authentication key they were started "
+                "with, set 'authentication key'."
+            )
+
+        # The local daemons are started by this process, so they can
+        # share a key that nobody else knows.
+        return daemon.make_key().encode()
+
+    @staticmethod
+    def __parse_host(host):
+        # type: (str) -> Tuple[str, int]
+        name, separator, port = host.rpartition(":")
+        if not separator:
+            raise ValueError("Host '%s' needs a port, name:port" % host)
+        return name, int(port)
+
+    def main_options(
+            self,
+            data,  # type: Dict[str, Any]
+            process_kernel,  # type: kernel.Kernel
+            internal_interface  # type: kernel.KernelInterface
+    ):
+        # type: (...) -> None
+        if self.__hosts is None:
+            self.__connect()
+
+        duplex = internal_interface.IS_DUPLEX
+        self.__load_hosts(data, process_kernel, duplex)
+        if duplex:
+            for host in self.__hosts:
+                host.wait_until_loaded()
+            connections = [host.connection for host in self.__hosts]
+        else:
+            connections = self.__process_connections()
+
+        self.__interface = _DistributedInterface(
+            internal_interface, connections, self.__hosts
+        )
+
+    def __connect(self):
+        addresses = self.__addresses
+        if not addresses:
+            addresses = self.__start_local_daemons()
+        self.__hosts = [
+            _Host(address, self.__authentication_key) for address in addresses
+        ]
+
+    def __start_local_daemons(self):
+        # type: () -> List[Tuple[str, int]]
+        self.__LOGGER.info(
+            "No hosts given, starting %d local daemons." % self.__local_daemons
+        )
+        addresses = []
+        for index in range(self.__local_daemons):
+            process, address = daemon.start_local_daemon(
+                self.__authentication_key, self.__processes_per_local_daemon
+            )
+            self.__daemon_processes.append(process)
+            addresses.append(address)
+        return addresses
+
+    def __load_hosts(self, data, process_kernel, duplex):
+        # type: (Dict[str, Any], kernel.Kernel, bool) -> None
+        weights = [host.processes for host in self.__hosts]
+        packets = self.__shard_folder.shard(data, weights)
+        pickled_kernel = pickle.dumps(process_kernel, pickle.HIGHEST_PROTOCOL)
+        path = list(sys.path)
+
+        offset = 0
+        for host, packet in zip(self.__hosts, packets):
+            host.load(path, pickled_kernel, packet, duplex, offset)
+            offset += host.processes
+
+    def __process_connections(self):
+        # type: () -> List[_ProcessConnection]
+        connections = []
+        for host in self.__hosts:
+            for index in range(host.processes):
+                connections.append(_ProcessConnection(host, index))
+        return connections
+
+    def fetch_interface(self):
+        # type: () -> _DistributedInterface
+        return self.__interface
+
+    def close(self):
+        """
+        Disconnects from the hosts and stops any local daemons, the remote
+        daemons keep running and wait for the next master.
+        """
+        if self.__hosts is not None:
+            for host in self.__hosts:
+                host.connection.close()
+            self.__hosts = None
+
+        for process in self.__daemon_processes:
+            process.join(5)
+            if process.is_alive():
+                self.__LOGGER.warning("Local daemon won't stop, terminating.")
+                process.terminate()
+        self.__daemon_processes = []
+        self.__shard_folder.release()
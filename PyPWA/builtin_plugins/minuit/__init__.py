@@ -23,6 +23,10 @@ This optimizer will try to find the nearest local minima in the function
 provided using the settings that it was configured with.
 
 To understand how to use the minimzer, read iminuit's documentation online.
+
+With the batched gradient enabled, the points Migrad would need for its
+numerical gradient are calculated together as a single batch, so each
+iteration only waits on the processes once instead of once for each point.
 """
 
 
@@ -47,21 +51,27 @@ class MinuitOptions(options.Plugin):
         "parameters": ["A1", "A2", "A3"],
         "settings": {"A1": 1, "fix_A1": True},
         "strategy": 1,
-        "number of calls": 10000
+        "number of calls": 10000,
+        "batched gradient": False,
+        "gradient step": 1e-5
     }
 
     option_difficulties = {
         "parameters": options.Levels.REQUIRED,
         "settings": options.Levels.REQUIRED,
         "strategy": options.Levels.OPTIONAL,
-        "number of calls": options.Levels.ADVANCED
+        "number of calls": options.Levels.ADVANCED,
+        "batched gradient": options.Levels.OPTIONAL,
+        "gradient step": options.Levels.ADVANCED
     }
 
     option_types = {
         "parameters": list,
         "settings": dict,
         "strategy": int,
-        "number of calls": int
+        "number of calls": int,
+        "batched gradient": bool,
+        "gradient step": float
     }
 
     option_comments = {
@@ -72,5 +82,11 @@ class MinuitOptions(options.Plugin):
         "strategy":
             "The strategy of Minuit. 0 for fast, 1 default, 2 for accurate",
         "number of calls":
-            "The suggested max number of calls for the fit."
+            "The suggested max number of calls for the fit.",
+        "batched gradient":
+            "Calculate the gradient from one batch of 2 points for each "
+            "free parameter, instead of letting Migrad call the function "
+            "for each point.",
+        "gradient step":
+            "The relative step used for the batched gradient."
     }
@@ -0,0 +1,115 @@
+#  coding=utf-8
+#
+#  PyPWA, a scientific analysis toolkit.
+#  Copyright (C) 2016 JLab
+#
+#  This program is free software: you can redistribute it and/or modify
+#  it under the terms of the GNU General Public License as published by
+#  the Free Software Foundation, either version 3 of the License, or
+#  (at your option) any later version.
+#
+#  This program is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#  GNU General Public License for more details.
+#
+#  You should have received a copy of the GNU General Public License
+#  along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+"""
+Gradients for Migrad
+--------------------
+Migrad's own numerical gradient calls the likelihood twice for each free
+parameter, one call after another, so every iteration sends the parameters
+to the processes 2P times. Here all 2P shifted points are sent to the
+processes as a single batch instead, and the gradient built from them is
+handed to iminuit.
+
+- BatchGradient - Called by iminuit with the parameter values, returns the
+  central difference gradient of every parameter, fixed parameters have a
+  gradient of zero.
+- AnalyticGradient - Hands iminuit the gradient calculated from the user's
+  gradient function, which needs only a single call for every parameter.
+  The value calculated along with the gradient is kept, so Migrad's call
+  for the value of the same point never reaches the processes again.
+"""
+
+from typing import Any, Callable, Dict, List, Tuple
+
+import numpy
+
+from PyPWA import AUTHOR, VERSION
+
+__credits__ = ["Mark Jones"]
+__author__ = AUTHOR
+__version__ = VERSION
+
+
+batch_type = Callable[[numpy.ndarray], numpy.ndarray]
+gradient_type = Callable[..., Tuple[float, numpy.ndarray]]
+
+
+class BatchGradient(object):
+
+    def __init__(
+            self,
+            batch_function,  # type: batch_type
+            parameters,  # type: List[str]
+            settings,  # type: Dict[str, Any]
+            step=1e-5  # type: float
+    ):
+        # type: (...) -> None
+        self.__batch_function = batch_function
+        self.__step = step
+        self.__free = numpy.array([
+            index for index, name in enumerate(parameters)
+            if not settings.get("fix_" + name, False)
+        ], dtype=int)
+        self.__size = len(parameters)
+
+    def __call__(self, *values):
+        # type: (float) -> List[float]
+        center = numpy.array(values, dtype=float)
+        gradient = numpy.zeros(self.__size)
+        if not len(self.__free):
+            return list(gradient)
+
+        # The step scales with the parameter, so large and small
+        # parameters are shifted by a similar relative amount.
+        steps = self.__step * numpy.maximum(numpy.abs(center[self.__free]), 1)
+        points = numpy.tile(center, (2 * len(self.__free), 1))
+        for row, (index, step) in enumerate(zip(self.__free, steps)):
+            points[2 * row, index] += step
+            points[2 * row + 1, index] -= step
+
+        results = numpy.asarray(self.__batch_function(points), dtype=float)
+        gradient[self.__free] = (results[0::2] - results[1::2]) / (2 * steps)
+        return list(gradient)
+
+
+class AnalyticGradient(object):
+
+    def __init__(self, gradient_function):
+        # type: (gradient_type) -> None
+        self.__gradient_function = gradient_function
+        self.__last_point = None  # type: Tuple[float, ...]
+        self.__last_value = None  # type: float
+
+    def __call__(self, *values):
+        # type: (float) -> List[float]
+        value, gradient = self.__gradient_function(*values)
+        self.__last_point = values
+        self.__last_value = value
+        return list(gradient)
+
+    def wrap(self, calc_function):
+        # type: (Callable[..., float]) -> Callable[..., float]
+        """
+        Returns the function for iminuit, which reuses the value that came
+        with the last gradient when Migrad asks for that same point.
+        """
+        def function(*values):
+            if values == self.__last_point:
+                return self.__last_value
+            return calc_function(*values)
+        return function
@@ -43,7 +43,9 @@ class MinuitSetup(options.Setup):
             parameters=self.__command.parameters,
             settings=self.__command.settings,
             strategy=self.__command.strategy,
-            number_of_calls=self.__command.number_of_calls
+            number_of_calls=self.__command.number_of_calls,
+            batched_gradient=self.__command.batched_gradient,
+            gradient_step=self.__command.gradient_step
         )
 
     def return_interface(self):
@@ -24,16 +24,29 @@ documentation online.
 
 - _ParserObject - Translates the received value inside run to something the
   user can easily interact with.
-- Minuit - The main optimizer object.
+- _CheckpointedFunction - Stands in for the likelihood while Migrad runs,
+  saving the best point found so far whenever a checkpoint is due, so Migrad
+  itself is never interrupted.
+- Minuit - The main optimizer object, hands iminuit the user's analytic
+  gradient when there is one, or optionally a gradient that is calculated
+  from a single batch of points.
+
+A resumed fit starts a new Migrad from the checkpoint's best point, Migrad's
+own state such as its estimate of the covariance isn't saved, so the rest of
+the fit can take a different path than a fit that was never stopped.
 """
 
 import logging
+from typing import Any, Callable, Tuple
+from typing import Optional as Opt
 
 import iminuit
 import numpy
 
 from PyPWA import AUTHOR, VERSION
+from PyPWA.builtin_plugins.minuit import _gradient
 from PyPWA.builtin_plugins.minuit import _save_data
+from PyPWA.libs import checkpoints
 from PyPWA.libs.interfaces import optimizers
 
 __credits__ = ["Mark Jones"]
@@ -56,9 +69,42 @@ class _ParserObject(optimizers.OptimizerOptionParser):
         return parameters_with_values
 
 
+class _CheckpointedFunction(object):
+
+    def __init__(
+            self,
+            function,  # type: Callable[..., float]
+            checkpoint,  # type: checkpoints.Checkpoint
+            calls=0,  # type: int
+            best_value=numpy.inf  # type: float
+    ):
+        # type: (...) -> None
+        self.__function = function
+        self.__checkpoint = checkpoint
+        self.__best_value = best_value
+        self.__best_point = None  # type: numpy.ndarray
+        self.calls = calls
+
+    def __call__(self, *args):
+        # type: (*float) -> float
+        value = self.__function(*args)
+        self.calls += 1
+        if value < self.__best_value:
+            self.__best_value = value
+            self.__best_point = numpy.array(args, dtype=float)
+
+        if self.__best_point is not None and self.__checkpoint.due(self.calls):
+            self.__checkpoint.save(
+                self.calls, values=self.__best_point, fval=self.__best_value
+            )
+        return value
+
+
 class Minuit(optimizers.Optimizer):
 
     OPTIMIZER_TYPE = optimizers.OptimizerTypes.MINIMIZER
+    WARM_START = True
+    CHECKPOINTS = True
 
     __LOGGER = logging.getLogger(__name__ + ".Minuit")
 
@@ -68,6 +114,8 @@ class Minuit(optimizers.Optimizer):
             settings=False,  # type: Dict[str, Any]
             strategy=1,  # type: int
             number_of_calls=10000,  # type: int
+            batched_gradient=False,  # type: bool
+            gradient_step=1e-5  # type: float
     ):
         # type: (...) -> None
         self.__save_data = _save_data.SaveData()
@@ -75,20 +123,30 @@ class Minuit(optimizers.Optimizer):
         self.__settings = settings
         self.__strategy = strategy
         self.__number_of_calls = number_of_calls
+        self.__batched_gradient = batched_gradient
+        self.__gradient_step = gradient_step
 
         self.__final_value = 0  # type: numpy.float64
         self.__covariance = 0  # type: tuple
         self.__values = 0  # type: float
         self.__set_up = 0  # type: float
         self.__calc_function = None  # type: Callable[[List[str]], float]
+        self.__batch_function = None  # type: _gradient.batch_type
+        self.__gradient_function = None  # type: _gradient.gradient_type
+        self.__checkpoint = None  # type: checkpoints.Checkpoint
+        self.__resume = False
 
     def main_options(
             self,
             calc_function,  # type: Callable[[List[str], float]]
-            fitting_type=False  # type: optimizers.LikelihoodTypes
+            fitting_type=False,  # type: optimizers.LikelihoodTypes
+            batch_function=None,  # type: _gradient.batch_type
+            gradient_function=None  # type: _gradient.gradient_type
     ):
         # type: (...) -> None
         self.__calc_function = calc_function
+        self.__batch_function = batch_function
+        self.__gradient_function = gradient_function
         self.__error_def(fitting_type)
 
     def __check_params(self):
@@ -110,22 +168,91 @@ class Minuit(optimizers.Optimizer):
 
     def start(self):
         self.__check_params()
+        calls, best_value = self.__load_checkpoint()
 
         self.__LOGGER.debug("Found settings: " + repr(self.__settings))
+        gradient = self.__get_gradient()
         minimal = iminuit.Minuit(
-            self.__calc_function,
+            self.__get_function(gradient, calls, best_value),
+            grad=gradient,
             forced_parameters=self.__parameters,
             **self.__settings
         )
 
         minimal.set_strategy(self.__strategy)
         minimal.set_up(self.__set_up)
-        minimal.migrad(ncall=self.__number_of_calls)
+        minimal.migrad(ncall=max(self.__number_of_calls - calls, 1))
+        if self.__checkpoint:
+            self.__checkpoint.remove()
 
         self.__final_value = minimal.fval
         self.__covariance = minimal.covariance
         self.__values = minimal.values
 
+    def __get_function(self, gradient, calls, best_value):
+        # type: (Any, int, float) -> Callable[..., float]
+        function = self.__calc_function
+        if isinstance(gradient, _gradient.AnalyticGradient):
+            function = gradient.wrap(function)
+        if self.__checkpoint:
+            return _CheckpointedFunction(
+                function, self.__checkpoint, calls, best_value
+            )
+        return function
+
+    def __load_checkpoint(self):
+        # type: () -> Tuple[int, float]
+        if not (self.__checkpoint and self.__resume):
+            return 0, numpy.inf
+        state = self.__checkpoint.load()
+        if state is None:
+            return 0, numpy.inf
+
+        self.__LOGGER.info(
+            "Resuming Migrad from its best point at %f." % state["fval"]
+        )
+        settings = dict(self.__settings or {})
+        for name, value in zip(self.__parameters, state["values"]):
+            settings[name] = float(value)
+        self.__settings = settings
+        return int(state["calls"]), float(state["fval"])
+
+    def __get_gradient(self):
+        # type: () -> Opt[Callable[..., List[float]]]
+        if self.__gradient_function is not None:
+            self.__LOGGER.info("Using the supplied analytic gradient.")
+            return _gradient.AnalyticGradient(self.__gradient_function)
+        elif not self.__batched_gradient:
+            return None
+        elif self.__batch_function is None:
+            self.__LOGGER.warning(
+                "Batches can't be calculated, leaving the gradient to Migrad."
+            )
+            return None
+
+        self.__LOGGER.info("Calculating the gradient in batches.")
+        return _gradient.BatchGradient(
+            self.__batch_function, self.__parameters, self.__settings or {},
+            self.__gradient_step
+        )
+
+    def best_values(self):
+        # type: () -> Dict[str, float]
+        return dict(self.__values)
+
+    def warm_start(self, values):
+        # type: (Dict[str, float]) -> None
+        # Only the starting values change, the limits, errors, and fixed
+        # parameters are kept from the user's settings.
+        settings = dict(self.__settings or {})
+        settings.update(values)
+        self.__settings = settings
+
+    def set_checkpoint(self, checkpoint, resume=False):
+        # type: (checkpoints.Checkpoint, bool) -> None
+        self.__checkpoint = checkpoint
+        self.__resume = resume
+
     def return_parser(self):
         # type: () -> _ParserObject
         return _ParserObject(self.__parameters)
@@ -25,8 +25,8 @@ points depending on the results of the returned value. To know what each
 option does, check the actual documentation for nestle on ReadTheDocs.io or 
 the documentation inside nestle.
 
-- _graph_data - Doesn't graph the data, but saves the data needed to 
-  generate a graph to file.
+- _graph_data - Doesn't graph the data, but logs the data needed to 
+  generate a graph to a single file, and reads it back.
 
 - _save_results - Where the table for the results are created and the data
   is saved to disk
@@ -64,12 +64,13 @@ class NestleOptions(options.Plugin):
         "maxiter": None,
         "maxcall": None,
         "dlogz": None,
-        "decline_factor": None
+        "decline_factor": None,
+        "callback file": None,
+        "callback stride": 1
     }
     option_difficulties = {
         "prior location": options.Levels.REQUIRED,
         "prior name": options.Levels.REQUIRED,
-        "folder location": options.Levels.OPTIONAL,
         "ndim": options.Levels.REQUIRED,
         "npoints": options.Levels.OPTIONAL,
         "method": options.Levels.OPTIONAL,
@@ -78,7 +79,9 @@ class NestleOptions(options.Plugin):
         "maxiter": options.Levels.ADVANCED,
         "maxcall": options.Levels.ADVANCED,
         "dlogz": options.Levels.ADVANCED,
-        "decline_factor": options.Levels.ADVANCED
+        "decline_factor": options.Levels.ADVANCED,
+        "callback file": options.Levels.OPTIONAL,
+        "callback stride": options.Levels.ADVANCED
     }
 
     option_types = {
@@ -92,7 +95,9 @@ class NestleOptions(options.Plugin):
         "maxiter": int,
         "maxcall": int,
         "dlogz": float,
-        "decline_factor": float
+        "decline_factor": float,
+        "callback file": str,
+        "callback stride": int
     }
 
     option_comments = {
@@ -121,5 +126,10 @@ class NestleOptions(options.Plugin):
             "evidence falls below this threshold.",
         "decline_factor":
             "If supplied, iteration will stop when the weight of newly "
-            "saved samples has been declining for x consecutive samples."
+            "saved samples has been declining for x consecutive samples.",
+        "callback file":
+            "A file the live points and ellipsoids of each iteration are "
+            "logged to, for graphing the progress of the fit.",
+        "callback stride":
+            "Only log every stride-th iteration."
     }
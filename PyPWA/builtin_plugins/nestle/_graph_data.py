@@ -19,134 +19,174 @@
 """
 Save graph data for the program.
 --------------------------------
-Saves the data needed to graph the ongoing fit for nestle.
+Saves the data needed to graph the ongoing fit for nestle into a single
+append only log. Every stride-th iteration becomes one record with its
+evidence, live points, and ellipsoid centers. The records are written by a
+background thread so the sampler never waits on the disk.
 
-- _Handler - Abstract object for saving data to disc.
+- _LogWriter - The background thread, appends each record to the log,
+  growing the file a chunk at a time instead of for every record.
 
-- _EllipsoidHandler - Saves the data for the ellipsoids.
+- SaveData - Copies the data out of nestle's callback and hands it to the
+  writer, then closes the log once sampling is finished.
 
-- _PointsHandler - Saves the information needed for the live points.
-
-- SaveData - Creates and clears the directory for saving the data, then saves
-  the live point data at each call of the likelihood.
+- read_log - Yields the data of each record inside a log.
 """
 
-import os
-import shutil
+import io
+import logging
+import struct
+import threading
+from typing import Any, Dict, Iterator, List
+from typing import Optional as Opt
 
 import numpy
 
 from PyPWA import AUTHOR, VERSION
 
+try:
+    from queue import Queue
+except ImportError:
+    from Queue import Queue
+
 __credits__ = ["Mark Jones"]
 __author__ = AUTHOR
 __version__ = VERSION
 
 
-class _Handler(object):
-
-    __data = None  # type: numpy.ndarray
-
-    def __init__(self, data):
-        self.__process_data(data)
-
-    def __process_data(self, data):
-        list_of_points = self._find_points(data)
-        array_of_points = self.__convert_list_to_numpy(list_of_points)
-        self.__data = array_of_points
-
-    @staticmethod
-    def _find_points(data):
-        raise NotImplementedError
-    
-    @staticmethod
-    def __convert_list_to_numpy(list_of_points):
-        return numpy.array(list_of_points)
+# Each record is this header, followed by the live points and the centers
+# of the ellipsoids as little endian doubles. The growth of the file is
+# filled with zeros, so a log from a killed run ends at the first header
+# without the marker.
+_MARKER = b"NSTL"
+_HEADER = struct.Struct("<4sqdqqq")
+_DOUBLE = numpy.dtype("<f8")
 
-    def save_data(self, file_location):
-        numpy.save(file_location, self.__data)
 
+class _LogWriter(threading.Thread):
 
-class _EllipsoidHandler(_Handler):
+    __LOGGER = logging.getLogger(__name__ + "._LogWriter")
 
-    @staticmethod
-    def _find_points(ellipsoids):
-        list_of_centers = [[],[]]
-        for ellipsoid in ellipsoids:
-            center = ellipsoid.ctr
-            list_of_centers[0].append(center[0])
-            list_of_centers[1].append(center[1])
-        return list_of_centers
+    __GROWTH = 4 * 1024 ** 2
 
+    def __init__(self, location):
+        # type: (str) -> None
+        super(_LogWriter, self).__init__()
+        self.daemon = True
+        self.__queue = Queue()
+        self.__stream = io.open(location, "wb")
+        self.__written = 0
+        self.__allocated = 0
 
-class _PointsHandler(_Handler):
+    def append(self, record):
+        # type: (List[bytes]) -> None
+        self.__queue.put(record)
 
-    @staticmethod
-    def _find_points(points):
-        xs_and_ys = [[],[]]
-        for point in points:
-            xs_and_ys[0].append(point[0])
-            xs_and_ys[1].append(point[1])
-        return xs_and_ys
-        
+    def close(self):
+        self.__queue.put(None)
+        self.join()
 
-class SaveData(object):
+    def run(self):
+        record = self.__queue.get()
+        while record is not None:
+            self.__write(record)
+            record = self.__queue.get()
 
-    __DATA_FOLDER = "saved_data"
+        # The unused part of the last chunk is cut back off.
+        self.__stream.truncate(self.__written)
+        self.__stream.close()
+        self.__LOGGER.debug("Wrote %d bytes of graph data." % self.__written)
 
-    __basic_data = None  # type: List[double]
-    __root_save_name = None  # type: str
+    def __write(self, record):
+        # type: (List[bytes]) -> None
+        size = sum(len(part) for part in record)
+        if self.__written + size > self.__allocated:
+            self.__allocated += max(self.__GROWTH, size)
+            self.__stream.truncate(self.__allocated)
 
-    def __init__(self, folder_name):
-        self.__create_empty_basic_data()
-        self.__handle_directories()
+        for part in record:
+            self.__stream.write(part)
+        self.__written += size
 
-    def __set_folder_name(self, folder):
-        self.__DATA_FOLDER = folder
 
-    def __create_empty_basic_data(self):
-        self.__basic_data = []
-        
-    def __handle_directories(self):
-        if os.path.isdir(self.__DATA_FOLDER):
-            self.__clear_directory()
-        self.__create_directory()
+class SaveData(object):
 
-    def __clear_directory(self):
-        shutil.rmtree(self.__DATA_FOLDER)
+    __LOGGER = logging.getLogger(__name__ + ".SaveData")
 
-    def __create_directory(self):
-        os.mkdir(self.__DATA_FOLDER)
+    def __init__(self, location, stride=1):
+        # type: (str, int) -> None
+        self.__stride = max(1, stride)
+        self.__writer = _LogWriter(location)
+        self.__writer.start()
+        self.__LOGGER.info("Writing nestle's data to %s" % location)
 
     def process_callback(self, info):
-        self.__set_root_save_name(info["it"])
-        self.__process_ellipsoids(info["sampler"].ells)
-        self.__process_active_points(info["active_u"])
-        self.__append_basic_data(info["logz"])
-
-    def __set_root_save_name(self, iteration):
-        self.__root_save_name = self.__DATA_FOLDER + "/"
-        self.__root_save_name += str(iteration) + "_"
-        
-    def __process_ellipsoids(self, ells):
-        handler = _EllipsoidHandler(ells)
-        save_location = self.__root_save_name + "ellipsoids.npy"
-        handler.save_data(save_location)
-
-    def __process_active_points(self, points):
-        handler = _PointsHandler(points)
-        save_location = self.__root_save_name + "points.npy"
-        handler.save_data(save_location)
-
-    def __append_basic_data(self, logz):
-        self.__basic_data.append(logz)
-
-    def save_final_data(self):
-        final_data = self.__converted_basic_data()
-        self.__write_data(final_data)
-
-    def __converted_basic_data(self):
-        return numpy.array(self.__basic_data)
-
-    def __write_data(self, data):
-        numpy.save(self.__DATA_FOLDER + "/logz.npy", data)
+        # type: (Dict[str, Any]) -> None
+        if info["it"] % self.__stride:
+            return
+
+        # Nestle keeps changing these arrays, so they are copied here and
+        # only turned into bytes on the writer's thread.
+        points = numpy.array(info["active_u"], dtype=_DOUBLE)
+        centers = self.__get_centers(info["sampler"], points.shape[1])
+        header = _HEADER.pack(
+            _MARKER, info["it"], info["logz"], points.shape[0],
+            points.shape[1], centers.shape[0]
+        )
+        self.__writer.append([header, points.tobytes(), centers.tobytes()])
+
+    @staticmethod
+    def __get_centers(sampler, ndim):
+        # type: (Any, int) -> numpy.ndarray
+        if hasattr(sampler, "ells"):
+            ellipsoids = sampler.ells
+        elif hasattr(sampler, "ell"):
+            ellipsoids = [sampler.ell]
+        else:
+            ellipsoids = []
+
+        centers = numpy.empty((len(ellipsoids), ndim), dtype=_DOUBLE)
+        for index, ellipsoid in enumerate(ellipsoids):
+            centers[index] = ellipsoid.ctr
+        return centers
+
+    def close(self):
+        self.__writer.close()
+
+
+def read_log(location):
+    # type: (str) -> Iterator[Dict[str, Any]]
+    with io.open(location, "rb") as stream:
+        while True:
+            record = _read_record(stream)
+            if record is None:
+                return
+            yield record
+
+
+def _read_record(stream):
+    # type: (io.BufferedReader) -> Opt[Dict[str, Any]]
+    header = stream.read(_HEADER.size)
+    if len(header) < _HEADER.size:
+        return None
+    marker, iteration, logz, count, ndim, ellipsoids = _HEADER.unpack(header)
+    if marker != _MARKER:
+        return None
+
+    points = _read_doubles(stream, count, ndim)
+    centers = _read_doubles(stream, ellipsoids, ndim)
+    if points is None or centers is None:
+        return None
+    return {
+        "iteration": iteration, "logz": logz, "active_u": points,
+        "centers": centers
+    }
+
+
+def _read_doubles(stream, rows, columns):
+    # type: (io.BufferedReader, int, int) -> Opt[numpy.ndarray]
+    size = rows * columns * _DOUBLE.itemsize
+    data = stream.read(size)
+    if len(data) < size:
+        return None
+    return numpy.frombuffer(data, _DOUBLE).reshape(rows, columns)
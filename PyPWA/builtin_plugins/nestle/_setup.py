@@ -63,7 +63,8 @@ class NestleSetup(options.Setup):
             self.__options.method, self.__options.update_interval,
             self.__options.npdim, self.__options.maxiter,
             self.__options.maxcall, self.__options.dlogz,
-            self.__options.decline_factor
+            self.__options.decline_factor, self.__options.callback_file,
+            self.__options.callback_stride
         )
 
     def return_interface(self):
@@ -24,12 +24,15 @@ your parameter space for provided function.
 
 - _NestleParserObject - Removes any extra information from the prior before
   its passed to the kernels.
-- NestedSampling - The actual optimizer object.
+- NestedSampling - The actual optimizer object. When it's checkpointed it
+  samples with PyPWA.libs.nested_sampling instead of nestle, one point at a
+  time like nestle, so that the live points and the random state can be
+  saved and resumed.
 - LoadPrior - Loads the prior for the optimizer.
 """
 
 import logging
-from typing import Any, Callable, Tuple
+from typing import Any, Callable, Dict, Tuple
 from typing import Optional as Opt
 
 import nestle
@@ -38,6 +41,8 @@ import numpy
 from PyPWA import AUTHOR, VERSION
 from PyPWA.builtin_plugins.nestle import _graph_data
 from PyPWA.builtin_plugins.nestle import _save_results
+from PyPWA.libs import checkpoints
+from PyPWA.libs import nested_sampling
 from PyPWA.libs import plugin_loader
 from PyPWA.libs.interfaces import optimizers
 
@@ -56,6 +61,7 @@ class _NestleParserObject(optimizers.OptimizerOptionParser):
 class NestledSampling(optimizers.Optimizer):
 
     OPTIMIZER_TYPE = optimizers.OptimizerTypes.MAXIMIZER
+    CHECKPOINTS = True
 
     __LOGGER = logging.getLogger(__name__ + ".NestledSampling")
 
@@ -71,7 +77,8 @@ class NestledSampling(optimizers.Optimizer):
             maxcall=None,  # type: Opt[int]
             dlogz=None,   # type: Opt[float]
             decline_factor=None,  # type: Opt[float]
-            folder_location=False  # type: Opt[str]
+            callback_file=None,  # type: Opt[str]
+            callback_stride=1  # type: int
     ):
         # type: (...) -> None
         self.__save_data = _save_results.SaveData()
@@ -85,40 +92,92 @@ class NestledSampling(optimizers.Optimizer):
         self.__maxcall = maxcall
         self.__dlogz = dlogz
         self.__decline_factor = decline_factor
-        self.__folder_location = folder_location
+        self.__callback_file = callback_file
+        self.__callback_stride = callback_stride
         self.__calc_function = None  # type: Callable[[Any], float]
         self.__callback_object = None  # type: _graph_data.SaveData
         self.__results = None  # type: nestle.Result
+        self.__checkpoint = None  # type: checkpoints.Checkpoint
+        self.__resume = False
 
-    def main_options(self, calc_function, fitting_type=False):
-        # type: (Callable[[Any], float], optimizers.LikelihoodTypes) -> None
+    def main_options(
+            self,
+            calc_function,  # type: Callable[[Any], float]
+            fitting_type=False,  # type: optimizers.LikelihoodTypes
+            batch_function=None,  # type: Callable[[Any], Any]
+            gradient_function=None  # type: Callable[[Any], Any]
+    ):
+        # type: (...) -> None
         self.__calc_function = calc_function
 
     def start(self):
-        self.__start_sampling()
+        self.__setup_callback()
+        try:
+            self.__start_sampling()
+        finally:
+            if self.__callback_object:
+                self.__callback_object.close()
 
     def __setup_callback(self):
-        if self.__folder_location:
-            self.__LOGGER.info("Writing nestle's data to disk.")
-            callback = _graph_data.SaveData(self.__folder_location)
-            self.__callback_object = callback.process_callback
+        if self.__callback_file:
+            self.__callback_object = _graph_data.SaveData(
+                self.__callback_file, self.__callback_stride
+            )
 
     def __start_sampling(self):
-        self.__results = nestle.sample(
-            loglikelihood=self.__calc_function,
-            prior_transform=self.__prior,
-            ndim=self.__ndim,
-            npoints=self.__npoints,
-            method=self.__method,
-            update_interval=self.__update_interval,
-            npdim=self.__npdim,
-            maxiter=self.__maxiter,
-            maxcall=self.__maxcall,
-            dlogz=self.__dlogz,
-            decline_factor=self.__decline_factor,
-            callback=self.__callback_object
+        if self.__checkpoint and self.__method == "classic":
+            self.__LOGGER.warning(
+                "The classic method can't be checkpointed, use single or "
+                "multi to be able to resume the fit."
+            )
+        if self.__checkpoint and self.__method != "classic":
+            self.__results = self.__get_sampler().sample()
+        else:
+            self.__results = nestle.sample(
+                loglikelihood=self.__calc_function,
+                prior_transform=self.__prior,
+                ndim=self.__ndim,
+                npoints=self.__npoints,
+                method=self.__method,
+                update_interval=self.__update_interval,
+                npdim=self.__npdim,
+                maxiter=self.__maxiter,
+                maxcall=self.__maxcall,
+                dlogz=self.__dlogz,
+                decline_factor=self.__decline_factor,
+                callback=self.__get_callback()
+            )
+
+    def __get_sampler(self):
+        # type: () -> nested_sampling.BatchSampler
+        return nested_sampling.BatchSampler(
+            nested_sampling.BatchPrior(self.__prior, self.__ndim),
+            self.__evaluate, self.__npdim or self.__ndim, self.__npoints,
+            self.__method, 1,
+            nested_sampling.get_update_interval(
+                self.__update_interval, self.__npoints
+            ),
+            self.__maxiter or float("inf"), self.__maxcall or float("inf"),
+            nested_sampling.get_dlogz(self.__dlogz, self.__decline_factor),
+            self.__decline_factor, self.__checkpoint, self.__resume,
+            self.__get_callback(), sequential=True
         )
 
+    def __evaluate(self, points):
+        # type: (numpy.ndarray) -> numpy.ndarray
+        return numpy.array([self.__calc_function(point) for point in points])
+
+    def set_checkpoint(self, checkpoint, resume=False):
+        # type: (checkpoints.Checkpoint, bool) -> None
+        self.__checkpoint = checkpoint
+        self.__resume = resume
+
+    def __get_callback(self):
+        # type: () -> Opt[Callable[[Dict[str, Any]], None]]
+        if self.__callback_object:
+            return self.__callback_object.process_callback
+        return None
+
     def return_parser(self):
         # type: () -> _NestleParserObject
         return _NestleParserObject()
@@ -27,12 +27,39 @@ Example:
     foreman.populate(AbstractInterface, AbstractKernels)
     interface = foreman.fetch_interface()
     processed_value = interface.run("Your args")
-"""
 
-import multiprocessing
+With pool mode enabled the processes stay alive after the interface is
+stopped, and the next call to main_options will load its kernels into those
+same processes. Call close on the foreman once it's no longer needed.
+
+Dynamic scheduling cuts the data into many chunks that the processes pull
+from a shared queue during each run, which only works for duplex kernels
+whose results can be summed.
+
+The fast parameter channel writes the parameters for duplex kernels into
+shared memory and reads their float results back the same way, only control
+messages and other values are pickled through the pipes.
+
+By default there is one process for each physical core, each pinned to its
+core, and BLAS may only use a single thread inside of each process so the
+processes don't end up competing with BLAS's threads for the same cores.
+
+Processes whose kernel raises, that die, or that miss the evaluation timeout
+are replaced with a new process holding the same data, and the evaluation is
+sent again. Once an evaluation has failed more than max retries times, the
+run is stopped with a RuntimeError.
+
+Duplex kernels are first timed inside of the main process, and the processes
+are only started if the timing says they would be faster than running the
+kernel inline, which is never the case with a single process.
+
+With lazy loading enabled, the data can be given as the locations of .npy,
+.csv, or .tsv files, and each process reads only its own events from them.
+"""
 
 from PyPWA import AUTHOR, VERSION
 from PyPWA.builtin_plugins.process import _setup
+from PyPWA.builtin_plugins.process import _topology
 from PyPWA.builtin_plugins.process import foreman
 from PyPWA.initializers.configurator import options
 
@@ -50,17 +77,66 @@ class Processing(options.Plugin):
     module_comment = "Builtin SMP Plugin, should be 'good enough'"
 
     default_options = {
-        "number of processes": multiprocessing.cpu_count() * 2
+        "number of processes": _topology.Topology().physical_cores,
+        "pool mode": False,
+        "scheduling": "static",
+        "fast parameter channel": True,
+        "pin processes": True,
+        "blas threads": 1,
+        "evaluation timeout": None,
+        "max retries": 3,
+        "inline evaluation": "auto",
+        "lazy loading": False
     }
 
-    option_levels = {
-        "number of processes": options.Levels.OPTIONAL
+    option_difficulties = {
+        "number of processes": options.Levels.OPTIONAL,
+        "pool mode": options.Levels.ADVANCED,
+        "scheduling": options.Levels.ADVANCED,
+        "fast parameter channel": options.Levels.ADVANCED,
+        "pin processes": options.Levels.ADVANCED,
+        "blas threads": options.Levels.ADVANCED,
+        "evaluation timeout": options.Levels.ADVANCED,
+        "max retries": options.Levels.ADVANCED,
+        "inline evaluation": options.Levels.ADVANCED,
+        "lazy loading": options.Levels.ADVANCED
     }
 
     option_types = {
-        "number of processes": int
+        "number of processes": int,
+        "pool mode": bool,
+        "scheduling": ["static", "dynamic"],
+        "fast parameter channel": bool,
+        "pin processes": bool,
+        "blas threads": int,
+        "evaluation timeout": float,
+        "max retries": int,
+        "inline evaluation": ["auto", "always", "never"],
+        "lazy loading": bool
     }
 
     option_comments = {
-        "number of processes": "Number of processes to use for calculation."
+        "number of processes": "Number of processes to use for calculation.",
+        "pool mode": "Keep the processes alive between calculations and "
+                     "load the new kernels into them instead.",
+        "scheduling": "Static gives each process one slice of the data, "
+                      "dynamic has the processes pull small chunks until "
+                      "the data is exhausted.",
+        "fast parameter channel": "Send parameters and receive float results "
+                                  "through shared memory instead of pipes.",
+        "pin processes": "Pin each process to its own physical core, and "
+                         "keep its data on that core's NUMA node.",
+        "blas threads": "How many threads BLAS and OpenMP may use inside "
+                        "each process, 0 leaves them alone.",
+        "evaluation timeout": "Seconds a process may spend on a single "
+                              "evaluation before it's considered hung and "
+                              "is replaced, empty for no deadline.",
+        "max retries": "How many times a failed evaluation is retried on a "
+                       "new process before the fit is stopped.",
+        "inline evaluation": "Run duplex kernels inside the main process "
+                             "instead, auto does so when the kernel is too "
+                             "fast for the processes to pay off.",
+        "lazy loading": "Data given as the location of an .npy, .csv, or "
+                        ".tsv file is read by each process for its own "
+                        "events, instead of by the main process."
     }
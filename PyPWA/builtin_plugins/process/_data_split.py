@@ -21,6 +21,7 @@ Splits data to be nested inside the Kernels
 -------------------------------------------
 - _ListSplit - Splits list data
 - _ArraySplit - Splits Array Data
+- _SharedSplit - Splits the descriptors of shared arrays and files
 - _MainSplitter - Calls the Split Data Objects to split their associated data,
   and raises an error if the data is of an unsupported type
 - SetupData - Iterates over the supplied dictionary and calls the splitter
@@ -33,13 +34,14 @@ from typing import Any, Dict, List, Union
 import numpy
 
 from PyPWA import AUTHOR, VERSION
+from PyPWA.builtin_plugins.process import _shared_data
 
 __credits__ = ["Mark Jones"]
 __author__ = AUTHOR
 __version__ = VERSION
 
 
-_supported_types = Union[numpy.ndarray, List[Any]]
+_supported_types = Union[numpy.ndarray, _shared_data.Descriptor, List[Any]]
 
 class _ListSplit(object):
 
@@ -80,18 +82,32 @@ class _ArraySplit(object):
         return numpy.array_split(data, self.__number_of_processes)
 
 
+class _SharedSplit(object):
+
+    def __init__(self, number_of_process):
+        # type: (int) -> None
+        self.__number_of_processes = number_of_process
+
+    def __call__(self, data):
+        # type: (_shared_data.Descriptor) -> List[_shared_data.Descriptor]
+        return data.split(self.__number_of_processes)
+
+
 class _MainSplitter(object):
 
     def __init__(self, number_of_processes):
         # type: (int) -> None
         self.__number_of_processes = number_of_processes
         self.__array_split = _ArraySplit(number_of_processes)
+        self.__shared_split = _SharedSplit(number_of_processes)
         self.__list_split = _ListSplit(number_of_processes)
 
     def __call__(self, data):
         # type: (_supported_types) -> List[Any]
         if isinstance(data, numpy.ndarray):
             return self.__array_split(data)
+        elif isinstance(data, _shared_data.Descriptor):
+            return self.__shared_split(data)
         elif isinstance(data, list):
             return self.__list_split(data)
         else:
@@ -0,0 +1,244 @@
+#  coding=utf-8
+#
+#  PyPWA, a scientific analysis toolkit.
+#  Copyright (C) 2016 JLab
+#
+#  This program is free software: you can redistribute it and/or modify
+#  it under the terms of the GNU General Public License as published by
+#  the Free Software Foundation, either version 3 of the License, or
+#  (at your option) any later version.
+#
+#  This program is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#  GNU General Public License for more details.
+#
+#  You should have received a copy of the GNU General Public License
+#  along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+"""
+Fast Parameter Channel
+----------------------
+Pickling every parameter dictionary and pushing it through a pipe costs more
+than the calculation itself when the likelihood is fast. These connections
+keep the pipe's send and recv, but parameters and float results skip the
+pipe: parameters are written into a shared row whose layout is only sent
+once, the result is written into a shared slot, and a pair of semaphores
+wakes up the other side. Everything else, control codes, errors, loaded
+kernels, and results that aren't floats, still travels over the pipe.
+
+- MainConnection - The end held by the kernel interface.
+- WorkerConnection - The end held by the process.
+- duplex_build - Wraps a set of duplex pipes with the fast channel.
+- close_connections - Removes the parameter rows of the main connections.
+"""
+
+import logging
+import multiprocessing
+from multiprocessing import sharedctypes
+from typing import Any, Dict, List, Tuple
+from typing import Optional as Opt
+from typing import Union
+
+import numpy
+
+from PyPWA import AUTHOR, VERSION
+from PyPWA.builtin_plugins.process import _connection_factory
+from PyPWA.builtin_plugins.process import _shared_data
+
+__credits__ = ["Mark Jones"]
+__author__ = AUTHOR
+__version__ = VERSION
+
+
+parameters = Union[Dict[str, float], numpy.ndarray]
+
+# Each connection owns three doubles of the control block.
+_COMMAND = 0
+_STATUS = 1
+_RESULT = 2
+_CONTROL_WIDTH = 3
+
+# Values of the command and the status, a status of _SLOT means the result
+# is waiting in the result slot instead of the pipe.
+_PIPE = 0
+_PARAMETERS = 1
+_LAYOUT = 2
+_SLOT = 1
+
+
+class _Control(object):
+
+    def __init__(self, block, start, done, index):
+        # type: (Any, Any, Any, int) -> None
+        self.__block = block
+        self.__offset = index * _CONTROL_WIDTH
+        self.start = start
+        self.done = done
+
+    def __getitem__(self, field):
+        # type: (int) -> float
+        return self.__block[self.__offset + field]
+
+    def __setitem__(self, field, value):
+        # type: (int, float) -> None
+        self.__block[self.__offset + field] = value
+
+
+class MainConnection(object):
+
+    __LOGGER = logging.getLogger(__name__ + ".MainConnection")
+
+    def __init__(self, pipe, control):
+        # type: (multiprocessing.Pipe, _Control) -> None
+        self.__pipe = pipe
+        self.__control = control
+        self.__store = _shared_data.SharedStore()
+        self.__layout = None  # type: Tuple
+        self.__row = None  # type: numpy.ndarray
+        self.__is_ready = False
+
+    def send(self, value):
+        # type: (Any) -> None
+        layout = self.__get_layout(value)
+        if layout is None:
+            self.__control[_COMMAND] = _PIPE
+            self.__pipe.send(value)
+        elif layout == self.__layout:
+            self.__control[_COMMAND] = _PARAMETERS
+            self.__write_row(value)
+        else:
+            self.__control[_COMMAND] = _LAYOUT
+            self.__send_layout(layout)
+            self.__write_row(value)
+        self.__control.start.release()
+
+    @staticmethod
+    def __get_layout(value):
+        # type: (Any) -> Opt[Tuple]
+        if isinstance(value, dict) and value and all(
+                isinstance(item, (float, int)) and not isinstance(item, bool)
+                for item in value.values()):
+            # Parsers build their dictionaries the same way every call, so
+            # the key order is stable and sorting would only cost time.
+            return tuple(value.keys())
+        elif isinstance(value, numpy.ndarray) and value.ndim == 1 and \
+                value.size and value.dtype == numpy.float64:
+            return None, len(value)
+        return None
+
+    def __send_layout(self, layout):
+        # type: (Tuple) -> None
+        self.__store.release()
+        self.__row = None
+        location = self.__store.share(
+            {"parameters": numpy.zeros(self.__get_length(layout))}
+        )["parameters"].location
+        # A plain view of the memmap, memmap's own indexing is much slower.
+        self.__row = numpy.memmap(location, numpy.float64, "r+").view(
+            numpy.ndarray
+        )
+        self.__layout = layout
+        self.__pipe.send((layout, location))
+        self.__LOGGER.debug("Sent a new parameter layout: %s" % (layout,))
+
+    @staticmethod
+    def __get_length(layout):
+        # type: (Tuple) -> int
+        if layout[0] is None:
+            return layout[1]
+        return len(layout)
+
+    def __write_row(self, value):
+        # type: (parameters) -> None
+        if self.__layout[0] is None:
+            self.__row[:] = value
+        else:
+            self.__row[:] = [value[name] for name in self.__layout]
+
+    def poll(self, timeout=0.):
+        # type: (float) -> bool
+        # Waiting on the semaphore consumes it, so remember that it was.
+        if not self.__is_ready:
+            self.__is_ready = self.__control.done.acquire(True, timeout)
+        return self.__is_ready
+
+    def recv(self):
+        # type: () -> Any
+        if self.__is_ready:
+            self.__is_ready = False
+        else:
+            self.__control.done.acquire()
+        if self.__control[_STATUS] == _SLOT:
+            return numpy.float64(self.__control[_RESULT])
+        return self.__pipe.recv()
+
+    def close(self):
+        self.__row = None
+        self.__store.release()
+
+
+class WorkerConnection(object):
+
+    def __init__(self, pipe, control):
+        # type: (multiprocessing.Pipe, _Control) -> None
+        self.__pipe = pipe
+        self.__control = control
+        self.__layout = None  # type: Tuple
+        self.__row = None  # type: numpy.ndarray
+
+    def recv(self):
+        # type: () -> Any
+        self.__control.start.acquire()
+        command = self.__control[_COMMAND]
+        if command == _PIPE:
+            return self.__pipe.recv()
+        elif command == _LAYOUT:
+            self.__load_layout(*self.__pipe.recv())
+        return self.__read_row()
+
+    def __load_layout(self, layout, location):
+        # type: (Tuple, str) -> None
+        self.__layout = layout
+        self.__row = numpy.memmap(location, numpy.float64, "r").view(
+            numpy.ndarray
+        )
+
+    def __read_row(self):
+        # type: () -> parameters
+        if self.__layout[0] is None:
+            return numpy.array(self.__row)
+        return dict(zip(self.__layout, self.__row.tolist()))
+
+    def send(self, value):
+        # type: (Any) -> None
+        if isinstance(value, float):
+            self.__control[_RESULT] = value
+            self.__control[_STATUS] = _SLOT
+        else:
+            self.__control[_STATUS] = _PIPE
+            self.__pipe.send(value)
+        self.__control.done.release()
+
+
+def duplex_build(count):
+    # type: (int) -> Tuple[List[WorkerConnection], List[MainConnection]]
+    # Same order as the connection factory, the first list goes to the
+    # processes.
+    workers, mains = _connection_factory.duplex_build(count)
+    block = sharedctypes.RawArray("d", count * _CONTROL_WIDTH)
+    for index in range(count):
+        control = _Control(
+            block, multiprocessing.Semaphore(0),
+            multiprocessing.Semaphore(0), index
+        )
+        mains[index] = MainConnection(mains[index], control)
+        workers[index] = WorkerConnection(workers[index], control)
+    return workers, mains
+
+
+def close_connections(connections):
+    # type: (List[Any]) -> None
+    for connection in connections:
+        if isinstance(connection, MainConnection):
+            connection.close()
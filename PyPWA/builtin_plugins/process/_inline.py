@@ -0,0 +1,215 @@
+#  coding=utf-8
+#
+#  PyPWA, a scientific analysis toolkit.
+#  Copyright (C) 2016 JLab
+#
+#  This program is free software: you can redistribute it and/or modify
+#  it under the terms of the GNU General Public License as published by
+#  the Free Software Foundation, either version 3 of the License, or
+#  (at your option) any later version.
+#
+#  This program is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#  GNU General Public License for more details.
+#
+#  You should have received a copy of the GNU General Public License
+#  along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+"""
+Inline Evaluation
+-----------------
+When the kernel only takes a few microseconds for all of the data, sending
+the parameters to each process and waiting for its reply costs more than
+the calculation itself. In that case the kernel is simply called inside of
+the main process instead.
+
+- InlineConnection - Calls the kernel when a value is sent to it, and hands
+  the result back on recv, just like a process's pipe would.
+- InlineInterface - Runs the kernel interface over a single inline kernel.
+- AdaptiveInterface - Times the first evaluations inline, then either stays
+  inline or starts the processes, whichever the timing says is faster.
+- count_events - The length of the longest array or list in the data.
+- load_kernel - Copies the kernel and loads all of the data into it, even
+  the data that would otherwise be loaded lazily.
+"""
+
+import copy
+import logging
+import time
+from typing import Any, Callable, Dict, List
+
+import numpy
+
+from PyPWA import AUTHOR, VERSION
+from PyPWA.builtin_plugins.process import _shared_data
+from PyPWA.libs.interfaces import kernel
+
+__credits__ = ["Mark Jones"]
+__author__ = AUTHOR
+__version__ = VERSION
+
+
+# Measured cost of a single round trip to one process, the replies are read
+# one after another so the cost grows with the number of processes.
+PIPE_ROUND_TRIP = 50e-6
+FAST_ROUND_TRIP = 15e-6
+
+
+class InlineConnection(object):
+
+    __LOGGER = logging.getLogger(__name__ + ".InlineConnection")
+
+    def __init__(self, inline_kernel):
+        # type: (kernel.Kernel) -> None
+        self.__kernel = inline_kernel
+        self.__result = None  # type: Any
+
+    def send(self, value):
+        # type: (Any) -> None
+        # Errors are reported the same way a process would report them, so
+        # the kernel interface doesn't need to know where the kernel runs.
+        try:
+            if kernel.is_batch(value):
+                self.__result = self.__kernel.process_batch(value[1])
+            elif kernel.is_gradient(value):
+                self.__result = self.__kernel.process_gradient(*value[1])
+            elif kernel.is_gradient_batch(value):
+                self.__result = self.__kernel.process_gradient_batch(
+                    *value[1]
+                )
+            else:
+                self.__result = self.__kernel.process(value)
+        except Exception as error:
+            self.__result = kernel.ProcessCodes.ERROR
+            self.__LOGGER.exception(error)
+
+    def recv(self):
+        # type: () -> Any
+        result, self.__result = self.__result, None
+        return result
+
+
+class InlineInterface(kernel.ProcessInterface):
+
+    def __init__(self, interface_kernel, inline_kernel):
+        # type: (kernel.KernelInterface, kernel.Kernel) -> None
+        self.__interface = interface_kernel
+        self.__connections = [InlineConnection(inline_kernel)]
+        self.__alive = True
+
+    def run(self, *args):
+        return self.__interface.run(self.__connections, args)
+
+    def run_batch(self, points):
+        return self.__interface.run_batch(self.__connections, points)
+
+    def stop(self, force=False):
+        self.__alive = False
+
+    @property
+    def is_alive(self):
+        return self.__alive
+
+
+class AdaptiveInterface(kernel.ProcessInterface):
+
+    __LOGGER = logging.getLogger(__name__ + ".AdaptiveInterface")
+
+    # The first call also pays for page faults and cold caches, so the
+    # fastest of a few calls is used as the kernel's cost.
+    __PROBE_CALLS = 3
+
+    def __init__(
+            self,
+            interface_kernel,  # type: kernel.KernelInterface
+            inline_kernel,  # type: kernel.Kernel
+            start_processes,  # type: Callable[[], kernel.ProcessInterface]
+            number_of_processes,  # type: int
+            round_trip,  # type: float
+            number_of_events  # type: int
+    ):
+        # type: (...) -> None
+        self.__inline = InlineInterface(interface_kernel, inline_kernel)
+        self.__start_processes = start_processes
+        self.__number_of_processes = number_of_processes
+        self.__round_trip = round_trip
+        self.__number_of_events = number_of_events
+        self.__timings = []  # type: List[float]
+        self.__target = None  # type: kernel.ProcessInterface
+
+    def run(self, *args):
+        if self.__target:
+            return self.__target.run(*args)
+        return self.__probe(self.__inline.run, args, 1)
+
+    def run_batch(self, points):
+        if self.__target:
+            return self.__target.run_batch(points)
+        return self.__probe(self.__inline.run_batch, (points,), len(points))
+
+    def __probe(self, method, args, evaluations):
+        # type: (Callable[..., Any], tuple, int) -> Any
+        start = time.time()
+        value = method(*args)
+        self.__timings.append((time.time() - start) / max(evaluations, 1))
+        if len(self.__timings) == self.__PROBE_CALLS:
+            self.__choose_path(min(self.__timings))
+        return value
+
+    def __choose_path(self, inline_cost):
+        # type: (float) -> None
+        parallel_cost = (
+            inline_cost / self.__number_of_processes +
+            self.__round_trip * self.__number_of_processes
+        )
+        self.__LOGGER.info(
+            "The kernel takes %.3gus per event over %d events, %.3gms inline "
+            "against an estimated %.3gms over %d processes." % (
+                1e6 * inline_cost / max(self.__number_of_events, 1),
+                self.__number_of_events, 1e3 * inline_cost,
+                1e3 * parallel_cost, self.__number_of_processes
+            )
+        )
+        if inline_cost <= parallel_cost:
+            self.__LOGGER.info("Running the kernel inline in this process.")
+            self.__target = self.__inline
+        else:
+            self.__LOGGER.info("Starting the processes.")
+            self.__inline.stop()
+            # The inline kernel still holds the original arrays, which the
+            # processes replace with views of the shared segments.
+            self.__inline = None
+            self.__target = self.__start_processes()
+
+    def stop(self, force=False):
+        if self.__target:
+            self.__target.stop(force)
+        else:
+            self.__inline.stop(force)
+
+    @property
+    def is_alive(self):
+        if self.__target:
+            return self.__target.is_alive
+        return self.__inline.is_alive
+
+
+def count_events(data):
+    # type: (Dict[str, Any]) -> int
+    lengths = [
+        len(value) for value in data.values()
+        if isinstance(value, (list, numpy.ndarray)) and numpy.ndim(value)
+    ]
+    return max(lengths) if lengths else 0
+
+
+def load_kernel(process_kernel, data):
+    # type: (kernel.Kernel, Dict[str, Any]) -> kernel.Kernel
+    inline_kernel = copy.deepcopy(process_kernel)
+    for name, value in data.items():
+        setattr(inline_kernel, name, value)
+    _shared_data.load_kernel(inline_kernel)
+    inline_kernel.PROCESS_ID = 0
+    inline_kernel.setup()
+    return inline_kernel
@@ -18,7 +18,9 @@
 
 """
 Takes a Kernel, copies it multiple times, loads a packet of data into
-each kernel, and then returns a list of those kernels
+each kernel, and then returns a list of those kernels. The packets are
+normally shared array descriptors, so the copies stay small until the
+kernel is loaded inside of its process.
 """
 
 import copy
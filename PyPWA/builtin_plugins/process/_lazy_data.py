@@ -0,0 +1,204 @@
+#  coding=utf-8
+#
+#  PyPWA, a scientific analysis toolkit.
+#  Copyright (C) 2016 JLab
+#
+#  This program is free software: you can redistribute it and/or modify
+#  it under the terms of the GNU General Public License as published by
+#  the Free Software Foundation, either version 3 of the License, or
+#  (at your option) any later version.
+#
+#  This program is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#  GNU General Public License for more details.
+#
+#  You should have received a copy of the GNU General Public License
+#  along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+"""
+Lazy Loading from Disk
+----------------------
+Instead of parsing the data in the main process and copying it to every
+process, the main process only opens each file far enough to know where its
+events are. Each process then reads its own range of events from the file
+once it has started, so the main process never holds the data, and the
+processes parse their shares at the same time.
+
+- LazyText - A descriptor of a range of rows inside of a CSV or TSV file,
+  the byte offset of each row is indexed once so any range can be read
+  without reading the rows before it. The rows are parsed the same way as
+  the builtin SV parser parses them.
+- LazyColumn - A descriptor of a single column of another descriptor,
+  which loads as ones when the file doesn't have the column.
+- open_npy - Maps an .npy file with a shared array descriptor.
+- open_text - Indexes a CSV or TSV file.
+- open_data - Replaces every file location and file column in the data
+  with a descriptor of it.
+"""
+
+import array
+import csv
+import io
+import os
+from typing import Any, Dict, List
+from typing import Optional as Opt
+
+import numpy
+from numpy.lib import format as npy_format
+
+from PyPWA import AUTHOR, VERSION
+from PyPWA.builtin_plugins.process import _shared_data
+from PyPWA.libs.interfaces import kernel
+
+__credits__ = ["Mark Jones"]
+__author__ = AUTHOR
+__version__ = VERSION
+
+
+# Matches the search size of the builtin SV parser.
+_HEADER_SEARCH_BITS = 3072
+
+
+class LazyText(_shared_data.Descriptor):
+
+    def __init__(self, location, names, delimiter, offsets):
+        # type: (str, List[str], str, numpy.ndarray) -> None
+        self.location = location
+        self.names = names
+        self.delimiter = delimiter
+        self.offsets = offsets  # The start of each row, then the end.
+
+    def __len__(self):
+        # type: () -> int
+        return len(self.offsets) - 1
+
+    def slice(self, start, stop):
+        # type: (int, int) -> LazyText
+        # A copy, so pickling a slice doesn't drag the whole index along.
+        return LazyText(
+            self.location, self.names, self.delimiter,
+            numpy.array(self.offsets[start:stop + 1])
+        )
+
+    def load(self):
+        # type: () -> numpy.ndarray
+        loaded = numpy.zeros(len(self), [(name, "f8") for name in self.names])
+        if len(self) == 0:
+            return loaded
+
+        with io.open(self.location, "rb") as stream:
+            stream.seek(int(self.offsets[0]))
+            text = stream.read(int(self.offsets[-1] - self.offsets[0]))
+
+        rows = csv.reader(
+            io.StringIO(text.decode()), delimiter=self.delimiter
+        )
+        rows = (row for row in rows if "".join(row).strip())
+        for row_index, row in enumerate(rows):
+            for name, value in zip(self.names, row):
+                loaded[name][row_index] = value
+        return loaded
+
+
+class LazyColumn(_shared_data.Descriptor):
+
+    def __init__(self, descriptor, column):
+        # type: (_shared_data.Descriptor, Opt[str]) -> None
+        self.descriptor = descriptor
+        self.column = column
+
+    def __len__(self):
+        # type: () -> int
+        return len(self.descriptor)
+
+    def slice(self, start, stop):
+        # type: (int, int) -> LazyColumn
+        return LazyColumn(self.descriptor.slice(start, stop), self.column)
+
+    def load(self):
+        # type: () -> numpy.ndarray
+        loaded = self.descriptor.load()
+        if self.column in (loaded.dtype.names or ()):
+            return numpy.array(loaded[self.column])
+        return numpy.ones(len(loaded))
+
+
+def open_npy(location):
+    # type: (str) -> _shared_data.SharedArray
+    with io.open(location, "rb") as stream:
+        version = npy_format.read_magic(stream)
+        if version == (1, 0):
+            shape, fortran_order, dtype = \
+                npy_format.read_array_header_1_0(stream)
+        else:
+            shape, fortran_order, dtype = \
+                npy_format.read_array_header_2_0(stream)
+        offset = stream.tell()
+
+    if fortran_order or dtype.hasobject or not shape:
+        raise ValueError("%s can't be loaded lazily!" % location)
+    return _shared_data.SharedArray(location, dtype, shape, offset=offset)
+
+
+def open_text(location):
+    # type: (str) -> LazyText
+    with io.open(location, "r") as stream:
+        dialect = csv.Sniffer().sniff(
+            stream.read(_HEADER_SEARCH_BITS), delimiters=[",", "\t"]
+        )
+
+    # Offsets are kept in an array of 64 bit ints, so the index stays at
+    # 8 bytes for each row even for very large files.
+    offsets = array.array("q")
+    with io.open(location, "rb") as stream:
+        header = stream.readline()
+        position = len(header)
+        for line in stream:
+            if line.strip():
+                offsets.append(position)
+            position += len(line)
+        offsets.append(position)
+
+    names = next(csv.reader([header.decode()], dialect))
+    return LazyText(
+        location, [name.strip() for name in names], dialect.delimiter,
+        numpy.frombuffer(offsets, numpy.int64)
+    )
+
+
+def open_file(location):
+    # type: (str) -> _shared_data.Descriptor
+    extension = os.path.splitext(location)[1].lower()
+    if extension == ".npy":
+        return open_npy(location)
+    elif extension in (".csv", ".tsv"):
+        return open_text(location)
+    raise ValueError(
+        "Only .npy, .csv, and .tsv files can be loaded lazily, not %s!"
+        % location
+    )
+
+
+def open_data(data):
+    # type: (Dict[str, Any]) -> Dict[str, Any]
+    # Each file is only indexed once, however many of its columns are used.
+    files = dict()  # type: Dict[str, _shared_data.Descriptor]
+    opened = dict()
+    for name, value in data.items():
+        if isinstance(value, str):
+            opened[name] = _open_once(files, value)
+        elif isinstance(value, kernel.FileColumn):
+            opened[name] = LazyColumn(
+                _open_once(files, value.location), value.column
+            )
+        else:
+            opened[name] = value
+    return opened
+
+
+def _open_once(files, location):
+    # type: (Dict[str, _shared_data.Descriptor], str) -> Any
+    if location not in files:
+        files[location] = open_file(location)
+    return files[location]
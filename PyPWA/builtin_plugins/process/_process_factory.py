@@ -18,14 +18,18 @@
 
 """
 The processes and their factories are defined here. The current supported
-methods are Duplex for worker processes and Simplex for offload processes.
+methods are Duplex for worker processes, Simplex for offload processes, and
+Pooled for the processes of a persistent worker pool. Duplex and Pooled
+processes can optionally talk over the fast parameter channel.
 """
 
+import functools
 from multiprocessing import Pipe
 from typing import List, Tuple
 
 from PyPWA import AUTHOR, VERSION
 from PyPWA.builtin_plugins.process import _connection_factory
+from PyPWA.builtin_plugins.process import _fast_channel
 from PyPWA.builtin_plugins.process import _processes
 from PyPWA.libs.interfaces import kernel
 
@@ -37,6 +41,7 @@ __version__ = VERSION
 abstract_return = Tuple[List[_processes._AbstractProcess], List[Pipe]]
 simplex_return = Tuple[List[_processes.Simplex], List[Pipe]]
 duplex_return = Tuple[List[_processes.Duplex], List[Pipe]]
+pooled_return = Tuple[List[_processes.Pooled], List[Pipe]]
 
 
 class _ProcessFactory(object):
@@ -96,9 +101,25 @@ def simplex_build(process_kernels):
     return factory.build(process_kernels)
 
 
-def duplex_build(process_kernels):
-    # type: (List[kernel.Kernel]) -> duplex_return
+def duplex_build(process_kernels, fast_channel=False):
+    # type: (List[kernel.Kernel], bool) -> duplex_return
     factory = _ProcessFactory(
-        _processes.Duplex, _connection_factory.duplex_build
+        _processes.Duplex, __get_duplex_connections(fast_channel)
     )
     return factory.build(process_kernels)
+
+
+def pooled_build(process_kernels, duplex, fast_channel=False):
+    # type: (List[kernel.Kernel], bool, bool) -> pooled_return
+    factory = _ProcessFactory(
+        functools.partial(_processes.Pooled, duplex=duplex),
+        __get_duplex_connections(fast_channel)
+    )
+    return factory.build(process_kernels)
+
+
+def __get_duplex_connections(fast_channel):
+    # type: (bool) -> _connection_factory.factory_type
+    if fast_channel:
+        return _fast_channel.duplex_build
+    return _connection_factory.duplex_build
@@ -19,19 +19,28 @@ This are where the actual processes are defined
 -----------------------------------------------
 - _AbstractProcess - The abstract process that the other processes subclass,
   this defines both the interface for the subclasses, and sets daemon mode to
-  true so that processes will shutdown with the main process.
+  true so that processes will shutdown with the main process. It also
+  applies the process's placement from inside of the new process.
 - Duplex - The duplex process, this process will take information received
-  from the main process and calculate over it.
+  from the main process and calculate over it, or over each of its points
+  when it receives a batch.
 - Simplex - The Simplex process, this process will calculate over whatever
   is in its kernel the moment it starts, then return the calculated value
   over its pipe.
+- Pooled - A long living process for the worker pool. It behaves like either
+  Duplex or Simplex depending on its kernel, and can have its kernel
+  replaced through a LOAD message without being restarted.
 """
 
 import logging
 import multiprocessing
-from typing import Any
+import pickle
+import sys
+from typing import Any, List
 
 from PyPWA import VERSION, AUTHOR
+from PyPWA.builtin_plugins.process import _shared_data
+from PyPWA.builtin_plugins.process import _topology
 from PyPWA.libs.interfaces import kernel
 
 __credits__ = ["Mark Jones"]
@@ -45,10 +54,20 @@ class _AbstractProcess(multiprocessing.Process):
         # type: (kernel.Kernel, multiprocessing.Pipe) -> None
         super(_AbstractProcess, self).__init__()
         self.daemon = True  # When true, processes will die with main
+        self.placement = None  # type: _topology.Placement
 
     def run(self):
         raise NotImplementedError
 
+    def _place(self):
+        if self.placement:
+            self.placement.apply()
+
+    def _load_kernel(self, process_kernel):
+        # type: (kernel.Kernel) -> None
+        local = bool(self.placement and self.placement.local)
+        _shared_data.load_kernel(process_kernel, local)
+
 
 class Duplex(_AbstractProcess):
 
@@ -62,13 +81,15 @@ class Duplex(_AbstractProcess):
         self.__received_value = None
 
     def run(self):
+        self._place()
+        self._load_kernel(self.__kernel)
         self.__kernel.setup()
         self.__loop()
 
     def __loop(self):
         while True:
             self.__get_value()
-            if self.__received_value == kernel.ProcessCodes.SHUTDOWN:
+            if self.__received_value is kernel.ProcessCodes.SHUTDOWN:
                 self.__LOGGER.debug("Gracefully shutting down process.")
                 break
             self.__process()
@@ -86,6 +107,16 @@ class Duplex(_AbstractProcess):
 
     def __run_kernel(self):
         # type: () -> Any
+        if kernel.is_batch(self.__received_value):
+            return self.__kernel.process_batch(self.__received_value[1])
+        elif kernel.is_gradient(self.__received_value):
+            return self.__kernel.process_gradient(
+                *self.__received_value[1]
+            )
+        elif kernel.is_gradient_batch(self.__received_value):
+            return self.__kernel.process_gradient_batch(
+                *self.__received_value[1]
+            )
         return self.__kernel.process(self.__received_value)
 
     def __handle_error(self, error):
@@ -109,6 +140,8 @@ class Simplex(_AbstractProcess):
         self.__connection = connect
 
     def run(self):
+        self._place()
+        self._load_kernel(self.__kernel)
         self.__kernel.setup()
         self.__process()
         self.__LOGGER.debug("Shutting Down.")
@@ -120,3 +153,79 @@ class Simplex(_AbstractProcess):
             self.__connection.send(kernel.ProcessCodes.ERROR)
             self.__LOGGER.exception(error)
             raise error
+
+
+class Pooled(_AbstractProcess):
+
+    __LOGGER = logging.getLogger(__name__ + ".Pooled")
+
+    def __init__(self, pooled_kernel, connect, duplex=True):
+        # type: (kernel.Kernel, multiprocessing.Pipe, bool) -> None
+        super(Pooled, self).__init__()
+        self.__kernel = pooled_kernel
+        self.__connection = connect
+        self.__duplex = duplex
+
+    def run(self):
+        self._place()
+        self.__start_kernel()
+        while True:
+            received = self.__connection.recv()
+            if received is kernel.ProcessCodes.SHUTDOWN:
+                self.__LOGGER.debug("Gracefully shutting down process.")
+                break
+            elif self.__is_load(received):
+                self.__load(*received[1:])
+            else:
+                self.__process(received)
+
+    @staticmethod
+    def __is_load(received):
+        # type: (Any) -> bool
+        return (
+            isinstance(received, tuple) and len(received) == 4 and
+            received[0] is kernel.ProcessCodes.LOAD
+        )
+
+    def __load(self, path, pickled_kernel, duplex):
+        # type: (List[str], bytes, bool) -> None
+        # The kernel is unpickled only after the path is synced, otherwise
+        # user modules added to the path after the fork couldn't be found.
+        self.__sync_path(path)
+        self.__kernel = pickle.loads(pickled_kernel)
+        self.__duplex = duplex
+        self.__start_kernel()
+
+    @staticmethod
+    def __sync_path(path):
+        # type: (List[str]) -> None
+        for location in path:
+            if location not in sys.path:
+                sys.path.append(location)
+
+    def __start_kernel(self):
+        self._load_kernel(self.__kernel)
+        self.__kernel.setup()
+        if not self.__duplex:
+            self.__process(None)
+
+    def __process(self, value):
+        # type: (Any) -> None
+        try:
+            if kernel.is_batch(value):
+                self.__connection.send(self.__kernel.process_batch(value[1]))
+            elif kernel.is_gradient(value):
+                self.__connection.send(
+                    self.__kernel.process_gradient(*value[1])
+                )
+            elif kernel.is_gradient_batch(value):
+                self.__connection.send(
+                    self.__kernel.process_gradient_batch(*value[1])
+                )
+            elif self.__duplex:
+                self.__connection.send(self.__kernel.process(value))
+            else:
+                self.__connection.send(self.__kernel.process())
+        except Exception as error:
+            self.__connection.send(kernel.ProcessCodes.ERROR)
+            self.__LOGGER.exception(error)
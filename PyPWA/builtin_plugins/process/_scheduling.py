@@ -0,0 +1,291 @@
+#  coding=utf-8
+#
+#  PyPWA, a scientific analysis toolkit.
+#  Copyright (C) 2016 JLab
+#
+#  This program is free software: you can redistribute it and/or modify
+#  it under the terms of the GNU General Public License as published by
+#  the Free Software Foundation, either version 3 of the License, or
+#  (at your option) any later version.
+#
+#  This program is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#  GNU General Public License for more details.
+#
+#  You should have received a copy of the GNU General Public License
+#  along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+"""
+Dynamic Scheduling
+------------------
+Instead of every process receiving one fixed slice of the data, the data is
+cut into many small chunks and the processes pull chunks from a shared queue
+until none are left, so a slow process simply ends up doing fewer chunks.
+
+- ChunkQueue - The shared queue, it lives inside of a shared segment and is
+  guarded with a file lock so that it survives being pickled.
+- ChunkedKernel - Wraps the user's kernel, loads each chunk it pulls into the
+  kernel and sums the results, or the results of each point for a batch.
+  The kernel is set up while it holds all of the data.
+- ChunkTuner - Resets the queue before each run and adjusts the number of
+  chunks from the measured latency of each chunk.
+- DynamicSetup - Builds the chunked kernels from shared data.
+"""
+
+import copy
+import fcntl
+import logging
+import os
+import time
+from typing import Any, Dict, List
+from typing import Optional as Opt
+
+import numpy
+
+from PyPWA import AUTHOR, VERSION
+from PyPWA.builtin_plugins.process import _shared_data
+from PyPWA.libs.interfaces import kernel
+
+__credits__ = ["Mark Jones"]
+__author__ = AUTHOR
+__version__ = VERSION
+
+
+# Layout of the queue's segment, the rest holds the chunk timings.
+_NEXT_CHUNK = 0
+_CHUNK_COUNT = 1
+_TIMED_CHUNKS = 2
+_TIMED_NANOSECONDS = 3
+_SEGMENT_LENGTH = 4
+
+
+class ChunkQueue(object):
+
+    def __init__(self, segment):
+        # type: (_shared_data.SharedArray) -> None
+        self.__segment = segment
+        self.__state = None  # type: numpy.ndarray
+        self.__lock = None  # type: int
+
+    def __getstate__(self):
+        return {"segment": self.__segment}
+
+    def __setstate__(self, state):
+        self.__init__(state["segment"])
+
+    def open(self):
+        self.__state = numpy.memmap(
+            self.__segment.location, dtype=numpy.int64, mode="r+",
+            shape=self.__segment.shape
+        )
+        self.__lock = os.open(self.__segment.location, os.O_RDWR)
+
+    def reset(self, chunk_count):
+        # type: (int) -> None
+        with self:
+            self.__state[:] = 0
+            self.__state[_CHUNK_COUNT] = chunk_count
+
+    def next_chunk(self):
+        # type: () -> Opt[int]
+        with self:
+            chunk = int(self.__state[_NEXT_CHUNK])
+            if chunk >= self.__state[_CHUNK_COUNT]:
+                return None
+            self.__state[_NEXT_CHUNK] = chunk + 1
+            return chunk
+
+    def record(self, seconds):
+        # type: (float) -> None
+        with self:
+            self.__state[_TIMED_CHUNKS] += 1
+            self.__state[_TIMED_NANOSECONDS] += int(seconds * 1e9)
+
+    @property
+    def chunk_count(self):
+        # type: () -> int
+        return int(self.__state[_CHUNK_COUNT])
+
+    @property
+    def latency(self):
+        # type: () -> Opt[float]
+        with self:
+            if self.__state[_TIMED_CHUNKS] == 0:
+                return None
+            total = float(self.__state[_TIMED_NANOSECONDS]) / 1e9
+            return total / self.__state[_TIMED_CHUNKS]
+
+    def __enter__(self):
+        fcntl.lockf(self.__lock, fcntl.LOCK_EX)
+
+    def __exit__(self, *args):
+        fcntl.lockf(self.__lock, fcntl.LOCK_UN)
+
+
+class ChunkedKernel(kernel.Kernel):
+
+    def __init__(self, process_kernel, data, queue):
+        # type: (kernel.Kernel, Dict[str, Any], ChunkQueue) -> None
+        self.__kernel = process_kernel
+        self.__data = data
+        self.__queue = queue
+        self.__views = None  # type: Dict[str, numpy.ndarray]
+
+    def setup(self):
+        # The kernel is set up with all of the data, so it can read its
+        # size or totals, but anything it builds for each event won't be
+        # cut into the chunks along with the data.
+        self.__views = dict()
+        for name, value in self.__data.items():
+            self.__views[name] = value.load()
+            setattr(self.__kernel, name, self.__views[name])
+        self.__queue.open()
+        self.__kernel.PROCESS_ID = self.PROCESS_ID
+        self.__kernel.setup()
+
+    def process(self, data=False):
+        # type: (Any) -> Any
+        total = 0.
+        chunk = self.__queue.next_chunk()
+        while chunk is not None:
+            self.__load_chunk(chunk)
+            start = time.time()
+            total = total + self.__kernel.process(data)
+            self.__queue.record(time.time() - start)
+            chunk = self.__queue.next_chunk()
+        return total
+
+    def process_batch(self, points):
+        # type: (List[Any]) -> numpy.ndarray
+        total = numpy.zeros(len(points))
+        chunk = self.__queue.next_chunk()
+        while chunk is not None:
+            self.__load_chunk(chunk)
+            start = time.time()
+            total += self.__kernel.process_batch(points)
+            self.__queue.record(time.time() - start)
+            chunk = self.__queue.next_chunk()
+        return total
+
+    def process_gradient(self, data, names):
+        # type: (Any, List[str]) -> numpy.ndarray
+        total = numpy.zeros(len(names) + 1)
+        chunk = self.__queue.next_chunk()
+        while chunk is not None:
+            self.__load_chunk(chunk)
+            start = time.time()
+            total += self.__kernel.process_gradient(data, names)
+            self.__queue.record(time.time() - start)
+            chunk = self.__queue.next_chunk()
+        return total
+
+    def process_gradient_batch(self, points, names):
+        # type: (List[Any], List[str]) -> numpy.ndarray
+        total = numpy.zeros((len(points), len(names) + 1))
+        chunk = self.__queue.next_chunk()
+        while chunk is not None:
+            self.__load_chunk(chunk)
+            start = time.time()
+            total += self.__kernel.process_gradient_batch(points, names)
+            self.__queue.record(time.time() - start)
+            chunk = self.__queue.next_chunk()
+        return total
+
+    def __load_chunk(self, chunk):
+        # type: (int) -> None
+        # Each array is cut at the same fractions, so the chunks of arrays
+        # with different lengths, data and monte carlo, still line up.
+        count = self.__queue.chunk_count
+        for name, view in self.__views.items():
+            start = (chunk * len(view)) // count
+            stop = ((chunk + 1) * len(view)) // count
+            setattr(self.__kernel, name, view[start:stop])
+
+
+class ChunkTuner(object):
+
+    __LOGGER = logging.getLogger(__name__ + ".ChunkTuner")
+
+    # Long enough that locking the queue is noise, short enough that the
+    # processes finish within a few milliseconds of each other.
+    __TARGET_LATENCY = .005
+    __CHUNKS_PER_PROCESS = 8
+
+    def __init__(self, queue, number_of_processes, max_chunks):
+        # type: (ChunkQueue, int, int) -> None
+        self.__queue = queue
+        self.__minimum = min(number_of_processes, max_chunks)
+        self.__maximum = max_chunks
+        self.__chunk_count = self.__clamp(
+            number_of_processes * self.__CHUNKS_PER_PROCESS
+        )
+        self.__queue.open()
+
+    def before_run(self):
+        self.__tune()
+        self.__queue.reset(self.__chunk_count)
+
+    def __tune(self):
+        latency = self.__queue.latency
+        if latency:
+            new_count = self.__clamp(
+                int(self.__chunk_count * latency / self.__TARGET_LATENCY)
+            )
+            if new_count != self.__chunk_count:
+                self.__LOGGER.debug(
+                    "Chunk latency was %fs, using %d chunks now." %
+                    (latency, new_count)
+                )
+            self.__chunk_count = new_count
+
+    def __clamp(self, count):
+        # type: (int) -> int
+        return max(self.__minimum, min(self.__maximum, count))
+
+
+class DynamicSetup(object):
+
+    __LOGGER = logging.getLogger(__name__ + ".DynamicSetup")
+
+    def __init__(self, number_of_processes):
+        # type: (int) -> None
+        self.__number_of_processes = number_of_processes
+        self.__tuner = None  # type: ChunkTuner
+
+    @staticmethod
+    def can_schedule(shared_data):
+        # type: (Dict[str, Any]) -> bool
+        for value in shared_data.values():
+            if not isinstance(value, _shared_data.SharedArray):
+                return False
+        return bool(shared_data)
+
+    def setup_kernels(self, process_kernel, shared_data, shared_store):
+        # type: (kernel.Kernel, Dict[str, Any], Any) -> List[ChunkedKernel]
+        queue = self.__make_queue(shared_store)
+        max_chunks = min(len(value) for value in shared_data.values())
+        self.__tuner = ChunkTuner(
+            queue, self.__number_of_processes, max_chunks
+        )
+        self.__LOGGER.debug("Using dynamic scheduling.")
+
+        kernels = []
+        for index in range(self.__number_of_processes):
+            kernels.append(ChunkedKernel(
+                copy.deepcopy(process_kernel), shared_data, queue
+            ))
+        return kernels
+
+    @staticmethod
+    def __make_queue(shared_store):
+        # type: (_shared_data.SharedStore) -> ChunkQueue
+        segment = shared_store.share(
+            {"chunk queue": numpy.zeros(_SEGMENT_LENGTH, numpy.int64)}
+        )
+        return ChunkQueue(segment["chunk queue"])
+
+    @property
+    def tuner(self):
+        # type: () -> ChunkTuner
+        return self.__tuner
@@ -36,7 +36,16 @@ class ProcessSetup(options.Setup):
 
     def __setup_interface(self):
         self.__interface = foreman.CalculationForeman(
-            number_of_processes=self.__command.number_of_processes
+            number_of_processes=self.__command.number_of_processes,
+            pool_mode=self.__command.pool_mode,
+            scheduling=self.__command.scheduling,
+            fast_channel=self.__command.fast_parameter_channel,
+            pin_processes=self.__command.pin_processes,
+            blas_threads=self.__command.blas_threads,
+            evaluation_timeout=self.__command.evaluation_timeout,
+            max_retries=self.__command.max_retries,
+            inline=self.__command.inline_evaluation,
+            lazy_loading=self.__command.lazy_loading
         )
 
     def return_interface(self):
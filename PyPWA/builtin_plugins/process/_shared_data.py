@@ -0,0 +1,267 @@
+#  coding=utf-8
+#
+#  PyPWA, a scientific analysis toolkit.
+#  Copyright (C) 2016 JLab
+#
+#  This program is free software: you can redistribute it and/or modify
+#  it under the terms of the GNU General Public License as published by
+#  the Free Software Foundation, either version 3 of the License, or
+#  (at your option) any later version.
+#
+#  This program is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#  GNU General Public License for more details.
+#
+#  You should have received a copy of the GNU General Public License
+#  along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+"""
+Shared Memory Data Distribution
+-------------------------------
+Instead of copying the data into every kernel, the data is written once into
+a memory mapped segment, preferably on a RAM backed file system, and the
+kernels only receive small descriptors that are turned back into numpy views
+once the kernel is inside its process.
+
+Once an array is written, the main process's array is replaced inside of
+the shared dictionary with a view of its segment, so the original can be
+freed and the data is held in memory once, by the segments that every
+process maps. Any other reference the caller keeps to the original array
+still holds its copy.
+
+- Descriptor - A picklable stand in for a range of data, which is only
+  loaded once the kernel is inside of its process.
+- SharedArray - A descriptor of a range inside a shared segment, or inside
+  of an .npy file, load returns a zero-copy view of that range.
+- SharedStore - Writes arrays into shared segments and removes the segments
+  when the processes are finished with them.
+- load_kernel - Replaces every descriptor inside a kernel with its data, or
+  a local copy of it when the process is pinned and its share is small.
+"""
+
+import atexit
+import itertools
+import logging
+import os
+import tempfile
+from typing import Any, Dict, List
+
+import numpy
+
+from PyPWA import AUTHOR, VERSION
+from PyPWA.libs.interfaces import kernel
+
+__credits__ = ["Mark Jones"]
+__author__ = AUTHOR
+__version__ = VERSION
+
+
+_SHARED_MEMORY_FOLDER = "/dev/shm"
+_COUNTER = itertools.count()
+
+# The largest share a pinned process copies to its own NUMA node, larger
+# shares stay in the segment so the data isn't held once more per process.
+_LOCAL_COPY_LIMIT = 64 * 1024 ** 2
+
+
+class Descriptor(object):
+
+    def __len__(self):
+        # type: () -> int
+        raise NotImplementedError
+
+    def split(self, number_of_processes):
+        # type: (int) -> List[Descriptor]
+        # Matches the boundaries that numpy.array_split would have used.
+        size, extra = divmod(len(self), number_of_processes)
+        packets = []
+        start = 0
+        for index in range(number_of_processes):
+            stop = start + size + (1 if index < extra else 0)
+            packets.append(self.slice(start, stop))
+            start = stop
+        return packets
+
+    def slice(self, start, stop):
+        # type: (int, int) -> Descriptor
+        """
+        Returns a descriptor of the rows start to stop of this descriptor.
+        """
+        raise NotImplementedError
+
+    def load(self):
+        # type: () -> Any
+        raise NotImplementedError
+
+
+class SharedArray(Descriptor):
+
+    def __init__(self, location, dtype, shape, start=0, stop=None, offset=0):
+        # type: (str, numpy.dtype, tuple, int, int, int) -> None
+        self.location = location
+        self.dtype = dtype
+        self.shape = shape
+        self.start = start
+        self.offset = offset
+        if stop is None:
+            self.stop = shape[0]
+        else:
+            self.stop = stop
+
+    def __len__(self):
+        # type: () -> int
+        return self.stop - self.start
+
+    @property
+    def nbytes(self):
+        # type: () -> int
+        row = numpy.dtype(self.dtype).itemsize
+        for size in self.shape[1:]:
+            row *= size
+        return len(self) * row
+
+    def slice(self, start, stop):
+        # type: (int, int) -> SharedArray
+        return SharedArray(
+            self.location, self.dtype, self.shape, self.start + start,
+            self.start + stop, self.offset
+        )
+
+    def load(self):
+        # type: () -> numpy.ndarray
+        # Copy on write, so a user function that writes into its data won't
+        # corrupt the data of the other processes.
+        segment = numpy.memmap(
+            self.location, dtype=self.dtype, mode="c", shape=self.shape,
+            offset=self.offset
+        )
+        return segment[self.start:self.stop]
+
+
+class SharedStore(object):
+
+    __LOGGER = logging.getLogger(__name__ + ".SharedStore")
+
+    def __init__(self):
+        self.__locations = []  # type: List[str]
+        atexit.register(self.release)
+
+    def share(self, data):
+        # type: (Dict[str, Any]) -> Dict[str, Any]
+        """
+        Writes every array of data into a segment, and returns a copy of
+        data where those arrays are replaced by their descriptors. The
+        arrays inside of data are replaced by views of their segments, so
+        that the originals are freed once nothing else holds them.
+        """
+        # The folder is chosen once for everything being shared, otherwise
+        # each array could fit on its own while all of them together don't.
+        folder = self.__get_folder(sum(
+            value.nbytes for value in data.values()
+            if self.__is_shareable(value)
+        ))
+        shared = dict()
+        for name, value in list(data.items()):
+            shared[name] = self.__share_value(folder, name, value)
+            if isinstance(shared[name], SharedArray) and \
+                    not isinstance(value, Descriptor):
+                data[name] = self.__get_view(shared[name])
+        return shared
+
+    def __share_value(self, folder, name, value):
+        # type: (str, str, Any) -> Any
+        if isinstance(value, Descriptor):
+            return value
+        elif self.__is_shareable(value):
+            return self.__write_segment(folder, name, value)
+        else:
+            self.__LOGGER.debug("'%s' can not be shared, copying it." % name)
+            return value
+
+    @staticmethod
+    def __is_shareable(value):
+        # type: (Any) -> bool
+        return (
+            isinstance(value, numpy.ndarray) and value.ndim > 0 and
+            value.size > 0 and not value.dtype.hasobject
+        )
+
+    def __write_segment(self, folder, name, array):
+        # type: (str, str, numpy.ndarray) -> SharedArray
+        location = self.__get_location(folder, name)
+        segment = numpy.memmap(
+            location, dtype=array.dtype, mode="w+", shape=array.shape
+        )
+        segment[:] = array
+        segment.flush()
+        del segment
+
+        self.__locations.append(location)
+        self.__LOGGER.debug(
+            "Shared '%s' (%d bytes) at %s" % (name, array.nbytes, location)
+        )
+        return SharedArray(location, array.dtype, array.shape)
+
+    @staticmethod
+    def __get_view(descriptor):
+        # type: (SharedArray) -> numpy.ndarray
+        # A plain view, memmap's own indexing is much slower. The view
+        # keeps the segment mapped even after it's released.
+        return numpy.memmap(
+            descriptor.location, dtype=descriptor.dtype, mode="r+",
+            shape=descriptor.shape
+        ).view(numpy.ndarray)
+
+    @staticmethod
+    def __get_location(folder, name):
+        # type: (str, str) -> str
+        clean_name = "".join(char for char in name if char.isalnum())
+        file_name = "PyPWA-%d-%d-%s" % (
+            os.getpid(), next(_COUNTER), clean_name
+        )
+        return os.path.join(folder, file_name)
+
+    @staticmethod
+    def __get_folder(size):
+        # type: (int) -> str
+        # /dev/shm is often tiny inside containers, writing past its end
+        # will kill the program, so fall back to the temp folder.
+        if os.path.isdir(_SHARED_MEMORY_FOLDER):
+            stats = os.statvfs(_SHARED_MEMORY_FOLDER)
+            if stats.f_bavail * stats.f_frsize > size:
+                return _SHARED_MEMORY_FOLDER
+        return tempfile.gettempdir()
+
+    def release(self):
+        for location in self.__locations:
+            self.__remove(location)
+        self.__locations = []
+
+    def __remove(self, location):
+        # type: (str) -> None
+        try:
+            os.remove(location)
+        except OSError as error:
+            self.__LOGGER.debug(error)
+
+
+def load_kernel(process_kernel, local=False):
+    # type: (kernel.Kernel, bool) -> None
+    # A local copy is first touched by the pinned process, so its pages are
+    # placed on that process's NUMA node instead of the main process's.
+    for name, value in list(vars(process_kernel).items()):
+        if isinstance(value, Descriptor):
+            if local and _should_copy(value):
+                setattr(process_kernel, name, numpy.array(value.load()))
+            else:
+                setattr(process_kernel, name, value.load())
+
+
+def _should_copy(descriptor):
+    # type: (Descriptor) -> bool
+    # Other descriptors are read from their files, so they're already local.
+    return (
+        isinstance(descriptor, SharedArray) and
+        descriptor.nbytes <= _LOCAL_COPY_LIMIT
+    )
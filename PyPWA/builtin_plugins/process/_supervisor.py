@@ -0,0 +1,180 @@
+#  coding=utf-8
+#
+#  PyPWA, a scientific analysis toolkit.
+#  Copyright (C) 2016 JLab
+#
+#  This program is free software: you can redistribute it and/or modify
+#  it under the terms of the GNU General Public License as published by
+#  the Free Software Foundation, either version 3 of the License, or
+#  (at your option) any later version.
+#
+#  This program is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#  GNU General Public License for more details.
+#
+#  You should have received a copy of the GNU General Public License
+#  along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+"""
+Process Supervision
+-------------------
+Watches the processes while the kernel interface waits on them. A process
+whose kernel raised, that died, whether it segfaulted or was taken by the
+OOM killer, or that missed its deadline, is replaced with a new process
+holding the same kernel and shard, and the evaluation it was working on is
+sent again.
+
+- SupervisedConnection - Stands in for a process's connection, so the
+  kernel interface is supervised without knowing about it.
+- Supervisor - Tracks the last value sent to each process and replaces the
+  processes that fail while their reply is awaited.
+"""
+
+import logging
+import time
+from typing import Any, Callable, List, Tuple
+
+from PyPWA import AUTHOR, VERSION
+from PyPWA.libs.interfaces import kernel
+
+__credits__ = ["Mark Jones"]
+__author__ = AUTHOR
+__version__ = VERSION
+
+
+respawn_type = Callable[[int], Tuple[Any, Any]]
+
+# How often a waiting connection checks whether its process is still alive.
+_CHECK_INTERVAL = 1.
+_NOTHING_SENT = object()
+
+
+class SupervisedConnection(object):
+
+    def __init__(self, supervisor, index):
+        # type: (Supervisor, int) -> None
+        self.__supervisor = supervisor
+        self.__index = index
+
+    def send(self, value):
+        # type: (Any) -> None
+        self.__supervisor.send(self.__index, value)
+
+    def recv(self):
+        # type: () -> Any
+        return self.__supervisor.recv(self.__index)
+
+
+class Supervisor(object):
+
+    __LOGGER = logging.getLogger(__name__ + ".Supervisor")
+
+    def __init__(
+            self,
+            processes,  # type: List[Any]
+            connections,  # type: List[Any]
+            respawn,  # type: respawn_type
+            timeout=None,  # type: float
+            max_retries=3,  # type: int
+            can_retry=True  # type: bool
+    ):
+        # type: (...) -> None
+        self.__processes = processes
+        self.__connections = connections
+        self.__respawn = respawn
+        self.__timeout = timeout
+        self.__max_retries = max_retries
+        self.__can_retry = can_retry
+        self.__pending = [_NOTHING_SENT] * len(processes)  # type: List[Any]
+        self.__supervised = [
+            SupervisedConnection(self, index)
+            for index in range(len(processes))
+        ]
+
+    @property
+    def connections(self):
+        # type: () -> List[SupervisedConnection]
+        return self.__supervised
+
+    def send(self, index, value):
+        # type: (int, Any) -> None
+        # A process that died between evaluations is replaced before it
+        # receives its next one.
+        if value is not kernel.ProcessCodes.SHUTDOWN:
+            if not self.__processes[index].is_alive():
+                self.__replace(index, "has died")
+            self.__pending[index] = value
+        self.__connections[index].send(value)
+
+    def recv(self, index):
+        # type: (int) -> Any
+        retries = 0
+        start = time.time()
+        while True:
+            if self.__connections[index].poll(self.__get_wait(start)):
+                value = self.__connections[index].recv()
+                if value is not kernel.ProcessCodes.ERROR:
+                    return value
+                problem = "raised an error"
+            else:
+                problem = self.__find_problem(index, start)
+
+            if problem:
+                retries += 1
+                self.__check_retry(index, problem, retries)
+                self.__replace(index, problem)
+                self.__resend(index)
+                start = time.time()
+
+    def __get_wait(self, start):
+        # type: (float) -> float
+        if self.__timeout:
+            remaining = self.__timeout - (time.time() - start)
+            return max(min(_CHECK_INTERVAL, remaining), 0.)
+        return _CHECK_INTERVAL
+
+    def __find_problem(self, index, start):
+        # type: (int, float) -> str
+        # A simplex process exits right after sending, so its reply could
+        # have arrived between the poll and the check.
+        if not self.__processes[index].is_alive():
+            if self.__connections[index].poll(0):
+                return ""
+            return "died with exit code %s" % (
+                self.__processes[index].exitcode
+            )
+        elif self.__timeout and time.time() - start > self.__timeout:
+            return "missed its %ss deadline" % self.__timeout
+        return ""
+
+    def __check_retry(self, index, problem, retries):
+        # type: (int, str, int) -> None
+        if not self.__can_retry:
+            raise RuntimeError(
+                "Process %d %s, and its evaluation can't be retried!" %
+                (index, problem)
+            )
+        elif retries > self.__max_retries:
+            raise RuntimeError(
+                "Process %d %s, giving up after %d retries!" %
+                (index, problem, self.__max_retries)
+            )
+
+    def __replace(self, index, problem):
+        # type: (int, str) -> None
+        self.__LOGGER.error("Process %d %s, respawning it." % (index, problem))
+        old_process = self.__processes[index]
+        if old_process.is_alive():
+            old_process.terminate()
+        old_process.join(_CHECK_INTERVAL)
+
+        process, connection = self.__respawn(index)
+        self.__processes[index] = process
+        self.__connections[index] = connection
+
+    def __resend(self, index):
+        # type: (int) -> None
+        if self.__pending[index] is not _NOTHING_SENT:
+            self.__LOGGER.info("Retrying process %d's evaluation." % index)
+            self.__connections[index].send(self.__pending[index])
@@ -0,0 +1,244 @@
+#  coding=utf-8
+#
+#  PyPWA, a scientific analysis toolkit.
+#  Copyright (C) 2016 JLab
+#
+#  This program is free software: you can redistribute it and/or modify
+#  it under the terms of the GNU General Public License as published by
+#  the Free Software Foundation, either version 3 of the License, or
+#  (at your option) any later version.
+#
+#  This program is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#  GNU General Public License for more details.
+#
+#  You should have received a copy of the GNU General Public License
+#  along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+"""
+Processor Topology
+------------------
+Hyperthreads share a core's floating point units and every NUMA node has its
+own memory, so the processes are placed on physical cores instead of being
+left to the scheduler, and BLAS is kept from starting its own threads
+inside of each process.
+
+- Core - A physical core, the logical cpus it offers, and its NUMA node.
+- Topology - Reads the available physical cores and NUMA nodes from sysfs,
+  falling back to treating every cpu as a core when sysfs is unavailable.
+- Placement - Where a single process should run, applied from inside that
+  process.
+- place_processes - Hands each process its placement and logs the layout.
+"""
+
+import glob
+import logging
+import multiprocessing
+import os
+from typing import Any, Dict, List, Set
+
+from PyPWA import AUTHOR, VERSION
+
+try:
+    import threadpoolctl
+except ImportError:
+    threadpoolctl = None
+
+__credits__ = ["Mark Jones"]
+__author__ = AUTHOR
+__version__ = VERSION
+
+
+_CPU_FOLDER = "/sys/devices/system/cpu"
+_NODE_FOLDER = "/sys/devices/system/node"
+_THREAD_VARIABLES = [
+    "OMP_NUM_THREADS", "OPENBLAS_NUM_THREADS", "MKL_NUM_THREADS",
+    "VECLIB_MAXIMUM_THREADS", "NUMEXPR_NUM_THREADS"
+]
+
+
+def _parse_cpu_list(cpu_list):
+    # type: (str) -> Set[int]
+    # sysfs writes its lists as ranges, such as '0-3,8-11'.
+    cpus = set()
+    for part in cpu_list.strip().split(","):
+        if "-" in part:
+            start, stop = part.split("-")
+            cpus.update(range(int(start), int(stop) + 1))
+        elif part:
+            cpus.add(int(part))
+    return cpus
+
+
+class Core(object):
+
+    def __init__(self, node, cpus):
+        # type: (int, List[int]) -> None
+        self.node = node
+        self.cpus = cpus
+
+
+class Topology(object):
+
+    __LOGGER = logging.getLogger(__name__ + ".Topology")
+
+    def __init__(
+            self, cpu_folder=_CPU_FOLDER, node_folder=_NODE_FOLDER, cpus=None
+    ):
+        # type: (str, str, Set[int]) -> None
+        self.__cpu_folder = cpu_folder
+        self.__node_folder = node_folder
+        self.cores = self.__read_cores(cpus or self.__available_cpus())
+
+    def __read_cores(self, cpus):
+        # type: (Set[int]) -> List[Core]
+        nodes = self.__read_nodes()
+        cores = dict()  # type: Dict[tuple, Core]
+        for cpu in sorted(cpus):
+            key = self.__read_core_key(cpu)
+            if key not in cores:
+                cores[key] = Core(nodes.get(cpu, 0), [])
+            cores[key].cpus.append(cpu)
+        return self.__interleave_nodes(list(cores.values()))
+
+    @staticmethod
+    def __available_cpus():
+        # type: () -> Set[int]
+        # Respects taskset, cgroups, and any other affinity we started with.
+        if hasattr(os, "sched_getaffinity"):
+            return set(os.sched_getaffinity(0))
+        return set(range(multiprocessing.cpu_count()))
+
+    def __read_nodes(self):
+        # type: () -> Dict[int, int]
+        nodes = dict()
+        pattern = os.path.join(self.__node_folder, "node[0-9]*", "cpulist")
+        for location in glob.glob(pattern):
+            node = int(os.path.basename(os.path.dirname(location))[4:])
+            for cpu in _parse_cpu_list(self.__read(location, "")):
+                nodes[cpu] = node
+        return nodes
+
+    def __read_core_key(self, cpu):
+        # type: (int) -> tuple
+        # Without a topology every cpu is its own core.
+        folder = os.path.join(self.__cpu_folder, "cpu%d" % cpu, "topology")
+        package = self.__read(
+            os.path.join(folder, "physical_package_id"), None
+        )
+        core = self.__read(os.path.join(folder, "core_id"), None)
+        if package is None or core is None:
+            return "cpu", cpu
+        return int(package), int(core)
+
+    def __read(self, location, default):
+        # type: (str, Any) -> Any
+        try:
+            with open(location) as stream:
+                return stream.read().strip()
+        except (IOError, OSError, ValueError):
+            self.__LOGGER.debug("Couldn't read %s" % location)
+            return default
+
+    @staticmethod
+    def __interleave_nodes(cores):
+        # type: (List[Core]) -> List[Core]
+        # Alternating nodes spreads fewer processes than cores across all
+        # of the memory controllers instead of filling the first node.
+        by_node = dict()  # type: Dict[int, List[Core]]
+        for core in sorted(cores, key=lambda core: core.cpus[0]):
+            by_node.setdefault(core.node, []).append(core)
+        interleaved = []
+        while any(by_node.values()):
+            for node in sorted(by_node.keys()):
+                if by_node[node]:
+                    interleaved.append(by_node[node].pop(0))
+        return interleaved
+
+    @property
+    def physical_cores(self):
+        # type: () -> int
+        return max(len(self.cores), 1)
+
+    @property
+    def nodes(self):
+        # type: () -> int
+        return max(len(set(core.node for core in self.cores)), 1)
+
+
+class Placement(object):
+
+    __LOGGER = logging.getLogger(__name__ + ".Placement")
+
+    def __init__(self, cpus=None, node=0, blas_threads=None, local=False):
+        # type: (List[int], int, int, bool) -> None
+        self.cpus = cpus
+        self.node = node
+        self.blas_threads = blas_threads
+        self.local = local
+
+    def apply(self):
+        if self.cpus and hasattr(os, "sched_setaffinity"):
+            os.sched_setaffinity(0, self.cpus)
+        if self.blas_threads:
+            self.__limit_threads()
+
+    def __limit_threads(self):
+        # The variables only reach libraries loaded after this point, numpy
+        # already started its BLAS in the parent, so threadpoolctl is needed
+        # to limit the pool that already exists.
+        for variable in _THREAD_VARIABLES:
+            os.environ[variable] = str(self.blas_threads)
+        if threadpoolctl:
+            threadpoolctl.threadpool_limits(self.blas_threads)
+        else:
+            self.__LOGGER.debug(
+                "threadpoolctl isn't installed, BLAS threads are only "
+                "limited through the environment."
+            )
+
+
+def place_processes(processes, pin=True, blas_threads=1, topology=None):
+    # type: (List[Any], bool, int, Topology) -> None
+    """
+    Sets the placement of each process, must be called before the processes
+    are started.
+    """
+    topology = topology or Topology()
+    logger = logging.getLogger(__name__ + ".place_processes")
+
+    pin = pin and len(processes) <= topology.physical_cores
+    local = pin and topology.nodes > 1
+    for index, process in enumerate(processes):
+        if pin:
+            core = topology.cores[index]
+            process.placement = Placement(
+                core.cpus, core.node, blas_threads, local
+            )
+            logger.debug(
+                "Process %d is on cpus %s of node %d" %
+                (index, core.cpus, core.node)
+            )
+        else:
+            process.placement = Placement(blas_threads=blas_threads)
+
+    logger.info(
+        "%d processes on %d physical cores across %d NUMA nodes, %s, "
+        "%s BLAS threads each." % (
+            len(processes), topology.physical_cores, topology.nodes,
+            "pinned" if pin else "not pinned", blas_threads or "unlimited"
+        )
+    )
+    if blas_threads and not threadpoolctl:
+        logger.warning(
+            "threadpoolctl isn't installed, so the BLAS numpy has already "
+            "started can't be limited to %d threads in each process. Install "
+            "threadpoolctl, or set OMP_NUM_THREADS before starting PyPWA."
+            % blas_threads
+        )
+    if not pin and len(processes) > topology.physical_cores:
+        logger.warning(
+            "There are more processes than physical cores, the processes "
+            "will compete for the cores."
+        )
@@ -21,18 +21,33 @@ Kernel Based Processing
 -----------------------
  - _ProcessingInterface - Interface between the processes and the requesting
    plugins.
+ - _WorkerPool - Keeps a set of Pooled processes alive between calls to
+   main_options, loading new kernels into them instead of starting new
+   processes.
  - CalculationForeman - Walks through the process of creating the processes
-   using the provided kernel and data.
+   using the provided kernel and data, and respawns them for the supervisor
+   when they fail. Duplex kernels are run inline instead when the processes
+   wouldn't pay for their overhead.
 """
 
+import functools
 import logging
 import multiprocessing
-from typing import Any, Dict, List
+import pickle
+import sys
+from typing import Any, Callable, Dict, List, Tuple
 
 from PyPWA import AUTHOR, VERSION
 from PyPWA.builtin_plugins.process import _data_split
+from PyPWA.builtin_plugins.process import _fast_channel
+from PyPWA.builtin_plugins.process import _inline
 from PyPWA.builtin_plugins.process import _kernel_setup
+from PyPWA.builtin_plugins.process import _lazy_data
 from PyPWA.builtin_plugins.process import _process_factory
+from PyPWA.builtin_plugins.process import _scheduling
+from PyPWA.builtin_plugins.process import _shared_data
+from PyPWA.builtin_plugins.process import _supervisor
+from PyPWA.builtin_plugins.process import _topology
 from PyPWA.libs.interfaces import kernel
 
 __credits__ = ["Mark Jones"]
@@ -40,6 +55,9 @@ __author__ = AUTHOR
 __version__ = VERSION
 
 
+_PHYSICAL_CORES = _topology.Topology().physical_cores
+
+
 class _ProcessInterface(kernel.ProcessInterface):
 
     __LOGGER = logging.getLogger(__name__ + "._ProcessInterface")
@@ -48,22 +66,48 @@ class _ProcessInterface(kernel.ProcessInterface):
             self,
             interface_kernel,  # type: kernel.KernelInterface
             process_com,  # type: List[multiprocessing.Pipe]
-            processes  # type: List[multiprocessing.Process]
+            processes,  # type: List[multiprocessing.Process]
+            shared_store,  # type: _shared_data.SharedStore
+            keep_alive=False,  # type: bool
+            tuner=None,  # type: _scheduling.ChunkTuner
+            supervisor=None  # type: _supervisor.Supervisor
     ):
         # type: (...) -> None
         self.__connections = process_com
+        if supervisor:
+            self.__supervised = supervisor.connections
+        else:
+            self.__supervised = process_com
         self.__interface = interface_kernel
         self.__processes = processes
+        self.__shared_store = shared_store
+        self.__keep_alive = keep_alive
+        self.__tuner = tuner
 
     def run(self, *args):
-        return self.__interface.run(self.__connections, args)
+        if self.__tuner:
+            self.__tuner.before_run()
+        return self.__interface.run(self.__supervised, args)
+
+    def run_batch(self, points):
+        if self.__tuner:
+            self.__tuner.before_run()
+        return self.__interface.run_batch(self.__supervised, points)
 
     def stop(self, force=False):
-        if self.__interface.IS_DUPLEX and not force:
+        if force:
+            self.__terminate_processes()
+        elif self.__keep_alive:
+            self.__LOGGER.debug("Leaving the pooled processes running.")
+        elif self.__interface.IS_DUPLEX:
             self.__ask_processes_to_stop()
         else:
             self.__terminate_processes()
 
+        if not self.__keep_alive:
+            _fast_channel.close_connections(self.__connections)
+        self.__shared_store.release()
+
     def __ask_processes_to_stop(self):
         for connection in self.__connections:
             self.__LOGGER.debug("Attempting to kill processes.")
@@ -79,19 +123,114 @@ class _ProcessInterface(kernel.ProcessInterface):
         return self.__processes[0].is_alive()
 
 
+class _WorkerPool(object):
+
+    __LOGGER = logging.getLogger(__name__ + "._WorkerPool")
+
+    def __init__(self, fast_channel=True, place_processes=None):
+        # type: (bool, Callable[[List[Any]], None]) -> None
+        self.__fast_channel = fast_channel
+        self.__place_processes = place_processes
+        self.__processes = None  # type: List[multiprocessing.Process]
+        self.__connections = None  # type: List[multiprocessing.Pipe]
+        self.__kernel_type = None  # type: type
+
+    def load(self, kernels, duplex):
+        # type: (List[kernel.Kernel], bool) -> _process_factory.pooled_return
+        if self.__can_reuse(kernels):
+            self.__LOGGER.debug("Loading new kernels into the pool.")
+            self.__send_kernels(kernels, duplex)
+        else:
+            self.close()
+            self.__start_pool(kernels, duplex)
+        return self.__processes, self.__connections
+
+    def __can_reuse(self, kernels):
+        # type: (List[kernel.Kernel]) -> bool
+        # A different kernel class gets fresh processes, so nothing the
+        # last kernel imported or setup can leak into the new one.
+        return (
+            self.__processes is not None and
+            len(self.__processes) == len(kernels) and
+            type(kernels[0]) is self.__kernel_type and
+            all(process.is_alive() for process in self.__processes)
+        )
+
+    def __send_kernels(self, kernels, duplex):
+        # type: (List[kernel.Kernel], bool) -> None
+        path = list(sys.path)
+        for index, process_kernel in enumerate(kernels):
+            process_kernel.PROCESS_ID = index
+            self.__connections[index].send((
+                kernel.ProcessCodes.LOAD, path,
+                pickle.dumps(process_kernel, pickle.HIGHEST_PROTOCOL), duplex
+            ))
+
+    def __start_pool(self, kernels, duplex):
+        # type: (List[kernel.Kernel], bool) -> None
+        self.__LOGGER.debug("Starting the worker pool.")
+        self.__processes, self.__connections = _process_factory.pooled_build(
+            kernels, duplex, self.__fast_channel
+        )
+        self.__kernel_type = type(kernels[0])
+        if self.__place_processes:
+            self.__place_processes(self.__processes)
+        for process in self.__processes:
+            process.start()
+
+    def close(self):
+        if self.__processes is not None:
+            self.__LOGGER.debug("Shutting down the worker pool.")
+            for process, connection in zip(
+                    self.__processes, self.__connections):
+                if process.is_alive():
+                    connection.send(kernel.ProcessCodes.SHUTDOWN)
+            _fast_channel.close_connections(self.__connections)
+            self.__processes = None
+            self.__connections = None
+
+
 class CalculationForeman(kernel.KernelProcessing):
 
     __LOGGER = logging.getLogger(__name__ + ".CalculationForeman")
 
     def __init__(
-            self, number_of_processes=multiprocessing.cpu_count() * 2,
+            self,
+            number_of_processes=_PHYSICAL_CORES,  # type: int
+            pool_mode=False,  # type: bool
+            scheduling="static",  # type: str
+            fast_channel=True,  # type: bool
+            pin_processes=True,  # type: bool
+            blas_threads=1,  # type: int
+            evaluation_timeout=None,  # type: float
+            max_retries=3,  # type: int
+            inline="auto",  # type: str
+            lazy_loading=False  # type: bool
     ):
-        # type: (int) -> None
+        # type: (...) -> None
+        self.__number_of_processes = number_of_processes
         self.__splitter = _data_split.SetupData(number_of_processes)
+        self.__dynamic_setup = _scheduling.DynamicSetup(number_of_processes)
+        self.__scheduling = scheduling
+        self.__tuner = None  # type: _scheduling.ChunkTuner
         self.__kernel_setup = _kernel_setup.SetupKernels()
+        self.__shared_store = _shared_data.SharedStore()
+        self.__place_processes = functools.partial(
+            _topology.place_processes, pin=pin_processes,
+            blas_threads=blas_threads, topology=_topology.Topology()
+        )
+        self.__pool = _WorkerPool(fast_channel, self.__place_processes)
+        self.__pool_mode = pool_mode
+        self.__fast_channel = fast_channel
+        self.__evaluation_timeout = evaluation_timeout
+        self.__max_retries = max_retries
+        self.__inline = inline
+        self.__lazy_loading = lazy_loading
+        self.__kernels = None  # type: List[kernel.Kernel]
+        self.__duplex = None  # type: bool
         self.__processes = None  # type: List[multiprocessing.Process]
         self.__connections = None  # type: List[multiprocessing.Pipe]
-        self.__interface = None  # type: _ProcessInterface
+        self.__interface = None  # type: kernel.ProcessInterface
 
     def main_options(
             self,
@@ -100,24 +239,129 @@ class CalculationForeman(kernel.KernelProcessing):
             internal_interface  # type: kernel.KernelInterface
     ):
         # type: (...) -> None
-        kernels = self.__setup_kernels(data, process_kernel)
-        self.__make_processes(kernels, internal_interface.IS_DUPLEX)
-        self.__start_processes()
-        self.__build_interface(internal_interface)
-
-    def __setup_kernels(self, data, process_kernel):
-        # type: (Dict[str, Any], kernel.Kernel) -> List[kernel.Kernel]
-        process_data = self.__splitter.split(data)
+        if self.__lazy_loading:
+            data = self.__open_lazy_data(data)
+
+        if self.__use_inline(internal_interface.IS_DUPLEX):
+            self.__interface = self.__build_inline_interface(
+                data, process_kernel, internal_interface
+            )
+        else:
+            self.__interface = self.__start(
+                data, process_kernel, internal_interface
+            )
+
+    @property
+    def lazy_loading(self):
+        # type: () -> bool
+        return self.__lazy_loading
+
+    def __open_lazy_data(self, data):
+        # type: (Dict[str, Any]) -> Dict[str, Any]
+        opened = _lazy_data.open_data(data)
+        for name, value in opened.items():
+            if value is not data[name]:
+                self.__LOGGER.info(
+                    "Each process will load its share of '%s' from %s" %
+                    (name, getattr(data[name], "location", data[name]))
+                )
+        return opened
+
+    def __use_inline(self, duplex):
+        # type: (bool) -> bool
+        # Running the kernel inline, or timing it inline, would load every
+        # file into this process, which is what lazy loading avoids.
+        if not duplex or self.__inline == "never":
+            return False
+        elif self.__inline == "always":
+            return True
+        return not self.__lazy_loading
+
+    def __build_inline_interface(
+            self,
+            data,  # type: Dict[str, Any]
+            process_kernel,  # type: kernel.Kernel
+            interface  # type: kernel.KernelInterface
+    ):
+        # type: (...) -> kernel.ProcessInterface
+        inline_kernel = _inline.load_kernel(process_kernel, data)
+        if self.__inline == "always" or self.__number_of_processes == 1:
+            self.__LOGGER.info("Running the kernel inline in this process.")
+            return _inline.InlineInterface(interface, inline_kernel)
+
+        if self.__fast_channel:
+            round_trip = _inline.FAST_ROUND_TRIP
+        else:
+            round_trip = _inline.PIPE_ROUND_TRIP
+        return _inline.AdaptiveInterface(
+            interface, inline_kernel,
+            functools.partial(self.__start, data, process_kernel, interface),
+            self.__number_of_processes, round_trip,
+            _inline.count_events(data)
+        )
+
+    def __start(
+            self,
+            data,  # type: Dict[str, Any]
+            process_kernel,  # type: kernel.Kernel
+            internal_interface  # type: kernel.KernelInterface
+    ):
+        # type: (...) -> _ProcessInterface
+        kernels = self.__setup_kernels(
+            data, process_kernel, internal_interface.IS_DUPLEX
+        )
+        self.__kernels = kernels
+        self.__duplex = internal_interface.IS_DUPLEX
+        if self.__pool_mode:
+            self.__load_pool(kernels, internal_interface.IS_DUPLEX)
+        else:
+            self.__make_processes(kernels, internal_interface.IS_DUPLEX)
+            self.__start_processes()
+        return self.__build_interface(internal_interface)
+
+    def __setup_kernels(self, data, process_kernel, duplex):
+        # type: (Dict[str, Any], kernel.Kernel, bool) -> List[kernel.Kernel]
+        self.__shared_store.release()
+        self.__tuner = None
+        shared_data = self.__shared_store.share(data)
+        if self.__use_dynamic_scheduling(shared_data, duplex):
+            return self.__setup_chunked_kernels(process_kernel, shared_data)
+
+        process_data = self.__splitter.split(shared_data)
         kernels = self.__kernel_setup.setup_kernels(
             process_kernel, process_data
         )
         return kernels
 
+    def __use_dynamic_scheduling(self, shared_data, duplex):
+        # type: (Dict[str, Any], bool) -> bool
+        if self.__scheduling != "dynamic":
+            return False
+        elif not duplex:
+            self.__LOGGER.debug("Simplex kernels are scheduled statically.")
+            return False
+        elif not self.__dynamic_setup.can_schedule(shared_data):
+            self.__LOGGER.warning(
+                "Data can't be shared, falling back to static scheduling."
+            )
+            return False
+        return True
+
+    def __setup_chunked_kernels(self, process_kernel, shared_data):
+        # type: (kernel.Kernel, Dict[str, Any]) -> List[kernel.Kernel]
+        kernels = self.__dynamic_setup.setup_kernels(
+            process_kernel, shared_data, self.__shared_store
+        )
+        self.__tuner = self.__dynamic_setup.tuner
+        return kernels
+
     def __make_processes(self, kernels, duplex):
         # type: (List[kernel.Kernel], bool) -> None
         if duplex:
             self.__LOGGER.debug("Building Duplex Processes.")
-            processes, connections = _process_factory.duplex_build(kernels)
+            processes, connections = _process_factory.duplex_build(
+                kernels, self.__fast_channel
+            )
         else:
             self.__LOGGER.debug("Building Simplex Processes.")
             processes, connections = _process_factory.simplex_build(kernels)
@@ -125,14 +369,58 @@ class CalculationForeman(kernel.KernelProcessing):
 
     def __start_processes(self):
         self.__LOGGER.debug("Starting Processes!")
+        self.__place_processes(self.__processes)
         for process in self.__processes:
             process.start()
 
+    def __load_pool(self, kernels, duplex):
+        # type: (List[kernel.Kernel], bool) -> None
+        self.__processes, self.__connections = self.__pool.load(
+            kernels, duplex
+        )
+
     def __build_interface(self, internal_interface):
-        self.__interface = _ProcessInterface(
-            internal_interface, self.__connections, self.__processes
+        # type: (kernel.KernelInterface) -> _ProcessInterface
+        # Chunks that a dynamic process took with it can't be given back,
+        # so those evaluations fail instead of returning a partial sum.
+        supervisor = _supervisor.Supervisor(
+            self.__processes, self.__connections, self.__respawn,
+            self.__evaluation_timeout, self.__max_retries,
+            can_retry=self.__tuner is None
+        )
+        return _ProcessInterface(
+            internal_interface, self.__connections, self.__processes,
+            self.__shared_store, self.__pool_mode, self.__tuner, supervisor
         )
 
+    def __respawn(self, index):
+        # type: (int) -> Tuple[multiprocessing.Process, Any]
+        process_kernel = self.__kernels[index]
+        if self.__pool_mode:
+            processes, connections = _process_factory.pooled_build(
+                [process_kernel], self.__duplex, self.__fast_channel
+            )
+        elif self.__duplex:
+            processes, connections = _process_factory.duplex_build(
+                [process_kernel], self.__fast_channel
+            )
+        else:
+            processes, connections = _process_factory.simplex_build(
+                [process_kernel]
+            )
+
+        process_kernel.PROCESS_ID = index
+        processes[0].placement = self.__processes[index].placement
+        processes[0].start()
+        return processes[0], connections[0]
+
     def fetch_interface(self):
-        # type: () -> _ProcessInterface
+        # type: () -> kernel.ProcessInterface
         return self.__interface
+
+    def close(self):
+        """
+        Shuts down the worker pool, only needed when pool mode is enabled
+        since the processes are otherwise stopped with their interface.
+        """
+        self.__pool.close()
@@ -0,0 +1,93 @@
+#  coding=utf-8
+#
+#  PyPWA, a scientific analysis toolkit.
+#  Copyright (C) 2016 JLab
+#
+#  This program is free software: you can redistribute it and/or modify
+#  it under the terms of the GNU General Public License as published by
+#  the Free Software Foundation, either version 3 of the License, or
+#  (at your option) any later version.
+#
+#  This program is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#  GNU General Public License for more details.
+#
+#  You should have received a copy of the GNU General Public License
+#  along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+"""
+Gradient Based Minimization with SciPy
+--------------------------------------
+Minimizes the function with scipy's quasi-Newton methods, L-BFGS-B or
+trust-constr, which respect the limits of the parameters. Each step asks
+for the value and the gradient of a point at the same time, the gradient is
+from your gradient function when you supplied one, otherwise from a central
+difference that is calculated in a single batch with the value.
+
+The parameters and settings are the same as Minuit's, the starting value
+is set with the parameter's name, limits with "limit_name", and fixed
+parameters with "fix_name".
+"""
+
+
+from PyPWA import AUTHOR, VERSION
+from PyPWA.builtin_plugins.scipy_optimize import _setup
+from PyPWA.initializers.configurator import options
+
+__credits__ = ["Mark Jones"]
+__author__ = AUTHOR
+__version__ = VERSION
+
+
+class ScipyOptions(options.Plugin):
+    plugin_name = "SciPy Minimize"
+    setup = _setup.ScipySetup
+    provides = options.Types.OPTIMIZER
+    defined_function = None
+    module_comment = "Quasi-Newton minimization with gradients and limits."
+
+    default_options = {
+        "parameters": ["A1", "A2", "A3"],
+        "settings": {"A1": 1, "fix_A1": True, "limit_A2": [0, 10]},
+        "method": "L-BFGS-B",
+        "max iterations": 1000,
+        "tolerance": None,
+        "gradient step": 1e-5
+    }
+
+    option_difficulties = {
+        "parameters": options.Levels.REQUIRED,
+        "settings": options.Levels.REQUIRED,
+        "method": options.Levels.OPTIONAL,
+        "max iterations": options.Levels.OPTIONAL,
+        "tolerance": options.Levels.ADVANCED,
+        "gradient step": options.Levels.ADVANCED
+    }
+
+    option_types = {
+        "parameters": list,
+        "settings": dict,
+        "method": ["L-BFGS-B", "trust-constr"],
+        "max iterations": int,
+        "tolerance": float,
+        "gradient step": float
+    }
+
+    option_comments = {
+        "parameters":
+            "The parameters used inside your settings and your function",
+        "settings":
+            "Starting values, limits, and fixed parameters, the same as "
+            "Minuit's settings.",
+        "method":
+            "L-BFGS-B is fast, trust-constr is more robust near limits.",
+        "max iterations":
+            "The max number of iterations of the method.",
+        "tolerance":
+            "The tolerance for termination, leave empty for scipy's "
+            "default.",
+        "gradient step":
+            "The relative step used for the gradient when you don't supply "
+            "a gradient function."
+    }
@@ -0,0 +1,369 @@
+#  coding=utf-8
+#
+#  PyPWA, a scientific analysis toolkit.
+#  Copyright (C) 2016 JLab
+#
+#  This program is free software: you can redistribute it and/or modify
+#  it under the terms of the GNU General Public License as published by
+#  the Free Software Foundation, either version 3 of the License, or
+#  (at your option) any later version.
+#
+#  This program is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#  GNU General Public License for more details.
+#
+#  You should have received a copy of the GNU General Public License
+#  along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+"""
+Gradient Based Minimization with SciPy
+--------------------------------------
+Quasi-Newton minimization with scipy.optimize.minimize, L-BFGS-B or
+trust-constr, with the value and gradient of each point calculated
+together. The gradient comes from the user's gradient function when there
+is one, otherwise it is a central difference gradient calculated in the
+same batch as the value.
+
+- _ParserObject - Translates the received value inside run to something the
+  user can easily interact with.
+- _Parameters - Splits Minuit style settings into starting values, bounds,
+  and the free parameters.
+- _ValueAndGradient - What scipy calls, returns the value and gradient of
+  the free parameters.
+- ScipyMinimize - The main optimizer object, with a checkpoint it saves
+  the values after each iteration that a checkpoint is due.
+"""
+
+import logging
+from typing import Any, Callable, Dict, List, Tuple
+from typing import Optional as Opt
+
+import numpy
+import tabulate
+from scipy import optimize
+
+from PyPWA import AUTHOR, VERSION
+from PyPWA.libs import checkpoints
+from PyPWA.libs.interfaces import optimizers
+
+__credits__ = ["Mark Jones"]
+__author__ = AUTHOR
+__version__ = VERSION
+
+
+batch_type = Callable[[numpy.ndarray], numpy.ndarray]
+gradient_type = Callable[..., Tuple[float, numpy.ndarray]]
+
+
+class _ParserObject(optimizers.OptimizerOptionParser):
+
+    def __init__(self, parameters):
+        # type: (List[str]) -> None
+        self._parameters = parameters
+
+    def convert(self, *args):
+        # type: (Tuple[Tuple[List[float]]]) -> Dict[str, float]
+        parameters_with_values = {}
+        for parameter, arg in zip(self._parameters, args[0][0]):
+            parameters_with_values[parameter] = arg
+
+        return parameters_with_values
+
+
+class _Parameters(object):
+
+    def __init__(self, parameters, settings):
+        # type: (List[str], Dict[str, Any]) -> None
+        self.names = parameters
+        self.start = numpy.array(
+            [float(settings.get(name, 0.)) for name in parameters]
+        )
+        self.free = numpy.array([
+            index for index, name in enumerate(parameters)
+            if not settings.get("fix_" + name, False)
+        ], dtype=int)
+        self.bounds = [
+            self.__get_bound(settings.get("limit_" + parameters[index]))
+            for index in self.free
+        ]
+
+    @staticmethod
+    def __get_bound(limit):
+        # type: (Opt[List[float]]) -> Tuple[Opt[float], Opt[float]]
+        if limit is None:
+            return None, None
+        return limit[0], limit[1]
+
+    def expand(self, free_values):
+        # type: (numpy.ndarray) -> numpy.ndarray
+        values = self.start.copy()
+        values[self.free] = free_values
+        return values
+
+
+class _ValueAndGradient(object):
+
+    def __init__(
+            self,
+            parameters,  # type: _Parameters
+            calc_function,  # type: Callable[..., float]
+            batch_function=None,  # type: Opt[batch_type]
+            gradient_function=None,  # type: Opt[gradient_type]
+            step=1e-5  # type: float
+    ):
+        # type: (...) -> None
+        self.__parameters = parameters
+        self.__calc_function = calc_function
+        self.__batch_function = batch_function
+        self.__gradient_function = gradient_function
+        self.__step = step
+        self.calls = 0
+
+    def __call__(self, free_values):
+        # type: (numpy.ndarray) -> Tuple[float, numpy.ndarray]
+        self.calls += 1
+        values = self.__parameters.expand(free_values)
+        if self.__gradient_function is not None:
+            value, gradient = self.__gradient_function(*values)
+            gradient = numpy.asarray(gradient, dtype=float)
+            return float(value), gradient[self.__parameters.free]
+        return self.__central_difference(values)
+
+    def __central_difference(self, values):
+        # type: (numpy.ndarray) -> Tuple[float, numpy.ndarray]
+        # The center is the first point of the batch, so the value and the
+        # gradient only need a single round trip to the processes.
+        free = self.__parameters.free
+        steps = self.__step * numpy.maximum(numpy.abs(values[free]), 1)
+        points = numpy.tile(values, (2 * len(free) + 1, 1))
+        for row, (index, step) in enumerate(zip(free, steps)):
+            points[2 * row + 1, index] += step
+            points[2 * row + 2, index] -= step
+
+        results = self.__calculate(points)
+        gradient = (results[1::2] - results[2::2]) / (2 * steps)
+        return float(results[0]), gradient
+
+    def __calculate(self, points):
+        # type: (numpy.ndarray) -> numpy.ndarray
+        if self.__batch_function is None:
+            return numpy.array(
+                [self.__calc_function(*point) for point in points]
+            )
+        return numpy.asarray(self.__batch_function(points), dtype=float)
+
+
+class ScipyMinimize(optimizers.Optimizer):
+
+    OPTIMIZER_TYPE = optimizers.OptimizerTypes.MINIMIZER
+    WARM_START = True
+    CHECKPOINTS = True
+
+    __LOGGER = logging.getLogger(__name__ + ".ScipyMinimize")
+
+    def __init__(
+            self,
+            parameters=False,  # type: List[str]
+            settings=False,  # type: Dict[str, Any]
+            method="L-BFGS-B",  # type: str
+            max_iterations=1000,  # type: int
+            tolerance=None,  # type: Opt[float]
+            gradient_step=1e-5  # type: float
+    ):
+        # type: (...) -> None
+        self.__parameters = parameters
+        self.__settings = settings
+        self.__method = method
+        self.__max_iterations = max_iterations
+        self.__tolerance = tolerance
+        self.__gradient_step = gradient_step
+
+        self.__errordef = .5
+        self.__result = None  # type: optimize.OptimizeResult
+        self.__values = None  # type: numpy.ndarray
+        self.__free = None  # type: numpy.ndarray
+        self.__calc_function = None  # type: Callable[..., float]
+        self.__batch_function = None  # type: batch_type
+        self.__gradient_function = None  # type: gradient_type
+        self.__checkpoint = None  # type: checkpoints.Checkpoint
+        self.__resume = False
+        self.__function = None  # type: _ValueAndGradient
+        self.__iterations = 0
+
+    def main_options(
+            self,
+            calc_function,  # type: Callable[..., float]
+            fitting_type=False,  # type: optimizers.LikelihoodTypes
+            batch_function=None,  # type: batch_type
+            gradient_function=None  # type: gradient_type
+    ):
+        # type: (...) -> None
+        self.__calc_function = calc_function
+        self.__batch_function = batch_function
+        self.__gradient_function = gradient_function
+        if fitting_type is optimizers.LikelihoodTypes.CHI_SQUARED:
+            self.__errordef = 1.
+        else:
+            self.__errordef = .5
+
+    def __check_params(self):
+        if isinstance(self.__parameters, bool):
+            raise ValueError(
+                "There are no supplied parameters! Please set "
+                "'parameters' under 'SciPy Minimize' in your settings!"
+            )
+        elif all(
+                (self.__settings or {}).get("fix_" + name, False)
+                for name in self.__parameters
+        ):
+            raise ValueError(
+                "Every parameter is fixed, so there is nothing to minimize! "
+                "Free at least one parameter under 'SciPy Minimize' in your "
+                "settings."
+            )
+
+    def start(self):
+        self.__check_params()
+        self.__iterations = 0
+        calls = self.__load_checkpoint()
+        parameters = _Parameters(self.__parameters, self.__settings or {})
+        self.__function = self.__get_function(parameters)
+        self.__function.calls = calls
+
+        self.__LOGGER.debug("Found settings: " + repr(self.__settings))
+        self.__result = optimize.minimize(
+            self.__function, parameters.start[parameters.free], jac=True,
+            method=self.__method, bounds=parameters.bounds,
+            tol=self.__tolerance, callback=self.__get_callback(),
+            options={
+                "maxiter": max(1, self.__max_iterations - self.__iterations)
+            }
+        )
+        self.__values = parameters.expand(self.__result.x)
+        self.__free = parameters.free
+        if self.__checkpoint:
+            self.__checkpoint.remove()
+        self.__LOGGER.info(
+            "%s finished after %d calls: %s" %
+            (self.__method, self.__result.nfev, self.__result.message)
+        )
+
+    def __get_function(self, parameters):
+        # type: (_Parameters) -> _ValueAndGradient
+        if self.__gradient_function is not None:
+            self.__LOGGER.info("Using the supplied analytic gradient.")
+        elif self.__batch_function is not None:
+            self.__LOGGER.info("Calculating the gradient in batches.")
+        else:
+            self.__LOGGER.warning(
+                "Batches can't be calculated, each point of the gradient "
+                "will be sent to the processes by itself."
+            )
+        return _ValueAndGradient(
+            parameters, self.__calc_function, self.__batch_function,
+            self.__gradient_function, self.__gradient_step
+        )
+
+    def __get_callback(self):
+        # type: () -> Opt[Callable[..., None]]
+        if self.__checkpoint:
+            return self.__save_checkpoint
+        return None
+
+    def __save_checkpoint(self, free_values, *state):
+        # type: (numpy.ndarray, Any) -> None
+        # trust-constr also hands over its own state, which isn't needed
+        # since the next start begins a new trust region anyway.
+        self.__iterations += 1
+        if self.__checkpoint.due(self.__function.calls):
+            parameters = _Parameters(self.__parameters, self.__settings or {})
+            self.__checkpoint.save(
+                self.__function.calls,
+                values=parameters.expand(free_values),
+                iterations=self.__iterations
+            )
+
+    def __load_checkpoint(self):
+        # type: () -> int
+        if not (self.__checkpoint and self.__resume):
+            return 0
+        state = self.__checkpoint.load()
+        if state is None:
+            return 0
+
+        self.warm_start(dict(zip(self.__parameters, state["values"].tolist())))
+        self.__iterations = int(state["iterations"])
+        return int(state["calls"])
+
+    def set_checkpoint(self, checkpoint, resume=False):
+        # type: (checkpoints.Checkpoint, bool) -> None
+        self.__checkpoint = checkpoint
+        self.__resume = resume
+
+    def best_values(self):
+        # type: () -> Dict[str, float]
+        return dict(zip(self.__parameters, self.__values.tolist()))
+
+    def warm_start(self, values):
+        # type: (Dict[str, float]) -> None
+        settings = dict(self.__settings or {})
+        settings.update(values)
+        self.__settings = settings
+
+    def return_parser(self):
+        # type: () -> _ParserObject
+        return _ParserObject(self.__parameters)
+
+    def save_extra(self, save_name):
+        # type: (str) -> None
+        if self.__result is None:
+            return
+
+        covariance = self.__get_covariance()
+        with open(save_name + ".txt", "w") as stream:
+            stream.write(str(self.__result.message) + "\n")
+            stream.write(self.__make_table(covariance) + "\n")
+            stream.write("final value: " + str(self.__result.fun))
+
+        numpy.save(save_name + ".npy", {
+            "covariance": covariance,
+            "fval": self.__result.fun,
+            "values": self.best_values()
+        })
+
+    def __get_covariance(self):
+        # type: () -> Opt[Dict[Tuple[str, str], float]]
+        # Only L-BFGS-B keeps its approximation of the inverse hessian, and
+        # it is only an approximation, Minuit's Hesse should be used when
+        # accurate errors are needed.
+        if not hasattr(self.__result, "hess_inv"):
+            return None
+
+        inverse = self.__result.hess_inv
+        if hasattr(inverse, "todense"):
+            inverse = inverse.todense()
+        matrix = 2 * self.__errordef * numpy.asarray(inverse)
+
+        names = [self.__parameters[index] for index in self.__free]
+        covariance = {}
+        for row, x in enumerate(names):
+            for column, y in enumerate(names):
+                covariance[(x, y)] = float(matrix[row, column])
+        return covariance
+
+    def __make_table(self, covariance):
+        # type: (Opt[Dict[Tuple[str, str], float]]) -> str
+        rows = [
+            [name, value]
+            for name, value in zip(self.__parameters, self.__values)
+        ]
+        table = tabulate.tabulate(rows, ["Parameter", "Value"], "grid")
+        if covariance is None:
+            return table
+
+        names = [x for x, y in covariance if x == y]
+        rows = [[x] + [covariance[(x, y)] for y in names] for x in names]
+        return table + "\n\nCovariance:\n" + tabulate.tabulate(
+            rows, names, "grid", numalign="center"
+        )
@@ -0,0 +1,71 @@
+#  coding=utf-8
+#
+#  PyPWA, a scientific analysis toolkit.
+#  Copyright (C) 2016 JLab
+#
+#  This program is free software: you can redistribute it and/or modify
+#  it under the terms of the GNU General Public License as published by
+#  the Free Software Foundation, either version 3 of the License, or
+#  (at your option) any later version.
+#
+#  This program is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#  GNU General Public License for more details.
+#
+#  You should have received a copy of the GNU General Public License
+#  along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+"""
+This is the builtin plugin for threading. It takes the same kernels and
+interface as the multiprocessing plugin, but runs each kernel in a thread
+over a view of the data instead of in its own process, so no data is copied
+and sending the kernels a value costs microseconds instead of a pickle and a
+pipe.
+
+Threads share the GIL, so this is only faster when the kernels spend most of
+their time inside of large numpy operations, which is the case for most
+vectorized processing functions whose evaluations take a few milliseconds.
+
+Example:
+    foreman = ThreadForeman()
+    foreman.main_options(data, AbstractKernel, AbstractInterface)
+    interface = foreman.fetch_interface()
+    processed_value = interface.run("Your args")
+"""
+
+import multiprocessing
+
+from PyPWA import AUTHOR, VERSION
+from PyPWA.builtin_plugins.threads import _setup
+from PyPWA.initializers.configurator import options
+
+__credits__ = ["Mark Jones"]
+__author__ = AUTHOR
+__version__ = VERSION
+
+
+class Threading(options.Plugin):
+
+    plugin_name = "Builtin Threading"
+    setup = _setup.ThreadSetup
+    provides = options.Types.KERNEL_PROCESSING
+    defined_function = None
+    module_comment = "Builtin thread plugin, for functions that are mostly " \
+                     "numpy"
+
+    default_options = {
+        "number of threads": multiprocessing.cpu_count()
+    }
+
+    option_difficulties = {
+        "number of threads": options.Levels.OPTIONAL
+    }
+
+    option_types = {
+        "number of threads": int
+    }
+
+    option_comments = {
+        "number of threads": "Number of threads to use for calculation."
+    }
@@ -0,0 +1,168 @@
+#  coding=utf-8
+#
+#  PyPWA, a scientific analysis toolkit.
+#  Copyright (C) 2016 JLab
+#
+#  This program is free software: you can redistribute it and/or modify
+#  it under the terms of the GNU General Public License as published by
+#  the Free Software Foundation, either version 3 of the License, or
+#  (at your option) any later version.
+#
+#  This program is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#  GNU General Public License for more details.
+#
+#  You should have received a copy of the GNU General Public License
+#  along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+"""
+The threads that host the kernels, and the queues they talk over.
+-----------------------------------------------------------------
+- ThreadConnection - One end of a pair of queues, it offers the same send
+  and recv methods as a multiprocessing Pipe so the kernel interfaces don't
+  need to know they are talking to a thread.
+- Duplex - Waits for values or batches of values from the main thread and
+  calculates over them until it receives a shutdown.
+- Simplex - Calculates over its kernel once, sends the value, then exits.
+- duplex_build and simplex_build - Wrap each kernel in its thread.
+"""
+
+import logging
+import threading
+from typing import Any, List, Tuple
+
+from PyPWA import AUTHOR, VERSION
+from PyPWA.libs.interfaces import kernel
+
+try:
+    from queue import Queue
+except ImportError:
+    from Queue import Queue
+
+__credits__ = ["Mark Jones"]
+__author__ = AUTHOR
+__version__ = VERSION
+
+
+class ThreadConnection(object):
+
+    def __init__(self, incoming, outgoing):
+        # type: (Queue, Queue) -> None
+        self.__incoming = incoming
+        self.__outgoing = outgoing
+
+    def send(self, value):
+        # type: (Any) -> None
+        self.__outgoing.put(value)
+
+    def recv(self):
+        # type: () -> Any
+        return self.__incoming.get()
+
+
+def _connection_pair():
+    # type: () -> Tuple[ThreadConnection, ThreadConnection]
+    to_thread, to_main = Queue(), Queue()
+    main = ThreadConnection(to_main, to_thread)
+    thread = ThreadConnection(to_thread, to_main)
+    return main, thread
+
+
+class _AbstractThread(threading.Thread):
+
+    def __init__(self):
+        super(_AbstractThread, self).__init__()
+        self.daemon = True  # When true, threads will die with main
+
+    def run(self):
+        raise NotImplementedError
+
+
+class Duplex(_AbstractThread):
+
+    __LOGGER = logging.getLogger(__name__ + ".Duplex")
+
+    def __init__(self, thread_kernel, connect):
+        # type: (kernel.Kernel, ThreadConnection) -> None
+        super(Duplex, self).__init__()
+        self.__kernel = thread_kernel
+        self.__connection = connect
+
+    def run(self):
+        self.__kernel.setup()
+        while True:
+            received = self.__connection.recv()
+            if received is kernel.ProcessCodes.SHUTDOWN:
+                self.__LOGGER.debug("Gracefully shutting down thread.")
+                break
+            elif not self.__process(received):
+                break
+
+    def __process(self, value):
+        # type: (Any) -> bool
+        # Raising would only print the error a second time, the thread
+        # simply exits instead, just like a crashed process would.
+        try:
+            if kernel.is_batch(value):
+                result = self.__kernel.process_batch(value[1])
+            elif kernel.is_gradient(value):
+                result = self.__kernel.process_gradient(*value[1])
+            elif kernel.is_gradient_batch(value):
+                result = self.__kernel.process_gradient_batch(*value[1])
+            else:
+                result = self.__kernel.process(value)
+            self.__connection.send(result)
+        except Exception as error:
+            self.__connection.send(kernel.ProcessCodes.ERROR)
+            self.__LOGGER.exception(error)
+            self.__LOGGER.critical(
+                "Kernel thread in critical state! The program will crash!"
+            )
+            return False
+        return True
+
+
+class Simplex(_AbstractThread):
+
+    __LOGGER = logging.getLogger(__name__ + ".Simplex")
+
+    def __init__(self, thread_kernel, connect):
+        # type: (kernel.Kernel, ThreadConnection) -> None
+        super(Simplex, self).__init__()
+        self.__kernel = thread_kernel
+        self.__connection = connect
+
+    def run(self):
+        try:
+            self.__kernel.setup()
+            self.__connection.send(self.__kernel.process())
+        except Exception as error:
+            self.__connection.send(kernel.ProcessCodes.ERROR)
+            self.__LOGGER.exception(error)
+        else:
+            self.__LOGGER.debug("Shutting Down.")
+
+
+build_return = Tuple[List[_AbstractThread], List[ThreadConnection]]
+
+
+def __build(thread_type, kernels):
+    # type: (type, List[kernel.Kernel]) -> build_return
+    threads, connections = [], []
+    for index, thread_kernel in enumerate(kernels):
+        thread_kernel.PROCESS_ID = index
+        main, thread = _connection_pair()
+        threads.append(thread_type(thread_kernel, thread))
+        connections.append(main)
+    return threads, connections
+
+
+def duplex_build(kernels):
+    # type: (List[kernel.Kernel]) -> build_return
+    return __build(Duplex, kernels)
+
+
+def simplex_build(kernels):
+    # type: (List[kernel.Kernel]) -> build_return
+    return __build(Simplex, kernels)
@@ -0,0 +1,129 @@
+#  coding=utf-8
+#
+#  PyPWA, a scientific analysis toolkit.
+#  Copyright (C) 2016 JLab
+#
+#  This program is free software: you can redistribute it and/or modify
+#  it under the terms of the GNU General Public License as published by
+#  the Free Software Foundation, either version 3 of the License, or
+#  (at your option) any later version.
+#
+#  This program is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#  GNU General Public License for more details.
+#
+#  You should have received a copy of the GNU General Public License
+#  along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+"""
+Thread Based Processing
+-----------------------
+Runs the same kernels as the process plugin, but inside of threads of the
+main process. The data is split into views of the original arrays, so
+nothing is copied or pickled, and a value reaches a kernel through a queue
+instead of a pipe. This only pays off when the kernels spend their time
+inside of numpy, which releases the GIL while it works.
+
+- _ThreadInterface - Interface between the threads and the requesting
+  plugins.
+- ThreadForeman - Splits the data, loads it into copies of the kernel, and
+  starts a thread for each copy.
+"""
+
+import logging
+import multiprocessing
+from typing import Any, Dict, List
+
+from PyPWA import AUTHOR, VERSION
+from PyPWA.builtin_plugins.process import _data_split
+from PyPWA.builtin_plugins.process import _kernel_setup
+from PyPWA.builtin_plugins.threads import _threads
+from PyPWA.libs.interfaces import kernel
+
+__credits__ = ["Mark Jones"]
+__author__ = AUTHOR
+__version__ = VERSION
+
+
+class _ThreadInterface(kernel.ProcessInterface):
+
+    __LOGGER = logging.getLogger(__name__ + "._ThreadInterface")
+
+    def __init__(
+            self,
+            interface_kernel,  # type: kernel.KernelInterface
+            connections,  # type: List[_threads.ThreadConnection]
+            threads  # type: List[_threads._AbstractThread]
+    ):
+        # type: (...) -> None
+        self.__interface = interface_kernel
+        self.__connections = connections
+        self.__threads = threads
+
+    def run(self, *args):
+        return self.__interface.run(self.__connections, args)
+
+    def run_batch(self, points):
+        return self.__interface.run_batch(self.__connections, points)
+
+    def stop(self, force=False):
+        # Threads can't be killed, but since they are daemons a thread that
+        # never reads its shutdown won't hold the program open either.
+        if force:
+            self.__LOGGER.debug("Threads can't be terminated, asking instead.")
+        if self.__interface.IS_DUPLEX:
+            for connection in self.__connections:
+                connection.send(kernel.ProcessCodes.SHUTDOWN)
+
+    @property
+    def is_alive(self):
+        return self.__threads[0].is_alive()
+
+
+class ThreadForeman(kernel.KernelProcessing):
+
+    __LOGGER = logging.getLogger(__name__ + ".ThreadForeman")
+
+    def __init__(self, number_of_threads=multiprocessing.cpu_count()):
+        # type: (int) -> None
+        self.__splitter = _data_split.SetupData(number_of_threads)
+        self.__kernel_setup = _kernel_setup.SetupKernels()
+        self.__threads = None  # type: List[_threads._AbstractThread]
+        self.__connections = None  # type: List[_threads.ThreadConnection]
+        self.__interface = None  # type: _ThreadInterface
+
+    def main_options(
+            self,
+            data,  # type: Dict[str, Any]
+            process_kernel,  # type: kernel.Kernel
+            internal_interface  # type: kernel.KernelInterface
+    ):
+        # type: (...) -> None
+        kernels = self.__kernel_setup.setup_kernels(
+            process_kernel, self.__splitter.split(data)
+        )
+        self.__make_threads(kernels, internal_interface.IS_DUPLEX)
+        self.__start_threads()
+        self.__interface = _ThreadInterface(
+            internal_interface, self.__connections, self.__threads
+        )
+
+    def __make_threads(self, kernels, duplex):
+        # type: (List[kernel.Kernel], bool) -> None
+        if duplex:
+            self.__LOGGER.debug("Building Duplex Threads.")
+            threads, connections = _threads.duplex_build(kernels)
+        else:
+            self.__LOGGER.debug("Building Simplex Threads.")
+            threads, connections = _threads.simplex_build(kernels)
+        self.__threads, self.__connections = threads, connections
+
+    def __start_threads(self):
+        self.__LOGGER.debug("Starting Threads!")
+        for thread in self.__threads:
+            thread.start()
+
+    def fetch_interface(self):
+        # type: () -> _ThreadInterface
+        return self.__interface
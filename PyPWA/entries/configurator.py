@@ -38,6 +38,7 @@ def py_fit():
         "description": description,
         "main": "shell fitting method",
         "main name": "General Fitting",
+        "resumable": True,
         "extras": None
     }
     initializer.start(configuration)
@@ -50,6 +51,7 @@ def likelihood_fit():
         "description": description,
         "main": "shell fitting method",
         "main name": "Likelihood Fitting",
+        "resumable": True,
         "main options": {"likelihood type": "likelihood"},
         "extras": None
     }
@@ -62,6 +64,7 @@ def chi_squared_fit():
         "description": description,
         "main": "shell fitting method",
         "main name": "Chi-Squared Fitting",
+        "resumable": True,
         "main options": {
             "likelihood type": "chi-squared",
             "generated length": None,
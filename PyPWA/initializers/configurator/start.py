@@ -30,6 +30,8 @@ program.
 - StartProgram - This is the object that takes the information from the 
   entry point along with the data from the _Arguments to determine where 
   which half of the configuration utility should be started. 
+  Configurations marked as resumable also accept --resume, which overrides
+  the main's resume option.
 """
 
 import argparse
@@ -52,20 +54,22 @@ class _Arguments(object):
         self.__parser = None  # type: argparse.ArgumentParser
         self.__arguments = None  # type: argparse.Namespace()
 
-    def parse_arguments(self, description):
-        # type: (str) -> None
-        self.__set_arguments(description)
+    def parse_arguments(self, description, resumable=False):
+        # type: (str, bool) -> None
+        self.__set_arguments(description, resumable)
         self.__parse_arguments()
         self.__quit_if_no_args()
 
-    def __set_arguments(self, description):
-        # type: (str) -> None
+    def __set_arguments(self, description, resumable):
+        # type: (str, bool) -> None
         self.__set_parser(description)
         self.__add_configurator_argument()
         self.__add_write_config_argument()
         self.__add_verbose_argument()
         self.__add_log_file_argument()
         self.__add_version_argument()
+        if resumable:
+            self.__add_resume_argument()
 
     def __set_parser(self, description):
         # type: (str) -> None
@@ -103,6 +107,13 @@ class _Arguments(object):
             version="%(prog)s (version " + __version__ + ")"
         )
 
+    def __add_resume_argument(self):
+        self.__parser.add_argument(
+            "--resume", action="store_true",
+            help="Resume the fit from the last checkpoint in the "
+                 "configuration's checkpoint file."
+        )
+
     def __parse_arguments(self):
         self.__arguments = self.__parser.parse_args()
 
@@ -131,6 +142,11 @@ class _Arguments(object):
         # type: () -> str
         return self.__arguments.log_file
 
+    @property
+    def resume(self):
+        # type: () -> bool
+        return getattr(self.__arguments, "resume", False)
+
 
 class StartProgram(object):
 
@@ -162,7 +178,10 @@ class StartProgram(object):
             )
 
     def __load_arguments(self):
-        self.__arguments.parse_arguments(self.__configuration["description"])
+        self.__arguments.parse_arguments(
+            self.__configuration["description"],
+            self.__configuration.get("resumable", False)
+        )
 
     def __begin_output(self):
         sys.stdout.write("\x1b[2J\x1b[H")  # Clears the screen
@@ -201,6 +220,9 @@ Built in Jefferson Lab.
             self.__run_builder()
 
     def __run_builder(self):
+        if self.__arguments.resume:
+            options = self.__configuration.setdefault("main options", {})
+            options["resume"] = True
         self.__execute.run(
             self.__configuration,
             self.__arguments.configuration_location
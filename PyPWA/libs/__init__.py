@@ -39,6 +39,9 @@ data location, and such.
 - plugin_loader - The main plugin loading module inside PyPWA. It's generic 
   enough to be used anywhere but also powerful enough to handle all plugin 
   needs.
+
+- nested_sampling - The nested sampling loop shared by the Nestle and Batch
+  Nestle optimizers, which can be checkpointed and resumed.
 """
 
 from PyPWA import AUTHOR, VERSION
@@ -0,0 +1,137 @@
+#  coding=utf-8
+#
+#  PyPWA, a scientific analysis toolkit.
+#  Copyright (C) 2016 JLab
+#
+#  This program is free software: you can redistribute it and/or modify
+#  it under the terms of the GNU General Public License as published by
+#  the Free Software Foundation, either version 3 of the License, or
+#  (at your option) any later version.
+#
+#  This program is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#  GNU General Public License for more details.
+#
+#  You should have received a copy of the GNU General Public License
+#  along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+"""
+Checkpoints for long running optimizations
+------------------------------------------
+Optimizers that can be stopped and picked back up write their state to a
+single compressed numpy file every so many calls or seconds, so a job that
+dies only loses the work since its last checkpoint.
+
+- Checkpoint - Decides when a checkpoint is due, writes the state of the
+  optimizer to disk without ever leaving half of a file behind, and loads
+  it back for a resumed run.
+- get_random_state - The state of numpy's random generator as arrays.
+- set_random_state - Restores the random generator from those arrays.
+"""
+
+import io
+import logging
+import os
+import time
+from typing import Dict
+from typing import Optional as Opt
+
+import numpy
+
+from PyPWA import AUTHOR, VERSION
+
+__credits__ = ["Mark Jones"]
+__author__ = AUTHOR
+__version__ = VERSION
+
+
+class Checkpoint(object):
+
+    __LOGGER = logging.getLogger(__name__ + ".Checkpoint")
+
+    # Used when a file is given without either interval.
+    __DEFAULT_SECONDS = 600.
+
+    def __init__(self, location, calls=None, seconds=None):
+        # type: (str, Opt[int], Opt[float]) -> None
+        self.__location = location
+        self.__calls = calls
+        self.__seconds = seconds
+        if not (calls or seconds):
+            self.__seconds = self.__DEFAULT_SECONDS
+        self.__last_calls = 0
+        self.__last_time = time.time()
+
+    @property
+    def location(self):
+        # type: () -> str
+        return self.__location
+
+    @property
+    def calls(self):
+        # type: () -> Opt[int]
+        return self.__calls
+
+    def due(self, calls):
+        # type: (int) -> bool
+        if self.__calls and calls - self.__last_calls >= self.__calls:
+            return True
+        elif self.__seconds:
+            return time.time() - self.__last_time >= self.__seconds
+        return False
+
+    def save(self, calls, **state):
+        # type: (int, numpy.ndarray) -> None
+        # Written next to the checkpoint then renamed over it, so a job
+        # killed while writing still has the last complete checkpoint.
+        temporary = self.__location + ".tmp"
+        with io.open(temporary, "wb") as stream:
+            numpy.savez_compressed(stream, calls=calls, **state)
+        os.rename(temporary, self.__location)
+
+        self.__last_calls = calls
+        self.__last_time = time.time()
+        self.__LOGGER.info(
+            "Saved a checkpoint after %d calls to %s" %
+            (calls, self.__location)
+        )
+
+    def load(self):
+        # type: () -> Opt[Dict[str, numpy.ndarray]]
+        if not os.path.exists(self.__location):
+            self.__LOGGER.warning(
+                "No checkpoint at %s, starting from the beginning." %
+                self.__location
+            )
+            return None
+
+        with numpy.load(self.__location) as stored:
+            state = dict((name, stored[name]) for name in stored.files)
+        self.__last_calls = int(state["calls"])
+        self.__LOGGER.info(
+            "Resuming from the checkpoint after %d calls." % self.__last_calls
+        )
+        return state
+
+    def remove(self):
+        if os.path.exists(self.__location):
+            os.remove(self.__location)
+
+
+def get_random_state():
+    # type: () -> Dict[str, numpy.ndarray]
+    name, keys, position, has_gauss, cached = numpy.random.get_state()
+    return {
+        "random_keys": keys,
+        "random_position": numpy.array(position),
+        "random_gauss": numpy.array([has_gauss, cached], dtype=float)
+    }
+
+
+def set_random_state(state):
+    # type: (Dict[str, numpy.ndarray]) -> None
+    numpy.random.set_state((
+        "MT19937", state["random_keys"], int(state["random_position"]),
+        int(state["random_gauss"][0]), float(state["random_gauss"][1])
+    ))
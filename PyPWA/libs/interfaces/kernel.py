@@ -25,6 +25,12 @@ kernel, load data into each copy, and then distribute those kernels across
 some predefined amount of resources of some type.
 
 - ProcessCodes - Codes that can be sent to or received from the resources.
+- is_batch - Checks whether a received value is a batch of points.
+- is_gradient - Checks whether a received value asks for a gradient.
+- is_gradient_batch - Checks whether a received value asks for the gradients
+  of a batch of points.
+- FileColumn - A column of a data file, given instead of the column's data
+  to processing plugins that load their data lazily.
 - KernelProcessing - Main Plugin
 - ProcessInterface - Main glue between the resources and the object trying
   to use them
@@ -51,10 +57,37 @@ class ProcessCodes(enum.Enum):
 
     SHUTDOWN = 1
     ERROR = 2
+    LOAD = 3
+    BATCH = 4
+    GRADIENT = 5
+    GRADIENT_BATCH = 6
+
+
+class FileColumn(object):
+
+    def __init__(self, location, column=None):
+        # type: (str, Opt[str]) -> None
+        """
+        :param str location: The file the column belongs to.
+        :param str column: The name of the column, a column that is missing
+        from the file, or None, loads as ones, the same as a missing column
+        of parsed data.
+        """
+        self.location = location
+        self.column = column
 
 
 class KernelProcessing(common.BasePlugin):
 
+    @property
+    def lazy_loading(self):
+        # type: () -> bool
+        """
+        Whether the data may be given as the locations of files, and the
+        columns of those files as FileColumns, instead of parsed arrays.
+        """
+        return False
+
     def main_options(
             self,
             data,  # type: Dict[str, numpy.ndarray]
@@ -107,6 +140,19 @@ class ProcessInterface(object):
         """
         raise NotImplementedError
 
+    def run_batch(self, points):
+        # type: (List[Any]) -> Any
+        """
+        Runs the processes over many points in a single round trip, the
+        kernels loop over the points themselves.
+
+        :param points: Each point holds the arguments of a single call to
+        run, an M×P matrix can be passed directly for optimizers that call
+        run with each parameter as its own argument.
+        :return: The value of the kernel interface's run_batch.
+        """
+        raise NotImplementedError
+
     def stop(self, force=False):
         # type: (Opt[bool]) -> None
         """
@@ -156,6 +202,47 @@ class Kernel(object):
         """
         raise NotImplementedError()
 
+    def process_batch(self, points):
+        # type: (List[Any]) -> List[Any]
+        """
+        Processes every point while the kernel's data is still in the cache,
+        kernels can override this if they can do better than a loop.
+
+        :param points: A list of the values that process would have
+        received one at a time.
+        :return: A list with the value of process for each point.
+        """
+        return [self.process(point) for point in points]
+
+    def process_gradient(self, data, names):
+        # type: (Any, List[str]) -> numpy.ndarray
+        """
+        Calculates the value of process along with its derivatives, only
+        kernels that know their derivatives need to extend this.
+
+        :param data: The value process would have received.
+        :param names: The order the derivatives should be returned in.
+        :return: An array holding the value followed by the derivative for
+        each name, so that the results of the kernels can simply be summed.
+        """
+        raise NotImplementedError()
+
+    def process_gradient_batch(self, points, names):
+        # type: (List[Any], List[str]) -> numpy.ndarray
+        """
+        Calculates the value and derivatives of every point while the
+        kernel's data is still in the cache.
+
+        :param points: A list of the values that process_gradient would
+        have received one at a time.
+        :param names: The order the derivatives should be returned in.
+        :return: A matrix with the result of process_gradient for each
+        point as its rows.
+        """
+        return numpy.array(
+            [self.process_gradient(point, names) for point in points]
+        )
+
 
 class KernelInterface(object):
 
@@ -179,3 +266,42 @@ class KernelInterface(object):
         :return: Whatever value that is calculated locally from the kernels.
         """
         raise NotImplementedError("The run method must be extended!")
+
+    def run_batch(self, communicator, points):
+        # type: (List[Any], List[Any]) -> List[Any]
+        """
+        Calculates many points at once. Interfaces that extend this should
+        send (ProcessCodes.BATCH, values) to the kernels, who reply with a
+        list holding a result for each value. Otherwise this falls back to
+        calling run once for each point.
+
+        :param communicator: A list of objects that will be used to
+        communicate with the kernels.
+        :param points: Each point holds the values of a single call to run.
+        :return: A list with the value of run for each point.
+        """
+        return [self.run(communicator, point) for point in points]
+
+
+def is_batch(value):
+    # type: (Any) -> bool
+    return (
+        isinstance(value, tuple) and len(value) == 2 and
+        value[0] is ProcessCodes.BATCH
+    )
+
+
+def is_gradient(value):
+    # type: (Any) -> bool
+    return (
+        isinstance(value, tuple) and len(value) == 2 and
+        value[0] is ProcessCodes.GRADIENT
+    )
+
+
+def is_gradient_batch(value):
+    # type: (Any) -> bool
+    return (
+        isinstance(value, tuple) and len(value) == 2 and
+        value[0] is ProcessCodes.GRADIENT_BATCH
+    )
@@ -27,10 +27,11 @@ Optimizers for PyPWA
 """
 
 import enum
-from typing import Any, Callable
+from typing import Any, Callable, Dict
 from typing import Optional as Opt
 
 from PyPWA import AUTHOR, VERSION
+from PyPWA.libs import checkpoints
 from PyPWA.libs.interfaces import common
 
 __credits__ = ["Mark Jones"]
@@ -55,8 +56,22 @@ class Optimizer(common.BasePlugin):
     # sort of calculation being done.
     OPTIMIZER_TYPE = None  # type: OptimizerTypes
 
-    def main_options(self, calc_function, fitting_type=None):
-        # type: (Callable[[Any], Any], Opt[LikelihoodTypes]) -> None
+    # Optimizers that converge to a single point and can be started from
+    # any point should set this and extend best_values and warm_start.
+    WARM_START = False
+
+    # Optimizers that can write their state to a checkpoint, and pick back
+    # up from it, should set this and extend set_checkpoint.
+    CHECKPOINTS = False
+
+    def main_options(
+            self,
+            calc_function,  # type: Callable[[Any], Any]
+            fitting_type=None,  # type: Opt[LikelihoodTypes]
+            batch_function=None,  # type: Opt[Callable[[Any], Any]]
+            gradient_function=None  # type: Opt[Callable[[Any], Any]]
+    ):
+        # type: (...) -> None
         """
         The main options for the Optimizer, these are options that are
         typically needed for optimization, but due to the design of the
@@ -68,6 +83,13 @@ class Optimizer(common.BasePlugin):
         optimized.
         :param internals.LikelihoodTypes fitting_type: One of the
         enumerations from likelihood types.
+        :param batch_function: Optionally calculates many points at once,
+        it takes a matrix with a row of parameters for each point and
+        returns an array with the value of each point.
+        :param gradient_function: Optionally calculates a point along with
+        its gradient, it takes the same arguments as calc_function and
+        returns the value and an array with the derivative for each
+        parameter. This is only given when the user supplied a gradient.
         """
         raise NotImplementedError
 
@@ -80,6 +102,39 @@ class Optimizer(common.BasePlugin):
         """
         raise NotImplementedError
 
+    def best_values(self):
+        # type: () -> Dict[str, float]
+        """
+        The values of the parameters at the best point found by the last
+        start, only needed when WARM_START is set.
+
+        :return: A dictionary with the value of each parameter.
+        """
+        raise NotImplementedError
+
+    def warm_start(self, values):
+        # type: (Dict[str, float]) -> None
+        """
+        Makes the next start begin from the supplied values instead of the
+        user's starting values, only needed when WARM_START is set.
+
+        :param dict values: The value of each parameter to start from.
+        """
+        raise NotImplementedError
+
+    def set_checkpoint(self, checkpoint, resume=False):
+        # type: (checkpoints.Checkpoint, bool) -> None
+        """
+        Makes the next start write its state to the checkpoint whenever
+        one is due, only needed when CHECKPOINTS is set.
+
+        :param checkpoints.Checkpoint checkpoint: Where and how often the
+        state should be saved.
+        :param bool resume: Continue from the state saved in the
+        checkpoint instead of starting over, if there is one.
+        """
+        raise NotImplementedError
+
     def return_parser(self):
         # type: () -> OptimizerOptionParser
         """
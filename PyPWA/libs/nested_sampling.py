@@ -0,0 +1,488 @@
+#  coding=utf-8
+#
+#  PyPWA, a scientific analysis toolkit.
+#  Copyright (C) 2016 JLab
+#
+#  This program is free software: you can redistribute it and/or modify
+#  it under the terms of the GNU General Public License as published by
+#  the Free Software Foundation, either version 3 of the License, or
+#  (at your option) any later version.
+#
+#  This program is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#  GNU General Public License for more details.
+#
+#  You should have received a copy of the GNU General Public License
+#  along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+"""
+Nested Sampling
+---------------
+The same nested sampling that nestle does, except the worst points can be
+removed several at a time and their replacements proposed and evaluated
+together, so each iteration only waits on the processes once instead of
+once for each proposed point. Unlike nestle.sample, the whole state of the
+sampling can be written to a checkpoint and picked back up. The Batch
+Nestle plugin always samples with it, and the Nestle plugin does so when it
+is checkpointed, replacing a single point at a time exactly like nestle.
+
+- BatchPrior - Calls the user's prior on the whole batch when it can
+  handle a matrix, or on one point at a time when it can't.
+- _Bounds - Bounds the live points with one or several ellipsoids and
+  proposes new points from inside of them.
+- _Evidence - Adds the dead points to the evidence and keeps the samples
+  for nestle's result.
+- BatchSampler - The actual sampling loop, which can write its state to a
+  checkpoint and pick it back up.
+- get_dlogz - nestle's default stopping rule.
+- get_update_interval - nestle's default interval between bound updates.
+"""
+
+import logging
+import math
+from typing import Any, Callable, Dict, List, Tuple
+from typing import Optional as Opt
+
+import nestle
+import numpy
+
+from PyPWA import AUTHOR, VERSION
+from PyPWA.libs import checkpoints
+
+__credits__ = ["Mark Jones"]
+__author__ = AUTHOR
+__version__ = VERSION
+
+
+class BatchPrior(object):
+
+    __LOGGER = logging.getLogger(__name__ + ".BatchPrior")
+
+    def __init__(self, prior, ndim):
+        # type: (Callable[[numpy.ndarray], numpy.ndarray], int) -> None
+        self.__prior = prior
+        self.__ndim = ndim
+        self.__vectorized = None  # type: bool
+
+    def __call__(self, points):
+        # type: (numpy.ndarray) -> numpy.ndarray
+        if self.__vectorized is None:
+            return self.__check(points)
+        elif self.__vectorized:
+            return self.__call_batch(points)
+        return self.__call_points(points)
+
+    def __check(self, points):
+        # type: (numpy.ndarray) -> numpy.ndarray
+        # A prior that only works on a single point can still return
+        # something of the right shape for a matrix, so the first batch is
+        # compared against the prior of each point.
+        expected = self.__call_points(points)
+        try:
+            batch = self.__call_batch(points)
+            self.__vectorized = bool(numpy.allclose(batch, expected))
+        except Exception:
+            self.__vectorized = False
+
+        if self.__vectorized:
+            self.__LOGGER.info("Calculating the prior in batches.")
+        else:
+            self.__LOGGER.info("Calculating the prior one point at a time.")
+        return expected
+
+    def __call_batch(self, points):
+        # type: (numpy.ndarray) -> numpy.ndarray
+        values = numpy.asarray(self.__prior(points), dtype=numpy.float64)
+        return values.reshape(len(points), self.__ndim)
+
+    def __call_points(self, points):
+        # type: (numpy.ndarray) -> numpy.ndarray
+        values = numpy.empty((len(points), self.__ndim))
+        for index, point in enumerate(points):
+            values[index] = self.__prior(point)
+        return values
+
+
+class _Bounds(object):
+
+    __ENLARGE = 1.2
+
+    def __init__(self, method):
+        # type: (str) -> None
+        self.__method = method
+        self.__ellipsoids = None  # type: List[nestle.Ellipsoid]
+
+    def update(self, points, pointvol):
+        # type: (numpy.ndarray, float) -> None
+        if self.__method == "multi":
+            self.__ellipsoids = nestle.bounding_ellipsoids(
+                points, pointvol=pointvol
+            )
+        else:
+            self.__ellipsoids = [nestle.bounding_ellipsoid(
+                points, pointvol=pointvol, minvol=True
+            )]
+
+        for ellipsoid in self.__ellipsoids:
+            ellipsoid.scale_to_vol(ellipsoid.vol * self.__ENLARGE)
+
+    @property
+    def ells(self):
+        # type: () -> List[nestle.Ellipsoid]
+        # Named like nestle's samplers, so callbacks can find the centers.
+        return self.__ellipsoids
+
+    def propose(self, count):
+        # type: (int) -> numpy.ndarray
+        points = numpy.empty((0, self.__ellipsoids[0].n))
+        while len(points) < count:
+            proposed = self.__sample(count - len(points))
+            inside = numpy.all((proposed > 0.) & (proposed < 1.), axis=1)
+            points = numpy.concatenate((points, proposed[inside]))
+        return points
+
+    def __sample(self, count):
+        # type: (int) -> numpy.ndarray
+        if len(self.__ellipsoids) == 1:
+            return self.__ellipsoids[0].samples(count)
+        return numpy.array([
+            nestle.sample_ellipsoids(self.__ellipsoids)
+            for index in range(count)
+        ])
+
+
+class _Evidence(object):
+
+    def __init__(self):
+        self.logz = -1e300
+        self.h = 0.
+        self.__samples = []  # type: List[numpy.ndarray]
+        self.__logwt = []  # type: List[float]
+        self.__logvol = []  # type: List[float]
+        self.__logl = []  # type: List[float]
+
+    def add(self, point, logl, logwidth):
+        # type: (numpy.ndarray, float, float) -> float
+        logwt = logwidth + logl
+        logz_new = numpy.logaddexp(self.logz, logwt)
+        self.h = (
+            math.exp(logwt - logz_new) * logl +
+            math.exp(self.logz - logz_new) * (self.h + self.logz) -
+            logz_new
+        )
+        self.logz = logz_new
+
+        self.__samples.append(numpy.array(point))
+        self.__logwt.append(logwt)
+        self.__logvol.append(logwidth)
+        self.__logl.append(logl)
+        return logwt
+
+    def get_state(self):
+        # type: () -> Dict[str, numpy.ndarray]
+        return {
+            "evidence": numpy.array([self.logz, self.h]),
+            "samples": numpy.array(self.__samples),
+            "samples_logwt": numpy.array(self.__logwt),
+            "samples_logvol": numpy.array(self.__logvol),
+            "samples_logl": numpy.array(self.__logl)
+        }
+
+    def set_state(self, state):
+        # type: (Dict[str, numpy.ndarray]) -> None
+        self.logz, self.h = state["evidence"].tolist()
+        self.__samples = list(state["samples"])
+        self.__logwt = state["samples_logwt"].tolist()
+        self.__logvol = state["samples_logvol"].tolist()
+        self.__logl = state["samples_logl"].tolist()
+
+    def result(self, iterations, calls, npoints):
+        # type: (int, int, int) -> nestle.Result
+        # Numerical error can leave a flat likelihood with a tiny negative
+        # information, which nestle also rounds to zero.
+        h = max(self.h, 0.)
+        return nestle.Result([
+            ("niter", iterations),
+            ("ncall", calls),
+            ("logz", self.logz),
+            ("logzerr", math.sqrt(h / npoints)),
+            ("h", h),
+            ("samples", numpy.array(self.__samples)),
+            ("weights", numpy.exp(numpy.array(self.__logwt) - self.logz)),
+            ("logvol", numpy.array(self.__logvol)),
+            ("logl", numpy.array(self.__logl))
+        ])
+
+
+class BatchSampler(object):
+
+    __LOGGER = logging.getLogger(__name__ + ".BatchSampler")
+
+    # Each round trip proposes enough points to replace the batch at the
+    # last acceptance rate, but never more than this many for each point.
+    __MAX_PROPOSALS = 16
+
+    # The counters that are saved in a checkpoint, in order.
+    __COUNTERS = ("logvol", "dead", "since_update", "iterations", "calls",
+                  "efficiency", "declining", "logwt_old")
+
+    def __init__(
+            self,
+            prior,  # type: BatchPrior
+            evaluate,  # type: Callable[[numpy.ndarray], numpy.ndarray]
+            npdim,  # type: int
+            npoints,  # type: int
+            method,  # type: str
+            batch_size,  # type: int
+            update_interval,  # type: int
+            maxiter,  # type: float
+            maxcall,  # type: float
+            dlogz,  # type: float
+            decline_factor,  # type: float
+            checkpoint=None,  # type: Opt[checkpoints.Checkpoint]
+            resume=False,  # type: bool
+            callback=None,  # type: Opt[Callable[[Dict[str, Any]], None]]
+            sequential=False  # type: bool
+    ):
+        # type: (...) -> None
+        self.__prior = prior
+        self.__evaluate = evaluate
+        self.__npdim = npdim
+        self.__npoints = npoints
+        self.__bounds = _Bounds(method)
+        self.__batch_size = max(1, min(batch_size, npoints - 1))
+        self.__update_interval = update_interval
+        self.__maxiter = maxiter
+        self.__maxcall = maxcall
+        self.__dlogz = dlogz
+        self.__decline_factor = decline_factor
+        self.__checkpoint = checkpoint
+        self.__resume = resume
+        self.__callback = callback
+        # Proposes a single point at a time, stopping at the first one
+        # that's accepted, for likelihoods that are called point by point.
+        self.__sequential = sequential
+
+        self.__evidence = _Evidence()
+        self.__active_u = None  # type: numpy.ndarray
+        self.__active_v = None  # type: numpy.ndarray
+        self.__active_logl = None  # type: numpy.ndarray
+
+        # logvol is the log of the prior volume left inside the live points.
+        self.__counters = dict.fromkeys(self.__COUNTERS, 0)
+        self.__counters["efficiency"] = 1.
+        self.__counters["logwt_old"] = -numpy.inf
+
+    def sample(self):
+        # type: () -> nestle.Result
+        if not self.__load_checkpoint():
+            self.__start()
+
+        while True:
+            self.__iterate()
+            if self.__should_stop():
+                break
+            self.__call_back()
+            self.__save_checkpoint()
+
+        # Every live point holds an equal share of the remaining volume.
+        counters = self.__counters
+        logwidth = counters["logvol"] - math.log(self.__npoints)
+        for index in numpy.argsort(self.__active_logl, kind="mergesort"):
+            self.__evidence.add(
+                self.__active_v[index], self.__active_logl[index], logwidth
+            )
+
+        self.__LOGGER.info(
+            "Finished after %d iterations and %d calls."
+            % (counters["iterations"], counters["calls"])
+        )
+        if self.__checkpoint:
+            self.__checkpoint.remove()
+        return self.__evidence.result(
+            counters["dead"], counters["calls"], self.__npoints
+        )
+
+    def __start(self):
+        self.__active_u = numpy.random.rand(self.__npoints, self.__npdim)
+        self.__active_v, self.__active_logl = self.__calculate(
+            self.__active_u
+        )
+        self.__bounds.update(self.__active_u, 1. / self.__npoints)
+
+    def __iterate(self):
+        counters = self.__counters
+        counters["iterations"] += 1
+        worst = numpy.argsort(self.__active_logl, kind="mergesort")
+        worst = worst[:self.__batch_size]
+
+        # Removing the worst points in likelihood order, the live points
+        # drop by one for each, so the volume shrinks by
+        # 1 / (npoints - index) for each of them.
+        for index, position in enumerate(worst):
+            shrink = 1. / (self.__npoints - index)
+            logwidth = counters["logvol"] + math.log(-math.expm1(-shrink))
+            counters["logvol"] -= shrink
+            logwt = self.__evidence.add(
+                self.__active_v[position], self.__active_logl[position],
+                logwidth
+            )
+            self.__count_decline(logwt)
+        counters["dead"] += len(worst)
+        counters["since_update"] += len(worst)
+
+        if counters["since_update"] >= self.__update_interval:
+            self.__update_bounds()
+            counters["since_update"] = 0
+
+        new_u, new_v, new_logl = self.__replace(
+            len(worst), self.__active_logl[worst[-1]]
+        )
+        self.__active_u[worst] = new_u
+        self.__active_v[worst] = new_v
+        self.__active_logl[worst] = new_logl
+
+    def __call_back(self):
+        # The same information nestle hands its callback.
+        if self.__callback:
+            self.__callback({
+                "it": self.__counters["iterations"],
+                "logz": self.__evidence.logz,
+                "active_u": self.__active_u,
+                "sampler": self.__bounds
+            })
+
+    def __update_bounds(self):
+        self.__bounds.update(
+            self.__active_u,
+            math.exp(self.__counters["logvol"]) / self.__npoints
+        )
+
+    def __calculate(self, points):
+        # type: (numpy.ndarray) -> Tuple[numpy.ndarray, numpy.ndarray]
+        values = self.__prior(points)
+        logl = numpy.asarray(self.__evaluate(values), dtype=numpy.float64)
+        self.__counters["calls"] += len(points)
+        return values, logl
+
+    def __replace(self, count, loglstar):
+        # type: (int, float) -> Tuple[numpy.ndarray, ...]
+        new_u, new_v, new_logl = [], [], []
+        needed = count
+        while needed:
+            if self.__sequential:
+                proposals = 1
+            else:
+                efficiency = self.__counters["efficiency"]
+                proposals = int(math.ceil(needed / efficiency))
+            proposed_u = self.__bounds.propose(proposals)
+            proposed_v, proposed_logl = self.__calculate(proposed_u)
+
+            accepted = numpy.flatnonzero(proposed_logl >= loglstar)
+            self.__update_efficiency(len(accepted), proposals)
+
+            accepted = accepted[:needed]
+            new_u.append(proposed_u[accepted])
+            new_v.append(proposed_v[accepted])
+            new_logl.append(proposed_logl[accepted])
+            needed -= len(accepted)
+
+        return (
+            numpy.concatenate(new_u), numpy.concatenate(new_v),
+            numpy.concatenate(new_logl)
+        )
+
+    def __update_efficiency(self, accepted, proposals):
+        # type: (int, int) -> None
+        # Averaged with the last rate so a single unlucky batch doesn't
+        # send a flood of proposals with the next round trip.
+        rate = float(accepted) / proposals
+        self.__counters["efficiency"] = max(
+            (self.__counters["efficiency"] + rate) / 2,
+            1. / self.__MAX_PROPOSALS
+        )
+
+    def __count_decline(self, logwt):
+        # type: (float) -> None
+        if logwt < self.__counters["logwt_old"]:
+            self.__counters["declining"] += 1
+        else:
+            self.__counters["declining"] = 0
+        self.__counters["logwt_old"] = logwt
+
+    def __should_stop(self):
+        # type: () -> bool
+        counters = self.__counters
+        if self.__dlogz is not None:
+            logz = self.__evidence.logz
+            logz_remain = numpy.max(self.__active_logl) + counters["logvol"]
+            if numpy.logaddexp(logz, logz_remain) - logz < self.__dlogz:
+                return True
+
+        if self.__decline_factor is not None:
+            limit = self.__decline_factor * self.__npoints
+            if counters["declining"] > limit:
+                return True
+
+        return (
+            counters["dead"] >= self.__maxiter or
+            counters["calls"] > self.__maxcall
+        )
+
+    def __save_checkpoint(self):
+        calls = self.__counters["calls"]
+        if not (self.__checkpoint and self.__checkpoint.due(calls)):
+            return
+
+        state = self.__evidence.get_state()
+        state.update(checkpoints.get_random_state())
+        self.__checkpoint.save(
+            calls, active_u=self.__active_u, active_v=self.__active_v,
+            active_logl=self.__active_logl, counters=numpy.array(
+                [self.__counters[name] for name in self.__COUNTERS], float
+            ), **state
+        )
+
+    def __load_checkpoint(self):
+        # type: () -> bool
+        if not (self.__checkpoint and self.__resume):
+            return False
+        state = self.__checkpoint.load()
+        if state is None:
+            return False
+
+        self.__active_u = state["active_u"]
+        self.__active_v = state["active_v"]
+        self.__active_logl = state["active_logl"]
+        self.__evidence.set_state(state)
+        checkpoints.set_random_state(state)
+        for name, value in zip(self.__COUNTERS, state["counters"].tolist()):
+            self.__counters[name] = value
+        for name in ("dead", "since_update", "iterations", "calls"):
+            self.__counters[name] = int(self.__counters[name])
+
+        # The bounds are rebuilt from the live points, the same as they are
+        # after every update interval.
+        self.__update_bounds()
+        return True
+
+
+def get_dlogz(dlogz, decline_factor):
+    # type: (Opt[float], Opt[float]) -> Opt[float]
+    # The same stopping rules as nestle.sample.
+    if dlogz is not None and decline_factor is not None:
+        raise ValueError(
+            "Cannot specify two separate stopping criteria: "
+            "decline_factor and dlogz"
+        )
+    elif dlogz is None and decline_factor is None:
+        return .5
+    return dlogz
+
+
+def get_update_interval(update_interval, npoints):
+    # type: (Opt[float], int) -> int
+    if update_interval is None:
+        return max(1, int(round(.6 * npoints)))
+    return max(1, int(round(update_interval)))
@@ -25,6 +25,8 @@ PyFit, PySimulate, and shared libraries
 - pyshell_functions - Contains the example functions for PyFit and PySimulate
 - shell types - The static typing information for the expected user's
   functions.
+- terms - Lets the user's functions remember terms whose parameters didn't
+  change since they were last calculated.
 """
 
 from PyPWA import AUTHOR, VERSION
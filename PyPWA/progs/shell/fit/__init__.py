@@ -67,11 +67,26 @@ class ShellFitting(options.Main):
         "function's location": "/path/to/the/function.py",
         "processing name": "processing_function",
         "setup name": "setup_function",
+        "gradient name": None,
         "qfactor location": None,
         "data location": "/path/to/the/data.csv",
         "internal data": {"quality factor": "Qfactors"},
         "accepted monte carlo location": None,
-        "save name": "output"
+        "save name": "output",
+        "progress rate": 1.,
+        "telemetry file": None,
+        "amplitude cache": None,
+        "evaluation cache size": 10000,
+        "evaluation cache file": None,
+        "block evaluation": False,
+        "subsample fractions": None,
+        "start count": 0,
+        "start ranges": None,
+        "start seed": None,
+        "checkpoint file": None,
+        "checkpoint calls": None,
+        "checkpoint seconds": None,
+        "resume": False
     }
 
     option_difficulties = {
@@ -80,11 +95,26 @@ class ShellFitting(options.Main):
         "function's location": options.Levels.REQUIRED,
         "processing name": options.Levels.REQUIRED,
         "setup name": options.Levels.REQUIRED,
+        "gradient name": options.Levels.OPTIONAL,
         "qfactor location": options.Levels.OPTIONAL,
         "data location": options.Levels.REQUIRED,
         "internal data": options.Levels.OPTIONAL,
         "accepted monte carlo location": options.Levels.OPTIONAL,
-        "save name": options.Levels.REQUIRED
+        "save name": options.Levels.REQUIRED,
+        "progress rate": options.Levels.ADVANCED,
+        "telemetry file": options.Levels.ADVANCED,
+        "amplitude cache": options.Levels.ADVANCED,
+        "evaluation cache size": options.Levels.ADVANCED,
+        "evaluation cache file": options.Levels.ADVANCED,
+        "block evaluation": options.Levels.ADVANCED,
+        "subsample fractions": options.Levels.ADVANCED,
+        "start count": options.Levels.OPTIONAL,
+        "start ranges": options.Levels.OPTIONAL,
+        "start seed": options.Levels.ADVANCED,
+        "checkpoint file": options.Levels.OPTIONAL,
+        "checkpoint calls": options.Levels.ADVANCED,
+        "checkpoint seconds": options.Levels.ADVANCED,
+        "resume": options.Levels.ADVANCED
     }
 
     option_types = {
@@ -93,6 +123,7 @@ class ShellFitting(options.Main):
         "function's location": str,
         "processing name": str,
         "setup name": str,
+        "gradient name": str,
         "qfactor location": str,
         "data location": str,
         "internal data": {
@@ -102,7 +133,21 @@ class ShellFitting(options.Main):
             "expected values": str
         },
         "accepted monte carlo location": str,
-        "save name": str
+        "save name": str,
+        "progress rate": float,
+        "telemetry file": str,
+        "amplitude cache": str,
+        "evaluation cache size": int,
+        "evaluation cache file": str,
+        "block evaluation": bool,
+        "subsample fractions": list,
+        "start count": int,
+        "start ranges": dict,
+        "start seed": int,
+        "checkpoint file": str,
+        "checkpoint calls": int,
+        "checkpoint seconds": float,
+        "resume": bool
     }
 
     module_comment = "PyFit, a simple python data analysis tool."
@@ -113,10 +158,45 @@ class ShellFitting(options.Main):
         "function's location": "The path of your functions file",
         "processing name": "The name of your processing function.",
         "setup name": "The name of your setup function.",
+        "gradient name": "The name of your optional gradient function, "
+                         "lets the optimizer skip numerical derivatives.",
         "qfactor location": "The path of the qfactors file.",
         "data location": "The path of your data file.",
         "internal data": "Internal name mapping.",
         "accepted monte carlo location":
             "The path to your accepted monte carlo file",
-        "save name": "The name out the output files."
+        "save name": "The name out the output files.",
+        "progress rate": "How many times a second the progress is "
+                         "refreshed, 0 disables it.",
+        "telemetry file": "A file the statistics of the evaluations are "
+                          "appended to as JSON lines.",
+        "amplitude cache": "A folder the amplitude log-likelihood caches "
+                           "the amplitudes of the events in.",
+        "evaluation cache size": "How many evaluated points are remembered "
+                                 "so repeats skip the processes, 0 disables "
+                                 "it.",
+        "evaluation cache file": "A file every evaluated point is appended "
+                                 "to and replayed from when the same fit "
+                                 "is restarted. A fit with other data, "
+                                 "likelihood, or functions starts it over.",
+        "block evaluation": "Calls your function on cache sized blocks of "
+                            "the events instead of all of them at once.",
+        "subsample fractions": "Fractions of the events, like [.05, .25], "
+                               "to fit before the full data, each stage "
+                               "starts from the last one's result. Every "
+                               "n-th event is used, so each fraction is "
+                               "rounded to 1/n.",
+        "start count": "How many random starting points are fitted at the "
+                       "same time, 0 only fits the optimizer's settings.",
+        "start ranges": "The range of each parameter's random starting "
+                        "values, like {A2: [-10, 10]}.",
+        "start seed": "The seed of the random starting values.",
+        "checkpoint file": "A file the optimizer's state is saved to while "
+                           "fitting, so a stopped fit can be resumed. "
+                           "Minuit restarts Migrad from its best point, so "
+                           "a resumed fit can take a different path.",
+        "checkpoint calls": "How many calls between checkpoints.",
+        "checkpoint seconds": "How many seconds between checkpoints, "
+                              "defaults to 600 without either.",
+        "resume": "Resume from the checkpoint file, the same as --resume."
     }
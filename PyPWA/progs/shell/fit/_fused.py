@@ -0,0 +1,223 @@
+#  coding=utf-8
+#
+#  PyPWA, a scientific analysis toolkit.
+#  Copyright (C) 2016 JLab
+#
+#  This program is free software: you can redistribute it and/or modify
+#  it under the terms of the GNU General Public License as published by
+#  the Free Software Foundation, either version 3 of the License, or
+#  (at your option) any later version.
+#
+#  This program is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#  GNU General Public License for more details.
+#
+#  You should have received a copy of the GNU General Public License
+#  along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+"""
+Fused Likelihood Sums
+---------------------
+The likelihoods only need the sum over the events, so instead of building
+full length temporaries for every step of the formula, the intensities are
+walked in blocks that fit inside the cache and each step is written into
+the same small scratch buffer with numpy's out arguments.
+
+- BLOCK_SIZE - The number of events worked on at once.
+- ConstantProducts - Remembers the products of arrays that never change
+  during a fit, like the qfactor times the binned data.
+- Scratch - A per kernel buffer holding the block's intermediate values.
+- BlockedEvaluation - Calls the user's function on blocks of the events
+  instead of all of them at once, the block size is picked by timing the
+  first blocks of the first few calls.
+- take - Returns a block of an array, or a scalar as is.
+"""
+
+from typing import Any, Callable, Dict, Iterator, List, Tuple, Union
+from typing import Optional as Opt
+
+import logging
+import time
+
+import numpy
+
+from PyPWA import AUTHOR, VERSION
+
+__credits__ = ["Mark Jones"]
+__author__ = AUTHOR
+__version__ = VERSION
+
+
+# 64KiB of doubles, small enough to stay in the L2 cache with its inputs.
+BLOCK_SIZE = 8192
+
+# Python 2 doesn't have perf_counter.
+_clock = getattr(time, "perf_counter", time.time)
+
+array_or_scalar = Union[numpy.ndarray, float]
+
+
+class ConstantProducts(object):
+
+    # Dynamic scheduling hands the kernel new views before every chunk, so
+    # the products are remembered for each range of memory instead of only
+    # the last one.
+    __MAX_PRODUCTS = 1024
+
+    def __init__(self):
+        self.__products = dict()  # type: Dict[Tuple, Tuple[Any, Any]]
+
+    def __getstate__(self):
+        return {}
+
+    def __setstate__(self, state):
+        self.__init__()
+
+    def get(self, function, *values):
+        # type: (Callable[..., array_or_scalar], array_or_scalar) -> Any
+        key = tuple(self.__key(value) for value in values)
+        if key not in self.__products:
+            if len(self.__products) >= self.__MAX_PRODUCTS:
+                self.__products.clear()
+            # The values are kept alive so their memory can't be reused by
+            # a different array while the product is remembered.
+            self.__products[key] = (values, function(*values))
+        return self.__products[key][1]
+
+    @staticmethod
+    def __key(value):
+        # type: (array_or_scalar) -> Any
+        if isinstance(value, numpy.ndarray):
+            return (
+                value.__array_interface__["data"][0], value.shape,
+                value.strides, value.dtype.str
+            )
+        return value
+
+
+class Scratch(object):
+
+    def __init__(self, block_size=BLOCK_SIZE):
+        # type: (int) -> None
+        self.__block_size = block_size
+        self.__buffer = None  # type: numpy.ndarray
+
+    def __getstate__(self):
+        # The buffer is never sent to the processes, each one allocates
+        # its own the first time it's used.
+        return {"block size": self.__block_size}
+
+    def __setstate__(self, state):
+        self.__init__(state["block size"])
+
+    def blocks(self, length):
+        # type: (int) -> Iterator[Tuple[slice, numpy.ndarray]]
+        if self.__buffer is None:
+            self.__buffer = numpy.empty(self.__block_size)
+        for start in range(0, length, self.__block_size):
+            stop = min(start + self.__block_size, length)
+            yield slice(start, stop), self.__buffer[:stop - start]
+
+    def weighted_log_sum(self, values, weights):
+        # type: (numpy.ndarray, array_or_scalar) -> float
+        """
+        Σ(weights * ln(values))
+        """
+        total = 0.
+        for block, out in self.blocks(len(values)):
+            numpy.log(values[block], out=out)
+            numpy.multiply(out, take(weights, block), out=out)
+            total += out.sum()
+        return total
+
+    def chi_sum(self, values, reference, divisor):
+        # type: (numpy.ndarray, array_or_scalar, array_or_scalar) -> float
+        """
+        Σ((values - reference)² / divisor)
+        """
+        total = 0.
+        for block, out in self.blocks(len(values)):
+            numpy.subtract(values[block], take(reference, block), out)
+            numpy.multiply(out, out, out=out)
+            numpy.divide(out, take(divisor, block), out=out)
+            total += out.sum()
+        return total
+
+
+class BlockedEvaluation(object):
+
+    __LOGGER = logging.getLogger(__name__ + ".BlockedEvaluation")
+
+    # From a few hundred KiB to a few MiB of doubles for each intermediate,
+    # the best size depends on the user's function and the machine's cache.
+    CANDIDATES = (4096, 16384, 65536, 262144)
+
+    # Each candidate is timed once per call, the fastest of these calls is
+    # its time, so a single interrupted block can't pick the size.
+    __SAMPLES = 3
+
+    def __init__(self, block_size=None):
+        # type: (int) -> None
+        self.__block_size = block_size
+        self.__timings = dict()  # type: Dict[int, List[float]]
+
+    def sum(self, length, evaluate):
+        # type: (int, Callable[[slice], float]) -> float
+        """
+        Sums evaluate over consecutive blocks that cover every event.
+
+        :param length: The number of events.
+        :param evaluate: Takes the slice of a block and returns its sum.
+        """
+        total, start = 0., 0
+        if self.__block_size is None:
+            total, start = self.__calibrate(length, evaluate)
+            if self.__block_size is None:
+                return total
+
+        size = self.__block_size
+        for start in range(start, length, size):
+            total += evaluate(slice(start, min(start + size, length)))
+        return total
+
+    def __calibrate(self, length, evaluate):
+        # type: (int, Callable[[slice], float]) -> Tuple[float, int]
+        # The first blocks are real work, each candidate simply takes its
+        # turn, so calibrating doesn't calculate anything twice.
+        total, start = 0., 0
+        for size in self.CANDIDATES:
+            if start + size > length:
+                break
+            began = _clock()
+            total += evaluate(slice(start, start + size))
+            self.__timings.setdefault(size, []).append(
+                (_clock() - began) / size
+            )
+            start += size
+
+        timings = dict(
+            (size, min(samples)) for size, samples in self.__timings.items()
+            if len(samples) >= self.__SAMPLES
+        )
+        if len(timings) < 2:
+            # Nothing to compare yet, try again on a later call.
+            return total + evaluate(slice(start, length)), length
+
+        self.__block_size = min(timings, key=timings.get)
+        self.__LOGGER.debug(
+            "Picked blocks of %d events, %s" % (self.__block_size, timings)
+        )
+        return total, start
+
+    @property
+    def block_size(self):
+        # type: () -> Opt[int]
+        return self.__block_size
+
+
+def take(value, block):
+    # type: (array_or_scalar, slice) -> array_or_scalar
+    if numpy.ndim(value):
+        return value[block]
+    return value
@@ -0,0 +1,294 @@
+#  coding=utf-8
+#
+#  PyPWA, a scientific analysis toolkit.
+#  Copyright (C) 2016 JLab
+#
+#  This program is free software: you can redistribute it and/or modify
+#  it under the terms of the GNU General Public License as published by
+#  the Free Software Foundation, either version 3 of the License, or
+#  (at your option) any later version.
+#
+#  This program is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#  GNU General Public License for more details.
+#
+#  You should have received a copy of the GNU General Public License
+#  along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+"""
+Concurrent Multi-Start Fitting
+------------------------------
+Runs a copy of the optimizer from each of many random starting points at
+the same time, each in its own thread. The threads never talk to the
+processes themselves, every point they need is collected by the main
+thread, which waits until every running fit is waiting on a point and then
+sends all of their points to the processes as a single batch.
+
+- get_starts - Draws the random starting values from the user's ranges.
+- _Request - The points one fit is waiting on.
+- BatchCoalescer - Stands in for the likelihood inside of every fit, and
+  turns their requests into batched round trips.
+- MultiStart - Runs the fits and ranks their minima.
+"""
+
+from __future__ import print_function
+
+import copy
+import logging
+import threading
+from typing import Any, Dict, List, Tuple
+from typing import Optional as Opt
+
+import numpy
+import tabulate
+
+from PyPWA import AUTHOR, VERSION
+from PyPWA.libs.interfaces import kernel
+from PyPWA.libs.interfaces import optimizers
+
+__credits__ = ["Mark Jones"]
+__author__ = AUTHOR
+__version__ = VERSION
+
+
+def get_starts(count, ranges, seed=None):
+    # type: (int, Dict[str, List[float]], Opt[int]) -> List[Dict[str, float]]
+    random = numpy.random.RandomState(seed)
+    starts = []
+    for index in range(count):
+        start = dict()
+        for name in sorted(ranges):
+            low, high = ranges[name]
+            start[name] = float(random.uniform(low, high))
+        starts.append(start)
+    return starts
+
+
+class _Request(object):
+
+    def __init__(self, points, gradient=False):
+        # type: (numpy.ndarray, bool) -> None
+        self.points = points
+        self.gradient = gradient
+        self.result = None  # type: Any
+        self.error = None  # type: Exception
+        self.done = threading.Event()
+
+
+class BatchCoalescer(object):
+
+    __LOGGER = logging.getLogger(__name__ + ".BatchCoalescer")
+
+    def __init__(self, interface, fit_count):
+        # type: (kernel.ProcessInterface, int) -> None
+        self.__interface = interface
+        self.__condition = threading.Condition()
+        self.__pending = []  # type: List[_Request]
+        self.__running = fit_count
+        self.round_trips = 0
+
+    def value(self, *values):
+        # type: (float) -> float
+        return self.__submit(_Request(numpy.array([values], float)))[0]
+
+    def batch(self, points):
+        # type: (numpy.ndarray) -> numpy.ndarray
+        return self.__submit(_Request(numpy.array(points, float)))
+
+    def gradient(self, *values):
+        # type: (float) -> Tuple[float, numpy.ndarray]
+        return self.__submit(_Request(numpy.array([values], float), True))
+
+    def __submit(self, request):
+        # type: (_Request) -> Any
+        with self.__condition:
+            self.__pending.append(request)
+            self.__condition.notify_all()
+        request.done.wait()
+        if request.error is not None:
+            raise request.error
+        return request.result
+
+    def finished(self):
+        """
+        Called by every fit once it's done, so the main thread stops
+        waiting on its points.
+        """
+        with self.__condition:
+            self.__running -= 1
+            self.__condition.notify_all()
+
+    def dispatch(self):
+        """
+        Sends the points of the fits to the processes until every fit has
+        finished, this has to be called from the thread that owns the
+        process interface.
+        """
+        while True:
+            with self.__condition:
+                # Every running fit is either waiting on a point or has
+                # finished, so waiting for all of them fills the batch.
+                while len(self.__pending) < self.__running:
+                    self.__condition.wait()
+                if not self.__pending:
+                    return
+                requests, self.__pending = self.__pending, []
+            self.__run(requests)
+
+    def __run(self, requests):
+        # type: (List[_Request]) -> None
+        try:
+            self.__run_values([req for req in requests if not req.gradient])
+            self.__run_gradients([req for req in requests if req.gradient])
+        except Exception as error:
+            self.__LOGGER.exception(error)
+            for request in requests:
+                request.error = error
+        for request in requests:
+            request.done.set()
+
+    def __run_values(self, requests):
+        # type: (List[_Request]) -> None
+        if not requests:
+            return
+        points = numpy.concatenate([request.points for request in requests])
+        values = numpy.asarray(self.__interface.run_batch(points), float)
+        self.round_trips += 1
+
+        start = 0
+        for request in requests:
+            request.result = values[start:start + len(request.points)]
+            start += len(request.points)
+
+
+    def __run_gradients(self, requests):
+        # type: (List[_Request]) -> None
+        if not requests:
+            return
+        points = [request.points[0] for request in requests]
+        totals = self.__interface.run(
+            kernel.ProcessCodes.GRADIENT_BATCH, points
+        )
+        self.round_trips += 1
+
+        for request, total in zip(requests, totals):
+            request.result = total[0], total[1:]
+
+
+class MultiStart(object):
+
+    __LOGGER = logging.getLogger(__name__ + ".MultiStart")
+
+    def __init__(
+            self,
+            optimizer,  # type: optimizers.Optimizer
+            interface,  # type: kernel.ProcessInterface
+            likelihood_type,  # type: optimizers.LikelihoodTypes
+            starts,  # type: List[Dict[str, float]]
+            use_gradient=False  # type: bool
+    ):
+        # type: (...) -> None
+        self.__interface = interface
+        self.__likelihood_type = likelihood_type
+        self.__use_gradient = use_gradient
+        self.__maximize = (
+            optimizer.OPTIMIZER_TYPE is optimizers.OptimizerTypes.MAXIMIZER
+        )
+        self.__optimizers = [copy.deepcopy(optimizer) for start in starts]
+        self.__starts = starts
+        self.__results = [None] * len(starts)  # type: List[Dict[str, float]]
+        self.__values = None  # type: numpy.ndarray
+
+    def run(self):
+        """
+        Fits every start at the same time, the next run starts each fit
+        from where its last run ended.
+        """
+        self.__values = None
+        coalescer = BatchCoalescer(self.__interface, len(self.__optimizers))
+        threads = []
+        for index, optimizer in enumerate(self.__optimizers):
+            optimizer.main_options(
+                coalescer.value, self.__likelihood_type, coalescer.batch,
+                coalescer.gradient if self.__use_gradient else None
+            )
+            thread = threading.Thread(
+                target=self.__fit, args=(index, optimizer, coalescer)
+            )
+            thread.daemon = True
+            thread.start()
+            threads.append(thread)
+
+        coalescer.dispatch()
+        for thread in threads:
+            thread.join()
+        self.__LOGGER.info(
+            "Fitted %d starts in %d round trips." %
+            (len(threads), coalescer.round_trips)
+        )
+
+    def __fit(self, index, optimizer, coalescer):
+        # type: (int, optimizers.Optimizer, BatchCoalescer) -> None
+        try:
+            optimizer.warm_start(self.__results[index] or self.__starts[index])
+            optimizer.start()
+            self.__results[index] = optimizer.best_values()
+        except Exception as error:
+            self.__LOGGER.warning("Start %d failed: %s" % (index, error))
+            self.__results[index] = None
+        finally:
+            coalescer.finished()
+
+    def rank(self):
+        # type: () -> List[int]
+        """
+        Calculates the value at the end of each fit, then returns the
+        index of each fit from the best to the worst, failed fits are last.
+        """
+        finished = [index for index, result in enumerate(self.__results)
+                    if result is not None]
+        if self.__values is None:
+            self.__calculate_values(finished)
+
+        order = -self.__values if self.__maximize else self.__values
+        return sorted(finished, key=lambda index: order[index]) + [
+            index for index in range(len(self.__results))
+            if index not in finished
+        ]
+
+    def __calculate_values(self, finished):
+        # type: (List[int]) -> None
+        self.__values = numpy.full(len(self.__results), numpy.nan)
+        if finished:
+            points = [list(self.__results[index].values())
+                      for index in finished]
+            self.__values[finished] = self.__interface.run_batch(
+                numpy.array(points, float)
+            )
+
+    def best_optimizer(self):
+        # type: () -> optimizers.Optimizer
+        return self.__optimizers[self.rank()[0]]
+
+    def save_table(self, save_name):
+        # type: (str) -> None
+        ranking = self.rank()
+        names = sorted(set(
+            name for result in self.__results if result
+            for name in result
+        ))
+        rows = []
+        for place, index in enumerate(ranking):
+            result = self.__results[index] or {}
+            rows.append(
+                [place + 1, index, self.__values[index]] +
+                [result.get(name) for name in names]
+            )
+        table = tabulate.tabulate(
+            rows, ["Rank", "Start", "Value"] + names, "grid",
+            numalign="center"
+        )
+        with open(save_name + "_starts.txt", "w") as stream:
+            stream.write(table)
+        print(table)
@@ -22,157 +22,401 @@ Processing and Output
 This is where the processing interface is defined along with the automated
 output from the the parallel thread.
 
-- _ThreadInterface - The object between the main thread and the output thread.
+- _Telemetry - Running statistics of the evaluations, the last value, the
+  average time, calls per second, and how long was spent sending the
+  parameters against waiting on the kernels.
 
-- _OutputThread - The actual output thread, its started with each call to the
-  likelihood. Has a 1hz output rate.
+- _ProgressReporter - A thread that sleeps between refreshes, printing the
+  statistics at the refresh rate and optionally writing them as JSON lines
+  to a telemetry file.
+
+- _EvaluationCache - Remembers the value of recently calculated points so
+  repeated points never reach the kernels, and can append every new point
+  to a file that a restarted fit replays. The file starts with the fit's
+  fingerprint, and is only replayed by a fit with the same fingerprint.
+
+- fingerprint - Identifies a fit by its likelihood, its data, and the
+  user's functions, so values are never replayed into a different fit.
 
 - FittingInterface - The interface between the Likelihood Kernels and the
-  optimizer module.
+  optimizer module, it can calculate a single point, a batch of points, or
+  a single point along with its gradient, optionally on only a fraction
+  of the events.
+
+- GradientFunction - Asks the process interface for the value and gradient
+  of a point, for optimizers that can use the user's gradient function.
 """
 
 from __future__ import print_function
 
-try:
-    from queue import Queue
-except ImportError:
-    from Queue import Queue
-
+import collections
+import hashlib
+import inspect
+import io
+import json
 import logging
+import os
 import threading
 import time
+from typing import Any, Dict, List, Tuple
+from typing import Optional as Opt
 
 import numpy
 
 from PyPWA import AUTHOR, VERSION
 from PyPWA.libs.interfaces import kernel
+from PyPWA.progs.shell.fit import _subsample
 
 __credits__ = ["Mark Jones"]
 __author__ = AUTHOR
 __version__ = VERSION
 
 
-class _ThreadInterface(object):
-
-    __LOGGER = logging.getLogger(__name__ + "_ThreadInterface")
+class _Telemetry(object):
 
     def __init__(self):
-        self.__root_logger = logging.getLogger()
-        self.__send_queue = Queue()
-        self.__receive_queue = Queue()
-        self.__times = []
         self.__initial_time = time.time()
+        self.__evaluation_start = None  # type: float
+        self.__sent_time = None  # type: float
+        self.last_value = None  # type: numpy.float64
+        self.calls = 0
+        self.evaluation_time = 0.
+        self.send_time = 0.
+        self.wait_time = 0.
+
+    def begin(self):
+        self.__evaluation_start = time.time()
+        self.__sent_time = None
+
+    def sent(self):
+        self.__sent_time = time.time()
+
+    def end(self, value, evaluations=1):
+        # type: (Any, int) -> None
+        now = time.time()
+        sent_time = self.__sent_time or now
+        self.send_time += sent_time - self.__evaluation_start
+        self.wait_time += now - sent_time
+        self.evaluation_time += now - self.__evaluation_start
+        self.calls += evaluations
+        self.last_value = value
+        self.__evaluation_start = None
+
+    @property
+    def current_time(self):
+        # type: () -> float
+        start = self.__evaluation_start
+        if start is None:
+            return 0.
+        return time.time() - start
+
+    @property
+    def average_time(self):
+        # type: () -> float
+        if self.calls == 0:
+            return 0.
+        return self.evaluation_time / self.calls
+
+    @property
+    def total_runtime(self):
+        # type: () -> float
+        return time.time() - self.__initial_time
 
-        if not self.__root_logger.isEnabledFor(logging.INFO):
-            self.__enabled = True
-        else:
-            self.__enabled = False
-            self.__LOGGER.info(
-                "Processor Output is disabled while info logging is enabled"
-            )
-
-    def start(self, last_value):
-        if self.__enabled:
-            thread = _OutputThread(
-                self.__receive_queue, self.__send_queue,
-                last_value, self.__get_last_time(), self.__average_time(),
-                self.__initial_time
-            )
-
-            thread.start()
-
-    def __get_last_time(self):
-        if len(self.__times) == 0:
-            return 0
-        else:
-            return self.__times[-1]
-
-    def __average_time(self):
-        if len(self.__times) == 0:
-            return 0
+    @property
+    def calls_per_second(self):
+        # type: () -> float
+        return self.calls / max(self.total_runtime, 1e-9)
+
+    @property
+    def send_fraction(self):
+        # type: () -> float
+        if self.evaluation_time == 0:
+            return 0.
+        return self.send_time / self.evaluation_time
+
+    def snapshot(self):
+        # type: () -> Dict[str, Any]
+        if self.last_value is None:
+            last_value = None
         else:
-            return sum(self.__times) / len(self.__times)
-
-    def stop(self):
-        if self.__enabled:
-            self.__send_queue.put("die")
-            self.__times.append(float(self.__receive_queue.get()))
-
-
-class _OutputThread(threading.Thread):
-
-    def __init__(
-            self,
-            send_queue,  # type: Queue
-            receive_queue, # type: Queue
-            last_value,  # type: numpy.float64
-            last_time,  # type: float
-            average_time,  # type: float
-            start_time
-    ):
-        # type: (...) -> None
-        super(_OutputThread, self).__init__()
-        self.__send_queue = send_queue
-        self.__receive_queue = receive_queue
-        self.__last_value = last_value
-        self.__last_time = last_time
-        self.__average_time = average_time
-        self.__start_time = start_time
+            last_value = float(self.last_value)
+        return {
+            "time": time.time(),
+            "calls": self.calls,
+            "last value": last_value,
+            "average time": self.average_time,
+            "total runtime": self.total_runtime,
+            "calls per second": self.calls_per_second,
+            "send time": self.send_time,
+            "wait time": self.wait_time
+        }
+
+
+class _ProgressReporter(object):
+
+    __LOGGER = logging.getLogger(__name__ + "._ProgressReporter")
+
+    def __init__(self, telemetry, refresh_rate=1., telemetry_file=None):
+        # type: (_Telemetry, float, Opt[str]) -> None
+        self.__telemetry = telemetry
+        self.__refresh_rate = refresh_rate
+        self.__telemetry_file = telemetry_file
+        self.__stream = None  # type: io.TextIOBase
+        self.__stopped = threading.Event()
+        self.__thread = None  # type: threading.Thread
+        self.__reported_calls = None  # type: int
         self.__output_pulse = "-"
-        self.__index = None
-        self.__initial_time = time.time()
-        self.daemon = True
-
-    def run(self):
-        while True:
-            if not self.__receive_queue.empty():
-                self.__send_runtime()
-                break
-            self.__output()
-
-    def __output(self):
-        print("\r" + self.__create_output(), end="\r")
-
-    def __create_output(self):
-        if isinstance(self.__last_value, type(None)):
-            return self.__simple_output()
-        else:
-            return self.__full_output()
-
-    def __simple_output(self):
-        self.__pulse()
-        runtime = self.__get_current_runtime()
-        return "Elapsed time: {0: .2f} {1}".format(
-            runtime, self.__output_pulse
+        self.__console = self.__console_enabled()
+
+    def __console_enabled(self):
+        # type: () -> bool
+        if not logging.getLogger().isEnabledFor(logging.INFO):
+            return True
+        self.__LOGGER.info(
+            "Processor Output is disabled while info logging is enabled"
         )
+        return False
+
+    def start(self):
+        if self.__thread or self.__refresh_rate <= 0:
+            return
+        elif not (self.__console or self.__telemetry_file):
+            return
+
+        if self.__telemetry_file:
+            self.__stream = io.open(self.__telemetry_file, "a")
+        self.__thread = threading.Thread(target=self.__report_loop)
+        self.__thread.daemon = True
+        self.__thread.start()
+
+    def __report_loop(self):
+        # Sleeps on the event, so the thread only wakes to refresh or stop.
+        while not self.__stopped.wait(1. / self.__refresh_rate):
+            self.__report()
+
+    def __report(self):
+        if self.__console:
+            print("\r" + self.__create_output(), end="\r")
+        if self.__stream and self.__reported_calls != self.__telemetry.calls:
+            self.__reported_calls = self.__telemetry.calls
+            self.__stream.write(
+                u"%s\n" % json.dumps(self.__telemetry.snapshot())
+            )
+            self.__stream.flush()
 
-    def __full_output(self):
+    def __create_output(self):
+        # type: () -> str
         self.__pulse()
-        runtime = self.__get_current_runtime()
+        telemetry = self.__telemetry
+        if telemetry.last_value is None:
+            return "Elapsed time: {0: .2f} {1}".format(
+                telemetry.current_time, self.__output_pulse
+            )
         return "Last Value: {0: .3f}, Average Time: {1: .2f}, " \
-               "Elapsed Time: {2: .2f}, " \
-               "Total Runtime {3: .2f} {4}".format(
-                 self.__last_value, self.__average_time,
-                 runtime, self.__get_total_runtime(), self.__output_pulse
+               "Elapsed Time: {2: .2f}, Total Runtime {3: .2f}, " \
+               "Calls/s: {4: .1f}, IPC: {5: .0%} {6}".format(
+                 float(telemetry.last_value), telemetry.average_time,
+                 telemetry.current_time, telemetry.total_runtime,
+                 telemetry.calls_per_second, telemetry.send_fraction,
+                 self.__output_pulse
                )
 
-    def __get_current_runtime(self):
-        return time.time() - self.__initial_time
-
-    def __get_total_runtime(self):
-        return time.time() - self.__start_time
-
     def __pulse(self):
-        if self.__output_pulse is "-":
+        if self.__output_pulse == "-":
             self.__output_pulse = "/"
-        elif self.__output_pulse is "/":
+        elif self.__output_pulse == "/":
             self.__output_pulse = "\\"
-        elif self.__output_pulse is "\\":
+        elif self.__output_pulse == "\\":
             self.__output_pulse = "-"
 
-    def __send_runtime(self):
-        self.__receive_queue.get()
-        self.__send_queue.put(self.__get_current_runtime())
+    def stop(self):
+        if self.__thread:
+            self.__stopped.set()
+            self.__thread.join()
+            self.__report()
+            self.__thread = None
+        if self.__stream:
+            self.__stream.close()
+            self.__stream = None
+
+
+def fingerprint(likelihood_name, data, functions):
+    # type: (str, Dict[str, Any], List[Any]) -> str
+    key = hashlib.sha1(repr(likelihood_name).encode())
+    for name in sorted(data):
+        key.update(repr(name).encode())
+        _add_data(key, data[name])
+    for function in functions:
+        _add_function(key, function)
+    return key.hexdigest()
+
+
+def _add_data(key, value):
+    # type: (Any, Any) -> None
+    if isinstance(value, numpy.ndarray) and not value.dtype.hasobject:
+        key.update(repr((value.dtype.descr, value.shape)).encode())
+        key.update(numpy.ascontiguousarray(value).view(numpy.uint8))
+        return
+
+    # Lazily loaded data is only a file location, or a column of one, so
+    # the file is only identified by its size and modification time.
+    location = value if isinstance(value, str) else getattr(
+        value, "location", None
+    )
+    if isinstance(location, str) and os.path.exists(location):
+        stats = os.stat(location)
+        key.update(repr((
+            location, getattr(value, "column", None), stats.st_size,
+            stats.st_mtime
+        )).encode())
+    else:
+        key.update(repr(value).encode())
+
+
+def _add_function(key, function):
+    # type: (Any, Any) -> None
+    if function is None:
+        key.update(b"None")
+        return
+    try:
+        with io.open(inspect.getsourcefile(function), "rb") as stream:
+            key.update(stream.read())
+    except (TypeError, IOError):
+        code = getattr(function, "__code__", None)
+        if code is not None:
+            key.update(code.co_code)
+            key.update(repr(code.co_consts).encode())
+    key.update(repr(getattr(function, "__name__", "")).encode())
+
+
+class _EvaluationCache(object):
+
+    __LOGGER = logging.getLogger(__name__ + "._EvaluationCache")
+
+    def __init__(self, size=10000, cache_file=None, fingerprint=None):
+        # type: (int, Opt[str], Opt[str]) -> None
+        self.__size = size
+        self.__cache_file = cache_file
+        self.__fingerprint = fingerprint
+        self.__values = collections.OrderedDict()
+        self.__stream = None  # type: io.TextIOBase
+        # A file written for a different fit is started over.
+        self.__restart_file = True
+        self.hits = 0
+        self.misses = 0
+        if cache_file:
+            self.__replay(cache_file)
+
+    @staticmethod
+    def key(values):
+        # type: (Any) -> Opt[bytes]
+        # Only exactly the same parameters may share a value, so the key
+        # is the bytes of the parameters themselves.
+        try:
+            return numpy.asarray(values, dtype=numpy.float64).tobytes()
+        except (TypeError, ValueError):
+            return None
+
+    def get(self, key):
+        # type: (Opt[bytes]) -> Opt[float]
+        if key is None or self.__size <= 0:
+            return None
+        elif key in self.__values:
+            value = self.__values.pop(key)
+            self.__values[key] = value
+            self.hits += 1
+            return value
+        self.misses += 1
+        return None
+
+    def store(self, key, value):
+        # type: (Opt[bytes], float) -> None
+        if key is None or self.__size <= 0:
+            return
+        self.__remember(key, float(value))
+        if self.__cache_file:
+            self.__write(key, float(value))
+
+    def __remember(self, key, value):
+        # type: (bytes, float) -> None
+        self.__values.pop(key, None)
+        self.__values[key] = value
+        while len(self.__values) > self.__size:
+            self.__values.popitem(last=False)
+
+    def __replay(self, cache_file):
+        # type: (str) -> None
+        try:
+            with io.open(cache_file) as stream:
+                header = stream.readline()
+                if not header:
+                    return
+                elif not self.__matches(header):
+                    self.__LOGGER.warning(
+                        "%s was written by a fit with a different "
+                        "likelihood, data, or functions, it won't be "
+                        "replayed." % cache_file
+                    )
+                    return
+                self.__restart_file = False
+                for line in stream:
+                    self.__replay_line(line)
+        except IOError:
+            return
+        self.__LOGGER.info(
+            "Replayed %d evaluations from %s" %
+            (len(self.__values), cache_file)
+        )
+
+    def __matches(self, header):
+        # type: (str) -> bool
+        try:
+            return json.loads(header)["fingerprint"] == self.__fingerprint
+        except (ValueError, KeyError, TypeError):
+            return False
+
+    def __replay_line(self, line):
+        # type: (str) -> None
+        try:
+            point = json.loads(line)
+            key = self.key(point["parameters"])
+            self.__remember(key, float(point["value"]))
+        except (ValueError, KeyError, TypeError):
+            # A fit that was killed may have left half of a line behind.
+            self.__LOGGER.debug("Skipped a broken line: %s" % line)
+
+    def __write(self, key, value):
+        # type: (bytes, float) -> None
+        if self.__stream is None:
+            self.__stream = self.__open_file()
+        parameters = numpy.frombuffer(key, dtype=numpy.float64).tolist()
+        self.__stream.write(u"%s\n" % json.dumps(
+            {"parameters": parameters, "value": value}
+        ))
+        self.__stream.flush()
+
+    def __open_file(self):
+        # type: () -> io.TextIOBase
+        if not self.__restart_file:
+            return io.open(self.__cache_file, "a")
+        stream = io.open(self.__cache_file, "w")
+        stream.write(u"%s\n" % json.dumps(
+            {"fingerprint": self.__fingerprint}
+        ))
+        return stream
+
+    def close(self):
+        if self.__stream:
+            self.__stream.close()
+            self.__stream = None
+
+    @property
+    def hit_rate(self):
+        # type: () -> float
+        total = self.hits + self.misses
+        if total == 0:
+            return 0.
+        return float(self.hits) / total
 
 
 class FittingInterface(kernel.KernelInterface):
@@ -180,21 +424,64 @@ class FittingInterface(kernel.KernelInterface):
     IS_DUPLEX = True
     __LOGGER = logging.getLogger(__name__ + ".FittingInterfaceKernel")
 
-    def __init__(self, minimizer_function):
+    def __init__(
+            self,
+            minimizer_function,  # type: Any
+            refresh_rate=1.,  # type: float
+            telemetry_file=None,  # type: Opt[str]
+            cache_size=10000,  # type: int
+            cache_file=None,  # type: Opt[str]
+            fingerprint=None  # type: Opt[str]
+    ):
+        # type: (...) -> None
         self.__parameter_parser = minimizer_function
-        self.__thread_interface = _ThreadInterface()
+        self.__telemetry = _Telemetry()
+        self.__reporter = _ProgressReporter(
+            self.__telemetry, refresh_rate, telemetry_file
+        )
+        self.__cache = _EvaluationCache(cache_size, cache_file, fingerprint)
         self.__last_value = None  # type: numpy.float64
+        self.__fraction = 1.
+
+    @property
+    def fraction(self):
+        # type: () -> float
+        return self.__fraction
+
+    @fraction.setter
+    def fraction(self, value):
+        # type: (float) -> None
+        """
+        The fraction of the events the kernels should use, anything less
+        than the full data is only understood by a SubsampleKernel.
+        """
+        self.__fraction = value
 
     def run(self, communication, *args):
+        if self.__is_code(args, kernel.ProcessCodes.GRADIENT):
+            return self.__run_gradient(communication, args[0][1:])
+        elif self.__is_code(args, kernel.ProcessCodes.GRADIENT_BATCH):
+            return self.__run_gradients(communication, args[0][1])
+
+        key = self.__get_key(args[0]) if len(args) == 1 else None
+        cached = self.__cache.get(key)
+        if cached is not None:
+            return cached
+
+        self.__reporter.start()
+        self.__telemetry.begin()
         self.__send_arguments(communication, args)
-        self.__thread_interface.start(self.__last_value)
+        self.__telemetry.sent()
         self.__get_final_value(communication)
-        self.__thread_interface.stop()
+        self.__telemetry.end(self.__last_value)
         self.__log_final_value()
+        self.__cache.store(key, self.__last_value)
         return self.__last_value
 
     def __send_arguments(self, communication, args):
-        parsed_arguments = self.__parameter_parser.convert(args)
+        parsed_arguments = self.__subsample(
+            self.__parameter_parser.convert(args)
+        )
 
         for pipe in communication:
             pipe.send(parsed_arguments)
@@ -205,5 +492,141 @@ class FittingInterface(kernel.KernelInterface):
             values[index] = pipe.recv()
         self.__last_value = numpy.sum(values)
 
+    def run_batch(self, communication, points):
+        keys = [self.__get_key(point) for point in points]
+        values = numpy.array([self.__cache.get(key) for key in keys], float)
+        missing = numpy.flatnonzero(numpy.isnan(values))
+        if len(missing):
+            values[missing] = self.__run_points(
+                communication, [points[index] for index in missing]
+            )
+            for index in missing:
+                self.__cache.store(keys[index], values[index])
+        return values
+
+    def __run_points(self, communication, points):
+        # type: (List[Any], List[Any]) -> numpy.ndarray
+        self.__reporter.start()
+        self.__telemetry.begin()
+        parsed_points = [
+            self.__subsample(self.__parameter_parser.convert((point,)))
+            for point in points
+        ]
+        for pipe in communication:
+            pipe.send((kernel.ProcessCodes.BATCH, parsed_points))
+        self.__telemetry.sent()
+
+        values = numpy.zeros(shape=len(parsed_points))
+        for pipe in communication:
+            values += pipe.recv()
+
+        self.__last_value = values[-1]
+        self.__telemetry.end(self.__last_value, len(values))
+        self.__LOGGER.info("Calculated a batch of %d points." % len(values))
+        return values
+
+    @staticmethod
+    def __is_code(args, code):
+        # type: (Tuple[Any], kernel.ProcessCodes) -> bool
+        return (
+            len(args) == 1 and isinstance(args[0], tuple) and
+            len(args[0]) > 0 and args[0][0] is code
+        )
+
+    def __run_gradient(self, communication, values):
+        # type: (List[Any], Tuple[Any]) -> Tuple[float, numpy.ndarray]
+        self.__reporter.start()
+        self.__telemetry.begin()
+        parsed_arguments = self.__parameter_parser.convert((values,))
+        names = list(parsed_arguments)
+        sent_arguments = self.__subsample(parsed_arguments)
+        for pipe in communication:
+            pipe.send(
+                (kernel.ProcessCodes.GRADIENT, (sent_arguments, names))
+            )
+        self.__telemetry.sent()
+
+        # The kernels return the value followed by the gradient, so the
+        # results of every kernel are simply summed together.
+        total = numpy.zeros(len(names) + 1)
+        for pipe in communication:
+            total += pipe.recv()
+
+        self.__last_value = total[0]
+        self.__telemetry.end(self.__last_value)
+        self.__log_final_value()
+        self.__cache.store(self.__get_key(values), total[0])
+        return total[0], total[1:]
+
+    def __run_gradients(self, communication, points):
+        # type: (List[Any], List[Any]) -> numpy.ndarray
+        self.__reporter.start()
+        self.__telemetry.begin()
+        parsed_points = [
+            self.__parameter_parser.convert((point,)) for point in points
+        ]
+        names = list(parsed_points[0])
+        sent_points = [self.__subsample(point) for point in parsed_points]
+        for pipe in communication:
+            pipe.send(
+                (kernel.ProcessCodes.GRADIENT_BATCH, (sent_points, names))
+            )
+        self.__telemetry.sent()
+
+        totals = numpy.zeros((len(points), len(names) + 1))
+        for pipe in communication:
+            totals += pipe.recv()
+
+        self.__last_value = totals[-1, 0]
+        self.__telemetry.end(self.__last_value, len(points))
+        self.__LOGGER.info(
+            "Calculated the gradients of %d points." % len(points)
+        )
+        for point, total in zip(points, totals):
+            self.__cache.store(self.__get_key(point), total[0])
+        return totals
+
+    def __get_key(self, values):
+        # type: (Any) -> Opt[bytes]
+        # A subsample's value is only an estimate of the full value, so it
+        # must never be remembered as the value of the point.
+        if self.__fraction < 1:
+            return None
+        return self.__cache.key(values)
+
+    def __subsample(self, parsed_arguments):
+        # type: (Any) -> Any
+        if self.__fraction < 1:
+            return _subsample.Subsample(self.__fraction, parsed_arguments)
+        return parsed_arguments
+
     def __log_final_value(self):
         self.__LOGGER.info("Final Value is: %f15" % self.__last_value)
+
+    def close(self):
+        """
+        Stops the progress reporter, closes the telemetry and cache files,
+        and reports how often the cache was able to skip the kernels.
+        """
+        self.__reporter.stop()
+        self.__cache.close()
+        self.__LOGGER.info(
+            "Evaluation cache had %d hits and %d misses, %.1f%% hit rate." %
+            (self.__cache.hits, self.__cache.misses,
+             100 * self.__cache.hit_rate)
+        )
+
+
+class GradientFunction(object):
+
+    def __init__(self, interface):
+        # type: (kernel.ProcessInterface) -> None
+        self.__interface = interface
+
+    def __call__(self, *args):
+        # type: (*Any) -> Tuple[float, numpy.ndarray]
+        """
+        Calculates the value and the gradient at a point at the same time,
+        the gradient is in the order of the parser's parameters.
+        """
+        return self.__interface.run(kernel.ProcessCodes.GRADIENT, *args)
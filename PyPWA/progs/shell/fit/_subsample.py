@@ -0,0 +1,144 @@
+#  coding=utf-8
+#
+#  PyPWA, a scientific analysis toolkit.
+#  Copyright (C) 2016 JLab
+#
+#  This program is free software: you can redistribute it and/or modify
+#  it under the terms of the GNU General Public License as published by
+#  the Free Software Foundation, either version 3 of the License, or
+#  (at your option) any later version.
+#
+#  This program is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#  GNU General Public License for more details.
+#
+#  You should have received a copy of the GNU General Public License
+#  along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+"""
+Coarse to Fine Subsampling
+--------------------------
+Each stage of the fit only changes how much of its share each kernel uses,
+the processes and their data stay exactly where they are. A kernel uses
+every n-th event of its share, which is a view of the data instead of a
+copy, and works the same whether the data was loaded up front or is loaded
+lazily by the processes. Because of that, every fraction is rounded to one
+over a whole number.
+
+- Subsample - The parameters for a point along with the fraction of the
+  events that should be used to calculate it.
+- SubsampleKernel - Wraps the likelihood, hands it the active part of its
+  data and scales the result back up to the size of the full data.
+- get_stages - Cleans up the user's fractions into the stages of the fit,
+  always ending with the full data.
+"""
+
+from typing import Any, Dict, List, Tuple
+from typing import Optional as Opt
+
+import numpy
+
+from PyPWA import AUTHOR, VERSION
+from PyPWA.libs.interfaces import kernel
+
+__credits__ = ["Mark Jones"]
+__author__ = AUTHOR
+__version__ = VERSION
+
+
+class Subsample(object):
+
+    def __init__(self, fraction, parameters):
+        # type: (float, Any) -> None
+        self.fraction = fraction
+        self.parameters = parameters
+
+
+class SubsampleKernel(kernel.Kernel):
+
+    def __init__(self, likelihood):
+        # type: (kernel.Kernel) -> None
+        self.__kernel = likelihood
+
+    def setup(self):
+        self.__forward(1.)
+        self.__kernel.setup()
+
+    def process(self, data=False):
+        # type: (Any) -> Any
+        fraction, parameters = self.__unwrap(data)
+        step = self.__forward(fraction)
+        return self.__kernel.process(parameters) * step
+
+    def process_batch(self, points):
+        # type: (List[Any]) -> numpy.ndarray
+        # Every point of a batch was sent during the same stage.
+        unwrapped = [self.__unwrap(point) for point in points]
+        fraction = unwrapped[0][0] if unwrapped else 1.
+        step = self.__forward(fraction)
+        values = self.__kernel.process_batch(
+            [parameters for ignored, parameters in unwrapped]
+        )
+        return numpy.asarray(values, dtype=float) * step
+
+    def process_gradient(self, data, names):
+        # type: (Any, List[str]) -> numpy.ndarray
+        fraction, parameters = self.__unwrap(data)
+        step = self.__forward(fraction)
+        return self.__kernel.process_gradient(parameters, names) * step
+
+    def process_gradient_batch(self, points, names):
+        # type: (List[Any], List[str]) -> numpy.ndarray
+        unwrapped = [self.__unwrap(point) for point in points]
+        fraction = unwrapped[0][0] if unwrapped else 1.
+        step = self.__forward(fraction)
+        values = self.__kernel.process_gradient_batch(
+            [parameters for ignored, parameters in unwrapped], names
+        )
+        return numpy.asarray(values, dtype=float) * step
+
+    @staticmethod
+    def __unwrap(data):
+        # type: (Any) -> Tuple[float, Any]
+        if isinstance(data, Subsample):
+            return data.fraction, data.parameters
+        return 1., data
+
+    def __forward(self, fraction):
+        # type: (float) -> int
+        # The processes load the data into this kernel, and dynamic
+        # scheduling swaps it before every chunk, so the active part is
+        # handed to the likelihood before every calculation.
+        step = _get_step(fraction)
+        for name, value in vars(self).items():
+            if not name.startswith("_SubsampleKernel__"):
+                setattr(self.__kernel, name, _stride(value, step))
+        return step
+
+
+def _stride(value, step):
+    # type: (Any, int) -> Any
+    if step == 1 or not isinstance(value, numpy.ndarray):
+        return value
+    elif value.ndim == 0:
+        return value
+    # A strided slice, so no events are copied, and ordered files are still
+    # sampled across their whole range. The count is rounded instead of
+    # always taking the first event, dynamic scheduling cuts the data into
+    # many small chunks and counting the first of each would bias the scale.
+    return value[::step][:int(round(len(value) / float(step)))]
+
+
+def _get_step(fraction):
+    # type: (float) -> int
+    return max(1, int(round(1. / fraction)))
+
+
+def get_stages(fractions):
+    # type: (Opt[List[float]]) -> List[float]
+    steps = set(
+        _get_step(float(fraction)) for fraction in fractions or []
+        if 0 < float(fraction) < 1
+    )
+    return sorted(1. / step for step in steps if step > 1) + [1.]
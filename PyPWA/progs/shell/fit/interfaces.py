@@ -19,12 +19,13 @@
 """
 These are the interfaces needed to define a new likelihood.
 -----------------------------------------------------------
-- Likelihood - used for the actual algorithm to calculate the likelihood.
+- Likelihood - used for the actual algorithm to calculate the likelihood,
+  and optionally its gradient from the user's gradient function.
 - Setup - used to define how to interact with the likelihood and the name of
   the likelihood.
 """
 
-from typing import Any, Dict
+from typing import Any, Dict, List
 from typing import Optional as Opt
 
 import numpy
@@ -55,11 +56,42 @@ class Likelihood(kernel.Kernel):
         # type: (Dict[str, numpy.float64]) -> numpy.float64
         raise NotImplementedError
 
+    @staticmethod
+    def _project(
+            weights,  # type: numpy.ndarray
+            derivatives,  # type: Dict[str, numpy.ndarray]
+            names  # type: List[str]
+    ):
+        # type: (...) -> numpy.ndarray
+        """
+        Sums the derivatives of the intensities weighted by the derivative
+        of the likelihood with respect to each intensity, for each name.
+
+        :raises ValueError: If the user's gradient function left out the
+        derivative of any of the parameters.
+        """
+        missing = [name for name in names if name not in derivatives]
+        if missing:
+            raise ValueError(
+                "The gradient function returned no derivative for %s, "
+                "return one for every parameter, even the fixed ones." %
+                ", ".join(missing)
+            )
+
+        gradient = numpy.zeros(len(names))
+        for index, name in enumerate(names):
+            gradient[index] = numpy.sum(weights * derivatives[name])
+        return gradient
+
 
 class Setup(object):
 
     NAME = None  # type: str
     LIKELIHOOD_TYPE = None  # type: optimizers.LikelihoodTypes
+    # Whether the likelihood can calculate its gradient, and whether it
+    # needs the user's gradient function to do so.
+    GRADIENT = False
+    NEEDS_GRADIENT_FUNCTION = True
 
     def setup_likelihood(
             self,
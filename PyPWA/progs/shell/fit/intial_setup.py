@@ -48,13 +48,14 @@ class FittingSetup(options.Setup):
         self.__data_loader = loaders.DataLoading(
             self.__options.data_parser, self.__options.data_location,
             self.__options.internal_data, self.__options.qfactor_location,
-            self.__options.accepted_monte_carlo_location
+            self.__options.accepted_monte_carlo_location,
+            self.__options.kernel_processing.lazy_loading
         )
 
     def __load_functions(self):
         self.__functions = loaders.FunctionLoader(
             self.__options.functions_location, self.__options.processing_name,
-            self.__options.setup_name
+            self.__options.setup_name, self.__options.gradient_name
         )
 
     def __setup_interface(self):
@@ -62,7 +63,16 @@ class FittingSetup(options.Setup):
             self.__options.optimizer, self.__options.kernel_processing,
             self.__data_loader, self.__functions,
             self.__options.likelihood_type, self.__options.generated_length,
-            self.__options.save_name
+            self.__options.save_name, self.__options.progress_rate,
+            self.__options.telemetry_file, self.__options.amplitude_cache,
+            self.__options.evaluation_cache_size,
+            self.__options.evaluation_cache_file,
+            self.__options.block_evaluation,
+            self.__options.subsample_fractions,
+            self.__options.start_count, self.__options.start_ranges,
+            self.__options.start_seed, self.__options.checkpoint_file,
+            self.__options.checkpoint_calls,
+            self.__options.checkpoint_seconds, self.__options.resume
         )
 
     def return_interface(self):
@@ -36,6 +36,7 @@ here without it ever needing to adjust any of the already defined objects.
    - MC = The acceptance data.
    - B = Binned data.
    - Q = QFactor Data.
+   - A = Decay amplitudes, V = Production amplitudes.
 """
 
 from PyPWA import AUTHOR, VERSION
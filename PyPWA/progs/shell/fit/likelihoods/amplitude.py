@@ -0,0 +1,313 @@
+#  coding=utf-8
+#
+#  PyPWA, a scientific analysis toolkit.
+#  Copyright (C) 2016 JLab
+#
+#  This program is free software: you can redistribute it and/or modify
+#  it under the terms of the GNU General Public License as published by
+#  the Free Software Foundation, either version 3 of the License, or
+#  (at your option) any later version.
+#
+#  This program is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#  GNU General Public License for more details.
+#
+#  You should have received a copy of the GNU General Public License
+#  along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+"""
+The Amplitude Log-Likelihood is defined here:
+---------------------------------------------
+- Σ(Q*ln(|Σ V·A(D)|²)) - 1/total_number * Σᵢⱼ(Vᵢ·Vⱼ*·Nᵢⱼ)
+- Nᵢⱼ = Σ(Aᵢ(MC)·Aⱼ*(MC))
+
+For models that are the squared sum of waves, the decay amplitudes A only
+depend on the events, and the production amplitudes V are the only thing
+being fit. The user's processing function is called once for each range of
+events with the parameters set to None, and returns the decay amplitudes as
+a complex array with a column for each wave. The parameters are read in
+pairs, the real and imaginary part of each wave's production amplitude, or
+as only the real parts when there is a single parameter for each wave.
+
+The amplitudes of the accepted monte carlo are reduced to the normalization
+matrix N, so the monte carlo is never revisited while fitting. Each kernel
+calculates the amplitudes and normalization of its own range of the events,
+which happens in parallel, and can cache them to disk so later fits over
+the same events skip the calculation completely.
+
+Since the likelihood is a simple function of the production amplitudes,
+its gradient is calculated exactly from the same amplitudes and normalization
+without a gradient function, and is always handed to the optimizer.
+
+- AmplitudeLogLikelihood - Sets up the likelihood, requires the accepted
+  monte carlo.
+- AmplitudeLikelihood - The likelihood kernel.
+"""
+
+import hashlib
+import logging
+import os
+import tempfile
+from typing import Any, Dict, List, Tuple
+from typing import Optional as Opt
+
+import numpy
+
+from PyPWA import AUTHOR, VERSION
+from PyPWA.libs.interfaces import optimizers
+from PyPWA.progs.shell import loaders
+from PyPWA.progs.shell import shell_types
+from PyPWA.progs.shell.fit import _fused
+from PyPWA.progs.shell.fit import interfaces
+
+__credits__ = ["Mark Jones"]
+__author__ = AUTHOR
+__version__ = VERSION
+
+
+class AmplitudeLogLikelihood(interfaces.Setup):
+
+    NAME = "amplitude log-likelihood"
+    LIKELIHOOD_TYPE = optimizers.LikelihoodTypes.LOG_LIKELIHOOD
+    GRADIENT = True
+    NEEDS_GRADIENT_FUNCTION = False
+
+    def __init__(self):
+        self.__data = dict()  # type: Dict[str, numpy.ndarray]
+        self.__likelihood = None  # type: interfaces.Likelihood
+
+    def setup_likelihood(
+            self,
+            data_package,  # type: loaders.DataLoading
+            function_package,  # type: loaders.FunctionLoader,
+            optimizer_type, # type: optimizers.OptimizerTypes
+            extra_info=None  # type: Opt[Dict[str, Any]]
+    ):
+        # type: (...) -> None
+        if data_package.monte_carlo is None:
+            raise ValueError(
+                "The amplitude log-likelihood needs the accepted monte carlo!"
+            )
+
+        self.__data["data"] = data_package.data
+        self.__data["qfactor"] = data_package.qfactor
+        self.__data["monte_carlo"] = data_package.monte_carlo
+
+        extra_info = extra_info or {}
+        self.__likelihood = AmplitudeLikelihood(
+            function_package.setup, function_package.process,
+            self.__get_multiplier(optimizer_type),
+            extra_info["generated length"],
+            extra_info.get("amplitude cache")
+        )
+
+    @staticmethod
+    def __get_multiplier(optimizer_type):
+        # type: (optimizers.OptimizerTypes) -> int
+        if optimizer_type is optimizers.OptimizerTypes.MINIMIZER:
+            return -1
+        return 1
+
+    def get_data(self):
+        # type: () -> Dict[str, numpy.ndarray]
+        return self.__data
+
+    def get_likelihood(self):
+        # type: () -> interfaces.Likelihood
+        return self.__likelihood
+
+
+class _AmplitudeCache(object):
+
+    __LOGGER = logging.getLogger(__name__ + "._AmplitudeCache")
+
+    def __init__(self, processing_function, folder=None):
+        # type: (shell_types.users_processing, Opt[str]) -> None
+        self.__processing_function = processing_function
+        self.__folder = folder
+
+    def amplitudes(self, events):
+        # type: (numpy.ndarray) -> numpy.ndarray
+        if not self.__folder:
+            return self.__calculate(events)
+
+        location = os.path.join(
+            self.__folder, "amplitudes-%s.npy" % self.__key(events)
+        )
+        if os.path.exists(location):
+            self.__LOGGER.debug("Loading amplitudes from %s" % location)
+            return numpy.load(location, mmap_mode="r")
+
+        amplitudes = self.__calculate(events)
+        self.__save(location, amplitudes)
+        return amplitudes
+
+    def __calculate(self, events):
+        # type: (numpy.ndarray) -> numpy.ndarray
+        amplitudes = numpy.asarray(
+            self.__processing_function(events, None), dtype=numpy.complex128
+        )
+        if amplitudes.ndim == 1:
+            amplitudes = amplitudes.reshape((len(amplitudes), 1))
+        return amplitudes
+
+    def __key(self, events):
+        # type: (numpy.ndarray) -> str
+        # Both the events and the function that made the amplitudes name
+        # the file, so changing either calculates them again.
+        key = hashlib.sha1()
+        function = self.__processing_function
+        key.update(repr(getattr(function, "__module__", "")).encode())
+        key.update(repr(getattr(function, "__name__", "")).encode())
+        code = getattr(function, "__code__", None)
+        if code is not None:
+            key.update(code.co_code)
+            key.update(repr(code.co_consts).encode())
+        key.update(repr(events.dtype.descr).encode())
+        key.update(numpy.ascontiguousarray(events).view(numpy.uint8))
+        return key.hexdigest()
+
+    def __save(self, location, amplitudes):
+        # type: (str, numpy.ndarray) -> None
+        # Every process may be calculating the same chunk, so the file is
+        # written aside and renamed into place.
+        try:
+            if not os.path.isdir(self.__folder):
+                os.makedirs(self.__folder)
+            handle, temporary = tempfile.mkstemp(dir=self.__folder)
+            with os.fdopen(handle, "wb") as stream:
+                numpy.save(stream, amplitudes)
+            os.rename(temporary, location)
+        except (IOError, OSError) as error:
+            self.__LOGGER.warning("Failed to cache the amplitudes: %s" % error)
+
+
+class AmplitudeLikelihood(interfaces.Likelihood):
+
+    def __init__(
+            self,
+            setup_function,  # type: shell_types.users_setup
+            processing_function,  # type: shell_types.users_processing
+            multiplier,  # type: int
+            generated_length,  # type: float
+            cache_folder=None  # type: Opt[str]
+    ):
+        # type: (...) -> None
+        super(AmplitudeLikelihood, self).__init__(setup_function)
+        self.__cache = _AmplitudeCache(processing_function, cache_folder)
+        self.__multiplier = multiplier
+        self.__processed = 1.0 / generated_length
+        self.__scratch = _fused.Scratch()
+        self.__constants = _fused.ConstantProducts()
+        self.data = None  # type: numpy.ndarray
+        self.monte_carlo = None  # type: numpy.ndarray
+        self.qfactor = 1  # type: numpy.ndarray
+
+    def process(self, data=False):
+        # type: (Dict[str, float]) -> float
+        # Dynamic scheduling hands each kernel new ranges of the events, the
+        # amplitudes are remembered for each range that is seen.
+        amplitudes = self.__constants.get(self.__cache.amplitudes, self.data)
+        normalization = self.__constants.get(
+            self.__normalization, self.monte_carlo
+        )
+        production = self.__production(data, amplitudes.shape[1])
+
+        data_result = self.__log_sum(amplitudes, production)
+        monte_carlo_result = numpy.real(
+            production.dot(normalization).dot(production.conj())
+        )
+        return self.__multiplier * (
+            data_result - self.__processed * monte_carlo_result
+        )
+
+    def process_gradient(self, data, names):
+        # type: (Dict[str, float], List[str]) -> numpy.ndarray
+        amplitudes = self.__constants.get(self.__cache.amplitudes, self.data)
+        normalization = self.__constants.get(
+            self.__normalization, self.monte_carlo
+        )
+        production = self.__production(data, amplitudes.shape[1])
+
+        data_result, data_derivatives = self.__log_sum_derivatives(
+            amplitudes, production
+        )
+        # N is hermitian, so N·V* is the derivative of V·N·V* for each V.
+        monte_carlo_derivatives = normalization.dot(production.conj())
+        monte_carlo_result = numpy.real(
+            production.dot(monte_carlo_derivatives)
+        )
+
+        value = data_result - self.__processed * monte_carlo_result
+        gradient = self.__split_derivatives(
+            data_derivatives - self.__processed * monte_carlo_derivatives,
+            len(names)
+        )
+        return self.__multiplier * numpy.concatenate(([value], gradient))
+
+    def __log_sum_derivatives(self, amplitudes, production):
+        # type: (numpy.ndarray, numpy.ndarray) -> Tuple[float, numpy.ndarray]
+        # The derivative of ln(|Σ V·A|²) for each V is A / Σ V·A.
+        total = 0.
+        derivatives = numpy.zeros(len(production), dtype=numpy.complex128)
+        for block, out in self.__scratch.blocks(len(amplitudes)):
+            sums = amplitudes[block].dot(production)
+            weights = _fused.take(self.qfactor, block)
+            numpy.absolute(sums, out=out)
+            numpy.multiply(out, out, out=out)
+            numpy.log(out, out=out)
+            total += numpy.sum(weights * out)
+            derivatives += amplitudes[block].T.dot(weights / sums)
+        return total, derivatives
+
+    @staticmethod
+    def __split_derivatives(derivatives, count):
+        # type: (numpy.ndarray, int) -> numpy.ndarray
+        # For a complex derivative d, the real part of the wave has a
+        # derivative of 2·Re(d), and the imaginary part of -2·Im(d).
+        derivatives = 2 * derivatives.conj()
+        if count == len(derivatives):
+            return derivatives.real
+
+        gradient = numpy.empty(count)
+        gradient[0::2] = derivatives.real
+        gradient[1::2] = derivatives.imag
+        return gradient
+
+    def __normalization(self, monte_carlo):
+        # type: (numpy.ndarray) -> numpy.ndarray
+        amplitudes = self.__cache.amplitudes(monte_carlo)
+        return amplitudes.T.dot(amplitudes.conj())
+
+    @staticmethod
+    def __production(parameters, wave_count):
+        # type: (Any, int) -> numpy.ndarray
+        if isinstance(parameters, dict):
+            parameters = list(parameters.values())
+        values = numpy.asarray(parameters, dtype=float).ravel()
+
+        if len(values) == 2 * wave_count:
+            return values[0::2] + 1j * values[1::2]
+        elif len(values) == wave_count:
+            return values.astype(numpy.complex128)
+        raise ValueError(
+            "Received %d parameters for %d waves, expected the real and "
+            "imaginary part of each wave." % (len(values), wave_count)
+        )
+
+    def __log_sum(self, amplitudes, production):
+        # type: (numpy.ndarray, numpy.ndarray) -> float
+        total = 0.
+        weights = self.qfactor
+        for block, out in self.__scratch.blocks(len(amplitudes)):
+            numpy.absolute(amplitudes[block].dot(production), out=out)
+            numpy.multiply(out, out, out=out)
+            numpy.log(out, out=out)
+            if numpy.ndim(weights):
+                numpy.multiply(out, weights[block], out=out)
+            total += out.sum()
+
+        if numpy.ndim(weights):
+            return total
+        return weights * total
@@ -23,7 +23,8 @@ The ChiSquared Likelihood is defined here:
 - Σ(((I°(D) - M)^2) / E^2)
 """
 
-from typing import Any, Dict
+import functools
+from typing import Any, Dict, List
 from typing import Optional as Opt
 
 import numpy
@@ -32,6 +33,7 @@ from PyPWA import AUTHOR, VERSION
 from PyPWA.libs.interfaces import optimizers
 from PyPWA.progs.shell import loaders
 from PyPWA.progs.shell import shell_types
+from PyPWA.progs.shell.fit import _fused
 from PyPWA.progs.shell.fit import interfaces
 
 __credits__ = ["Mark Jones"]
@@ -43,12 +45,14 @@ class ChiLikelihood(interfaces.Setup):
 
     NAME = "chi-squared"
     LIKELIHOOD_TYPE = optimizers.LikelihoodTypes.CHI_SQUARED
+    GRADIENT = True
 
     def __init__(self):
         super(ChiLikelihood, self).__init__()
         self.__data = dict()  # type: Dict[str, numpy.ndarray]
         self.__likelihood = None  # type: interfaces.Likelihood
         self.__multiplier = None  # type: float
+        self.__block_evaluation = False
 
     def setup_likelihood(
             self,
@@ -60,6 +64,10 @@ class ChiLikelihood(interfaces.Setup):
         # type: (...) -> None
         self.__setup_multiplier(optimizer_type)
         self.__setup_data(data_package)
+        if extra_info:
+            self.__block_evaluation = extra_info.get(
+                "block evaluation", False
+            )
         self.__setup_likelihood(function_package)
 
     def __setup_multiplier(self, optimizer_type):
@@ -98,14 +106,16 @@ class ChiLikelihood(interfaces.Setup):
         # type: (loaders.FunctionLoader) -> None
         self.__likelihood = Chi(
             function_package.setup, function_package.process,
-            self.__multiplier
+            self.__multiplier, function_package.gradient,
+            self.__block_evaluation
         )
 
     def __setup_unbinned_chi(self, function_package):
         # type: (loaders.FunctionLoader) -> None
         self.__likelihood = UnBinnedChi(
             function_package.setup, function_package.process,
-            self.__multiplier
+            self.__multiplier, function_package.gradient,
+            self.__block_evaluation
         )
 
     def get_data(self):
@@ -123,24 +133,53 @@ class Chi(interfaces.Likelihood):
             self,
             setup_function,  # type: shell_types.users_setup
             processing_function,  # type: shell_types.users_processing
-            multiplier  # type: float
+            multiplier,  # type: float
+            gradient_function=None,  # type: shell_types.users_gradient
+            block_evaluation=False  # type: bool
     ):
         # type: (...) -> None
         super(Chi, self).__init__(setup_function)
         self.__processing_function = processing_function
+        self.__gradient_function = gradient_function
         self.__multiplier = multiplier
+        self.__scratch = _fused.Scratch()
+        self.__blocks = None  # type: _fused.BlockedEvaluation
+        if block_evaluation:
+            self.__blocks = _fused.BlockedEvaluation()
         self.data = None  # type: numpy.ndarray
         self.binned = None  # type: numpy.ndarray
 
     def process(self, data=False):
         # type: (Dict[str, float]) -> float
-        intensity = self.__processing_function(self.data, data)
-        likelihood = self.__likelihood(intensity)
+        if self.__blocks:
+            likelihood = self.__blocks.sum(
+                len(self.data), functools.partial(self.__block, data)
+            )
+        else:
+            intensity = self.__processing_function(self.data, data)
+            likelihood = self.__likelihood(intensity)
         return self.__multiplier * likelihood
 
+    def __block(self, parameters, block):
+        # type: (Dict[str, float], slice) -> float
+        intensity = self.__processing_function(self.data[block], parameters)
+        binned = _fused.take(self.binned, block)
+        return self.__scratch.chi_sum(intensity, binned, binned)
+
+    def process_gradient(self, data, names):
+        # type: (Dict[str, float], List[str]) -> numpy.ndarray
+        intensity = self.__processing_function(self.data, data)
+        gradient = self._project(
+            2 * (intensity - self.binned) / self.binned,
+            self.__gradient_function(self.data, data), names
+        )
+
+        value = self.__likelihood(intensity)
+        return self.__multiplier * numpy.concatenate(([value], gradient))
+
     def __likelihood(self, data):
         # type: (numpy.ndarray) -> float
-        return numpy.sum(((data - self.binned)**2) / self.binned)
+        return self.__scratch.chi_sum(data, self.binned, self.binned)
 
 
 class UnBinnedChi(interfaces.Likelihood):
@@ -149,22 +188,53 @@ class UnBinnedChi(interfaces.Likelihood):
             self,
             setup_function,  # type: shell_types.users_setup
             processing_function,  # type: shell_types.users_processing,
-            multiplier  # type: float
+            multiplier,  # type: float
+            gradient_function=None,  # type: shell_types.users_gradient
+            block_evaluation=False  # type: bool
     ):
         # type: (...) -> None
         super(UnBinnedChi, self).__init__(setup_function)
         self.__processing_function = processing_function
+        self.__gradient_function = gradient_function
         self.__multiplier = multiplier
+        self.__scratch = _fused.Scratch()
+        self.__blocks = None  # type: _fused.BlockedEvaluation
+        if block_evaluation:
+            self.__blocks = _fused.BlockedEvaluation()
         self.data = None  # type: numpy.ndarray
         self.expected = None  # type: numpy.ndarray
         self.error = None  # type: numpy.ndarray
 
     def process(self, data=False):
         # type: (Dict[str, float]) -> float
-        intensity = self.__processing_function(self.data, data)
-        likelihood = self.__likelihood(intensity)
+        if self.__blocks:
+            likelihood = self.__blocks.sum(
+                len(self.data), functools.partial(self.__block, data)
+            )
+        else:
+            intensity = self.__processing_function(self.data, data)
+            likelihood = self.__likelihood(intensity)
         return self.__multiplier * likelihood
 
+    def __block(self, parameters, block):
+        # type: (Dict[str, float], slice) -> float
+        intensity = self.__processing_function(self.data[block], parameters)
+        return self.__scratch.chi_sum(
+            intensity, _fused.take(self.expected, block),
+            _fused.take(self.error, block)
+        )
+
+    def process_gradient(self, data, names):
+        # type: (Dict[str, float], List[str]) -> numpy.ndarray
+        intensity = self.__processing_function(self.data, data)
+        gradient = self._project(
+            2 * (intensity - self.expected) / self.error,
+            self.__gradient_function(self.data, data), names
+        )
+
+        value = self.__likelihood(intensity)
+        return self.__multiplier * numpy.concatenate(([value], gradient))
+
     def __likelihood(self, data):
         # type: (numpy.ndarray) -> float
-        return numpy.sum(((data - self.expected)**2) / self.error)
+        return self.__scratch.chi_sum(data, self.expected, self.error)
@@ -23,8 +23,9 @@ The Log-Likelihood Extended and UnExtended are defined here:
 - Extended Σln(Q*I°(D)) - 1/total_number * Σ(I°(MC))
 """
 
+import functools
 import logging
-from typing import Any, Dict
+from typing import Any, Dict, List
 from typing import Optional as Opt
 
 import numpy
@@ -33,6 +34,7 @@ from PyPWA import AUTHOR, VERSION
 from PyPWA.libs.interfaces import optimizers
 from PyPWA.progs.shell import loaders
 from PyPWA.progs.shell import shell_types
+from PyPWA.progs.shell.fit import _fused
 from PyPWA.progs.shell.fit import interfaces
 
 __credits__ = ["Mark Jones"]
@@ -44,10 +46,12 @@ class LogLikelihood(interfaces.Setup):
 
     NAME = "log-likelihood"
     LIKELIHOOD_TYPE = optimizers.LikelihoodTypes.LOG_LIKELIHOOD
+    GRADIENT = True
 
     def __init__(self):
         self.__data = dict()  # type: Dict[str, numpy.ndarray]
         self.__generated_length = None  # type: float
+        self.__block_evaluation = False
         self.__likelihood = None  # type: interfaces.Likelihood
         self.__multiplier = None  # type: float
 
@@ -76,13 +80,16 @@ class LogLikelihood(interfaces.Setup):
         self.__data["data"] = data_package.data
         self.__data["qfactor"] = data_package.qfactor
         self.__data["binned"] = data_package.binned
-        if isinstance(data_package.monte_carlo, numpy.ndarray):
+        if data_package.monte_carlo is not None:
             self.__data["monte_carlo"] = data_package.monte_carlo
 
     def __extract_generated_length(self, extra_info):
         # type: (Dict[str, float]) -> None
         if extra_info:
             self.__generated_length = extra_info["generated length"]
+            self.__block_evaluation = extra_info.get(
+                "block evaluation", False
+            )
 
     def __setup_likelihood(self, function_package):
         # type: (loaders.FunctionLoader) -> None
@@ -95,14 +102,16 @@ class LogLikelihood(interfaces.Setup):
         # type: (loaders.FunctionLoader) -> None
         self.__likelihood = ExtendedLikelihoodAmplitude(
             function_package.setup, function_package.process,
-            self.__multiplier, self.__generated_length
+            self.__multiplier, self.__generated_length,
+            function_package.gradient, self.__block_evaluation
         )
 
     def __setup_standard_likelihood(self, function_package):
         # type: (loaders.FunctionLoader) -> None
         self.__likelihood = UnExtendedLikelihoodAmplitude(
             function_package.setup, function_package.process,
-            self.__multiplier
+            self.__multiplier, function_package.gradient,
+            self.__block_evaluation
         )
 
     def get_data(self):
@@ -123,25 +132,78 @@ class ExtendedLikelihoodAmplitude(interfaces.Likelihood):
             setup_function,  # type: shell_types.users_setup
             processing_function,  # type: shell_types.users_processing
             multiplier, # type: int
-            generated_length  # type: float
+            generated_length,  # type: float
+            gradient_function=None,  # type: shell_types.users_gradient
+            block_evaluation=False  # type: bool
     ):
         # type: (...) -> None
         super(ExtendedLikelihoodAmplitude, self).__init__(setup_function)
         self.__processing_function = processing_function
+        self.__gradient_function = gradient_function
         self.__multiplier = multiplier
         self.__processed = 1.0 / generated_length
+        self.__scratch = _fused.Scratch()
+        self.__blocks = None  # type: _fused.BlockedEvaluation
+        if block_evaluation:
+            self.__blocks = _fused.BlockedEvaluation()
         self.data = None  # type: numpy.ndarray
         self.monte_carlo = None  # type: numpy.ndarray
         self.qfactor = 1  # type: numpy.ndarray
 
     def process(self, data=False):
         # type: (Dict[str, float]) -> float
+        if self.__blocks:
+            return self.__process_blocks(data)
+
         processed_data = self.__processing_function(self.data, data)
         processed_monte_carlo = self.__processing_function(
             self.monte_carlo, data
         )
         return self.__likelihood(processed_data, processed_monte_carlo)
 
+    def __process_blocks(self, parameters):
+        # type: (Dict[str, float]) -> float
+        data_result = self.__blocks.sum(
+            len(self.data), functools.partial(self.__data_block, parameters)
+        )
+        monte_carlo_result = self.__processed * self.__blocks.sum(
+            len(self.monte_carlo),
+            functools.partial(self.__monte_carlo_block, parameters)
+        )
+        return self.__multiplier * (data_result + monte_carlo_result)
+
+    def __data_block(self, parameters, block):
+        # type: (Dict[str, float], slice) -> float
+        intensities = self.__processing_function(self.data[block], parameters)
+        return self.__scratch.weighted_log_sum(
+            intensities, _fused.take(self.qfactor, block)
+        )
+
+    def __monte_carlo_block(self, parameters, block):
+        # type: (Dict[str, float], slice) -> float
+        return numpy.sum(
+            self.__processing_function(self.monte_carlo[block], parameters)
+        )
+
+    def process_gradient(self, data, names):
+        # type: (Dict[str, float], List[str]) -> numpy.ndarray
+        processed_data = self.__processing_function(self.data, data)
+        processed_monte_carlo = self.__processing_function(
+            self.monte_carlo, data
+        )
+        data_gradient = self._project(
+            self.qfactor / processed_data,
+            self.__gradient_function(self.data, data), names
+        )
+        monte_carlo_gradient = self._project(
+            numpy.full(len(processed_monte_carlo), self.__processed),
+            self.__gradient_function(self.monte_carlo, data), names
+        )
+
+        value = self.__likelihood(processed_data, processed_monte_carlo)
+        gradient = self.__multiplier * (data_gradient + monte_carlo_gradient)
+        return numpy.concatenate(([value], gradient))
+
     def __likelihood(self, data, monte_carlo):
         # type: (numpy.ndarray, numpy.ndarray) -> float
         data_result = self.__process_log_likelihood(data)
@@ -150,7 +212,7 @@ class ExtendedLikelihoodAmplitude(interfaces.Likelihood):
 
     def __process_log_likelihood(self, data):
         # type: (numpy.ndarray) -> float
-        return numpy.sum(self.qfactor * numpy.log(data))
+        return self.__scratch.weighted_log_sum(data, self.qfactor)
 
     def __process_monte_carlo(self, monte_carlo):
         # type: (numpy.ndarray) -> float
@@ -163,24 +225,59 @@ class UnExtendedLikelihoodAmplitude(interfaces.Likelihood):
             self,
             setup_function,  # type: shell_types.users_setup
             processing_function,  # type: shell_types.users_processing
-            multiplier  # type: int
+            multiplier,  # type: int
+            gradient_function=None,  # type: shell_types.users_gradient
+            block_evaluation=False  # type: bool
     ):
         # type: (...) -> None
         super(UnExtendedLikelihoodAmplitude, self).__init__(setup_function)
         self.__processing_function = processing_function
+        self.__gradient_function = gradient_function
         self.__multiplier = multiplier
+        self.__scratch = _fused.Scratch()
+        self.__constants = _fused.ConstantProducts()
+        self.__blocks = None  # type: _fused.BlockedEvaluation
+        if block_evaluation:
+            self.__blocks = _fused.BlockedEvaluation()
         self.data = None  # type: numpy.ndarray
         self.qfactor = 1  # type: numpy.ndarray
         self.binned = 1  # type: numpy.ndarray
 
     def process(self, data=False):
         # type: (Dict[str, float]) -> float
-        processed_data = self.__processing_function(self.data, data)
-        likelihood = self.__likelihood(processed_data)
+        if self.__blocks:
+            likelihood = self.__blocks.sum(
+                len(self.data), functools.partial(self.__block, data)
+            )
+        else:
+            processed_data = self.__processing_function(self.data, data)
+            likelihood = self.__likelihood(processed_data)
         return self.__multiplier * likelihood
 
+    def __block(self, parameters, block):
+        # type: (Dict[str, float], slice) -> float
+        intensities = self.__processing_function(self.data[block], parameters)
+        return self.__scratch.weighted_log_sum(
+            intensities, _fused.take(self.__weights, block)
+        )
+
+    def process_gradient(self, data, names):
+        # type: (Dict[str, float], List[str]) -> numpy.ndarray
+        processed_data = self.__processing_function(self.data, data)
+        gradient = self._project(
+            self.__weights / processed_data,
+            self.__gradient_function(self.data, data), names
+        )
+
+        value = self.__likelihood(processed_data)
+        return self.__multiplier * numpy.concatenate(([value], gradient))
+
     def __likelihood(self, data):
         # type: (numpy.ndarray) -> float
-        processed = self.qfactor * self.binned * numpy.log(data)
-        value = numpy.sum(processed)
-        return value
+        return self.__scratch.weighted_log_sum(data, self.__weights)
+
+    @property
+    def __weights(self):
+        # type: () -> numpy.ndarray
+        # Constant for the whole fit, so it's only multiplied once.
+        return self.__constants.get(numpy.multiply, self.qfactor, self.binned)
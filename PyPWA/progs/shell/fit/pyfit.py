@@ -21,20 +21,32 @@ PyFit, a flexible python fitting utility.
 -----------------------------------------
 - _LikelihoodPackager - a simple object that searches the 'likelihoods'
   package for the user's selected likelihood.
-- Fitting - defines the actual main logic for the program.
+- Fitting - defines the actual main logic for the program, optionally
+  fitting growing random subsamples of the events first, with each stage
+  starting from the result of the one before it, and optionally fitting
+  many random starting points at the same time. The fit of the full data
+  can be checkpointed and resumed from the last checkpoint.
 """
 
-from typing import List
+import logging
+import os
+from typing import Dict, List
+from typing import Optional as Opt
 
 from PyPWA import AUTHOR, VERSION
+from PyPWA.libs import checkpoints
 from PyPWA.libs import plugin_loader
 from PyPWA.libs.interfaces import common
 from PyPWA.libs.interfaces import kernel
 from PyPWA.libs.interfaces import optimizers
 from PyPWA.progs.shell import loaders
 from PyPWA.progs.shell.fit import interfaces
+from PyPWA.progs.shell.fit import _multi_start
+from PyPWA.progs.shell.fit import _subsample
 from PyPWA.progs.shell.fit import likelihoods
 from PyPWA.progs.shell.fit._process_interface import FittingInterface
+from PyPWA.progs.shell.fit._process_interface import GradientFunction
+from PyPWA.progs.shell.fit._process_interface import fingerprint
 
 __credits__ = ["Mark Jones"]
 __author__ = AUTHOR
@@ -78,6 +90,8 @@ class LikelihoodPackager(object):
 
 class Fitting(common.Main):
 
+    __LOGGER = logging.getLogger(__name__ + ".Fitting")
+
     def __init__(
             self,
             optimizer,  # type: optimizers.Optimizer
@@ -86,7 +100,21 @@ class Fitting(common.Main):
             function_loader,  # type: loaders.FunctionLoader
             likelihood_type,  # type: str
             generated_length,  # type: int
-            save_name  # type: str
+            save_name,  # type: str
+            refresh_rate=1.,  # type: float
+            telemetry_file=None,  # type: str
+            amplitude_cache=None,  # type: str
+            evaluation_cache_size=10000,  # type: int
+            evaluation_cache_file=None,  # type: str
+            block_evaluation=False,  # type: bool
+            subsample_fractions=None,  # type: List[float]
+            start_count=0,  # type: int
+            start_ranges=None,  # type: Dict[str, List[float]]
+            start_seed=None,  # type: int
+            checkpoint_file=None,  # type: str
+            checkpoint_calls=None,  # type: int
+            checkpoint_seconds=None,  # type: float
+            resume=False  # type: bool
     ):
         self.__optimizer = optimizer
         self.__processing = processing
@@ -95,15 +123,76 @@ class Fitting(common.Main):
         self.__likelihood_type = likelihood_type
         self.__generated_length = generated_length
         self.__save_name = save_name
+        self.__refresh_rate = refresh_rate
+        self.__telemetry_file = telemetry_file
+        self.__amplitude_cache = amplitude_cache
+        self.__evaluation_cache_size = evaluation_cache_size
+        self.__evaluation_cache_file = evaluation_cache_file
+        self.__block_evaluation = block_evaluation
+        self.__stages = self.__get_stages(subsample_fractions)
+        self.__starts = self.__get_starts(
+            start_count, start_ranges, start_seed
+        )
+        self.__resume = resume
+        self.__checkpoint = self.__get_checkpoint(
+            checkpoint_file, checkpoint_calls, checkpoint_seconds
+        )
 
         self.__likelihood_loader = LikelihoodPackager()
         self.__process_interface = None  # type: FittingInterface
         self.__likelihood = None  # type: interfaces.Setup
         self.__interface = None  # type: kernel.ProcessInterface
 
+    def __get_stages(self, subsample_fractions):
+        # type: (Opt[List[float]]) -> List[float]
+        stages = _subsample.get_stages(subsample_fractions)
+        if len(stages) > 1 and not self.__optimizer.WARM_START:
+            self.__LOGGER.warning(
+                "The optimizer can't be warm started, only fitting the full "
+                "data."
+            )
+            return [1.]
+        return stages
+
+    def __get_starts(self, count, ranges, seed):
+        # type: (int, Dict[str, List[float]], Opt[int]) -> List[Dict]
+        if not count:
+            return []
+        elif not self.__optimizer.WARM_START:
+            self.__LOGGER.warning(
+                "The optimizer can't be started from a point, only fitting "
+                "from the starting values."
+            )
+            return []
+        return _multi_start.get_starts(count, ranges or {}, seed)
+
+    def __get_checkpoint(self, location, calls, seconds):
+        # type: (Opt[str], Opt[int], Opt[float]) -> Opt[checkpoints.Checkpoint]
+        if not location:
+            if self.__resume:
+                self.__LOGGER.warning(
+                    "There is no checkpoint file to resume from, set "
+                    "'checkpoint file' under 'General Fitting'."
+                )
+            return None
+        elif not self.__optimizer.CHECKPOINTS:
+            self.__LOGGER.warning("The optimizer can't be checkpointed.")
+            return None
+        elif self.__starts:
+            self.__LOGGER.warning(
+                "Fits from many starting points can't be checkpointed."
+            )
+            return None
+
+        # Only the fit of the full data is checkpointed, so the smaller
+        # stages were already finished when the checkpoint was written.
+        if self.__resume and os.path.exists(location):
+            self.__stages = [1.]
+        return checkpoints.Checkpoint(location, calls, seconds)
+
     def start(self):
-        self.__setup_interface()
         self.__setup_likelihood()
+        self.__setup_interface()
         self.__setup_processing()
         self.__set_interface()
         self.__start_optimizer()
@@ -111,7 +200,21 @@ class Fitting(common.Main):
 
     def __setup_interface(self):
         self.__processing_interface = FittingInterface(
-            self.__optimizer.return_parser()
+            self.__optimizer.return_parser(), self.__refresh_rate,
+            self.__telemetry_file, self.__evaluation_cache_size,
+            self.__evaluation_cache_file, self.__get_fingerprint()
+        )
+
+    def __get_fingerprint(self):
+        # type: () -> Opt[str]
+        if not self.__evaluation_cache_file:
+            return None
+        return fingerprint(
+            self.__likelihood_type, self.__likelihood.get_data(),
+            [
+                self.__function_loader.process, self.__function_loader.setup,
+                self.__function_loader.gradient
+            ]
         )
 
     def __setup_likelihood(self):
@@ -122,24 +225,85 @@ class Fitting(common.Main):
         self.__likelihood.setup_likelihood(
             self.__data_loader, self.__function_loader,
             self.__optimizer.OPTIMIZER_TYPE,
-            {"generated length": self.__generated_length}
+            {
+                "generated length": self.__generated_length,
+                "amplitude cache": self.__amplitude_cache,
+                "block evaluation": self.__block_evaluation
+            }
         )
 
     def __setup_processing(self):
+        data = self.__likelihood.get_data()
+        likelihood = self.__likelihood.get_likelihood()
+        if len(self.__stages) > 1:
+            likelihood = _subsample.SubsampleKernel(likelihood)
+
         self.__processing.main_options(
-            self.__likelihood.get_data(), self.__likelihood.get_likelihood(),
-            self.__processing_interface
+            data, likelihood, self.__processing_interface
         )
 
     def __set_interface(self):
         self.__interface = self.__processing.fetch_interface()
 
     def __start_optimizer(self):
+        if self.__starts:
+            self.__run_multi_start()
+            return
+
         self.__optimizer.main_options(
-            self.__interface.run, self.__likelihood.LIKELIHOOD_TYPE
+            self.__interface.run, self.__likelihood.LIKELIHOOD_TYPE,
+            self.__interface.run_batch, self.__get_gradient_function()
         )
+        for fraction in self.__stages:
+            self.__run_stage(fraction)
+
+    def __run_stage(self, fraction):
+        # type: (float) -> None
+        self.__LOGGER.info("Fitting %.1f%% of the events." % (100 * fraction))
+        self.__processing_interface.fraction = fraction
+        if fraction == 1 and self.__checkpoint:
+            self.__optimizer.set_checkpoint(self.__checkpoint, self.__resume)
         self.__optimizer.start()
+        if fraction < 1:
+            self.__optimizer.warm_start(self.__optimizer.best_values())
+
+    def __run_multi_start(self):
+        multi_start = _multi_start.MultiStart(
+            self.__optimizer, self.__interface,
+            self.__likelihood.LIKELIHOOD_TYPE, self.__starts,
+            self.__uses_gradient()
+        )
+        for fraction in self.__stages:
+            self.__LOGGER.info(
+                "Fitting %d starts on %.1f%% of the events." %
+                (len(self.__starts), 100 * fraction)
+            )
+            self.__processing_interface.fraction = fraction
+            multi_start.run()
+
+        multi_start.save_table(self.__save_name)
+        # The best fit's optimizer saves its own results as usual.
+        self.__optimizer = multi_start.best_optimizer()
+
+    def __get_gradient_function(self):
+        # type: () -> Opt[GradientFunction]
+        if self.__uses_gradient():
+            return GradientFunction(self.__interface)
+        return None
+
+    def __uses_gradient(self):
+        # type: () -> bool
+        has_function = self.__function_loader.gradient is not None
+        if not self.__likelihood.GRADIENT:
+            if has_function:
+                self.__LOGGER.warning(
+                    "The %s can't use a gradient, the gradient function is "
+                    "ignored." % self.__likelihood.NAME
+                )
+            return False
+        return has_function or not self.__likelihood.NEEDS_GRADIENT_FUNCTION
 
     def __finalize_program(self):
         self.__interface.stop()
+        self.__processing_interface.close()
         self.__optimizer.save_extra(self.__save_name)
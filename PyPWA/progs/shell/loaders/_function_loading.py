@@ -21,6 +21,7 @@ Loads functions for PyShell
 ---------------------------
 - _ProcessFunctionLoader - Loads the users processing function
 - _SetupFunctionLoader - Loads the users setup function
+- _GradientFunctionLoader - Loads the users optional gradient function
 - FunctionLoader - Calls the Process and Setup Function Loaders and exposes
   their results.
 """
@@ -116,16 +117,56 @@ class _SetupFunctionLoader(object):
         return self.__function
 
 
+class _GradientFunctionLoader(object):
+
+    __LOGGER = logging.getLogger(__name__ + "._GradientFunctionLoader")
+
+    def __init__(self, loader, name):
+        # type: (plugin_loader.PluginLoader, Opt[str]) -> None
+        self.__loader = loader
+        self.__function = None  # type: Opt[shell_types.users_gradient]
+        if isinstance(name, str):
+            self.__try_to_load_gradient_function(name)
+
+    def __try_to_load_gradient_function(self, name):
+        # type: (str) -> None
+        try:
+            self.__function = self.__loader.get_by_name(name)
+        except Exception as error:
+            self.__LOGGER.critical("%s failed to load!" % name)
+            self.__LOGGER.exception(error)
+
+        if self.__function is None:
+            self.__LOGGER.warning(
+                "No gradient function found, the optimizer will have to "
+                "calculate the gradient itself."
+            )
+
+    @property
+    def gradient(self):
+        # type: () -> Opt[shell_types.users_gradient]
+        return self.__function
+
+
 class FunctionLoader(object):
 
     __LOGGER = logging.getLogger(__name__ + ".FunctionLoader")
 
-    def __init__(self, location, process_name, setup_name=None):
-        # type: (str, str, Opt[str]) -> None
+    def __init__(
+            self,
+            location,  # type: str
+            process_name,  # type: str
+            setup_name=None,  # type: Opt[str]
+            gradient_name=None  # type: Opt[str]
+    ):
+        # type: (...) -> None
         loader = plugin_loader.PluginLoader()
         loader.add_plugin_location(location)
         self.__process_loader = _ProcessFunctionLoader(loader, process_name)
         self.__setup_loader = _SetupFunctionLoader(loader, setup_name)
+        self.__gradient_loader = _GradientFunctionLoader(
+            loader, gradient_name
+        )
 
     @property
     def process(self):
@@ -136,3 +177,8 @@ class FunctionLoader(object):
     def setup(self):
         # type: () -> shell_types.users_setup
         return self.__setup_loader.setup
+
+    @property
+    def gradient(self):
+        # type: () -> Opt[shell_types.users_gradient]
+        return self.__gradient_loader.gradient
@@ -19,12 +19,15 @@
 """
 Loads files for the Data Loader
 -------------------------------
-- _FileLoader - Actually parses the files if a filename is provided.
+- _FileLoader - Actually parses the files if a filename is provided, or
+  when the file is loaded lazily, leaves the filename for the processes.
 - DataHandler - Takes all loaded data and exposes it through its properties.
 """
 
 import logging
+import os
 from typing import Optional as Opt
+from typing import Union
 
 import numpy
 
@@ -40,15 +43,30 @@ class _FileLoader(object):
 
     __LOGGER = logging.getLogger(__name__ +"._FileLoader")
 
+    # The files the processing plugin can read a range of events from.
+    __LAZY_EXTENSIONS = (".npy", ".csv", ".tsv")
+
     def __init__(self, data_parser):
         # type: (data_loaders.ParserPlugin) -> None
         self.__data_parser = data_parser
 
-    def load_file(self, file):
-        # type: (Opt[str]) -> Opt[numpy.ndarray]
-        if file:
+    def load_file(self, file, lazy=False):
+        # type: (Opt[str], bool) -> Opt[Union[numpy.ndarray, str]]
+        if file and lazy and self.__can_be_lazy(file):
+            return file
+        elif file:
             return self.__try_to_load_file(file)
 
+    def __can_be_lazy(self, file):
+        # type: (str) -> bool
+        extension = os.path.splitext(file)[1].lower()
+        if extension in self.__LAZY_EXTENSIONS:
+            return True
+        self.__LOGGER.warning(
+            "%s can't be loaded lazily, parsing it instead." % file
+        )
+        return False
+
     def __try_to_load_file(self, file):
         # type: (str) -> Opt[numpy.ndarray]
         try:
@@ -66,35 +84,42 @@ class DataHandler(object):
             data_parser,  # type: data_loaders.ParserPlugin
             data,  # type: Opt[str]
             monte_carlo,  # type: Opt[str]
-            qfactor  # type: Opt[str]
+            qfactor,  # type: Opt[str]
+            lazy=False  # type: bool
     ):
         # type: (...) -> None
         self.__data_parser = data_parser
         self.__file_loader = _FileLoader(data_parser)
-        self.__data = self.__file_loader.load_file(data)
-        self.__monte_carlo = self.__file_loader.load_file(monte_carlo)
+        self.__data = self.__file_loader.load_file(data, lazy)
+        self.__monte_carlo = self.__file_loader.load_file(monte_carlo, lazy)
         self.__qfactor = self.__file_loader.load_file(qfactor)
 
     def write(self, file, array):
         # type: (str, numpy.ndarray) -> None
         self.__data_parser.write(file, array)
 
+    @property
+    def is_lazy(self):
+        # type: () -> bool
+        return isinstance(self.__data, str)
+
     @property
     def data(self):
-        # type: () -> Opt[numpy.ndarray]
+        # type: () -> Opt[Union[numpy.ndarray, str]]
         if self.__data_is_columned():
             return self.__data
 
     def __data_is_columned(self):
         # type: () -> bool
+        # Data that is loaded lazily has to have columns.
         if isinstance(self.__data, numpy.ndarray):
             return bool(self.__data.dtype.names)
         else:
-            return False
+            return self.is_lazy
 
     @property
     def monte_carlo(self):
-        # type: () -> Opt[numpy.ndarray]
+        # type: () -> Opt[Union[numpy.ndarray, str]]
         return self.__monte_carlo
 
     @property
@@ -23,18 +23,22 @@ Moves the data in the dataset to its correct positions.
   all while remove those columns from the original data.
 - _QFactorSetup - Sets up the QFactor data using either the source data
   file or a separate data file.
+- _LazyColumns - When the data is loaded lazily, the internal columns are
+  left in the data file for the processes to read, and the columns of the
+  data aren't trimmed.
 - LoadData - Main entry point, extracts and loads all the data into the
   dateset object and returns that object.
 """
 
 import logging
-from typing import Dict
+from typing import Dict, Union
 from typing import Optional as Opt
 
 import numpy
 
 from PyPWA import AUTHOR, VERSION
 from PyPWA.libs.interfaces import data_loaders
+from PyPWA.libs.interfaces import kernel
 from PyPWA.progs.shell.loaders.data_loader import _dataset_storage
 from PyPWA.progs.shell.loaders.data_loader import _file_handling
 
@@ -122,6 +126,26 @@ class _QFactorSetup(object):
         return self.__extractor.extract("quality factor")
 
 
+class _LazyColumns(object):
+
+    def __init__(self, data_loader, internal_names):
+        # type: (_file_handling.DataHandler, Dict[str, str]) -> None
+        self.__data_loader = data_loader
+        self.__internal_names = internal_names
+
+    def extract(self, name):
+        # type: (str) -> kernel.FileColumn
+        return kernel.FileColumn(
+            self.__data_loader.data, self.__internal_names.get(name)
+        )
+
+    def qfactor(self):
+        # type: () -> Union[numpy.ndarray, kernel.FileColumn]
+        if isinstance(self.__data_loader.qfactor, numpy.ndarray):
+            return self.__data_loader.qfactor
+        return self.extract("quality factor")
+
+
 class LoadData(object):
 
     __LOGGER = logging.getLogger(__name__ + ".DataLoading")
@@ -132,12 +156,14 @@ class LoadData(object):
             data,  # type: str
             internal_data,  # type: Dict[str, str]
             qfactor=None,  # type: Opt[str]
-            monte_carlo=None  # type: Opt[str]
+            monte_carlo=None,  # type: Opt[str]
+            lazy=False  # type: bool
     ):
         # type: (...) -> None
         self.__data_handler = _file_handling.DataHandler(
-            parser, data, monte_carlo, qfactor
+            parser, data, monte_carlo, qfactor, lazy
         )
+        self.__lazy_columns = _LazyColumns(self.__data_handler, internal_data)
         self.__extractor = _InternalDataExtractor(
             self.__data_handler, internal_data
         )
@@ -148,11 +174,28 @@ class LoadData(object):
 
     def load(self):
         # type: () -> _dataset_storage.DataStorage
-        if isinstance(self.__data_handler.data, numpy.ndarray):
+        if self.__data_handler.is_lazy:
+            self.__process_lazy_columns()
+        elif isinstance(self.__data_handler.data, numpy.ndarray):
             self.__process_columns()
         self.__process_data()
         return self.__storage
 
+    @property
+    def is_lazy(self):
+        # type: () -> bool
+        return self.__data_handler.is_lazy
+
+    def __process_lazy_columns(self):
+        self.__storage.binned = self.__lazy_columns.extract("binned data")
+        self.__storage.qfactor = self.__lazy_columns.qfactor()
+        self.__storage.event_errors = self.__lazy_columns.extract(
+            "event errors"
+        )
+        self.__storage.expected_values = self.__lazy_columns.extract(
+            "expected values"
+        )
+
     def __process_columns(self):
         self.__get_binned()
         self.__get_qfactor()
@@ -174,7 +217,10 @@ class LoadData(object):
         )
 
     def __process_data(self):
-        self.__storage.data = self.__extractor.trimmed_array
+        if self.__data_handler.is_lazy:
+            self.__storage.data = self.__data_handler.data
+        else:
+            self.__storage.data = self.__extractor.trimmed_array
         self.__storage.monte_carlo = self.__data_handler.monte_carlo
         self.__storage.single_array = self.__data_handler.single_array
 
@@ -21,6 +21,11 @@ Data Loading, the main place to load data for the Shell
 -------------------------------------------------------
 Loads all the data from setup_dataset and filters it with _bin_filter,
 then exposes that through it's properties.
+
+When the data is loaded lazily, the data and monte carlo are left as the
+locations of their files, and the internal columns as FileColumns, so that
+the processes read their own events. Bins of zero can't be filtered from
+data that was never read, so they are kept.
 """
 
 import logging
@@ -50,7 +55,8 @@ class DataLoading(object):
             data,  # type: str
             internal_data=None,  # type: Opt[Dict[str, str]]
             qfactor=None,  # type: Opt[str]
-            monte_carlo=None  # type: Opt[str]
+            monte_carlo=None,  # type: Opt[str]
+            lazy=False  # type: bool
     ):
         # type: (...) -> None
         if not internal_data:
@@ -59,14 +65,18 @@ class DataLoading(object):
         self.__storage = None  # type: _dataset_storage.DataStorage
 
         self.__loader = _setup_dataset.LoadData(
-            parser, data, internal_data, qfactor, monte_carlo
+            parser, data, internal_data, qfactor, monte_carlo, lazy
         )
         self.__filter = _bin_filter.BinFilter()
         self.__load_data()
 
     def __load_data(self):
         storage = self.__loader.load()
-        self.__storage = self.__filter(storage)
+        if self.__loader.is_lazy:
+            self.__LOGGER.info("The data will be loaded by the processes.")
+            self.__storage = storage
+        else:
+            self.__storage = self.__filter(storage)
 
     def write(self, file_location, data):
         # type: (str, numpy.ndarray) -> None
@@ -74,7 +84,7 @@ class DataLoading(object):
 
     @property
     def data(self):
-        # type: () -> numpy.ndarray
+        # type: () -> Union[numpy.ndarray, str]
         return self.__storage.data
 
     @property
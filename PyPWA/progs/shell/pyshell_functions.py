@@ -42,6 +42,14 @@ def processing_function(the_array, the_params):
     return final_value
         """,
         """
+def gradient_function(the_array, the_params):
+    # Optional, only used when 'gradient name' is set. Return the derivative
+    # of processing_function for each event, keyed by the parameter's name.
+    # Every parameter needs a derivative, fixed parameters included.
+    
+    return {"A1": the_array["x"]}
+        """,
+        """
 def setup_function():
     # If you have an amplitude that needs a method are function called before
     # you can begin processing, call it here.
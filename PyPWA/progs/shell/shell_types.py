@@ -24,4 +24,7 @@ from typing import Callable, Dict
 from numpy import ndarray
 
 users_processing = Callable[[ndarray, Dict[str, float]], ndarray]
+users_gradient = Callable[
+    [ndarray, Dict[str, float]], Dict[str, ndarray]
+]
 users_setup = Callable[[], None]
@@ -0,0 +1,211 @@
+#  coding=utf-8
+#
+#  PyPWA, a scientific analysis toolkit.
+#  Copyright (C) 2016 JLab
+#
+#  This program is free software: you can redistribute it and/or modify
+#  it under the terms of the GNU General Public License as published by
+#  the Free Software Foundation, either version 3 of the License, or
+#  (at your option) any later version.
+#
+#  This program is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#  GNU General Public License for more details.
+#
+#  You should have received a copy of the GNU General Public License
+#  along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+"""
+Cached Amplitude Terms
+----------------------
+While Migrad estimates the derivatives it shifts a single parameter at a
+time, so most of the terms that make up an amplitude are calculated again
+with the exact same parameters as before. Declaring the parameters each term
+depends on lets its result be remembered for each range of events, so only
+the terms whose parameters changed are calculated again:
+
+    from PyPWA.progs.shell import terms
+
+    @terms.term("mass", "width")
+    def breit_wigner(the_array, the_params):
+        ...
+
+    def processing_function(the_array, the_params):
+        return numpy.abs(breit_wigner(the_array, the_params))**2
+
+Each process keeps its own cache, and once the cache grows past its memory
+budget the least recently used results are dropped. The budget can be
+changed with set_memory_budget from the setup function, which runs inside
+of every process. The remembered results are read only, since they are
+handed out again on later calls.
+
+- TermCache - A least recently used cache with a memory budget, safe to
+  share between threads.
+- term - The decorator that declares the parameters a term depends on.
+- set_memory_budget - Changes the budget of this process's cache.
+- cache - Returns this process's cache, to inspect its hits and misses.
+"""
+
+import collections
+import functools
+import logging
+import threading
+from typing import Any, Callable, Hashable, Tuple
+
+import numpy
+
+from PyPWA import AUTHOR, VERSION
+
+__credits__ = ["Mark Jones"]
+__author__ = AUTHOR
+__version__ = VERSION
+
+
+_DEFAULT_BUDGET = 256 * 1024**2
+
+
+class TermCache(object):
+
+    __LOGGER = logging.getLogger(__name__ + ".TermCache")
+
+    def __init__(self, budget=_DEFAULT_BUDGET):
+        # type: (int) -> None
+        self.__budget = budget
+        self.__entries = collections.OrderedDict()
+        self.__size = 0
+        # Thread kernels share this process's cache.
+        self.__lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key, events, calculate):
+        # type: (Hashable, Any, Callable[[], Any]) -> Any
+        with self.__lock:
+            if key in self.__entries:
+                # Reinserting moves the entry to the most recently used end.
+                entry = self.__entries.pop(key)
+                self.__entries[key] = entry
+                self.hits += 1
+                return entry[1]
+            self.misses += 1
+
+        # The term is calculated outside of the lock so other threads aren't
+        # held up by it, at worst two threads calculate the same term.
+        value = calculate()
+        with self.__lock:
+            self.__store(key, events, value)
+        return value
+
+    def __store(self, key, events, value):
+        # type: (Hashable, Any, Any) -> None
+        size = getattr(value, "nbytes", 0)
+        if size > self.__budget:
+            self.__LOGGER.debug(
+                "A term of %d bytes is larger than the budget." % size
+            )
+            return
+
+        if isinstance(value, numpy.ndarray):
+            value.flags.writeable = False
+
+        if key in self.__entries:
+            self.__size -= self.__entries.pop(key)[2]
+
+        # The events are kept alive with the result, otherwise a new array
+        # could reuse their memory and be mistaken for them.
+        self.__entries[key] = (events, value, size)
+        self.__size += size
+        self.__shrink(self.__budget)
+
+    def __shrink(self, budget):
+        # type: (int) -> None
+        while self.__size > budget and self.__entries:
+            key, entry = self.__entries.popitem(last=False)
+            self.__size -= entry[2]
+
+    def resize(self, budget):
+        # type: (int) -> None
+        with self.__lock:
+            self.__budget = budget
+            self.__shrink(budget)
+
+    def clear(self):
+        with self.__lock:
+            self.__entries.clear()
+            self.__size = 0
+            self.hits = 0
+            self.misses = 0
+
+    @property
+    def size(self):
+        # type: () -> int
+        return self.__size
+
+    def __len__(self):
+        # type: () -> int
+        return len(self.__entries)
+
+
+_CACHE = TermCache()
+
+
+def _events_key(events):
+    # type: (Any) -> Hashable
+    if isinstance(events, numpy.ndarray):
+        return (
+            events.__array_interface__["data"][0], events.shape,
+            events.strides, events.dtype.str
+        )
+    return id(events)
+
+
+def term(*parameters):
+    # type: (str) -> Callable[[Callable], Callable]
+    """
+    Declares the parameters a term depends on, the term's result is only
+    calculated again for new events or when one of those parameters changed.
+
+    :param parameters: The names of the parameters the term uses.
+    """
+    def decorate(function):
+        # type: (Callable[[Any, Any], Any]) -> Callable[[Any, Any], Any]
+        @functools.wraps(function)
+        def cached_term(the_array, the_params):
+            values = _parameter_values(parameters, the_params)
+            if values is None:
+                return function(the_array, the_params)
+
+            key = (function, _events_key(the_array), values)
+            return _CACHE.get(
+                key, the_array, lambda: function(the_array, the_params)
+            )
+        return cached_term
+    return decorate
+
+
+def _parameter_values(parameters, the_params):
+    # type: (Tuple[str], Any) -> Tuple
+    # Terms are only remembered for named parameters, anything else is
+    # simply calculated every time.
+    if not isinstance(the_params, dict):
+        return None
+    try:
+        return tuple(the_params[name] for name in parameters)
+    except KeyError:
+        return None
+
+
+def set_memory_budget(megabytes):
+    # type: (float) -> None
+    """
+    Changes how much memory this process's cache may use.
+
+    :param megabytes: The budget in megabytes, 0 disables the cache.
+    """
+    _CACHE.resize(int(megabytes * 1024**2))
+
+
+def cache():
+    # type: () -> TermCache
+    return _CACHE
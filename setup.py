@@ -35,7 +35,8 @@ entry_points = {
         "PySimulate = %s:py_simulate" % configurator_entry,
         "GenerateIntensities = %s:generate_intensities" % configurator_entry,
         "GenerateWeights = %s:generate_weights" % configurator_entry,
-        "PyMask = %s:masking_utility" % argument_entry
+        "PyMask = %s:masking_utility" % argument_entry,
+        "PyPWADaemon = PyPWA.builtin_plugins.distributed.daemon:main"
     ]
 }
 
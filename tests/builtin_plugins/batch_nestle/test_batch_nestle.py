@@ -0,0 +1,163 @@
+import math
+import os
+
+import numpy
+import pytest
+
+from PyPWA.builtin_plugins import batch_nestle
+from PyPWA.builtin_plugins.batch_nestle import batched
+from PyPWA.initializers.configurator import option_tools
+from PyPWA.libs import checkpoints
+from PyPWA.libs import nested_sampling
+
+SIMPLE_PRIOR = os.path.join(
+    os.path.dirname(__file__), "../../data/source_files/simple_prior.py"
+)
+
+SIGMA = .1
+# The gaussian integrates to 2 pi sigma^2 inside of the unit square.
+EXPECTED_LOGZ = math.log(2 * math.pi * SIGMA ** 2)
+
+
+def gaussian(point):
+    return -numpy.sum((numpy.asarray(point) - .5) ** 2, -1) / (2 * SIGMA**2)
+
+
+class BatchCounter(object):
+
+    def __init__(self):
+        self.sizes = []
+
+    def __call__(self, points):
+        self.sizes.append(len(points))
+        return gaussian(points)
+
+
+@pytest.fixture()
+def nested():
+    template = batch_nestle.BatchNestleOptions.default_options
+    options = {
+        "prior location": SIMPLE_PRIOR,
+        "prior name": "prior",
+        "ndim": 2,
+        "npoints": 100,
+        "batch size": 10
+    }
+    command = option_tools.CommandOptions(template, options)
+    setup = batch_nestle.BatchNestleOptions.setup(command)
+    return setup.return_interface()
+
+
+def test_points_are_sent_in_batches(nested):
+    numpy.random.seed(1)
+    counter = BatchCounter()
+    nested.main_options(gaussian, batch_function=counter)
+    nested.start()
+    nested.save_extra("batch_extra_data")
+    os.remove("batch_extra_data.npy")
+    os.remove("batch_extra_data.txt")
+    assert len(counter.sizes) > 1
+    assert max(counter.sizes[1:]) > 1
+
+
+def test_evidence_is_accurate():
+    numpy.random.seed(2)
+    sampler = nested_sampling.BatchSampler(
+        nested_sampling.BatchPrior(lambda x: x, 2), gaussian, 2, 200, "single",
+        10, 120, float("inf"), float("inf"), .1, None
+    )
+    result = sampler.sample()
+    assert result.logz == pytest.approx(EXPECTED_LOGZ, abs=3 * result.logzerr)
+    assert result.weights.sum() == pytest.approx(1.)
+    assert len(result.samples) == result.niter + 200
+
+
+def test_works_without_a_batch_function():
+    numpy.random.seed(3)
+    optimizer = batched.BatchNestedSampling(
+        lambda x: x, 2, npoints=20, batch_size=4, maxiter=40
+    )
+    optimizer.main_options(gaussian)
+    optimizer.start()
+
+
+def test_both_stopping_criteria_are_rejected():
+    optimizer = batched.BatchNestedSampling(
+        lambda x: x, 1, dlogz=.1, decline_factor=1.
+    )
+    optimizer.main_options(gaussian, batch_function=gaussian)
+    with pytest.raises(ValueError):
+        optimizer.start()
+
+
+def test_prior_is_vectorized_when_it_can_be():
+    calls = []
+
+    def prior(x):
+        calls.append(numpy.ndim(x))
+        return x * 2
+
+    batch_prior = nested_sampling.BatchPrior(prior, 2)
+    points = numpy.random.rand(5, 2)
+    numpy.testing.assert_allclose(batch_prior(points), points * 2)
+    del calls[:]
+    batch_prior(points)
+    assert calls == [2]
+
+
+def test_prior_falls_back_to_single_points():
+    def prior(x):
+        return numpy.array([x[0] * 2, x[1]])
+
+    batch_prior = nested_sampling.BatchPrior(prior, 2)
+    points = numpy.random.rand(2, 2)
+    expected = points * [2, 1]
+    numpy.testing.assert_allclose(batch_prior(points), expected)
+    numpy.testing.assert_allclose(batch_prior(points), expected)
+
+
+def test_parser_returns_a_single_point():
+    parser = batched.BatchNestedSampling(lambda x: x, 2).return_parser()
+    point = numpy.array([.1, .2])
+    numpy.testing.assert_array_equal(parser.convert(((point,),)), point)
+    numpy.testing.assert_array_equal(parser.convert((point,)), point)
+
+
+class Interrupted(Exception):
+    pass
+
+
+class InterruptAfter(object):
+
+    def __init__(self, calls):
+        self.calls = calls
+
+    def __call__(self, points):
+        self.calls -= len(points)
+        if self.calls < 0:
+            raise Interrupted
+        return gaussian(points)
+
+
+def make_sampler(evaluate, checkpoint, resume=False):
+    return nested_sampling.BatchSampler(
+        nested_sampling.BatchPrior(lambda x: x, 2), evaluate, 2, 100, "single",
+        10, 60, float("inf"), float("inf"), .1, None, checkpoint, resume
+    )
+
+
+def test_sampling_resumes_from_the_checkpoint(tmpdir):
+    numpy.random.seed(5)
+    location = str(tmpdir.join("nestle.checkpoint"))
+    checkpoint = checkpoints.Checkpoint(location, calls=100)
+    with pytest.raises(Interrupted):
+        make_sampler(InterruptAfter(1000), checkpoint).sample()
+    saved_calls = int(numpy.load(location)["calls"])
+
+    counter = BatchCounter()
+    checkpoint = checkpoints.Checkpoint(location, calls=100)
+    result = make_sampler(counter, checkpoint, True).sample()
+
+    assert result.ncall == saved_calls + sum(counter.sizes)
+    assert result.logz == pytest.approx(EXPECTED_LOGZ, abs=3 * result.logzerr)
+    assert not os.path.exists(location)
@@ -0,0 +1,132 @@
+import os
+
+import numpy
+import pytest
+
+from PyPWA.builtin_plugins.distributed import _shards
+from PyPWA.builtin_plugins.distributed import daemon
+from PyPWA.builtin_plugins.distributed import foreman
+from PyPWA.libs.interfaces import kernel
+
+TEST_DATA = {
+    "data": numpy.random.rand(1000),
+    "monte_carlo": numpy.random.rand(370)
+}
+EXPECTED = TEST_DATA["data"].sum() + 2 * TEST_DATA["monte_carlo"].sum()
+
+
+class SumKernel(kernel.Kernel):
+
+    def __init__(self):
+        self.data = None  # type: numpy.ndarray
+        self.monte_carlo = None  # type: numpy.ndarray
+
+    def setup(self):
+        pass
+
+    def process(self, data=False):
+        return numpy.sum(self.data) + data * numpy.sum(self.monte_carlo)
+
+
+class SumInterface(kernel.KernelInterface):
+    IS_DUPLEX = True
+
+    def run(self, connections, arguments):
+        for connection in connections:
+            connection.send(arguments[0])
+        return sum(connection.recv() for connection in connections)
+
+    def run_batch(self, connections, points):
+        for connection in connections:
+            connection.send((kernel.ProcessCodes.BATCH, points))
+        return sum(connection.recv() for connection in connections)
+
+
+class SimplexKernel(SumKernel):
+
+    def process(self, data=False):
+        return self.PROCESS_ID, self.data
+
+
+class SimplexInterface(kernel.KernelInterface):
+    IS_DUPLEX = False
+
+    def run(self, connections, args):
+        results = [connection.recv() for connection in connections]
+        return [process_id for process_id, data in results], \
+            numpy.concatenate([data for process_id, data in results])
+
+
+@pytest.fixture(scope="module")
+def distributed():
+    the_foreman = foreman.DistributedForeman(
+        local_daemons=2, processes_per_local_daemon=2
+    )
+    yield the_foreman
+    the_foreman.close()
+
+
+def test_duplex_sum_matches_expected(distributed):
+    distributed.main_options(TEST_DATA, SumKernel(), SumInterface())
+    interface = distributed.fetch_interface()
+    for repeat in range(3):
+        numpy.testing.assert_approx_equal(interface.run(2), EXPECTED)
+    numpy.testing.assert_allclose(
+        interface.run_batch([0, 1]),
+        [TEST_DATA["data"].sum(), EXPECTED - TEST_DATA["monte_carlo"].sum()]
+    )
+    interface.stop()
+
+
+def test_duplex_reports_is_alive(distributed):
+    distributed.main_options(TEST_DATA, SumKernel(), SumInterface())
+    interface = distributed.fetch_interface()
+    assert interface.is_alive
+    interface.stop()
+
+
+def test_simplex_results_are_in_process_order(distributed):
+    distributed.main_options(TEST_DATA, SimplexKernel(), SimplexInterface())
+    process_ids, data = distributed.fetch_interface().run()
+    assert process_ids == [0, 1, 2, 3]
+    numpy.testing.assert_array_equal(data, TEST_DATA["data"])
+
+
+@pytest.mark.parametrize("length", [0, 7, 100])
+def test_split_ranges_cover_everything(length):
+    ranges = _shards.split_ranges(length, [1, 3, 2])
+    assert ranges[0][0] == 0 and ranges[-1][1] == length
+    for (start, stop), (next_start, next_stop) in zip(ranges, ranges[1:]):
+        assert stop == next_start
+
+
+def test_shards_load_their_rows(tmpdir):
+    folder = _shards.ShardFolder(str(tmpdir))
+    packets = folder.shard(
+        {"data": TEST_DATA["data"], "list": [1, 2, 3]}, [1, 1]
+    )
+    assert isinstance(packets[0]["data"], _shards.ShardFile)
+    assert packets[1]["list"] == [2, 3]
+    loaded = [_shards.load_packet(packet)["data"] for packet in packets]
+    numpy.testing.assert_array_equal(
+        numpy.concatenate(loaded), TEST_DATA["data"]
+    )
+
+    location = folder.location
+    folder.release()
+    assert not os.path.exists(location)
+
+
+def test_daemon_defaults_to_localhost_without_a_key():
+    namespace = daemon._parse_arguments(["--port", "7431"])
+    assert namespace.address == "localhost"
+    assert namespace.authentication_key is None
+
+
+def test_random_keys_differ():
+    assert daemon.make_key() != daemon.make_key()
+
+
+def test_hosts_need_a_key():
+    with pytest.raises(ValueError):
+        foreman.DistributedForeman(["node1:7431"])
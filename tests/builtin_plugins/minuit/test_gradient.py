@@ -0,0 +1,73 @@
+import numpy
+import pytest
+
+pytest.importorskip("iminuit")
+
+from PyPWA.builtin_plugins.minuit import _gradient
+
+PARAMETERS = ["a", "b", "c"]
+
+
+class Batches(object):
+
+    def __init__(self):
+        self.batches = []
+
+    def __call__(self, points):
+        self.batches.append(len(points))
+        return numpy.array([
+            a ** 2 + 3 * a * b + numpy.sin(c) for a, b, c in points
+        ])
+
+
+def expected_gradient(a, b, c):
+    return [2 * a + 3 * b, 3 * a, numpy.cos(c)]
+
+
+@pytest.mark.parametrize(
+    "point", [(1., 2., .5), (0., 0., 0.), (100., -3., 2.)]
+)
+def test_gradient_matches_analytic(point):
+    gradient = _gradient.BatchGradient(Batches(), PARAMETERS, {})
+    numpy.testing.assert_allclose(
+        gradient(*point), expected_gradient(*point), rtol=1e-6, atol=1e-6
+    )
+
+
+def test_gradient_is_a_single_batch():
+    batches = Batches()
+    gradient = _gradient.BatchGradient(batches, PARAMETERS, {})
+    gradient(1., 2., 3.)
+    assert batches.batches == [6]
+
+
+def test_fixed_parameters_are_skipped():
+    batches = Batches()
+    gradient = _gradient.BatchGradient(batches, PARAMETERS, {"fix_b": True})
+    values = gradient(1., 2., .5)
+    assert batches.batches == [4]
+    assert values[1] == 0
+    numpy.testing.assert_allclose(values[0], 8., rtol=1e-6)
+
+
+def test_value_of_the_gradient_is_reused():
+    calls = []
+
+    def function(a, b, c):
+        calls.append("value")
+        return a ** 2 + 3 * a * b + numpy.sin(c)
+
+    def gradient_function(a, b, c):
+        calls.append("gradient")
+        return function(a, b, c), expected_gradient(a, b, c)
+
+    expected = function(1., 2., 3.)
+    gradient = _gradient.AnalyticGradient(gradient_function)
+    wrapped = gradient.wrap(function)
+    gradient(1., 2., 3.)
+    del calls[:]
+
+    assert wrapped(1., 2., 3.) == expected
+    assert calls == []
+    wrapped(1., 2., 4.)
+    assert calls == ["value"]
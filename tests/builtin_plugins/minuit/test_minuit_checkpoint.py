@@ -0,0 +1,39 @@
+import numpy
+import pytest
+
+pytest.importorskip("iminuit")
+
+from PyPWA.builtin_plugins.minuit import minimization
+from PyPWA.libs import checkpoints
+
+
+def quadratic(a, b):
+    return (a - 1) ** 2 + (b + 2) ** 2
+
+
+def test_best_point_is_saved_while_migrad_runs(tmpdir):
+    checkpoint = checkpoints.Checkpoint(str(tmpdir.join("minuit")), calls=1)
+    function = minimization._CheckpointedFunction(quadratic, checkpoint)
+    for a, b in [(0., 0.), (1., -1.), (5., 5.)]:
+        function(a, b)
+
+    state = checkpoint.load()
+    assert function.calls == int(state["calls"]) == 3
+    numpy.testing.assert_array_equal(state["values"], [1., -1.])
+    assert state["fval"] == 1.
+
+
+def test_resumed_fit_finds_the_minimum(tmpdir):
+    location = str(tmpdir.join("minuit"))
+    checkpoints.Checkpoint(location).save(
+        5, values=numpy.array([.9, -1.9]), fval=.02
+    )
+    minimizer = minimization.Minuit(["a", "b"], {"a": 0., "b": 0.})
+    minimizer.main_options(quadratic)
+    minimizer.set_checkpoint(checkpoints.Checkpoint(location, calls=1), True)
+    minimizer.start()
+
+    values = minimizer.best_values()
+    numpy.testing.assert_allclose(
+        [values["a"], values["b"]], [1., -2.], atol=1e-3
+    )
@@ -1,9 +1,14 @@
+import math
 import os
 
+import numpy
 import pytest
 
 from PyPWA.builtin_plugins import nestle
+from PyPWA.builtin_plugins.nestle import _graph_data
+from PyPWA.builtin_plugins.nestle import nested as nested_module
 from PyPWA.initializers.configurator import option_tools
+from PyPWA.libs import checkpoints
 
 SIMPLE_PRIOR = os.path.join(
     os.path.dirname(__file__), "../../data/source_files/simple_prior.py"
@@ -40,3 +45,107 @@ def test_nested_with_save(nested_save_data):
     logl = lambda x: 0.0
     nested_save_data.main_options(logl)
     nested_save_data.start()
+
+
+def gaussian(x):
+    return -numpy.sum((x - .5) ** 2) / .02
+
+
+@pytest.mark.parametrize("method", ["classic", "single", "multi"])
+@pytest.mark.parametrize("checkpointed", [False, True])
+def test_callback_log_has_every_stride(tmpdir, method, checkpointed):
+    location = str(tmpdir.join("graph.log"))
+    optimizer = nested_module.NestledSampling(
+        lambda x: x, 2, npoints=20, method=method, maxiter=30,
+        callback_file=location, callback_stride=4
+    )
+    if checkpointed:
+        optimizer.set_checkpoint(
+            checkpoints.Checkpoint(str(tmpdir.join("nestle.checkpoint")))
+        )
+    optimizer.main_options(gaussian)
+    optimizer.start()
+
+    records = list(_graph_data.read_log(location))
+    assert [record["iteration"] for record in records] == list(range(4, 30, 4))
+    for record in records:
+        assert record["active_u"].shape == (20, 2)
+        assert record["centers"].shape[1] == 2
+        assert numpy.all((record["active_u"] > 0) & (record["active_u"] < 1))
+    assert records[-1]["logz"] > records[0]["logz"]
+
+
+def test_reader_stops_at_a_partial_record(tmpdir):
+    location = str(tmpdir.join("graph.log"))
+    points = numpy.random.rand(3, 2)
+    header = _graph_data._HEADER.pack(_graph_data._MARKER, 1, -2., 3, 2, 0)
+    with open(location, "wb") as stream:
+        stream.write(header + points.tobytes())
+        stream.write(header + points.tobytes()[:10])
+
+    records = list(_graph_data.read_log(location))
+    assert len(records) == 1
+    numpy.testing.assert_array_equal(records[0]["active_u"], points)
+
+
+class Interrupted(Exception):
+    pass
+
+
+class InterruptAfter(object):
+
+    def __init__(self, calls):
+        self.calls = calls
+
+    def __call__(self, point):
+        self.calls -= 1
+        if self.calls < 0:
+            raise Interrupted
+        return gaussian(point)
+
+
+class CallCounter(object):
+
+    def __init__(self):
+        self.calls = 0
+
+    def __call__(self, point):
+        self.calls += 1
+        return gaussian(point)
+
+
+def make_checkpointed(location, resume=False):
+    optimizer = nested_module.NestledSampling(
+        lambda x: x, 2, npoints=100, dlogz=.1
+    )
+    optimizer.set_checkpoint(
+        checkpoints.Checkpoint(location, calls=100), resume
+    )
+    return optimizer
+
+
+def test_sampling_resumes_from_the_checkpoint(tmpdir):
+    numpy.random.seed(3)
+    location = str(tmpdir.join("nestle.checkpoint"))
+    optimizer = make_checkpointed(location)
+    optimizer.main_options(InterruptAfter(1000))
+    with pytest.raises(Interrupted):
+        optimizer.start()
+    saved_calls = int(numpy.load(location)["calls"])
+
+    counter = CallCounter()
+    optimizer = make_checkpointed(location, True)
+    optimizer.main_options(counter)
+    optimizer.start()
+    optimizer.save_extra(str(tmpdir.join("results")))
+
+    with open(str(tmpdir.join("results.txt"))) as stream:
+        summary = dict(
+            line.split(": ") for line in stream.read().split("\n\n")[0]
+            .splitlines()
+        )
+    logz, logzerr = map(float, summary["logz"].split("+/-"))
+    assert saved_calls > 0
+    assert int(summary["ncall"]) == saved_calls + counter.calls
+    assert logz == pytest.approx(math.log(2 * math.pi * .01), abs=3 * logzerr)
+    assert not os.path.exists(location)
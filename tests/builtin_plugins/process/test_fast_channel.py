@@ -0,0 +1,92 @@
+import numpy
+import pytest
+
+from PyPWA.builtin_plugins.process import _fast_channel
+from PyPWA.builtin_plugins.process import foreman
+from PyPWA.libs.interfaces import kernel
+
+TEST_DATA = {"data": numpy.random.rand(100)}
+
+
+class ParameterKernel(kernel.Kernel):
+
+    def __init__(self):
+        self.data = None  # type: numpy.ndarray
+
+    def setup(self):
+        pass
+
+    def process(self, data=False):
+        if isinstance(data, dict):
+            return numpy.sum(self.data) * data["a"] + data.get("b", 0.)
+        elif isinstance(data, numpy.ndarray):
+            return numpy.sum(self.data) * data[0]
+        elif data == "error":
+            raise RuntimeError
+        return self.PROCESS_ID, data
+
+
+class ParameterInterface(kernel.KernelInterface):
+    IS_DUPLEX = True
+
+    def run(self, connections, arguments):
+        for connection in connections:
+            connection.send(arguments[0])
+        return [connection.recv() for connection in connections]
+
+
+@pytest.fixture(params=[False, True])
+def interface(request):
+    process_builder = foreman.CalculationForeman(
+        3, pool_mode=request.param, fast_channel=True, inline="never"
+    )
+    process_builder.main_options(
+        TEST_DATA, ParameterKernel(), ParameterInterface()
+    )
+    the_interface = process_builder.fetch_interface()
+    yield the_interface
+    the_interface.stop()
+    process_builder.close()
+
+
+def test_parameters_are_received(interface):
+    for value in (1., 2.5, -3.):
+        total = sum(interface.run({"a": value}))
+        numpy.testing.assert_approx_equal(
+            total, value * TEST_DATA["data"].sum()
+        )
+
+
+def test_new_layout_is_sent(interface):
+    interface.run({"a": 1.})
+    total = sum(interface.run({"a": 2., "b": 1.}))
+    numpy.testing.assert_approx_equal(
+        total, 2 * TEST_DATA["data"].sum() + 3
+    )
+
+
+def test_arrays_are_received(interface):
+    total = sum(interface.run(numpy.array([4., 1.])))
+    numpy.testing.assert_approx_equal(total, 4 * TEST_DATA["data"].sum())
+
+
+def test_other_values_use_the_pipe(interface):
+    assert interface.run("go") == [(0, "go"), (1, "go"), (2, "go")]
+    interface.run({"a": 1.})
+    assert interface.run(None) == [(0, None), (1, None), (2, None)]
+
+
+def test_errors_use_the_pipe(interface):
+    with pytest.raises(RuntimeError, match="raised an error"):
+        interface.run("error")
+
+
+def test_processes_receive_the_worker_ends():
+    workers, mains = _fast_channel.duplex_build(1)
+    assert isinstance(mains[0], _fast_channel.MainConnection)
+    mains[0].send({"a": 1.})
+    assert workers[0].recv() == {"a": 1.}
+    workers[0].send(2.)
+    assert mains[0].poll(1.)
+    assert mains[0].recv() == 2.
+    _fast_channel.close_connections(mains)
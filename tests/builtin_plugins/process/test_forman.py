@@ -143,7 +143,9 @@ def broken_interface(request):
 
 @pytest.fixture()
 def interface_with_errors(broken_interface):
-    process_builder = foreman.CalculationForeman(3)
+    process_builder = foreman.CalculationForeman(
+        3, inline="never", max_retries=1
+    )
     process_builder.main_options(TEST_DATA, KernelError(), broken_interface)
     interface = process_builder.fetch_interface()
     yield interface
@@ -151,5 +153,5 @@ def interface_with_errors(broken_interface):
 
 
 def test_error_was_handled(interface_with_errors):
-    values = interface_with_errors.run()
-    assert kernel.ProcessCodes.ERROR in values
+    with pytest.raises(RuntimeError):
+        interface_with_errors.run()
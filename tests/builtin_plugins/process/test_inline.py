@@ -0,0 +1,80 @@
+import os
+import time
+
+import numpy
+import pytest
+
+from PyPWA.builtin_plugins.process import foreman
+from PyPWA.libs.interfaces import kernel
+
+TEST_DATA = {"data": numpy.random.rand(100)}
+
+
+class PidKernel(kernel.Kernel):
+
+    def __init__(self, delay=0.):
+        self.data = None  # type: numpy.ndarray
+        self.delay = delay
+
+    def setup(self):
+        pass
+
+    def process(self, data=False):
+        if data == "fail":
+            raise RuntimeError
+        if self.delay:
+            time.sleep(self.delay)
+        return numpy.sum(self.data), os.getpid()
+
+
+class PidInterface(kernel.KernelInterface):
+    IS_DUPLEX = True
+
+    def run(self, connections, arguments):
+        for connection in connections:
+            connection.send(arguments[0])
+        return [connection.recv() for connection in connections]
+
+
+def run_foreman(count, delay=0., calls=4, **options):
+    process_builder = foreman.CalculationForeman(count, **options)
+    process_builder.main_options(TEST_DATA, PidKernel(delay), PidInterface())
+    interface = process_builder.fetch_interface()
+    results = [interface.run("go") for call in range(calls)]
+    interface.stop()
+    return results
+
+
+def test_single_process_runs_inline():
+    for results in run_foreman(1):
+        assert len(results) == 1
+        numpy.testing.assert_approx_equal(
+            results[0][0], TEST_DATA["data"].sum()
+        )
+        assert results[0][1] == os.getpid()
+
+
+def test_fast_kernel_stays_inline():
+    assert run_foreman(3)[-1][0][1] == os.getpid()
+
+
+def test_slow_kernel_starts_the_processes():
+    results = run_foreman(3, delay=.05)
+    assert all(pid == os.getpid() for value, pid in results[0])
+    assert len(results[-1]) == 3
+    assert all(pid != os.getpid() for value, pid in results[-1])
+    total = sum(value for value, pid in results[-1])
+    numpy.testing.assert_approx_equal(total, TEST_DATA["data"].sum())
+
+
+@pytest.mark.parametrize("inline", ["always", "never"])
+def test_inline_can_be_forced(inline):
+    pids = [pid for value, pid in run_foreman(3, inline=inline)[-1]]
+    assert (pids == [os.getpid()]) == (inline == "always")
+
+
+def test_inline_errors_are_reported():
+    process_builder = foreman.CalculationForeman(1)
+    process_builder.main_options(TEST_DATA, PidKernel(), PidInterface())
+    interface = process_builder.fetch_interface()
+    assert interface.run("fail") == [kernel.ProcessCodes.ERROR]
@@ -0,0 +1,144 @@
+import os
+
+import numpy
+import pytest
+
+from PyPWA.builtin_plugins.process import _data_split
+from PyPWA.builtin_plugins.process import _lazy_data
+from PyPWA.builtin_plugins.process import foreman
+from PyPWA.libs.interfaces import kernel
+
+STRUCTURED = numpy.zeros(53, dtype=[("x", "f8"), ("y", "f8")])
+STRUCTURED["x"] = numpy.random.rand(53)
+STRUCTURED["y"] = numpy.random.rand(53)
+
+
+@pytest.fixture()
+def npy_file(tmpdir):
+    location = str(tmpdir.join("data.npy"))
+    numpy.save(location, STRUCTURED)
+    return location
+
+
+@pytest.fixture(params=[",", "\t"])
+def text_file(tmpdir, request):
+    location = str(tmpdir.join("data.csv"))
+    numpy.savetxt(
+        location, numpy.column_stack([STRUCTURED["x"], STRUCTURED["y"]]),
+        delimiter=request.param, header=request.param.join(["x", "y"]),
+        comments="", fmt="%.17g"
+    )
+    return location
+
+
+@pytest.fixture(params=["npy", "text"])
+def descriptor(request, npy_file, text_file):
+    if request.param == "npy":
+        return _lazy_data.open_file(npy_file)
+    return _lazy_data.open_file(text_file)
+
+
+def test_descriptor_loads_everything(descriptor):
+    assert len(descriptor) == len(STRUCTURED)
+    loaded = descriptor.load()
+    numpy.testing.assert_array_equal(loaded["x"], STRUCTURED["x"])
+    numpy.testing.assert_array_equal(loaded["y"], STRUCTURED["y"])
+
+
+@pytest.mark.parametrize("count", [1, 3, 4, 7])
+def test_split_matches_array_split(descriptor, count):
+    expected = numpy.array_split(STRUCTURED, count)
+    for packet, split in zip(descriptor.split(count), expected):
+        numpy.testing.assert_array_equal(packet.load()["x"], split["x"])
+
+
+def test_setup_data_splits_descriptors(descriptor):
+    packets = _data_split.SetupData(4).split({"data": descriptor})
+    total = sum(numpy.sum(packet["data"].load()["y"]) for packet in packets)
+    numpy.testing.assert_approx_equal(total, numpy.sum(STRUCTURED["y"]))
+
+
+def test_blank_lines_are_skipped(tmpdir):
+    location = str(tmpdir.join("blank.csv"))
+    with open(location, "w") as stream:
+        stream.write("x,y\n1,2\n\n3,4\n\n")
+    descriptor = _lazy_data.open_text(location)
+    assert len(descriptor) == 2
+    numpy.testing.assert_array_equal(descriptor.slice(1, 2).load()["x"], [3])
+
+
+def test_unknown_files_are_refused(tmpdir):
+    with pytest.raises(ValueError):
+        _lazy_data.open_file(str(tmpdir.join("data.gamp")))
+
+
+class PidKernel(kernel.Kernel):
+
+    def __init__(self):
+        self.data = None  # type: numpy.ndarray
+
+    def setup(self):
+        pass
+
+    def process(self, data=False):
+        if data == "sum":
+            return numpy.sum(self.data["x"])
+        return numpy.sum(self.data["x"]), os.getpid()
+
+
+class PidInterface(kernel.KernelInterface):
+    IS_DUPLEX = True
+
+    def run(self, connections, arguments):
+        for connection in connections:
+            connection.send(arguments[0])
+        return [connection.recv() for connection in connections]
+
+
+def test_processes_load_their_own_share(npy_file, text_file):
+    process_builder = foreman.CalculationForeman(3, lazy_loading=True)
+    for location in (npy_file, text_file):
+        process_builder.main_options(
+            {"data": location}, PidKernel(), PidInterface()
+        )
+        interface = process_builder.fetch_interface()
+        results = interface.run("go")
+        interface.stop()
+
+        assert all(pid != os.getpid() for value, pid in results)
+        total = sum(value for value, pid in results)
+        numpy.testing.assert_approx_equal(total, STRUCTURED["x"].sum())
+
+
+def test_npy_files_can_be_scheduled_dynamically(npy_file):
+    process_builder = foreman.CalculationForeman(
+        3, lazy_loading=True, scheduling="dynamic"
+    )
+    process_builder.main_options(
+        {"data": npy_file}, PidKernel(), PidInterface()
+    )
+    interface = process_builder.fetch_interface()
+    total = sum(interface.run("sum"))
+    interface.stop()
+    numpy.testing.assert_approx_equal(total, STRUCTURED["x"].sum())
+
+
+def test_single_process_still_loads_in_the_child(npy_file):
+    process_builder = foreman.CalculationForeman(1, lazy_loading=True)
+    process_builder.main_options(
+        {"data": npy_file}, PidKernel(), PidInterface()
+    )
+    interface = process_builder.fetch_interface()
+    results = interface.run("go")
+    interface.stop()
+    assert all(pid != os.getpid() for value, pid in results)
+
+
+def test_missing_columns_load_as_ones(npy_file):
+    descriptor = _lazy_data.open_data(
+        {"column": kernel.FileColumn(npy_file, "missing")}
+    )["column"]
+    assert len(descriptor) == len(STRUCTURED)
+    numpy.testing.assert_array_equal(
+        descriptor.slice(0, 5).load(), numpy.ones(5)
+    )
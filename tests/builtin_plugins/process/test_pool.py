@@ -0,0 +1,95 @@
+import os
+
+import numpy
+import pytest
+
+from PyPWA.builtin_plugins.process import foreman
+from PyPWA.libs.interfaces import kernel
+
+FIRST_DATA = {"data": numpy.random.rand(100)}
+SECOND_DATA = {"data": numpy.random.rand(60)}
+
+
+class PidKernel(kernel.Kernel):
+
+    def __init__(self):
+        self.data = None  # type: numpy.ndarray
+
+    def setup(self):
+        pass
+
+    def process(self, data=False):
+        return numpy.sum(self.data), os.getpid()
+
+
+class PidInterface(kernel.KernelInterface):
+    IS_DUPLEX = True
+
+    def run(self, connections, arguments):
+        for connection in connections:
+            connection.send(arguments[0])
+
+        total, pids = 0, set()
+        for connection in connections:
+            value, pid = connection.recv()
+            total += value
+            pids.add(pid)
+        return total, pids
+
+
+class SimplexPidKernel(PidKernel):
+
+    def process(self, data=False):
+        return self.PROCESS_ID, numpy.sum(self.data)
+
+
+class SimplexInterface(kernel.KernelInterface):
+    IS_DUPLEX = False
+
+    def run(self, connections, args):
+        return sum(connection.recv()[1] for connection in connections)
+
+
+@pytest.fixture()
+def pool():
+    the_foreman = foreman.CalculationForeman(
+        3, pool_mode=True, inline="never"
+    )
+    yield the_foreman
+    the_foreman.close()
+
+
+def run_duplex(pool, data):
+    pool.main_options(data, PidKernel(), PidInterface())
+    interface = pool.fetch_interface()
+    value = interface.run("go")
+    interface.stop()
+    return value
+
+
+def test_pool_reuses_processes(pool):
+    first_total, first_pids = run_duplex(pool, FIRST_DATA)
+    second_total, second_pids = run_duplex(pool, SECOND_DATA)
+
+    numpy.testing.assert_approx_equal(first_total, FIRST_DATA["data"].sum())
+    numpy.testing.assert_approx_equal(second_total, SECOND_DATA["data"].sum())
+    assert first_pids == second_pids
+
+
+def test_pool_stays_alive_after_stop(pool):
+    run_duplex(pool, FIRST_DATA)
+    assert pool.fetch_interface().is_alive
+
+
+def test_pool_restarts_for_new_kernel_class(pool):
+    run_duplex(pool, FIRST_DATA)
+    pool.main_options(SECOND_DATA, SimplexPidKernel(), SimplexInterface())
+    total = pool.fetch_interface().run()
+    numpy.testing.assert_approx_equal(total, SECOND_DATA["data"].sum())
+
+
+def test_pool_runs_simplex_kernels_on_load(pool):
+    for data in (FIRST_DATA, SECOND_DATA):
+        pool.main_options(data, SimplexPidKernel(), SimplexInterface())
+        total = pool.fetch_interface().run()
+        numpy.testing.assert_approx_equal(total, data["data"].sum())
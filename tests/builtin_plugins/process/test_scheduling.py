@@ -0,0 +1,101 @@
+import numpy
+import pytest
+
+from PyPWA.builtin_plugins.process import _scheduling
+from PyPWA.builtin_plugins.process import _shared_data
+from PyPWA.builtin_plugins.process import foreman
+from PyPWA.libs.interfaces import kernel
+
+TEST_DATA = {
+    "data": numpy.random.rand(1000),
+    "monte_carlo": numpy.random.rand(370)
+}
+EXPECTED = TEST_DATA["data"].sum() + 2 * TEST_DATA["monte_carlo"].sum()
+
+
+class SumKernel(kernel.Kernel):
+
+    def __init__(self):
+        self.data = None  # type: numpy.ndarray
+        self.monte_carlo = None  # type: numpy.ndarray
+
+    def setup(self):
+        pass
+
+    def process(self, data=False):
+        return numpy.sum(self.data) + data * numpy.sum(self.monte_carlo)
+
+
+class SumInterface(kernel.KernelInterface):
+    IS_DUPLEX = True
+
+    def run(self, connections, arguments):
+        for connection in connections:
+            connection.send(arguments[0])
+        return sum(connection.recv() for connection in connections)
+
+
+@pytest.fixture(params=[False, True])
+def dynamic_interface(request):
+    process_builder = foreman.CalculationForeman(
+        3, pool_mode=request.param, scheduling="dynamic", inline="never"
+    )
+    process_builder.main_options(TEST_DATA, SumKernel(), SumInterface())
+    interface = process_builder.fetch_interface()
+    yield interface
+    interface.stop()
+    process_builder.close()
+
+
+def test_dynamic_sum_matches_expected(dynamic_interface):
+    for repeat in range(5):
+        numpy.testing.assert_approx_equal(dynamic_interface.run(2), EXPECTED)
+
+
+@pytest.fixture()
+def queue():
+    store = _shared_data.SharedStore()
+    segment = store.share({"queue": numpy.zeros(4, numpy.int64)})["queue"]
+    the_queue = _scheduling.ChunkQueue(segment)
+    the_queue.open()
+    yield the_queue
+    store.release()
+
+
+def test_queue_hands_out_every_chunk_once(queue):
+    queue.reset(5)
+    chunks = [queue.next_chunk() for index in range(7)]
+    assert chunks == [0, 1, 2, 3, 4, None, None]
+
+
+def test_queue_records_latency(queue):
+    queue.reset(2)
+    assert queue.latency is None
+    queue.record(.5)
+    queue.record(1.5)
+    assert queue.latency == pytest.approx(1.)
+
+
+class MeanKernel(kernel.Kernel):
+
+    def __init__(self):
+        self.data = None  # type: numpy.ndarray
+        self.events = None  # type: int
+
+    def setup(self):
+        self.events = len(self.data)
+
+    def process(self, data=False):
+        return numpy.sum(self.data) / self.events
+
+
+def test_kernel_is_set_up_with_the_data(queue):
+    store = _shared_data.SharedStore()
+    shared = store.share({"data": numpy.arange(10.)})
+    chunked = _scheduling.ChunkedKernel(MeanKernel(), shared, queue)
+    chunked.PROCESS_ID = 0
+    chunked.setup()
+
+    queue.reset(4)
+    assert chunked.process() == pytest.approx(4.5)
+    store.release()
@@ -0,0 +1,129 @@
+import os
+
+import numpy
+import pytest
+
+from PyPWA.builtin_plugins.process import _data_split
+from PyPWA.builtin_plugins.process import _shared_data
+
+STRUCTURED = numpy.zeros(
+    53, dtype=[("x", "f8"), ("y", "f8"), ("flag", "i4")]
+)
+STRUCTURED["x"] = numpy.random.rand(53)
+STRUCTURED["y"] = numpy.random.rand(53)
+FLAT = numpy.random.rand(53)
+
+
+@pytest.fixture()
+def store():
+    the_store = _shared_data.SharedStore()
+    yield the_store
+    the_store.release()
+
+
+@pytest.fixture()
+def shared(store):
+    return store.share({"data": STRUCTURED, "qfactor": FLAT, "list": [1, 2]})
+
+
+def test_arrays_become_descriptors(shared):
+    assert isinstance(shared["data"], _shared_data.SharedArray)
+    assert isinstance(shared["qfactor"], _shared_data.SharedArray)
+    assert shared["list"] == [1, 2]
+
+
+def test_loaded_arrays_match(shared):
+    numpy.testing.assert_array_equal(shared["data"].load(), STRUCTURED)
+    numpy.testing.assert_array_equal(shared["qfactor"].load(), FLAT)
+
+
+@pytest.mark.parametrize("count", [1, 3, 4, 7])
+def test_split_matches_array_split(shared, count):
+    expected = numpy.array_split(FLAT, count)
+    for packet, split in zip(shared["qfactor"].split(count), expected):
+        numpy.testing.assert_array_equal(packet.load(), split)
+
+
+def test_setup_data_splits_descriptors(shared):
+    packets = _data_split.SetupData(4).split({"data": shared["data"]})
+    total = sum(numpy.sum(packet["data"].load()["x"]) for packet in packets)
+    numpy.testing.assert_approx_equal(total, numpy.sum(STRUCTURED["x"]))
+
+
+def test_writes_are_private(shared):
+    view = shared["qfactor"].load()
+    view[:] = 0
+    numpy.testing.assert_array_equal(shared["qfactor"].load(), FLAT)
+
+
+def test_release_removes_segments(store):
+    location = store.share({"data": FLAT})["data"].location
+    assert os.path.exists(location)
+    store.release()
+    assert not os.path.exists(location)
+
+
+def test_shared_arrays_become_views_of_their_segments(store):
+    data = {"data": STRUCTURED.copy(), "list": [1, 2]}
+    shared = store.share(data)
+
+    assert not data["data"].flags.owndata
+    numpy.testing.assert_array_equal(data["data"], STRUCTURED)
+    assert data["list"] == [1, 2]
+
+    # The main process and the processes read the same pages.
+    data["data"]["x"][0] = 5
+    assert shared["data"].load()["x"][0] == 5
+
+
+def test_empty_arrays_are_not_shared(store):
+    empty = numpy.zeros(0)
+    assert store.share({"empty": empty})["empty"] is empty
+
+
+class Kernel(object):
+
+    def __init__(self, data):
+        self.data = data
+        self.other = 1
+
+
+def test_load_kernel_replaces_descriptors(shared):
+    the_kernel = Kernel(shared["qfactor"])
+    _shared_data.load_kernel(the_kernel)
+    numpy.testing.assert_array_equal(the_kernel.data, FLAT)
+    assert the_kernel.other == 1
+
+
+def test_only_small_shares_are_copied_locally(shared, monkeypatch):
+    monkeypatch.setattr(_shared_data, "_LOCAL_COPY_LIMIT", FLAT.nbytes // 2)
+    small = Kernel(shared["qfactor"].slice(0, 10))
+    large = Kernel(shared["qfactor"])
+    _shared_data.load_kernel(small, True)
+    _shared_data.load_kernel(large, True)
+
+    assert small.data.flags.owndata
+    assert not large.data.flags.owndata
+    numpy.testing.assert_array_equal(large.data, FLAT)
+
+
+class Stats(object):
+    f_frsize = 1
+
+    def __init__(self, free):
+        self.f_bavail = free
+
+
+def test_everything_shared_must_fit(store, tmpdir, monkeypatch):
+    # Each array fits into the shared memory on its own, but not both.
+    shared_memory = tmpdir.mkdir("shm")
+    monkeypatch.setattr(
+        _shared_data, "_SHARED_MEMORY_FOLDER", str(shared_memory)
+    )
+    monkeypatch.setattr(
+        _shared_data.os, "statvfs",
+        lambda folder: Stats(STRUCTURED.nbytes + FLAT.nbytes - 1)
+    )
+    shared = store.share({"data": STRUCTURED, "qfactor": FLAT})
+    assert shared_memory.listdir() == []
+    numpy.testing.assert_array_equal(shared["data"].load(), STRUCTURED)
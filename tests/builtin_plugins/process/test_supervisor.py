@@ -0,0 +1,99 @@
+import os
+import time
+
+import numpy
+import pytest
+
+from PyPWA.builtin_plugins.process import foreman
+from PyPWA.libs.interfaces import kernel
+
+TEST_DATA = {"data": numpy.random.rand(100)}
+
+
+class FailingKernel(kernel.Kernel):
+
+    def __init__(self, marker):
+        self.data = None  # type: numpy.ndarray
+        self.marker = marker
+
+    def setup(self):
+        pass
+
+    def process(self, data=False):
+        # Only the first process to get here fails, unless it always fails.
+        if data != "go" and self.PROCESS_ID == 0:
+            if data.startswith("always") or not os.path.exists(self.marker):
+                open(self.marker, "w").close()
+                self.__fail(data)
+        return numpy.sum(self.data)
+
+    @staticmethod
+    def __fail(data):
+        if data in ("crash", "always crash"):
+            os._exit(1)
+        elif data == "hang":
+            time.sleep(60)
+        elif data in ("raise", "always raise"):
+            raise RuntimeError
+
+
+class SumInterface(kernel.KernelInterface):
+    IS_DUPLEX = True
+
+    def run(self, connections, arguments):
+        for connection in connections:
+            connection.send(arguments[0])
+        return [connection.recv() for connection in connections]
+
+
+def make_interface(tmpdir, **options):
+    process_builder = foreman.CalculationForeman(2, inline="never", **options)
+    process_builder.main_options(
+        TEST_DATA, FailingKernel(str(tmpdir.join("failed"))), SumInterface()
+    )
+    return process_builder.fetch_interface()
+
+
+@pytest.mark.parametrize("pool_mode", [False, True])
+def test_crashed_process_is_respawned(tmpdir, pool_mode):
+    interface = make_interface(tmpdir, pool_mode=pool_mode)
+    values = interface.run("crash")
+    numpy.testing.assert_approx_equal(sum(values), TEST_DATA["data"].sum())
+    assert interface.is_alive
+    interface.stop(True)
+
+
+def test_hung_process_is_replaced(tmpdir):
+    interface = make_interface(tmpdir, evaluation_timeout=1.)
+    values = interface.run("hang")
+    numpy.testing.assert_approx_equal(sum(values), TEST_DATA["data"].sum())
+    interface.stop(True)
+
+
+def test_raised_evaluation_is_retried(tmpdir):
+    interface = make_interface(tmpdir)
+    values = interface.run("raise")
+    numpy.testing.assert_approx_equal(sum(values), TEST_DATA["data"].sum())
+    interface.stop(True)
+
+
+@pytest.mark.parametrize("pool_mode", [False, True])
+def test_kernel_that_always_raises_gives_up(tmpdir, pool_mode):
+    interface = make_interface(tmpdir, pool_mode=pool_mode, max_retries=1)
+    with pytest.raises(RuntimeError, match="raised an error"):
+        interface.run("always raise")
+    interface.stop(True)
+
+
+def test_gives_up_after_max_retries(tmpdir):
+    interface = make_interface(tmpdir, max_retries=1)
+    with pytest.raises(RuntimeError):
+        interface.run("always crash")
+    interface.stop(True)
+
+
+def test_dynamic_evaluations_are_not_retried(tmpdir):
+    interface = make_interface(tmpdir, scheduling="dynamic")
+    with pytest.raises(RuntimeError):
+        interface.run("crash")
+    interface.stop(True)
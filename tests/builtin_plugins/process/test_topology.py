@@ -0,0 +1,132 @@
+import os
+
+import numpy
+import pytest
+
+from PyPWA.builtin_plugins.process import _topology
+from PyPWA.builtin_plugins.process import foreman
+from PyPWA.libs.interfaces import kernel
+
+
+def write(location, value):
+    if not os.path.isdir(os.path.dirname(location)):
+        os.makedirs(os.path.dirname(location))
+    with open(location, "w") as stream:
+        stream.write(value)
+
+
+@pytest.fixture()
+def sysfs(tmpdir):
+    # Two nodes, each with two cores of two hyperthreads.
+    cpu_folder = str(tmpdir.join("cpu"))
+    node_folder = str(tmpdir.join("node"))
+    for cpu in range(8):
+        folder = os.path.join(cpu_folder, "cpu%d" % cpu, "topology")
+        write(os.path.join(folder, "physical_package_id"), str(cpu // 4))
+        write(os.path.join(folder, "core_id"), str(cpu % 2))
+    write(os.path.join(node_folder, "node0", "cpulist"), "0-3\n")
+    write(os.path.join(node_folder, "node1", "cpulist"), "4-7\n")
+    return cpu_folder, node_folder
+
+
+def test_parse_cpu_list():
+    assert _topology._parse_cpu_list("0-2,5,8-9\n") == {0, 1, 2, 5, 8, 9}
+
+
+def test_hyperthreads_share_a_core(sysfs):
+    topology = _topology.Topology(*sysfs, cpus=set(range(8)))
+    assert topology.physical_cores == 4
+    assert topology.nodes == 2
+    assert [core.cpus for core in topology.cores] == [
+        [0, 2], [4, 6], [1, 3], [5, 7]
+    ]
+
+
+def test_missing_sysfs_counts_every_cpu(tmpdir):
+    topology = _topology.Topology(
+        str(tmpdir.join("cpu")), str(tmpdir.join("node")), cpus={0, 1, 2}
+    )
+    assert topology.physical_cores == 3
+    assert topology.nodes == 1
+
+
+class FakeProcess(object):
+    placement = None
+
+
+def test_processes_are_pinned_and_local(sysfs):
+    topology = _topology.Topology(*sysfs, cpus=set(range(8)))
+    processes = [FakeProcess() for index in range(2)]
+    _topology.place_processes(processes, topology=topology)
+    assert processes[0].placement.cpus == [0, 2]
+    assert processes[1].placement.node == 1
+    assert all(process.placement.local for process in processes)
+    assert processes[0].placement.blas_threads == 1
+
+
+@pytest.mark.parametrize("blas_threads", [0, 1])
+def test_warns_when_blas_threads_cant_be_limited(
+        sysfs, monkeypatch, caplog, blas_threads
+):
+    monkeypatch.setattr(_topology, "threadpoolctl", None)
+    topology = _topology.Topology(*sysfs, cpus=set(range(8)))
+    _topology.place_processes(
+        [FakeProcess()], blas_threads=blas_threads, topology=topology
+    )
+    warned = any(
+        "threadpoolctl" in record.getMessage() for record in caplog.records
+        if record.levelname == "WARNING"
+    )
+    assert warned == bool(blas_threads)
+
+
+def test_oversubscribed_processes_are_not_pinned(sysfs):
+    topology = _topology.Topology(*sysfs, cpus=set(range(8)))
+    processes = [FakeProcess() for index in range(5)]
+    _topology.place_processes(processes, topology=topology)
+    assert not any(process.placement.cpus for process in processes)
+
+
+class AffinityKernel(kernel.Kernel):
+
+    def __init__(self):
+        self.data = None  # type: numpy.ndarray
+
+    def setup(self):
+        pass
+
+    def process(self, data=False):
+        return (
+            sorted(os.sched_getaffinity(0)),
+            os.environ.get("OPENBLAS_NUM_THREADS")
+        )
+
+
+class AffinityInterface(kernel.KernelInterface):
+    IS_DUPLEX = True
+
+    def run(self, connections, arguments):
+        for connection in connections:
+            connection.send(arguments[0])
+        return [connection.recv() for connection in connections]
+
+
+@pytest.mark.skipif(
+    not hasattr(os, "sched_getaffinity"), reason="Needs cpu affinity"
+)
+def test_processes_run_on_their_core():
+    topology = _topology.Topology()
+    process_builder = foreman.CalculationForeman(
+        topology.physical_cores, blas_threads=2, inline="never"
+    )
+    process_builder.main_options(
+        {"data": numpy.random.rand(100)}, AffinityKernel(),
+        AffinityInterface()
+    )
+    interface = process_builder.fetch_interface()
+    values = interface.run("go")
+    interface.stop()
+    assert [value[0] for value in values] == [
+        core.cpus for core in topology.cores
+    ]
+    assert all(value[1] == "2" for value in values)
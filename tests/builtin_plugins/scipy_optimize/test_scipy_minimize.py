@@ -0,0 +1,151 @@
+import os
+
+import numpy
+import pytest
+
+from PyPWA.builtin_plugins import scipy_optimize
+from PyPWA.builtin_plugins.scipy_optimize import minimization
+from PyPWA.initializers.configurator import option_tools
+from PyPWA.libs import checkpoints
+from PyPWA.libs.interfaces import optimizers
+
+PARAMETERS = ["a", "b", "c"]
+SETTINGS = {"a": 0., "b": 0., "c": 3., "fix_c": True, "limit_b": [-1, .5]}
+
+
+def function(a, b, c):
+    return (a - 1) ** 2 + (b - 2) ** 2 + (c - 1) ** 2
+
+
+def batch_function(points):
+    return numpy.array([function(*point) for point in points])
+
+
+def gradient_function(a, b, c):
+    return function(a, b, c), numpy.array([2 * (a - 1), 2 * (b - 2), 0])
+
+
+@pytest.fixture(params=["L-BFGS-B", "trust-constr"])
+def minimizer(request):
+    template = scipy_optimize.ScipyOptions.default_options
+    options = {
+        "parameters": PARAMETERS,
+        "settings": SETTINGS,
+        "method": request.param
+    }
+    command = option_tools.CommandOptions(template, options)
+    setup = scipy_optimize.ScipyOptions.setup(command)
+    return setup.return_interface()
+
+
+def check_minimum(minimizer):
+    values = minimizer.best_values()
+    assert values["a"] == pytest.approx(1., abs=1e-3)
+    assert values["b"] == pytest.approx(.5, abs=1e-3)
+    assert values["c"] == 3.
+
+
+def test_minimizes_with_batched_gradient(minimizer):
+    batches = []
+
+    def counting_batch(points):
+        batches.append(len(points))
+        return batch_function(points)
+
+    minimizer.main_options(
+        function, optimizers.LikelihoodTypes.LOG_LIKELIHOOD, counting_batch
+    )
+    minimizer.start()
+    check_minimum(minimizer)
+    assert set(batches) == {5}
+
+
+def test_minimizes_with_analytic_gradient(minimizer):
+    minimizer.main_options(
+        function, optimizers.LikelihoodTypes.LOG_LIKELIHOOD, None,
+        gradient_function
+    )
+    minimizer.start()
+    check_minimum(minimizer)
+
+
+def test_minimizes_without_batches(minimizer):
+    minimizer.main_options(function)
+    minimizer.start()
+    check_minimum(minimizer)
+
+
+def test_warm_start_moves_the_start():
+    minimizer = minimization.ScipyMinimize(PARAMETERS, SETTINGS)
+    starts = []
+
+    def recording(a, b, c):
+        starts.append((a, b, c))
+        return function(a, b, c)
+
+    minimizer.main_options(recording)
+    minimizer.warm_start({"a": .75, "b": .25})
+    minimizer.start()
+    assert starts[0] == (.75, .25, 3.)
+
+
+def test_save_extra(tmpdir):
+    minimizer = minimization.ScipyMinimize(PARAMETERS, SETTINGS)
+    minimizer.main_options(
+        function, optimizers.LikelihoodTypes.CHI_SQUARED, batch_function
+    )
+    minimizer.start()
+    save_name = str(tmpdir.join("output"))
+    minimizer.save_extra(save_name)
+
+    saved = numpy.load(save_name + ".npy", allow_pickle=True).item()
+    assert saved["values"]["c"] == 3.
+    assert ("a", "a") in saved["covariance"]
+    assert os.path.exists(save_name + ".txt")
+
+
+def test_parameters_are_required():
+    minimizer = minimization.ScipyMinimize()
+    minimizer.main_options(function)
+    with pytest.raises(ValueError):
+        minimizer.start()
+
+
+def test_some_parameter_must_be_free():
+    settings = {"a": 1., "fix_a": True, "b": 2., "fix_b": True}
+    minimizer = minimization.ScipyMinimize(["a", "b"], settings)
+    minimizer.main_options(lambda a, b: a + b)
+    with pytest.raises(ValueError, match="Every parameter is fixed"):
+        minimizer.start()
+
+
+def test_minimization_resumes_from_the_checkpoint(tmpdir):
+    location = str(tmpdir.join("scipy.checkpoint"))
+    points = []
+
+    def interrupted(a, b, c):
+        points.append((a, b, c))
+        if len(points) > 12:
+            raise KeyboardInterrupt
+        return function(a, b, c)
+
+    minimizer = minimization.ScipyMinimize(PARAMETERS, SETTINGS)
+    minimizer.main_options(interrupted)
+    minimizer.set_checkpoint(checkpoints.Checkpoint(location, calls=1))
+    with pytest.raises(KeyboardInterrupt):
+        minimizer.start()
+    saved = numpy.load(location)["values"]
+
+    starts = []
+
+    def recording(a, b, c):
+        starts.append((a, b, c))
+        return function(a, b, c)
+
+    minimizer = minimization.ScipyMinimize(PARAMETERS, SETTINGS)
+    minimizer.main_options(recording)
+    minimizer.set_checkpoint(checkpoints.Checkpoint(location, calls=1), True)
+    minimizer.start()
+    numpy.testing.assert_array_equal(starts[0], saved)
+    check_minimum(minimizer)
+    assert not os.path.exists(location)
@@ -51,3 +51,8 @@ def test_setup(iterate_over_plugins):
 
 def test_provides(iterate_over_plugins):
     assert iterate_over_plugins.provides in options.Types
+
+
+def test_every_option_has_a_difficulty(iterate_over_plugins):
+    difficulties = iterate_over_plugins.option_difficulties
+    assert set(iterate_over_plugins.default_options) == set(difficulties)
@@ -0,0 +1,112 @@
+import numpy
+import pytest
+
+from PyPWA.builtin_plugins.threads import foreman
+from PyPWA.libs.interfaces import kernel
+
+TEST_DATA = {"data": numpy.random.rand(100)}
+
+
+class DuplexKernel(kernel.Kernel):
+
+    def __init__(self):
+        self.data = None  # type: numpy.ndarray
+
+    def setup(self):
+        pass
+
+    def process(self, data=False):
+        if data == "shared":
+            return numpy.shares_memory(self.data, TEST_DATA["data"])
+        return numpy.sum(self.data)
+
+
+class DuplexInterface(kernel.KernelInterface):
+    IS_DUPLEX = True
+
+    def run(self, connections, arguments):
+        for connection in connections:
+            connection.send(arguments[0])
+        return [connection.recv() for connection in connections]
+
+
+@pytest.fixture(params=[True, False])
+def duplex_interface(request):
+    thread_builder = foreman.ThreadForeman(3)
+    thread_builder.main_options(TEST_DATA, DuplexKernel(), DuplexInterface())
+    interface = thread_builder.fetch_interface()
+    yield interface
+    interface.stop(request.param)
+
+
+def test_duplex_calculated_matches_expected(duplex_interface):
+    for repeat in range(3):
+        numpy.testing.assert_approx_equal(
+            sum(duplex_interface.run("go")), numpy.sum(TEST_DATA["data"])
+        )
+
+
+def test_duplex_kernels_use_views(duplex_interface):
+    assert all(duplex_interface.run("shared"))
+
+
+def test_duplex_reports_is_alive(duplex_interface):
+    assert duplex_interface.is_alive
+
+
+class SimplexKernel(DuplexKernel):
+
+    def process(self, data=False):
+        return self.PROCESS_ID, numpy.sum(self.data)
+
+
+class SimplexInterface(kernel.KernelInterface):
+    IS_DUPLEX = False
+
+    def run(self, connections, args):
+        return [connection.recv() for connection in connections]
+
+
+def test_simplex_sum_matches_expected():
+    thread_builder = foreman.ThreadForeman(3)
+    thread_builder.main_options(TEST_DATA, SimplexKernel(), SimplexInterface())
+    values = thread_builder.fetch_interface().run()
+    assert sorted(value[0] for value in values) == [0, 1, 2]
+    numpy.testing.assert_approx_equal(
+        sum(value[1] for value in values), numpy.sum(TEST_DATA["data"])
+    )
+
+
+class KernelError(DuplexKernel):
+
+    def process(self, data=False):
+        raise RuntimeError
+
+
+@pytest.mark.parametrize("duplex", [False, True])
+def test_error_was_handled(duplex):
+    interface = DuplexInterface() if duplex else SimplexInterface()
+    thread_builder = foreman.ThreadForeman(3)
+    thread_builder.main_options(TEST_DATA, KernelError(), interface)
+    values = thread_builder.fetch_interface().run("go")
+    assert kernel.ProcessCodes.ERROR in values
+
+
+class BatchInterface(DuplexInterface):
+
+    def run_batch(self, connections, points):
+        for connection in connections:
+            connection.send((kernel.ProcessCodes.BATCH, points))
+        return [connection.recv() for connection in connections]
+
+
+def test_batches_are_processed_by_each_thread():
+    thread_builder = foreman.ThreadForeman(3)
+    thread_builder.main_options(TEST_DATA, DuplexKernel(), BatchInterface())
+    interface = thread_builder.fetch_interface()
+    values = interface.run_batch(["go", "shared"])
+    interface.stop()
+    assert sum(value[0] for value in values) == pytest.approx(
+        numpy.sum(TEST_DATA["data"])
+    )
+    assert all(value[1] for value in values)
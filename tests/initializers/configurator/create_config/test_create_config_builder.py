@@ -16,7 +16,13 @@ PYSIM_CONFIG = {
 
 
 @pytest.fixture()
-def plugin_list():
+def plugin_list(monkeypatch):
+    monkeypatch.setattr(
+        _questions.GetSpecificPlugin, "_question_loop", lambda self: None
+    )
+    monkeypatch.setattr(
+        _questions.GetSpecificPlugin, "_answer", "Builtin Multiprocessing"
+    )
     plugins = _metadata.GetPluginList()
     plugins.parse_plugins(simulate.ShellSimulation)
     return plugins
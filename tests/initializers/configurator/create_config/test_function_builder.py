@@ -4,6 +4,7 @@ import pytest
 
 from PyPWA.initializers.configurator.create_config import _function_builder
 from PyPWA.initializers.configurator.create_config import _metadata
+from PyPWA.initializers.configurator.create_config import _questions
 from PyPWA.progs.shell import simulate
 
 
@@ -13,7 +14,13 @@ def function_handler():
 
 
 @pytest.fixture()
-def plugin_list():
+def plugin_list(monkeypatch):
+    monkeypatch.setattr(
+        _questions.GetSpecificPlugin, "_question_loop", lambda self: None
+    )
+    monkeypatch.setattr(
+        _questions.GetSpecificPlugin, "_answer", "Builtin Multiprocessing"
+    )
     plugins = _metadata.GetPluginList()
     plugins.parse_plugins(simulate.ShellSimulation)
     return plugins
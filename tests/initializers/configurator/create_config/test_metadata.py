@@ -18,12 +18,20 @@ def plugin_list():
     return _metadata.GetPluginList()
 
 
+def answer_plugin_question(question):
+    if "Nestle" in question:
+        return "Nestle"
+    return "Builtin Multiprocessing"
+
+
 @pytest.fixture()
 def mock_input_for_nestle(monkeypatch):
     if sys.version_info.major == 2:
-        monkeypatch.setitem(__builtins__, "raw_input", lambda x: "Nestle")
+        monkeypatch.setitem(
+            __builtins__, "raw_input", answer_plugin_question
+        )
     else:
-        monkeypatch.setitem(__builtins__, "input", lambda x: "Nestle")
+        monkeypatch.setitem(__builtins__, "input", answer_plugin_question)
 
 
 def test_metadata_storage_finds_builtin_parser(metadata_storage):
@@ -37,7 +45,7 @@ def test_metadata_storage_finds_optimizers(metadata_storage):
     object = metadata_storage.request_plugins_by_type(
         options.Types.OPTIMIZER
     )
-    assert len(object) == 2
+    assert len(object) == 4
 
 
 def check_plugin_in_list(template, plugin_list):
@@ -49,7 +57,9 @@ def check_plugin_in_list(template, plugin_list):
     assert found
 
 
-def test_plugin_list_finds_pysimulate_plugins(plugin_list):
+def test_plugin_list_finds_pysimulate_plugins(
+        plugin_list, mock_input_for_nestle
+):
     plugin_list.parse_plugins(simulate.ShellSimulation)
     assert plugin_list.program == simulate.ShellSimulation
     check_plugin_in_list(process.Processing, plugin_list.plugins)
@@ -0,0 +1,29 @@
+import sys
+
+import pytest
+
+from PyPWA.initializers.configurator import start
+
+
+@pytest.fixture()
+def resume_arguments(monkeypatch):
+    monkeypatch.setattr(sys, "argv", ["pyfit", "fit.yml", "--resume"])
+
+
+def test_resume_is_parsed_when_resumable(resume_arguments):
+    arguments = start._Arguments()
+    arguments.parse_arguments("Fitting", True)
+    assert arguments.resume
+    assert arguments.configuration_location == "fit.yml"
+
+
+def test_resume_is_rejected_when_not_resumable(resume_arguments):
+    with pytest.raises(SystemExit):
+        start._Arguments().parse_arguments("Simulation")
+
+
+def test_resume_defaults_to_false(monkeypatch):
+    monkeypatch.setattr(sys, "argv", ["pyfit", "fit.yml"])
+    arguments = start._Arguments()
+    arguments.parse_arguments("Fitting", True)
+    assert not arguments.resume
@@ -0,0 +1,58 @@
+import os
+
+import numpy
+import pytest
+
+from PyPWA.libs import checkpoints
+
+
+@pytest.fixture()
+def location(tmpdir):
+    return str(tmpdir.join("fit.checkpoint"))
+
+
+def test_checkpoint_is_due_after_enough_calls(location):
+    checkpoint = checkpoints.Checkpoint(location, calls=10)
+    assert not checkpoint.due(9)
+    assert checkpoint.due(10)
+    checkpoint.save(10, values=numpy.zeros(2))
+    assert not checkpoint.due(15)
+    assert checkpoint.due(20)
+
+
+def test_checkpoint_is_due_after_enough_seconds(location):
+    assert checkpoints.Checkpoint(location, seconds=1e-9).due(0)
+    assert not checkpoints.Checkpoint(location).due(10 ** 9)
+
+
+def test_saved_state_is_loaded(location):
+    values = numpy.random.rand(5, 3)
+    checkpoint = checkpoints.Checkpoint(location, calls=1)
+    checkpoint.save(42, values=values, fval=1.5)
+
+    state = checkpoints.Checkpoint(location, calls=1).load()
+    numpy.testing.assert_array_equal(state["values"], values)
+    assert state["fval"] == 1.5
+    assert state["calls"] == 42
+    assert not os.path.exists(location + ".tmp")
+
+
+def test_missing_checkpoint_loads_nothing(location):
+    assert checkpoints.Checkpoint(location).load() is None
+
+
+def test_remove_deletes_the_file(location):
+    checkpoint = checkpoints.Checkpoint(location)
+    checkpoint.save(1, values=numpy.zeros(1))
+    checkpoint.remove()
+    assert not os.path.exists(location)
+    checkpoint.remove()
+
+
+def test_random_state_is_restored():
+    numpy.random.seed(4)
+    numpy.random.standard_normal()
+    state = checkpoints.get_random_state()
+    expected = numpy.random.standard_normal(3)
+    checkpoints.set_random_state(state)
+    numpy.testing.assert_array_equal(numpy.random.standard_normal(3), expected)
@@ -0,0 +1,183 @@
+import numpy
+import pytest
+
+from PyPWA.builtin_plugins.process import foreman
+from PyPWA.libs.interfaces import kernel
+from PyPWA.libs.interfaces import optimizers
+from PyPWA.progs.shell import loaders
+from PyPWA.progs.shell.fit.likelihoods import amplitude
+
+DATA = numpy.random.rand(3000) + .1
+MONTE_CARLO = numpy.random.rand(5000) + .1
+QFACTOR = numpy.random.rand(3000)
+GENERATED = 20000
+PARAMETERS = {"re1": 1., "im1": .5, "re2": -.3, "im2": .2, "re3": 2., "im3": 0}
+
+CALLS = []
+
+
+def amplitudes(events, parameters):
+    CALLS.append(len(events))
+    assert parameters is None
+    return numpy.column_stack(
+        [numpy.cos(events), numpy.sin(events) * (1 + 1j), events]
+    )
+
+
+def expected_value(parameters):
+    values = list(parameters.values())
+    production = numpy.array(values[0::2]) + 1j * numpy.array(values[1::2])
+    data = numpy.abs(amplitudes(DATA, None).dot(production))**2
+    monte_carlo = numpy.abs(amplitudes(MONTE_CARLO, None).dot(production))**2
+    return -(
+        numpy.sum(QFACTOR * numpy.log(data)) -
+        numpy.sum(monte_carlo) / GENERATED
+    )
+
+
+class Functions(loaders.FunctionLoader):
+
+    gradient = None
+
+    def __init__(self):
+        pass
+
+    def setup(self):
+        pass
+
+    @property
+    def process(self):
+        return amplitudes
+
+
+class Data(loaders.DataLoading):
+
+    def __init__(self, monte_carlo=MONTE_CARLO):
+        self.__monte_carlo = monte_carlo
+
+    @property
+    def data(self):
+        return DATA
+
+    @property
+    def qfactor(self):
+        return QFACTOR
+
+    @property
+    def monte_carlo(self):
+        return self.__monte_carlo
+
+
+def make_likelihood(cache=None):
+    setup = amplitude.AmplitudeLogLikelihood()
+    setup.setup_likelihood(
+        Data(), Functions(), optimizers.OptimizerTypes.MINIMIZER,
+        {"generated length": GENERATED, "amplitude cache": cache}
+    )
+    return setup
+
+
+def load(setup):
+    likelihood = setup.get_likelihood()
+    for name, value in setup.get_data().items():
+        setattr(likelihood, name, value)
+    return likelihood
+
+
+def test_value_matches_expected():
+    likelihood = load(make_likelihood())
+    for repeat in range(2):
+        numpy.testing.assert_allclose(
+            likelihood.process(PARAMETERS), expected_value(PARAMETERS)
+        )
+
+
+def test_amplitudes_are_calculated_once():
+    likelihood = load(make_likelihood())
+    del CALLS[:]
+    for repeat in range(3):
+        likelihood.process(PARAMETERS)
+    assert sorted(CALLS) == [len(DATA), len(MONTE_CARLO)]
+
+
+def test_amplitudes_are_cached_to_disk(tmpdir):
+    folder = str(tmpdir.join("cache"))
+    first = load(make_likelihood(folder)).process(PARAMETERS)
+    del CALLS[:]
+    second = load(make_likelihood(folder)).process(PARAMETERS)
+    assert CALLS == []
+    assert first == second
+    assert len(tmpdir.join("cache").listdir()) == 2
+
+
+def test_requires_monte_carlo():
+    with pytest.raises(ValueError):
+        amplitude.AmplitudeLogLikelihood().setup_likelihood(
+            Data(None), Functions(), optimizers.OptimizerTypes.MINIMIZER,
+            {"generated length": GENERATED}
+        )
+
+
+def test_wrong_parameter_count_is_an_error():
+    with pytest.raises(ValueError):
+        load(make_likelihood()).process({"re1": 1., "im1": 1.})
+
+
+class SumInterface(kernel.KernelInterface):
+    IS_DUPLEX = True
+
+    def run(self, connections, arguments):
+        for connection in connections:
+            connection.send(arguments[0])
+        return sum(connection.recv() for connection in connections)
+
+
+@pytest.mark.parametrize("scheduling", ["static", "dynamic"])
+def test_processes_sum_to_expected(scheduling):
+    setup = make_likelihood()
+    process_builder = foreman.CalculationForeman(
+        2, scheduling=scheduling, inline="never"
+    )
+    process_builder.main_options(
+        setup.get_data(), setup.get_likelihood(), SumInterface()
+    )
+    interface = process_builder.fetch_interface()
+    try:
+        for repeat in range(2):
+            numpy.testing.assert_allclose(
+                interface.run(PARAMETERS), expected_value(PARAMETERS)
+            )
+    finally:
+        interface.stop()
+        process_builder.close()
+
+
+def numerical_gradient(parameters, step=1e-6):
+    gradient = []
+    for name in parameters:
+        upper, lower = dict(parameters), dict(parameters)
+        upper[name] += step
+        lower[name] -= step
+        gradient.append(
+            (expected_value(upper) - expected_value(lower)) / (2 * step)
+        )
+    return numpy.array(gradient)
+
+
+def test_gradient_matches_numerical_gradient():
+    likelihood = load(make_likelihood())
+    result = likelihood.process_gradient(PARAMETERS, list(PARAMETERS))
+    numpy.testing.assert_allclose(result[0], expected_value(PARAMETERS))
+    numpy.testing.assert_allclose(
+        result[1:], numerical_gradient(PARAMETERS), rtol=1e-5, atol=1e-3
+    )
+
+
+def test_gradient_of_real_production_amplitudes():
+    parameters = {"re1": 1., "re2": -.3, "re3": 2.}
+    full = {"re1": 1., "im1": 0., "re2": -.3, "im2": 0., "re3": 2., "im3": 0.}
+    likelihood = load(make_likelihood())
+    result = likelihood.process_gradient(parameters, list(parameters))
+    numpy.testing.assert_allclose(
+        result[1:], numerical_gradient(full)[0::2], rtol=1e-5, atol=1e-3
+    )
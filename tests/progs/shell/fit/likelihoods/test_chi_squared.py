@@ -7,6 +7,8 @@ from PyPWA.libs.interfaces import optimizers
 
 class Functions(loaders.FunctionLoader):
 
+    gradient = None
+
     def __init__(self):
         pass
 
@@ -169,3 +171,88 @@ def test_no_binned_or_errors():
         likelihood_loader.setup_likelihood(
             BaseData(), Functions(), optimizers.OptimizerTypes.MAXIMIZER
         )
+
+
+"""
+Test Gradients
+"""
+
+class GradientFunctions(Functions):
+
+    def process(self, data, parameters):
+        return parameters["A"] * data + parameters["B"]
+
+    @property
+    def gradient(self):
+        return self.derivatives
+
+    @staticmethod
+    def derivatives(data, parameters):
+        return {"A": data, "B": numpy.ones(len(data))}
+
+
+@pytest.mark.parametrize("data_package", [BinnedData(), UnBinnedData()])
+def test_gradient_matches_numerical(data_package, data):
+    likelihood_loader = chi_squared.ChiLikelihood()
+    likelihood_loader.setup_likelihood(
+        data_package, GradientFunctions(), optimizers.OptimizerTypes.MINIMIZER
+    )
+    likelihood = likelihood_loader.get_likelihood()
+    likelihood.data = data
+    likelihood.binned = data_package.binned
+    likelihood.expected = data_package.expected_values
+    likelihood.error = data_package.event_errors
+
+    parameters = {"A": 2., "B": .5}
+    result = likelihood.process_gradient(parameters, ["A", "B"])
+    numpy.testing.assert_allclose(result[0], likelihood.process(parameters))
+    for index, name in enumerate(["A", "B"]):
+        up, down = dict(parameters), dict(parameters)
+        up[name] += 1e-6
+        down[name] -= 1e-6
+        numerical = (likelihood.process(up) - likelihood.process(down)) / 2e-6
+        numpy.testing.assert_allclose(result[index + 1], numerical, rtol=1e-5)
+
+
+class PartialGradientFunctions(GradientFunctions):
+
+    @staticmethod
+    def derivatives(data, parameters):
+        return {"A": data}
+
+
+def test_missing_derivative_is_an_error(data):
+    likelihood_loader = chi_squared.ChiLikelihood()
+    likelihood_loader.setup_likelihood(
+        UnBinnedData(), PartialGradientFunctions(),
+        optimizers.OptimizerTypes.MINIMIZER
+    )
+    likelihood = likelihood_loader.get_likelihood()
+    likelihood.data = data
+    likelihood.expected = UnBinnedData().expected_values
+    likelihood.error = UnBinnedData().event_errors
+
+    with pytest.raises(ValueError, match="no derivative for B"):
+        likelihood.process_gradient({"A": 2., "B": .5}, ["A", "B"])
+
+
+"""
+Test Block Evaluation
+"""
+
+@pytest.mark.parametrize("data_package", [BinnedData(), UnBinnedData()])
+def test_blocks_match_whole(data_package, data):
+    values = []
+    for block_evaluation in (False, True):
+        likelihood_loader = chi_squared.ChiLikelihood()
+        likelihood_loader.setup_likelihood(
+            data_package, Functions(), optimizers.OptimizerTypes.MINIMIZER,
+            {"block evaluation": block_evaluation}
+        )
+        likelihood = likelihood_loader.get_likelihood()
+        likelihood.data = data
+        likelihood.binned = data_package.binned
+        likelihood.expected = data_package.expected_values
+        likelihood.error = data_package.event_errors
+        values.append(likelihood.process(1))
+    numpy.testing.assert_allclose(values[1], values[0], rtol=1e-12)
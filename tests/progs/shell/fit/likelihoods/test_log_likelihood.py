@@ -8,6 +8,8 @@ from PyPWA.libs.interfaces import optimizers
 
 class Functions(loaders.FunctionLoader):
 
+    gradient = None
+
     def __init__(self):
         pass
 
@@ -158,3 +160,83 @@ def test_extended_matches_expected(
     mc = 1/1000000. * numpy.sum(monte_carlo + 1)
     expected = data + mc
     assert expected == extended_value.sum()
+
+
+"""
+Test Gradients
+"""
+
+
+class GradientFunctions(Functions):
+
+    def process(self, data, parameters):
+        return parameters["A"] * data + parameters["B"]
+
+    @property
+    def gradient(self):
+        return self.derivatives
+
+    @staticmethod
+    def derivatives(data, parameters):
+        return {"A": data, "B": numpy.ones(len(data))}
+
+
+def numerical_gradient(likelihood, parameters, names):
+    gradient = []
+    for name in names:
+        up, down = dict(parameters), dict(parameters)
+        up[name] += 1e-6
+        down[name] -= 1e-6
+        gradient.append(
+            (likelihood.process(up) - likelihood.process(down)) / 2e-6
+        )
+    return numpy.array(gradient)
+
+
+@pytest.mark.parametrize("data_package", [BaseData(), ExtendedData()])
+def test_gradient_matches_numerical(data_package, data, qfactor, binned):
+    likelihood_loader = log_likelihood.LogLikelihood()
+    likelihood_loader.setup_likelihood(
+        data_package, GradientFunctions(),
+        optimizers.OptimizerTypes.MINIMIZER, {"generated length": 1000}
+    )
+    likelihood = likelihood_loader.get_likelihood()
+    likelihood.data = data
+    likelihood.qfactor = qfactor
+    likelihood.binned = binned
+    likelihood.monte_carlo = data_package.monte_carlo
+
+    parameters = {"A": 2., "B": .5}
+    result = likelihood.process_gradient(parameters, ["B", "A"])
+    numpy.testing.assert_allclose(result[0], likelihood.process(parameters))
+    numpy.testing.assert_allclose(
+        result[1:], numerical_gradient(likelihood, parameters, ["B", "A"]),
+        rtol=1e-5
+    )
+
+    # C has no derivative, it must not silently become 0.
+    with pytest.raises(ValueError, match="no derivative for C"):
+        likelihood.process_gradient(parameters, ["B", "A", "C"])
+
+
+"""
+Test Block Evaluation
+"""
+
+
+@pytest.mark.parametrize("data_package", [BaseData(), ExtendedData()])
+def test_blocks_match_whole(data_package, data, qfactor, binned):
+    values = []
+    for block_evaluation in (False, True, True):
+        likelihood_loader = log_likelihood.LogLikelihood()
+        likelihood_loader.setup_likelihood(
+            data_package, Functions(), optimizers.OptimizerTypes.MINIMIZER,
+            {"generated length": 1000, "block evaluation": block_evaluation}
+        )
+        likelihood = likelihood_loader.get_likelihood()
+        likelihood.data = data
+        likelihood.qfactor = qfactor
+        likelihood.binned = binned
+        likelihood.monte_carlo = data_package.monte_carlo
+        values.append(likelihood.process(1))
+    numpy.testing.assert_allclose(values[1:], [values[0]] * 2, rtol=1e-12)
@@ -0,0 +1,102 @@
+import pickle
+
+import numpy
+import pytest
+
+from PyPWA.progs.shell.fit import _fused
+
+LENGTH = 3 * _fused.BLOCK_SIZE + 17
+VALUES = numpy.random.rand(LENGTH) + .1
+WEIGHTS = numpy.random.rand(LENGTH)
+REFERENCE = numpy.random.rand(LENGTH)
+
+
+@pytest.fixture()
+def scratch():
+    return _fused.Scratch()
+
+
+@pytest.mark.parametrize("weights", [WEIGHTS, 1])
+def test_weighted_log_sum(scratch, weights):
+    expected = numpy.sum(weights * numpy.log(VALUES))
+    numpy.testing.assert_allclose(
+        scratch.weighted_log_sum(VALUES, weights), expected
+    )
+
+
+def test_chi_sum(scratch):
+    expected = numpy.sum((VALUES - REFERENCE)**2 / WEIGHTS)
+    numpy.testing.assert_allclose(
+        scratch.chi_sum(VALUES, REFERENCE, WEIGHTS), expected
+    )
+
+
+def test_small_sums_are_unchanged(scratch):
+    values = VALUES[:100]
+    expected = numpy.sum(WEIGHTS[:100] * numpy.log(values))
+    assert scratch.weighted_log_sum(values, WEIGHTS[:100]) == expected
+
+
+def test_buffer_is_not_pickled(scratch):
+    scratch.weighted_log_sum(VALUES, 1)
+    assert len(pickle.dumps(scratch)) < 1000
+
+
+def test_products_are_calculated_once():
+    calls = []
+
+    def product(first, second):
+        calls.append(1)
+        return first * second
+
+    products = _fused.ConstantProducts()
+    for repeat in range(3):
+        result = products.get(product, WEIGHTS, REFERENCE)
+    numpy.testing.assert_array_equal(result, WEIGHTS * REFERENCE)
+    assert len(calls) == 1
+
+    products.get(product, WEIGHTS[:10], REFERENCE[:10])
+    assert len(calls) == 2
+
+
+def test_blocks_cover_every_event():
+    blocks = _fused.BlockedEvaluation()
+    seen = []
+
+    def evaluate(block):
+        seen.append(block)
+        return numpy.sum(VALUES[block])
+
+    for repeat in range(4):
+        numpy.testing.assert_allclose(
+            blocks.sum(LENGTH, evaluate), numpy.sum(VALUES)
+        )
+    assert blocks.block_size in _fused.BlockedEvaluation.CANDIDATES
+    indices = numpy.arange(LENGTH)
+    covered = numpy.concatenate([indices[block] for block in seen])
+    numpy.testing.assert_array_equal(
+        covered, numpy.tile(numpy.arange(LENGTH), 4)
+    )
+
+
+def test_block_size_waits_for_several_samples():
+    blocks = _fused.BlockedEvaluation()
+    for repeat in range(2):
+        blocks.sum(LENGTH, lambda block: 0.)
+        assert blocks.block_size is None
+    blocks.sum(LENGTH, lambda block: 0.)
+    assert blocks.block_size in (4096, 16384)
+
+
+def test_few_events_are_not_calibrated():
+    blocks = _fused.BlockedEvaluation()
+    assert blocks.sum(100, lambda block: block.stop - block.start) == 100
+    assert blocks.block_size is None
+
+
+def test_a_single_candidate_is_not_picked():
+    blocks = _fused.BlockedEvaluation()
+    for repeat in range(5):
+        total = blocks.sum(5000, lambda block: block.stop - block.start)
+        assert total == 5000
+    assert blocks.block_size is None
@@ -0,0 +1,98 @@
+import numpy
+import pytest
+
+from PyPWA.builtin_plugins.scipy_optimize import minimization
+from PyPWA.libs.interfaces import kernel
+from PyPWA.libs.interfaces import optimizers
+from PyPWA.progs.shell.fit import _multi_start
+
+
+def double_well(a, b):
+    # Two minima, the one near a = -1 is lower.
+    return (a ** 2 - 1) ** 2 + .3 * a + b ** 2
+
+
+class Interface(object):
+
+    def __init__(self):
+        self.batches = []
+        self.gradient_batches = []
+
+    def run(self, *args):
+        if args[0] is kernel.ProcessCodes.GRADIENT_BATCH:
+            self.gradient_batches.append(len(args[1]))
+            return numpy.array([
+                [double_well(a, b), 4 * a ** 3 - 4 * a + .3, 2 * b]
+                for a, b in args[1]
+            ])
+        return double_well(*args)
+
+    def run_batch(self, points):
+        self.batches.append(len(points))
+        return numpy.array([double_well(*point) for point in points])
+
+
+RANGES = {"a": [-2, 2], "b": [5, 6]}
+
+
+def test_starts_are_inside_the_ranges():
+    starts = _multi_start.get_starts(20, RANGES, 1)
+    assert len(starts) == 20
+    assert all(-2 <= start["a"] <= 2 for start in starts)
+    assert all(5 <= start["b"] <= 6 for start in starts)
+    assert starts == _multi_start.get_starts(20, RANGES, 1)
+
+
+@pytest.fixture(params=[False, True])
+def multi_start(request):
+    interface = Interface()
+    optimizer = minimization.ScipyMinimize(["a", "b"], {"a": 0, "b": 1})
+    starts = _multi_start.get_starts(8, {"a": [-2, 2]}, 4)
+    fitter = _multi_start.MultiStart(
+        optimizer, interface, optimizers.LikelihoodTypes.CHI_SQUARED,
+        starts, request.param
+    )
+    fitter.run()
+    return fitter, interface
+
+
+def test_best_start_finds_the_lower_minimum(multi_start):
+    fitter, interface = multi_start
+    values = fitter.best_optimizer().best_values()
+    assert values["a"] == pytest.approx(-1.04, abs=.01)
+    assert values["b"] == pytest.approx(0, abs=1e-3)
+
+
+def test_points_of_the_fits_share_round_trips(multi_start):
+    fitter, interface = multi_start
+    if interface.batches:
+        # Each fit sends the center and two points for each parameter.
+        assert max(interface.batches) == 8 * 5
+    else:
+        # Every fit's gradient is sent in the same message.
+        assert max(interface.gradient_batches) == 8
+
+
+def test_ranked_table_is_saved(multi_start, tmpdir):
+    fitter, interface = multi_start
+    save_name = str(tmpdir.join("output"))
+    fitter.save_table(save_name)
+    with open(save_name + "_starts.txt") as stream:
+        table = stream.read()
+    assert "Rank" in table
+    assert table.count("\n") > 8
+
+
+class Failing(minimization.ScipyMinimize):
+
+    def start(self):
+        raise RuntimeError("Failed on purpose")
+
+
+def test_failed_fits_are_ranked_last():
+    fitter = _multi_start.MultiStart(
+        Failing(["a", "b"], {}), Interface(),
+        optimizers.LikelihoodTypes.CHI_SQUARED, [{"a": 1.}, {"a": 2.}]
+    )
+    fitter.run()
+    assert fitter.rank() == [0, 1]
@@ -19,3 +19,13 @@ def test_finder_finds_chi_squared(likelihood_finder):
 def test_finder_finds_chi_squared(likelihood_finder):
     assert "empty" in likelihood_finder.get_likelihood_name_list()
 
+
+
+def test_empty_likelihood_has_no_gradient(likelihood_finder):
+    assert not likelihood_finder.get_likelihood("empty").GRADIENT
+
+
+def test_amplitude_gradient_needs_no_function(likelihood_finder):
+    setup = likelihood_finder.get_likelihood("amplitude log-likelihood")
+    assert setup.GRADIENT
+    assert not setup.NEEDS_GRADIENT_FUNCTION
@@ -1,8 +1,13 @@
+import json
 import logging
 import time
 
+import numpy
 import pytest
 
+from PyPWA.builtin_plugins.process import foreman
+from PyPWA.libs.interfaces import kernel
+from PyPWA.libs.interfaces import optimizers
 from PyPWA.progs.shell.fit import _process_interface
 
 
@@ -15,17 +20,251 @@ def override_logging_effective_level(monkeypatch):
 
 
 @pytest.fixture()
-def output_thread(override_logging_effective_level):
-    return _process_interface._ThreadInterface()
+def telemetry():
+    return _process_interface._Telemetry()
 
 
-def test_small_output(output_thread):
-    output_thread.start(None)
-    time.sleep(2)
-    output_thread.stop()
+def run_reporter(telemetry, **options):
+    reporter = _process_interface._ProgressReporter(
+        telemetry, refresh_rate=20., **options
+    )
+    reporter.start()
+    for value in (1.2233, 1.1):
+        telemetry.begin()
+        time.sleep(.05)
+        telemetry.sent()
+        time.sleep(.05)
+        telemetry.end(value)
+    reporter.stop()
+
+
+def test_small_output(override_logging_effective_level, telemetry):
+    reporter = _process_interface._ProgressReporter(telemetry, 20.)
+    reporter.start()
+    telemetry.begin()
+    time.sleep(.2)
+    reporter.stop()
+
+
+def test_full_output(override_logging_effective_level, telemetry):
+    run_reporter(telemetry)
+    assert telemetry.calls == 2
+    assert telemetry.last_value == 1.1
+
+
+def test_telemetry_splits_send_and_wait(telemetry):
+    run_reporter(telemetry)
+    assert telemetry.send_time == pytest.approx(.1, abs=.05)
+    assert telemetry.wait_time == pytest.approx(.1, abs=.05)
+    assert telemetry.average_time == pytest.approx(.1, abs=.05)
+    assert 0 < telemetry.calls_per_second <= 20
+
+
+def test_telemetry_file_has_json_lines(telemetry, tmpdir):
+    location = str(tmpdir.join("telemetry.jsonl"))
+    run_reporter(telemetry, telemetry_file=location)
+    with open(location) as stream:
+        lines = [json.loads(line) for line in stream]
+    assert lines[-1]["calls"] == 2
+    assert lines[-1]["last value"] == 1.1
+    assert len(lines) == len(set(line["calls"] for line in lines))
+
+
+def test_reporter_sleeps_between_refreshes(
+        override_logging_effective_level, telemetry):
+    reporter = _process_interface._ProgressReporter(telemetry, 1.)
+    reporter.start()
+    start = time.process_time()
+    time.sleep(.5)
+    used = time.process_time() - start
+    reporter.stop()
+    assert used < .1
+
+
+"""
+Test Batches
+"""
+
+DATA = {"data": numpy.random.rand(200)}
+
+
+class Parser(optimizers.OptimizerOptionParser):
+
+    def convert(self, *args):
+        return dict(zip(["a", "b"], args[0][0]))
+
+
+class Kernel(kernel.Kernel):
+
+    def __init__(self):
+        self.data = None  # type: numpy.ndarray
+
+    def setup(self):
+        pass
+
+    def process(self, data=False):
+        return numpy.sum(self.data * data["a"] + data["b"])
+
+    def process_gradient(self, data, names):
+        derivatives = {"a": numpy.sum(self.data), "b": len(self.data)}
+        gradient = [derivatives[name] for name in names]
+        return numpy.array([self.process(data)] + gradient)
+
+
+@pytest.fixture(
+    params=[("static", False), ("dynamic", False), ("static", True)]
+)
+def fitting_interface(request):
+    process_builder = foreman.CalculationForeman(
+        3, scheduling=request.param[0], pool_mode=request.param[1],
+        inline="never"
+    )
+    process_builder.main_options(
+        DATA, Kernel(), _process_interface.FittingInterface(Parser())
+    )
+    interface = process_builder.fetch_interface()
+    yield interface
+    interface.stop()
+    process_builder.close()
+
+
+def test_batch_matches_single_calls(fitting_interface):
+    points = numpy.array([[1., 0.], [2., 1.], [-1., .5]])
+    batch = fitting_interface.run_batch(points)
+    singles = [fitting_interface.run(*point) for point in points]
+    numpy.testing.assert_allclose(batch, singles)
+
+
+def test_gradient_is_summed_over_processes(fitting_interface):
+    gradient_function = _process_interface.GradientFunction(
+        fitting_interface
+    )
+    value, gradient = gradient_function(2., 1.)
+    numpy.testing.assert_allclose(value, fitting_interface.run(2., 1.))
+    numpy.testing.assert_allclose(
+        gradient, [DATA["data"].sum(), len(DATA["data"])]
+    )
+
+
+
+def test_gradient_batch_matches_single_gradients(fitting_interface):
+    points = [(2., 1.), (-1., .5)]
+    totals = fitting_interface.run(kernel.ProcessCodes.GRADIENT_BATCH, points)
+    gradient_function = _process_interface.GradientFunction(
+        fitting_interface
+    )
+    for point, total in zip(points, totals):
+        value, gradient = gradient_function(*point)
+        numpy.testing.assert_allclose(total, [value] + list(gradient))
+
+"""
+Test Evaluation Cache
+"""
+
+
+class CountingPipe(object):
+
+    def __init__(self):
+        self.sent = []
+
+    def send(self, value):
+        self.sent.append(value)
+
+    def recv(self):
+        value = self.sent[-1]
+        if kernel.is_batch(value):
+            return [point["a"] + point["b"] for point in value[1]]
+        return value["a"] + value["b"]
+
+
+def test_repeated_points_skip_the_kernels():
+    pipe = CountingPipe()
+    interface = _process_interface.FittingInterface(Parser(), 0)
+    assert interface.run([pipe], (1., 2.)) == 3.
+    assert interface.run([pipe], (1., 2.)) == 3.
+    assert interface.run([pipe], (1., 3.)) == 4.
+    assert len(pipe.sent) == 2
+
+
+def test_batches_only_send_new_points():
+    pipe = CountingPipe()
+    interface = _process_interface.FittingInterface(Parser(), 0)
+    interface.run([pipe], (1., 2.))
+    values = interface.run_batch([pipe], numpy.array([[1., 2.], [2., 2.]]))
+    numpy.testing.assert_allclose(values, [3., 4.])
+    assert len(pipe.sent[-1][1]) == 1
+
+
+def test_cache_is_bounded():
+    pipe = CountingPipe()
+    interface = _process_interface.FittingInterface(Parser(), 0, None, 2)
+    for point in ((1., 1.), (2., 2.), (3., 3.), (1., 1.)):
+        interface.run([pipe], point)
+    assert len(pipe.sent) == 4
+
+
+def test_cache_file_is_replayed(tmpdir):
+    location = str(tmpdir.join("evaluations.jsonl"))
+    first = _process_interface.FittingInterface(
+        Parser(), 0, cache_file=location
+    )
+    first.run([CountingPipe()], (.1, 1e-17))
+    first.close()
+
+    pipe = CountingPipe()
+    second = _process_interface.FittingInterface(
+        Parser(), 0, cache_file=location
+    )
+    assert second.run([pipe], (.1, 1e-17)) == .1 + 1e-17
+    assert pipe.sent == []
+    second.close()
+
+
+def test_cache_file_of_another_fit_is_not_replayed(tmpdir, caplog):
+    caplog.set_level(logging.WARNING)
+    location = str(tmpdir.join("evaluations.jsonl"))
+    first = _process_interface.FittingInterface(
+        Parser(), 0, cache_file=location, fingerprint="first"
+    )
+    first.run([CountingPipe()], (1., 2.))
+    first.close()
+
+    pipe = CountingPipe()
+    second = _process_interface.FittingInterface(
+        Parser(), 0, cache_file=location, fingerprint="second"
+    )
+    assert second.run([pipe], (1., 2.)) == 3.
+    assert len(pipe.sent) == 1
+    second.close()
+    assert "won't be replayed" in caplog.text
+
+    with open(location) as stream:
+        lines = stream.readlines()
+    assert json.loads(lines[0]) == {"fingerprint": "second"}
+    assert len(lines) == 2
+
+
+def test_fingerprint_changes_with_the_data():
+    data = {"data": numpy.arange(10.), "qfactor": 1}
+    same = {"data": numpy.arange(10.), "qfactor": 1}
+    changed = {"data": numpy.arange(10.) + 1, "qfactor": 1}
+
+    def fingerprint(the_data, name="log-likelihood"):
+        return _process_interface.fingerprint(name, the_data, [numpy.sum])
+
+    assert fingerprint(data) == fingerprint(same)
+    assert fingerprint(data) != fingerprint(changed)
+    assert fingerprint(data) != fingerprint(data, "chi-squared")
 
 
-def test_full_output(output_thread):
-    output_thread.start(1.2233)
-    time.sleep(2)
-    output_thread.stop()
+def test_fingerprint_of_lazy_data(tmpdir):
+    location = tmpdir.join("data.csv")
+    location.write("x\n1\n")
+    lazy = {
+        "data": str(location),
+        "qfactor": kernel.FileColumn(str(location), "x")
+    }
+    before = _process_interface.fingerprint("log-likelihood", lazy, [None])
+    location.write("x\n1\n2\n")
+    after = _process_interface.fingerprint("log-likelihood", lazy, [None])
+    assert before != after
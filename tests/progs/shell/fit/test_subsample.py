@@ -0,0 +1,124 @@
+import numpy
+import pytest
+
+from PyPWA.builtin_plugins.process import foreman
+from PyPWA.libs.interfaces import kernel
+from PyPWA.libs.interfaces import optimizers
+from PyPWA.progs.shell.fit import _process_interface
+from PyPWA.progs.shell.fit import _subsample
+
+DATA = {
+    "data": numpy.arange(1000.),
+    "qfactor": numpy.arange(1000.) * 2,
+    "monte_carlo": numpy.arange(300.),
+    "binned": 1.
+}
+
+
+@pytest.mark.parametrize("fractions, stages", [
+    (None, [1.]),
+    ([.25, .05, 1, 0], [.05, .25, 1.]),
+    ([.5, .5], [.5, 1.]),
+    ([.3, .2, .75], [.2, 1. / 3, 1.])
+])
+def test_stages_end_on_the_full_data(fractions, stages):
+    assert _subsample.get_stages(fractions) == stages
+
+
+class Parser(optimizers.OptimizerOptionParser):
+
+    def convert(self, *args):
+        return {"a": args[0][0][0]}
+
+
+class SumKernel(kernel.Kernel):
+
+    def __init__(self):
+        self.data = None  # type: numpy.ndarray
+        self.monte_carlo = None  # type: numpy.ndarray
+
+    def setup(self):
+        pass
+
+    def process(self, data=False):
+        return data["a"] * (len(self.data) + len(self.monte_carlo))
+
+
+@pytest.fixture(params=["static", "dynamic"])
+def interfaces(request):
+    processing_interface = _process_interface.FittingInterface(Parser(), 0)
+    process_builder = foreman.CalculationForeman(
+        2, scheduling=request.param, inline="never"
+    )
+    data = dict(DATA)
+    data.pop("binned")
+    process_builder.main_options(
+        data, _subsample.SubsampleKernel(SumKernel()),
+        processing_interface
+    )
+    interface = process_builder.fetch_interface()
+    yield interface, processing_interface
+    interface.stop()
+    process_builder.close()
+
+
+def test_full_data_is_unchanged(interfaces):
+    interface, processing_interface = interfaces
+    assert interface.run(2.) == 2 * 1300
+
+
+def test_subsample_is_scaled_to_the_full_data(interfaces):
+    interface, processing_interface = interfaces
+    processing_interface.fraction = .1
+    assert interface.run(2.) == pytest.approx(2 * 1300, rel=.05)
+    processing_interface.fraction = 1.
+    assert interface.run(2.) == 2 * 1300
+
+
+def test_subsample_uses_fewer_events():
+    sum_kernel = SumKernel()
+    wrapper = _subsample.SubsampleKernel(sum_kernel)
+    wrapper.data = DATA["data"]
+    wrapper.monte_carlo = DATA["monte_carlo"]
+    wrapper.setup()
+    wrapper.process(_subsample.Subsample(.05, {"a": 1.}))
+    assert len(sum_kernel.data) == 50
+    assert len(sum_kernel.monte_carlo) == 15
+
+
+def test_subsample_is_a_view_across_the_whole_data():
+    sum_kernel = SumKernel()
+    wrapper = _subsample.SubsampleKernel(sum_kernel)
+    wrapper.data = DATA["data"]
+    wrapper.monte_carlo = DATA["monte_carlo"]
+    wrapper.setup()
+    assert wrapper.process(_subsample.Subsample(.25, {"a": 1.})) == 1300
+    assert sum_kernel.data.base is DATA["data"]
+    numpy.testing.assert_array_equal(
+        sum_kernel.data, numpy.arange(0, 1000., 4)
+    )
+
+
+class Pipe(object):
+
+    def __init__(self):
+        self.sent = []
+
+    def send(self, value):
+        self.sent.append(value)
+
+    def recv(self):
+        value = self.sent[-1]
+        if isinstance(value, _subsample.Subsample):
+            return value.parameters["a"] + value.fraction
+        return value["a"]
+
+
+def test_subsample_values_are_not_cached():
+    pipe = Pipe()
+    interface = _process_interface.FittingInterface(Parser(), 0)
+    interface.fraction = .5
+    assert interface.run([pipe], (1.,)) == 1.5
+    interface.fraction = 1.
+    assert interface.run([pipe], (1.,)) == 1.
+    assert len(pipe.sent) == 2
@@ -4,6 +4,8 @@ import numpy
 import pytest
 
 from PyPWA.builtin_plugins.data import memory
+from PyPWA.builtin_plugins.process import foreman
+from PyPWA.libs.interfaces import kernel
 from PyPWA.progs.shell import loaders
 
 
@@ -142,3 +144,76 @@ def test_length_of_all_data_match_with_internal(data_with_internal_names):
     errors_len = len(data_with_internal_names.data)
     data = [data_len, qfactor_len, binned_len, measurement_len, errors_len]
     assert len(set(data)) == 1
+
+
+"""
+Test with lazy loading.
+"""
+
+class RefusingParser(object):
+
+    def parse(self, file_location):
+        raise AssertionError("%s was parsed!" % file_location)
+
+
+class ColumnKernel(kernel.Kernel):
+
+    def __init__(self):
+        self.data = None  # type: numpy.ndarray
+        self.qfactor = None  # type: numpy.ndarray
+        self.binned = None  # type: numpy.ndarray
+
+    def setup(self):
+        pass
+
+    def process(self, data=False):
+        return numpy.array([
+            numpy.sum(self.data["qf"]), numpy.sum(self.qfactor),
+            numpy.sum(self.binned), os.getpid()
+        ])
+
+
+class ColumnInterface(kernel.KernelInterface):
+    IS_DUPLEX = True
+
+    def run(self, connections, arguments):
+        for connection in connections:
+            connection.send(arguments[0])
+        return [connection.recv() for connection in connections]
+
+
+@pytest.fixture
+def lazy_data():
+    return loaders.DataLoading(
+        RefusingParser(), INTERNAL_NAMES, INTERNAL_NAMES_DICT,
+        monte_carlo=MONTE_CARLO, lazy=True
+    )
+
+
+def test_lazy_files_are_not_parsed(lazy_data):
+    assert lazy_data.data == INTERNAL_NAMES
+    assert lazy_data.monte_carlo == MONTE_CARLO
+    assert lazy_data.qfactor.location == INTERNAL_NAMES
+    assert lazy_data.qfactor.column == "qf"
+
+
+def test_processes_load_the_lazy_columns(lazy_data):
+    parsed = PARSER.parse(INTERNAL_NAMES)
+    process_builder = foreman.CalculationForeman(2, lazy_loading=True)
+    process_builder.main_options(
+        {
+            "data": lazy_data.data, "qfactor": lazy_data.qfactor,
+            "binned": lazy_data.binned
+        },
+        ColumnKernel(), ColumnInterface()
+    )
+    interface = process_builder.fetch_interface()
+    results = numpy.array(interface.run("go"))
+    interface.stop()
+    process_builder.close()
+
+    assert all(pid != os.getpid() for pid in results[:, 3])
+    totals = results[:, :3].sum(axis=0)
+    numpy.testing.assert_approx_equal(totals[0], parsed["qf"].sum())
+    numpy.testing.assert_approx_equal(totals[1], parsed["qf"].sum())
+    numpy.testing.assert_approx_equal(totals[2], parsed["bn"].sum())
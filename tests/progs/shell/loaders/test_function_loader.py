@@ -48,3 +48,25 @@ def function_without_math_or_setup():
 def test_function_without_setup_is_none(function_without_math_or_setup):
     setup = function_without_math_or_setup.setup
     assert isinstance(setup(), type(None))
+
+
+"""
+Test optional gradient
+"""
+
+def test_gradient_is_none_without_name(function_without_math):
+    assert function_without_math.gradient is None
+
+
+def test_gradient_is_loaded_by_name():
+    loader = loaders.FunctionLoader(
+        FUNCTIONS_FOR_TEST, "processing", "setup", "processing"
+    )
+    assert loader.gradient(1, 1)
+
+
+def test_missing_gradient_is_none():
+    loader = loaders.FunctionLoader(
+        FUNCTIONS_FOR_TEST, "processing", "setup", "A dirty lie"
+    )
+    assert loader.gradient is None
@@ -0,0 +1,116 @@
+import threading
+
+import numpy
+import pytest
+
+from PyPWA.progs.shell import terms
+
+EVENTS = numpy.random.rand(1000)
+CALLS = []
+
+
+@terms.term("mass")
+def mass_term(the_array, the_params):
+    CALLS.append("mass")
+    return the_array * the_params["mass"]
+
+
+@terms.term("width")
+def width_term(the_array, the_params):
+    CALLS.append("width")
+    return the_array + the_params["width"]
+
+
+def processing(the_array, the_params):
+    return mass_term(the_array, the_params) * width_term(the_array, the_params)
+
+
+@pytest.fixture(autouse=True)
+def clean_cache():
+    terms.cache().clear()
+    del CALLS[:]
+    yield
+    terms.set_memory_budget(256)
+    terms.cache().clear()
+
+
+def test_only_changed_terms_are_calculated():
+    first = processing(EVENTS, {"mass": 1., "width": 2.})
+    second = processing(EVENTS, {"mass": 1., "width": 3.})
+    assert CALLS == ["mass", "width", "width"]
+    numpy.testing.assert_allclose(first, EVENTS * (EVENTS + 2.))
+    numpy.testing.assert_allclose(second, EVENTS * (EVENTS + 3.))
+
+
+def test_earlier_points_are_remembered():
+    for width in (2., 3., 2.):
+        processing(EVENTS, {"mass": 1., "width": width})
+    assert CALLS.count("width") == 2
+    assert terms.cache().hits == 3
+
+
+def test_new_events_are_calculated():
+    processing(EVENTS, {"mass": 1., "width": 2.})
+    processing(EVENTS[:500], {"mass": 1., "width": 2.})
+    assert CALLS == ["mass", "width", "mass", "width"]
+
+
+def test_results_are_read_only():
+    result = mass_term(EVENTS, {"mass": 1.})
+    with pytest.raises(ValueError):
+        result[0] = 5
+
+
+def test_least_recently_used_is_dropped():
+    terms.set_memory_budget(2.5 * EVENTS.nbytes / 1024.**2)
+    for mass in (1., 2., 3.):
+        mass_term(EVENTS, {"mass": mass})
+    assert len(terms.cache()) == 2
+    assert terms.cache().size <= 2.5 * EVENTS.nbytes
+
+    mass_term(EVENTS, {"mass": 3.})
+    mass_term(EVENTS, {"mass": 1.})
+    assert CALLS == ["mass", "mass", "mass", "mass"]
+
+
+def test_zero_budget_disables_the_cache():
+    terms.set_memory_budget(0)
+    mass_term(EVENTS, {"mass": 1.})
+    mass_term(EVENTS, {"mass": 1.})
+    assert CALLS == ["mass", "mass"]
+
+
+def test_unnamed_parameters_are_not_cached():
+    parameters = numpy.array([1., 2.])
+    terms.term("mass")(lambda events, values: CALLS.append(1))(
+        EVENTS, parameters
+    )
+    assert len(terms.cache()) == 0
+
+
+def test_cache_is_shared_by_threads():
+    cache = terms.TermCache(20 * EVENTS.nbytes)
+    errors = []
+
+    def evaluate(offset):
+        try:
+            for index in range(500):
+                key = (offset + index) % 40
+                value = cache.get(key, EVENTS, lambda: EVENTS * key)
+                numpy.testing.assert_array_equal(value, EVENTS * key)
+        except Exception as error:
+            errors.append(error)
+
+    threads = [
+        threading.Thread(target=evaluate, args=(offset,))
+        for offset in range(8)
+    ]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert not errors
+    assert len(cache) <= 20
+    assert cache.size == len(cache) * EVENTS.nbytes
+    assert cache.hits + cache.misses == 8 * 500